@@ -150,7 +150,7 @@ class _VideoCallScreenState extends ConsumerState<VideoCallScreen> {
     
     _signalingActive = true;
     final service = ref.read(consultationServiceProvider);
-    DateTime? lastPollTime;
+    int lastSeq = 0;
     int consecutiveErrors = 0;
     
     // Poll every 500ms for new signals
@@ -158,13 +158,13 @@ class _VideoCallScreenState extends ConsumerState<VideoCallScreen> {
       try {
         final signals = await service.pollSignals(
           widget.consultationId!,
-          since: lastPollTime,
+          sinceSeq: lastSeq,
         );
         
         consecutiveErrors = 0; // Reset on success
         
         for (final signal in signals) {
-          lastPollTime = signal.timestamp;
+          lastSeq = signal.seq;
           await _processSignal(signal);
         }
       } catch (e) {
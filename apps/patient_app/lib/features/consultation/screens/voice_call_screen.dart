@@ -124,7 +124,7 @@ class _VoiceCallScreenState extends ConsumerState<VoiceCallScreen> {
     
     _signalingActive = true;
     final service = ref.read(consultationServiceProvider);
-    DateTime? lastPollTime;
+    int lastSeq = 0;
     int consecutiveErrors = 0;
     
     // Poll every 500ms for new signals
@@ -132,13 +132,13 @@ class _VoiceCallScreenState extends ConsumerState<VoiceCallScreen> {
       try {
         final signals = await service.pollSignals(
           widget.consultationId!,
-          since: lastPollTime,
+          sinceSeq: lastSeq,
         );
         
         consecutiveErrors = 0;
         
         for (final signal in signals) {
-          lastPollTime = signal.timestamp;
+          lastSeq = signal.seq;
           await _processSignal(signal);
         }
       } catch (e) {
@@ -0,0 +1,134 @@
+"""Add composite and partial indexes for hot queries
+
+Revision ID: 005_hot_path_indexes
+Revises: 004_document_requests_consultations
+Create Date: 2026-10-18
+
+Adds indexes matching the filters and sort keys of queue, NFC, chat,
+check-in and listing queries. Superseded single-column/prefix indexes are
+dropped. Indexes are built CONCURRENTLY so a live tickets table keeps
+accepting writes during the upgrade.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "005_hot_path_indexes"
+down_revision = "004_document_requests_consultations"
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_tickets_queue_status_created", "tickets", ["queue_id", "status", "created_at"]),
+    ("ix_tickets_queue_created", "tickets", ["queue_id", "created_at", "id"]),
+    ("ix_tickets_created_by_status", "tickets", ["created_by_id", "status"]),
+    ("ix_tickets_called_at", "tickets", ["called_at"]),
+    ("ix_check_in_events_practice_time", "check_in_events", ["practice_id", "checked_in_at"]),
+    (
+        "ix_document_requests_practice_created",
+        "document_requests",
+        ["practice_id", "created_at", "id"],
+    ),
+    (
+        "ix_patient_consultations_patient_created",
+        "patient_consultations",
+        ["patient_id", "created_at", "id"],
+    ),
+    (
+        "ix_patient_consultations_doctor_scheduled",
+        "patient_consultations",
+        ["doctor_id", "scheduled_at"],
+    ),
+    ("ix_patient_consultations_created", "patient_consultations", ["created_at", "id"]),
+    (
+        "ix_patient_consultation_messages_consultation_created",
+        "patient_consultation_messages",
+        ["consultation_id", "created_at", "id"],
+    ),
+]
+
+# Prefixes of the new composite indexes
+SUPERSEDED = [
+    ("ix_tickets_queue_status", "tickets", ["queue_id", "status"]),
+    ("ix_check_in_events_practice", "check_in_events", ["practice_id"]),
+]
+
+
+def _waiting_label() -> str:
+    """Return the ticketstatus label used for waiting tickets in this database."""
+    label = op.get_bind().execute(
+        sa.text(
+            "SELECT e.enumlabel FROM pg_enum e "
+            "JOIN pg_type t ON t.oid = e.enumtypid "
+            "WHERE t.typname = 'ticketstatus' AND lower(e.enumlabel) = 'waiting'"
+        )
+    ).scalar()
+    return label or "waiting"
+
+
+def upgrade() -> None:
+    """Create hot-path indexes."""
+    waiting = _waiting_label()
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+        # Partial indexes stay small: only open tickets / active queues
+        op.create_index(
+            "ix_tickets_queue_waiting",
+            "tickets",
+            ["queue_id", "created_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text(f"status = '{waiting}'"),
+        )
+        op.create_index(
+            "ix_queues_practice_active",
+            "queues",
+            ["practice_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("is_active"),
+        )
+
+        for name, table, _columns in SUPERSEDED:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Drop hot-path indexes and restore the previous ones."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in SUPERSEDED:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+        for name, table in [
+            ("ix_queues_practice_active", "queues"),
+            ("ix_tickets_queue_waiting", "tickets"),
+        ] + [(name, table) for name, table, _columns in INDEXES]:
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True,
+            )
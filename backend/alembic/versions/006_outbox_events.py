@@ -0,0 +1,57 @@
+"""Add transactional outbox for ticket side effects
+
+Revision ID: 006_outbox_events
+Revises: 005_hot_path_indexes
+Create Date: 2026-10-18
+
+Ticket changes write their WebSocket/MQTT/push/LED side effects to
+outbox_events in the same transaction; a background dispatcher delivers
+and deletes them.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "006_outbox_events"
+down_revision = "005_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create outbox_events table."""
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Uuid(as_uuid=True), primary_key=True),
+        sa.Column("ticket_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("queue_id", sa.Uuid(as_uuid=True), nullable=False),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("payload", sa.Text, nullable=False),
+        sa.Column("channels", sa.String(100), nullable=False),
+        sa.Column("attempts", sa.Integer, server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column(
+            "available_at", sa.DateTime, server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("failed_at", sa.DateTime, nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime, server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_outbox_events_ticket_created", "outbox_events", ["ticket_id", "created_at"]
+    )
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["available_at"],
+        postgresql_where=sa.text("failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Drop outbox_events table."""
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_ticket_created", table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,101 @@
+"""Add hourly rollup tables for analytics
+
+Revision ID: 007_analytics_rollups
+Revises: 006_outbox_events
+Create Date: 2026-10-18
+
+Closed days of tickets and check-in events are rolled up per queue/practice
+and hour; analytics reads the rollups and only queries the raw tables for
+days after the high-water mark in analytics_rollup_state (found via the
+new tickets.created_at index). Fill them with
+``python -m app.services.analytics_rollup`` after upgrading.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = "007_analytics_rollups"
+down_revision = "006_outbox_events"
+branch_labels = None
+depends_on = None
+
+
+def _count(name: str) -> sa.Column:
+    """Non-null counter column."""
+    return sa.Column(name, sa.Integer, server_default="0", nullable=False)
+
+
+def upgrade() -> None:
+    """Create rollup tables and the tickets.created_at index."""
+    # Type created with check_in_events in 002
+    check_in_method_enum = postgresql.ENUM(
+        "nfc",
+        "qr",
+        "manual",
+        "kiosk",
+        "online",
+        name="checkinmethod",
+        create_type=False,
+    )
+
+    op.create_table(
+        "ticket_hourly_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("queue_id", sa.Uuid(as_uuid=True), primary_key=True),
+        sa.Column("hour", sa.Integer, primary_key=True),
+        sa.Column("practice_id", sa.Uuid(as_uuid=True), nullable=False),
+        _count("total"),
+        _count("waiting"),
+        _count("called"),
+        _count("in_progress"),
+        _count("completed"),
+        _count("cancelled"),
+        _count("no_show"),
+        _count("waited"),
+        sa.Column("wait_minutes_sum", sa.Float, server_default="0", nullable=False),
+        sa.Column("wait_minutes_min", sa.Float, nullable=True),
+        sa.Column("wait_minutes_max", sa.Float, nullable=True),
+    )
+    op.create_index(
+        "ix_ticket_hourly_rollups_practice_day",
+        "ticket_hourly_rollups",
+        ["practice_id", "day"],
+    )
+    op.create_table(
+        "check_in_hourly_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("practice_id", sa.Uuid(as_uuid=True), primary_key=True),
+        sa.Column("hour", sa.Integer, primary_key=True),
+        sa.Column("check_in_method", check_in_method_enum, primary_key=True),
+        _count("count"),
+    )
+    op.create_table(
+        "analytics_rollup_state",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("rolled_up_through", sa.Date, nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tickets_created_at",
+            "tickets",
+            ["created_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop rollup tables and the tickets.created_at index."""
+    op.drop_index("ix_tickets_created_at", table_name="tickets")
+    op.drop_table("analytics_rollup_state")
+    op.drop_table("check_in_hourly_rollups")
+    op.drop_index(
+        "ix_ticket_hourly_rollups_practice_day", table_name="ticket_hourly_rollups"
+    )
+    op.drop_table("ticket_hourly_rollups")
@@ -0,0 +1,51 @@
+"""Add wait/service time sketches
+
+Revision ID: 008_wait_sketches
+Revises: 007_analytics_rollups
+Create Date: 2026-10-18
+
+Mergeable quantile sketches (DDSketch) of wait and service minutes: per
+queue and hour in ticket_hourly_sketches for closed days, and per worker in
+live_queue_sketches for the /analytics/live endpoints. Rebuild the rollups
+with ``python -m app.services.analytics_rollup`` to fill the sketches of
+closed days.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "008_wait_sketches"
+down_revision = "007_analytics_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the sketch tables."""
+    op.create_table(
+        "ticket_hourly_sketches",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("queue_id", sa.Uuid(as_uuid=True), primary_key=True),
+        sa.Column("hour", sa.Integer, primary_key=True),
+        sa.Column("wait_sketch", sa.LargeBinary, nullable=False),
+        sa.Column("service_sketch", sa.LargeBinary, nullable=True),
+    )
+    op.create_table(
+        "live_queue_sketches",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("hour", sa.Integer, primary_key=True),
+        sa.Column("queue_id", sa.Uuid(as_uuid=True), primary_key=True),
+        sa.Column("source", sa.String(32), primary_key=True),
+        sa.Column("wait_sketch", sa.LargeBinary, nullable=True),
+        sa.Column("service_sketch", sa.LargeBinary, nullable=True),
+        sa.Column(
+            "updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop the sketch tables."""
+    op.drop_table("live_queue_sketches")
+    op.drop_table("ticket_hourly_sketches")
@@ -0,0 +1,35 @@
+"""Add completed-ticket wait sketches to the hourly sketches
+
+Revision ID: 009_completed_wait_sketches
+Revises: 008_wait_sketches
+Create Date: 2026-10-18
+
+/analytics/wait-times reads closed days from ticket_hourly_sketches instead
+of scanning the raw tickets; it reports completed tickets only, so the
+rollup job keeps a sketch of their waits per queue and hour. The rollup
+high-water mark is dropped so the next rollup run rebuilds every closed day
+with the new column; until then the reports read the raw tables.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = "009_completed_wait_sketches"
+down_revision = "008_wait_sketches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the column and reset the rollup high-water mark."""
+    op.add_column(
+        "ticket_hourly_sketches",
+        sa.Column("completed_wait_sketch", sa.LargeBinary, nullable=True),
+    )
+    op.execute("DELETE FROM analytics_rollup_state WHERE name = 'hourly'")
+
+
+def downgrade() -> None:
+    """Drop the column."""
+    op.drop_column("ticket_hourly_sketches", "completed_wait_sketch")
@@ -5,7 +5,7 @@ Security: All secrets loaded from environment variables (Fail Fast).
 """
 
 from functools import lru_cache
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -64,6 +64,50 @@ class Settings(BaseSettings):
     # Request size limits (MB)
     MAX_REQUEST_SIZE_MB: int = 5
 
+    # Queue state cache reconciliation interval (seconds, 0 disables); also
+    # how long other workers' changes may take to show without a backplane
+    QUEUE_CACHE_RECONCILE_SECONDS: int = 60
+
+    # Public queue summary response cache TTL (seconds, 0 disables)
+    PUBLIC_SUMMARY_CACHE_TTL_SECONDS: int = 30
+
+    # Wait time estimator (EWMA smoothing, startup replay window,
+    # seconds between reads of new calls/logs, 0 disables)
+    WAIT_ESTIMATOR_ALPHA: float = 0.2
+    WAIT_ESTIMATOR_WINDOW_DAYS: int = 14
+    WAIT_ESTIMATOR_SYNC_SECONDS: float = 15.0
+
+    # Outbox dispatcher (ticket side effects to WebSocket/MQTT/push/LED)
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_SECONDS: float = 1.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+
+    # Analytics rollups of closed days (seconds between runs, 0 disables;
+    # closed days re-rolled on every run for late ticket changes)
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: int = 900
+    ANALYTICS_ROLLUP_SETTLE_DAYS: int = 1
+    # Seconds between flushes of the live wait/service sketches (0 disables)
+    ANALYTICS_SKETCH_FLUSH_SECONDS: float = 10.0
+    # Cached rolled-up parts of analytics reports (entries, 0 disables)
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 512
+
+    # WebSocket per-client send queue (messages) and what to do when it is full
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_OVERFLOW_POLICY: Literal["drop_oldest", "coalesce", "disconnect"] = "coalesce"
+    # Wait time / LED broadcasts within this window collapse into one (0 disables)
+    WS_COALESCE_WINDOW_MS: int = 200
+    # Heartbeat interval and idle disconnect (0 disables) in seconds
+    WS_HEARTBEAT_SECONDS: int = 30
+    WS_IDLE_TIMEOUT_SECONDS: int = 90
+    # Sequenced events kept per practice for replay on reconnect (?since_seq=)
+    WS_REPLAY_BUFFER_SIZE: int = 512
+
+    # Share WebSocket broadcasts between worker processes ("none" = single process)
+    WS_BACKPLANE: Literal["none", "postgres", "mqtt"] = "none"
+    WS_BACKPLANE_CHANNEL: str = "sanad_ws"
+    # Open Server-Sent Events streams per client IP (0 disables)
+    SSE_MAX_STREAMS_PER_CLIENT: int = 20
+
     # Security headers
     ENABLE_HSTS: bool = True
 
@@ -73,6 +117,9 @@ class Settings(BaseSettings):
     TURN_SERVER_USERNAME: str | None = None
     TURN_SERVER_CREDENTIAL: str | None = None
     TURN_SERVER_REALM: str = "sanad.de"
+    # Signaling: signals kept per consultation room and their lifetime
+    WEBRTC_SIGNALS_PER_ROOM: int = 200
+    WEBRTC_SIGNAL_TTL_SECONDS: int = 300
 
     # E2E Encryption (Option B: Client-side with searchable index)
     E2E_ENCRYPTION_ENABLED: bool = True
@@ -4,7 +4,8 @@ Database connection and session management.
 Uses async SQLAlchemy for non-blocking database operations.
 """
 
-from typing import AsyncGenerator
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
@@ -43,6 +44,21 @@ class Base(DeclarativeBase):
     pass
 
 
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Normalize a datetime to naive UTC, as stored in the timestamp columns.
+
+    Args:
+        value: Aware or naive (already UTC) datetime, or None.
+
+    Returns:
+        Optional[datetime]: Naive UTC datetime (None stays None).
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting database sessions.
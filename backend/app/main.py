@@ -4,6 +4,7 @@ Sanad Backend API - Main Application Entry Point.
 A medical practice management system API built with FastAPI.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 import logging
@@ -17,7 +18,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.config import get_settings
 from sqlalchemy import text
 
-from app.database import engine, Base
+from app.database import async_session_maker, engine, Base
 from app.routers import (
     auth,
     users,
@@ -28,6 +29,7 @@ from app.routers import (
     nfc,
     led,
     websocket,
+    events,
     push,
     analytics,
     document_requests,
@@ -47,6 +49,7 @@ from app.routers import (
 )
 from app.middleware import (
     CorrelationIdMiddleware,
+    EventStreamMiddleware,
     RequestLoggingMiddleware,
     PrometheusMiddleware,
     RateLimitMiddleware,
@@ -58,6 +61,18 @@ from app.middleware import (
     record_error,
     metrics_endpoint,
 )
+from app.services.analytics_rollup import run_rollup_loop
+from app.services.analytics_sketch import run_sketch_flush_loop
+from app.services.outbox import run_outbox_dispatcher
+from app.services.queue_state_cache import (
+    get_queue_state_cache,
+    run_reconciliation_loop,
+)
+from app.services.wait_time_estimator import (
+    get_wait_time_estimator,
+    run_estimator_sync_loop,
+)
+from app.services.ws_backplane import create_backplane
 
 
 settings = get_settings()
@@ -100,12 +115,76 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Startup
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    background_tasks: list[asyncio.Task] = []
+    backplane = None
     if not settings.TESTING:
         await init_db()
         await seed_demo_data()
+        try:
+            await get_wait_time_estimator().rebuild(
+                async_session_maker, settings.WAIT_ESTIMATOR_WINDOW_DAYS
+            )
+        except Exception as e:
+            logger.warning(f"Wartezeit-Schätzer nicht geladen: {e}")
+        if settings.WAIT_ESTIMATOR_SYNC_SECONDS > 0:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_estimator_sync_loop(
+                        async_session_maker, settings.WAIT_ESTIMATOR_SYNC_SECONDS
+                    )
+                )
+            )
+        if settings.QUEUE_CACHE_RECONCILE_SECONDS > 0:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_reconciliation_loop(
+                        async_session_maker, settings.QUEUE_CACHE_RECONCILE_SECONDS
+                    )
+                )
+            )
+        background_tasks.append(
+            asyncio.create_task(
+                run_outbox_dispatcher(async_session_maker, settings.OUTBOX_POLL_SECONDS)
+            )
+        )
+        if settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS > 0:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_rollup_loop(
+                        async_session_maker,
+                        settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS,
+                        settings.ANALYTICS_ROLLUP_SETTLE_DAYS,
+                    )
+                )
+            )
+        if settings.ANALYTICS_SKETCH_FLUSH_SECONDS > 0:
+            background_tasks.append(
+                asyncio.create_task(
+                    run_sketch_flush_loop(
+                        async_session_maker, settings.ANALYTICS_SKETCH_FLUSH_SECONDS
+                    )
+                )
+            )
+        try:
+            backplane = create_backplane(settings)
+            if backplane is not None:
+                ws_manager = websocket.get_connection_manager()
+                await backplane.start(ws_manager.deliver_remote)
+                ws_manager.attach_backplane(backplane)
+                get_queue_state_cache().attach_backplane(backplane)
+        except Exception as e:
+            # Broadcasts then reach this worker's clients only
+            logger.warning(f"WebSocket-Backplane nicht gestartet: {e}")
+            backplane = None
     yield
     # Shutdown
     logger.info(f"Shutting down {settings.APP_NAME}")
+    for task in background_tasks:
+        task.cancel()
+    if backplane is not None:
+        websocket.get_connection_manager().attach_backplane(None)
+        get_queue_state_cache().attach_backplane(None)
+        await backplane.stop()
 
 
 app = FastAPI(
@@ -222,8 +301,7 @@ async def internal_exception_handler(
     )
 
 # CORS Middleware - includes Netlify domains
-app.add_middleware(
-    CORSMiddleware,
+cors_options = dict(
     allow_origins=settings.all_cors_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
@@ -238,6 +316,7 @@ app.add_middleware(
         "x-device-secret",
     ],
 )
+app.add_middleware(CORSMiddleware, **cors_options)
 
 # Observability Middleware (order matters: first added = outermost)
 app.add_middleware(SecurityHeadersMiddleware, enable_hsts=settings.ENABLE_HSTS)
@@ -252,6 +331,20 @@ app.add_middleware(CorrelationIdMiddleware)
 if PROMETHEUS_AVAILABLE:
     app.add_middleware(PrometheusMiddleware)
 
+# Server-Sent Events streams bypass the per-request middleware above
+# (added last = outermost), which caps them per client and adds the
+# security headers itself; they are still listed in the API docs below
+stream_app = FastAPI(openapi_url=None, docs_url=None, redoc_url=None)
+stream_app.include_router(events.router, prefix="/api/v1")
+stream_app.add_middleware(CORSMiddleware, **cors_options)
+app.add_middleware(
+    EventStreamMiddleware,
+    stream_app=stream_app,
+    path_prefix="/api/v1/events/",
+    max_streams_per_client=settings.SSE_MAX_STREAMS_PER_CLIENT,
+    enable_hsts=settings.ENABLE_HSTS,
+)
+
 # Include Routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
@@ -276,6 +369,7 @@ app.include_router(
 app.include_router(nfc.router, prefix="/api/v1", tags=["NFC"])
 app.include_router(led.router, prefix="/api/v1", tags=["LED & Wayfinding"])
 app.include_router(websocket.router, prefix="/api/v1", tags=["WebSocket"])
+app.include_router(events.router, prefix="/api/v1", tags=["Events"])
 
 # Push Notifications
 app.include_router(push.router, prefix="/api/v1", tags=["Push Notifications"])
@@ -13,8 +13,18 @@ from app.middleware.observability import (
     record_ticket_created,
     record_error,
     record_push_notification,
+    record_queue_cache_lookup,
+    record_queue_cache_drift,
+    record_outbox_dispatch,
+    record_outbox_failure,
+    record_ws_fanout,
+    record_ws_dropped,
+    record_ws_backplane,
+    record_ws_resume,
+    record_analytics_cache_lookup,
     metrics_endpoint,
 )
+from app.middleware.event_stream import EventStreamMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
@@ -174,8 +184,18 @@ __all__ = [
     "record_ticket_created",
     "record_error",
     "record_push_notification",
+    "record_queue_cache_lookup",
+    "record_queue_cache_drift",
+    "record_outbox_dispatch",
+    "record_outbox_failure",
+    "record_ws_fanout",
+    "record_ws_dropped",
+    "record_ws_backplane",
+    "record_ws_resume",
+    "record_analytics_cache_lookup",
     "metrics_endpoint",
     "RateLimitMiddleware",
     "SecurityHeadersMiddleware",
     "RequestSizeLimitMiddleware",
+    "EventStreamMiddleware",
 ]
@@ -0,0 +1,121 @@
+"""
+Event stream routing middleware for Sanad Backend.
+"""
+
+from collections import defaultdict
+from typing import DefaultDict
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.observability import record_error
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.security_headers import security_headers
+
+# Retry-After of streams rejected for the per-client limit (seconds)
+STREAM_LIMIT_RETRY_SECONDS = 30
+
+
+class EventStreamMiddleware:
+    """
+    Serve long-lived event streams outside the per-request middleware stack.
+
+    Every ``BaseHTTPMiddleware`` layer keeps a task group, memory streams and
+    events alive for as long as its response streams, which multiplies the
+    memory of an idle Server-Sent Events connection several times over, and
+    an hour-long stream would count as a slow request. Requests under
+    ``path_prefix`` go straight to ``stream_app``; everything else continues
+    down the stack. Add it last so it is the outermost middleware.
+
+    What the skipped stack would do for streams is done here with plain
+    ASGI: open streams are capped per client (IP, as in
+    ``RateLimitMiddleware``) and responses get the security headers.
+
+    Args:
+        app: ASGI app instance.
+        stream_app: ASGI app serving the streams (with its own CORS handling).
+        path_prefix: Path prefix of the stream endpoints.
+        max_streams_per_client: Open streams allowed per client (0 disables).
+        enable_hsts: Add Strict-Transport-Security to stream responses.
+
+    Returns:
+        None.
+
+    Raises:
+        None.
+
+    Security Implications:
+        - ``stream_app`` must only serve read-only endpoints.
+        - The stream cap is process-local, like the rate limiter.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        stream_app: ASGIApp,
+        path_prefix: str,
+        max_streams_per_client: int = 0,
+        enable_hsts: bool = False,
+    ) -> None:
+        self.app = app
+        self.stream_app = stream_app
+        self.path_prefix = path_prefix
+        self.max_streams_per_client = max(int(max_streams_per_client), 0)
+        self._headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in security_headers(enable_hsts).items()
+        ]
+        self._open: DefaultDict[str, int] = defaultdict(int)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Route stream requests to ``stream_app``.
+
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive channel.
+            send: ASGI send channel.
+
+        Returns:
+            None.
+
+        Raises:
+            None.
+
+        Security Implications:
+            - Only HTTP requests under ``path_prefix`` are rerouted.
+            - Clients beyond the stream cap get 429 before a stream opens.
+        """
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                present = {name.lower() for name, _ in message.get("headers", [])}
+                message["headers"] = [
+                    *message.get("headers", []),
+                    *(header for header in self._headers if header[0] not in present),
+                ]
+            await send(message)
+
+        request = Request(scope)
+        client_key = RateLimitMiddleware._get_client_key(request)
+        if (
+            self.max_streams_per_client
+            and self._open[client_key] >= self.max_streams_per_client
+        ):
+            record_error("rate_limit", scope["path"])
+            response = RateLimitMiddleware._rate_limited_response(
+                request, STREAM_LIMIT_RETRY_SECONDS
+            )
+            await response(scope, receive, send_with_headers)
+            return
+
+        self._open[client_key] += 1
+        try:
+            await self.stream_app(scope, receive, send_with_headers)
+        finally:
+            self._open[client_key] -= 1
+            if not self._open[client_key]:
+                del self._open[client_key]
@@ -186,6 +186,67 @@ try:
         "sanad_active_tickets", "Currently active (waiting) tickets", ["queue_code"]
     )
 
+    QUEUE_CACHE_LOOKUPS = Counter(
+        "sanad_queue_cache_lookups_total",
+        "Queue state cache lookups",
+        ["result"],  # hit, miss
+    )
+
+    QUEUE_CACHE_DRIFT = Counter(
+        "sanad_queue_cache_drift_total",
+        "Queues whose cached state differed from the database on reconciliation",
+    )
+
+    OUTBOX_EVENTS = Counter(
+        "sanad_outbox_events_total",
+        "Outbox events processed by the dispatcher",
+        ["event_type", "result"],  # result=dispatched|retried|failed
+    )
+
+    OUTBOX_LAG = Histogram(
+        "sanad_outbox_dispatch_lag_seconds",
+        "Time from outbox write (commit) to delivery",
+        ["event_type"],
+        buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 30.0, 300.0],
+    )
+
+    WS_SEND_QUEUE_DEPTH = Histogram(
+        "sanad_ws_send_queue_depth",
+        "Deepest per-client WebSocket send queue after a broadcast",
+        buckets=[0, 1, 2, 5, 10, 25, 50, 100, 250, 500],
+    )
+
+    WS_DROPPED = Counter(
+        "sanad_ws_messages_dropped_total",
+        "WebSocket messages not delivered to slow clients",
+        ["reason"],  # overflow, coalesced, disconnected
+    )
+
+    WS_BACKPLANE_MESSAGES = Counter(
+        "sanad_ws_backplane_messages_total",
+        "Broadcasts exchanged with other workers over the WebSocket backplane",
+        ["backend", "result"],  # published, received, duplicate, gap, failed
+    )
+
+    WS_BACKPLANE_LAG = Histogram(
+        "sanad_ws_backplane_lag_seconds",
+        "Time from publish on one worker to local fan-out on another",
+        ["backend"],
+        buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0],
+    )
+
+    WS_RESUMES = Counter(
+        "sanad_ws_resumes_total",
+        "WebSocket reconnects with since_seq, by how the client caught up",
+        ["result"],  # replayed, snapshot
+    )
+
+    ANALYTICS_CACHE_LOOKUPS = Counter(
+        "sanad_analytics_cache_lookups_total",
+        "Analytics result cache lookups for the rolled-up part of a report",
+        ["endpoint", "result"],  # hit, shared (waited for a running build), miss
+    )
+
     class PrometheusMiddleware(BaseHTTPMiddleware):
         """Collect Prometheus metrics for each request."""
 
@@ -346,3 +407,64 @@ def record_push_notification(notification_type: str, success: bool) -> None:
         PUSH_NOTIFICATIONS.labels(
             type=notification_type, status="success" if success else "failed"
         ).inc()
+
+
+def record_queue_cache_lookup(hit: bool) -> None:
+    """Record a queue state cache lookup for metrics."""
+    if PROMETHEUS_AVAILABLE:
+        QUEUE_CACHE_LOOKUPS.labels(result="hit" if hit else "miss").inc()
+
+
+def record_queue_cache_drift(queues: int) -> None:
+    """Record queues repaired by queue state cache reconciliation."""
+    if PROMETHEUS_AVAILABLE:
+        QUEUE_CACHE_DRIFT.inc(queues)
+
+
+def record_outbox_dispatch(event_type: str, lag_seconds: float) -> None:
+    """Record a delivered outbox event and its commit-to-delivery lag."""
+    if PROMETHEUS_AVAILABLE:
+        OUTBOX_EVENTS.labels(event_type=event_type, result="dispatched").inc()
+        OUTBOX_LAG.labels(event_type=event_type).observe(lag_seconds)
+
+
+def record_outbox_failure(event_type: str, final: bool) -> None:
+    """Record an outbox delivery failure (retried, or given up if final)."""
+    if PROMETHEUS_AVAILABLE:
+        OUTBOX_EVENTS.labels(
+            event_type=event_type, result="failed" if final else "retried"
+        ).inc()
+
+
+def record_ws_fanout(deepest_queue: int) -> None:
+    """Record the deepest client send queue after a WebSocket broadcast."""
+    if PROMETHEUS_AVAILABLE:
+        WS_SEND_QUEUE_DEPTH.observe(deepest_queue)
+
+
+def record_ws_dropped(reason: str) -> None:
+    """Record a WebSocket message dropped for a slow client."""
+    if PROMETHEUS_AVAILABLE:
+        WS_DROPPED.labels(reason=reason).inc()
+
+
+def record_ws_backplane(
+    backend: str, result: str, lag_seconds: float | None = None
+) -> None:
+    """Record a WebSocket backplane message (and its cross-worker lag)."""
+    if PROMETHEUS_AVAILABLE:
+        WS_BACKPLANE_MESSAGES.labels(backend=backend, result=result).inc()
+        if lag_seconds is not None:
+            WS_BACKPLANE_LAG.labels(backend=backend).observe(lag_seconds)
+
+
+def record_ws_resume(result: str) -> None:
+    """Record how a reconnecting WebSocket client caught up."""
+    if PROMETHEUS_AVAILABLE:
+        WS_RESUMES.labels(result=result).inc()
+
+
+def record_analytics_cache_lookup(endpoint: str, result: str) -> None:
+    """Record an analytics result cache lookup (hit, shared or miss)."""
+    if PROMETHEUS_AVAILABLE:
+        ANALYTICS_CACHE_LOOKUPS.labels(endpoint=endpoint, result=result).inc()
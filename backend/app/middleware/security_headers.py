@@ -7,6 +7,28 @@ from starlette.requests import Request
 from starlette.responses import Response
 
 
+def security_headers(enable_hsts: bool = False) -> dict[str, str]:
+    """
+    Baseline security headers of every response.
+
+    Args:
+        enable_hsts: Include Strict-Transport-Security.
+
+    Returns:
+        dict[str, str]: Header names and values.
+    """
+    headers = {
+        "X-Frame-Options": "DENY",
+        "X-Content-Type-Options": "nosniff",
+        "Referrer-Policy": "strict-origin-when-cross-origin",
+        "Permissions-Policy": "camera=(), microphone=(), geolocation=()",
+        "X-XSS-Protection": "1; mode=block",
+    }
+    if enable_hsts:
+        headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    return headers
+
+
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """
     Apply baseline security headers to all responses.
@@ -52,19 +74,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         """
         response = await call_next(request)
 
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Referrer-Policy", "strict-origin-when-cross-origin")
-        response.headers.setdefault(
-            "Permissions-Policy",
-            "camera=(), microphone=(), geolocation=()",
-        )
-        response.headers.setdefault("X-XSS-Protection", "1; mode=block")
-
-        if self.enable_hsts:
-            response.headers.setdefault(
-                "Strict-Transport-Security",
-                "max-age=31536000; includeSubDomains",
-            )
+        for name, value in security_headers(self.enable_hsts).items():
+            response.headers.setdefault(name, value)
 
         return response
@@ -29,6 +29,12 @@ from app.models.models import (
     WaitTimeLog,
     PushDeviceToken,
     DevicePlatform,
+    OutboxEvent,
+    TicketHourlyRollup,
+    TicketHourlySketch,
+    CheckInHourlyRollup,
+    AnalyticsRollupState,
+    LiveQueueSketch,
 )
 
 from app.models.document_request import (
@@ -84,6 +90,14 @@ __all__ = [
     # Push
     "PushDeviceToken",
     "DevicePlatform",
+    # Outbox
+    "OutboxEvent",
+    # Analytics rollups
+    "TicketHourlyRollup",
+    "TicketHourlySketch",
+    "CheckInHourlyRollup",
+    "AnalyticsRollupState",
+    "LiveQueueSketch",
     # Document Requests
     "DocumentRequest",
     "DocumentType",
@@ -18,6 +18,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -80,6 +81,10 @@ class DocumentRequest(Base):
     """
 
     __tablename__ = "document_requests"
+    __table_args__ = (
+        # Staff list, keyset pagination on (created_at, id)
+        Index("ix_document_requests_practice_created", "practice_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
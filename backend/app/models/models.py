@@ -5,11 +5,25 @@ All models use UUID primary keys for security and scalability.
 """
 
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum as PyEnum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Integer, String, Text, Uuid
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    Uuid,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -149,6 +163,14 @@ class Queue(Base):
     """Queue/category for tickets."""
 
     __tablename__ = "queues"
+    __table_args__ = (
+        Index(
+            "ix_queues_practice_active",
+            "practice_id",
+            postgresql_where=text("is_active"),
+            sqlite_where=text("is_active"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -180,6 +202,16 @@ class Ticket(Base):
     """Patient ticket in the queue."""
 
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_queue_status_created", "queue_id", "status", "created_at"),
+        # Keyset pagination on (created_at, id)
+        Index("ix_tickets_queue_created", "queue_id", "created_at", "id"),
+        # NFC duplicate check
+        Index("ix_tickets_created_by_status", "created_by_id", "status"),
+        Index("ix_tickets_called_at", "called_at"),
+        # Analytics: the part of a report window that is not rolled up yet
+        Index("ix_tickets_created_at", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -220,6 +252,16 @@ class Ticket(Base):
     )
 
 
+# Waiting line of a queue (call next, waiting counts); stays small as history grows
+Index(
+    "ix_tickets_queue_waiting",
+    Ticket.queue_id,
+    Ticket.created_at,
+    postgresql_where=Ticket.status == TicketStatus.WAITING,
+    sqlite_where=Ticket.status == TicketStatus.WAITING,
+)
+
+
 class Task(Base):
     """Staff task/todo item."""
 
@@ -311,6 +353,9 @@ class ChatMessage(Base):
     """Chat message."""
 
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_room_created", "room_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -629,6 +674,12 @@ class CheckInEvent(Base):
     """
 
     __tablename__ = "check_in_events"
+    __table_args__ = (
+        Index("ix_check_in_events_practice_time", "practice_id", "checked_in_at"),
+        Index("ix_check_in_events_patient", "patient_id"),
+        Index("ix_check_in_events_time", "checked_in_at"),
+        Index("ix_check_in_events_method", "check_in_method"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -685,6 +736,11 @@ class WaitTimeLog(Base):
     """
 
     __tablename__ = "wait_time_logs"
+    __table_args__ = (
+        Index("ix_wait_time_logs_practice", "practice_id"),
+        Index("ix_wait_time_logs_queue", "queue_id"),
+        Index("ix_wait_time_logs_time", "recorded_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -753,3 +809,156 @@ class PushDeviceToken(Base):
 
     # Relationships
     user: Mapped["User"] = relationship("User")
+
+
+class OutboxEvent(Base):
+    """
+    Side effect of a ticket change, written in the same transaction.
+
+    The outbox dispatcher delivers pending rows to WebSocket, MQTT, push and
+    LED after commit, so request handlers never wait on external services.
+    Delivered rows are deleted; rows that exhausted their retries keep
+    ``failed_at`` and ``last_error`` for inspection.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Per-ticket ordering check of the dispatcher
+        Index("ix_outbox_events_ticket_created", "ticket_id", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    # No foreign keys: events must be deliverable after the ticket is gone
+    ticket_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True))
+    queue_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True))
+    event_type: Mapped[str] = mapped_column(String(50))  # e.g., "ticket.called"
+    payload: Mapped[str] = mapped_column(Text)  # JSON object
+    channels: Mapped[str] = mapped_column(String(100))  # Pending, comma-separated
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    failed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+# Pending events only; given-up rows drop out of the index
+Index(
+    "ix_outbox_events_pending",
+    OutboxEvent.available_at,
+    postgresql_where=OutboxEvent.failed_at.is_(None),
+    sqlite_where=OutboxEvent.failed_at.is_(None),
+)
+
+
+class TicketHourlyRollup(Base):
+    """
+    Ticket counts per queue and hour of creation (UTC), for analytics.
+
+    Written by the analytics rollup job for closed days only; rows of a day
+    are replaced as a whole, so the natural key is the primary key. Wait
+    figures cover completed tickets that were called (minutes).
+    """
+
+    __tablename__ = "ticket_hourly_rollups"
+    __table_args__ = (
+        Index("ix_ticket_hourly_rollups_practice_day", "practice_id", "day"),
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    queue_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)  # 0-23
+    practice_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True))
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    # One column per TicketStatus value
+    waiting: Mapped[int] = mapped_column(Integer, default=0)
+    called: Mapped[int] = mapped_column(Integer, default=0)
+    in_progress: Mapped[int] = mapped_column(Integer, default=0)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    cancelled: Mapped[int] = mapped_column(Integer, default=0)
+    no_show: Mapped[int] = mapped_column(Integer, default=0)
+    waited: Mapped[int] = mapped_column(Integer, default=0)
+    wait_minutes_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    wait_minutes_min: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    wait_minutes_max: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class TicketHourlySketch(Base):
+    """
+    Wait/service time sketches per queue and hour of creation (UTC).
+
+    Serialized DDSketches (app.services.analytics_sketch) of every called
+    ticket: minutes until the call and from call to completion, plus the
+    wait of the completed ones (``/analytics/wait-times``). Written by the
+    analytics rollup job next to ``ticket_hourly_rollups``; a separate
+    table keeps the rollup rows narrow for the count reports.
+    """
+
+    __tablename__ = "ticket_hourly_sketches"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    queue_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    wait_sketch: Mapped[bytes] = mapped_column(LargeBinary)
+    service_sketch: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True
+    )
+    completed_wait_sketch: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True
+    )
+
+
+class CheckInHourlyRollup(Base):
+    """Check-in events per practice, hour (UTC) and method, for analytics."""
+
+    __tablename__ = "check_in_hourly_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    practice_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    check_in_method: Mapped[CheckInMethod] = mapped_column(
+        Enum(CheckInMethod), primary_key=True
+    )
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class AnalyticsRollupState(Base):
+    """High-water mark of the analytics rollups (last rolled-up closed day)."""
+
+    __tablename__ = "analytics_rollup_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    rolled_up_through: Mapped[date] = mapped_column(Date)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class LiveQueueSketch(Base):
+    """
+    Live wait/service time sketches of one worker per queue and hour of
+    creation (UTC).
+
+    Each worker process flushes the sketches it has built from ticket
+    transitions under its own ``source`` id; readers merge all sources.
+    Rows are kept for a few days only (see app.services.analytics_sketch).
+    """
+
+    __tablename__ = "live_queue_sketches"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    queue_id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True), primary_key=True)
+    source: Mapped[str] = mapped_column(String(32), primary_key=True)
+    wait_sketch: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    service_sketch: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
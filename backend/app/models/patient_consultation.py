@@ -19,6 +19,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -71,6 +72,12 @@ class PatientConsultation(Base):
     """
 
     __tablename__ = "patient_consultations"
+    __table_args__ = (
+        # Patient/staff lists, keyset pagination on (created_at, id)
+        Index("ix_patient_consultations_patient_created", "patient_id", "created_at", "id"),
+        Index("ix_patient_consultations_doctor_scheduled", "doctor_id", "scheduled_at"),
+        Index("ix_patient_consultations_created", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -160,6 +167,14 @@ class PatientConsultationMessage(Base):
     """
 
     __tablename__ = "patient_consultation_messages"
+    __table_args__ = (
+        Index(
+            "ix_patient_consultation_messages_consultation_created",
+            "consultation_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4
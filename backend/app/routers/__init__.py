@@ -10,6 +10,7 @@ from app.routers import (
     nfc,
     led,
     websocket,
+    events,
     push,
     analytics,
     document_requests,
@@ -26,6 +27,7 @@ __all__ = [
     "nfc",
     "led",
     "websocket",
+    "events",
     "push",
     "analytics",
     "document_requests",
@@ -6,30 +6,45 @@ Provides endpoints for:
     - Queue performance metrics
     - Wait time trends
     - Check-in patterns
+    - Live wait/service time percentiles (streaming sketches)
 
 All endpoints require authenticated admin access.
 """
 
 import logging
+from functools import partial
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select, and_
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.models.models import (
-    CheckInEvent,
-    CheckInMethod,
-    Queue,
-    Ticket,
-    TicketStatus,
-    User,
-    UserRole,
+from app.models.models import Queue, User, UserRole
+from app.services.analytics_cache import compute_split, get_analytics_cache
+from app.services.analytics_sketch import (
+    DDSketch,
+    WaitSketches,
+    get_live_wait_sketches,
+    rollup_sketches,
+    sketches_since_day,
+)
+from app.services.analytics_service import (
+    WAIT_PERCENTILES,
+    SummaryCounts,
+    TicketCounts,
+    hourly_ticket_counts,
+    summary_counts,
+    WaitDistribution,
+    completed_wait_sketches,
+    merge_wait_sketches,
+    parse_wait_edges,
+    rollup_state,
+    wait_time_distribution,
 )
 
 logger = logging.getLogger(__name__)
@@ -89,6 +104,31 @@ class AnalyticsSummary(BaseModel):
     queue_performance: list[QueuePerformance] = []
 
 
+class SketchPercentiles(BaseModel):
+    """Percentiles (minutes) estimated from a sketch, within 1 %."""
+
+    count: int = Field(..., description="Number of observations")
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p95: Optional[float] = None
+
+
+class LiveQueueMetrics(BaseModel):
+    """Wait and service time percentiles of one queue."""
+
+    queue_id: UUID
+    queue_name: str
+    wait: SketchPercentiles = Field(..., description="Check-in until call")
+    service: SketchPercentiles = Field(..., description="Call until completion")
+
+
+class LiveMetrics(BaseModel):
+    """Per-queue percentiles since a point in time."""
+
+    since: datetime = Field(..., description="Window start (UTC, full hour)")
+    queues: list[LiveQueueMetrics] = []
+
+
 # =============================================================================
 # Helper functions
 # =============================================================================
@@ -96,13 +136,46 @@ class AnalyticsSummary(BaseModel):
 
 def _require_admin(user: User) -> None:
     """Raise 403 if user is not admin."""
-    if user.role not in (UserRole.ADMIN, UserRole.SUPER_ADMIN):
+    if user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required for analytics",
         )
 
 
+def _percentiles(sketch: DDSketch) -> SketchPercentiles:
+    """Rounded ``WAIT_PERCENTILES`` of a sketch."""
+    values = {}
+    for fraction in WAIT_PERCENTILES:
+        value = sketch.quantile(fraction)
+        values[f"p{fraction * 100:g}"] = round(value, 1) if value is not None else None
+    return SketchPercentiles(count=sketch.count, **values)
+
+
+async def _live_metrics(
+    db: AsyncSession, since: datetime, sketches: dict[UUID, WaitSketches]
+) -> LiveMetrics:
+    """Response of the merged sketches, queues sorted by name."""
+    names = {}
+    if sketches:
+        result = await db.execute(
+            select(Queue.id, Queue.name).where(Queue.id.in_(list(sketches)))
+        )
+        names = dict(result.all())
+    queues = [
+        LiveQueueMetrics(
+            queue_id=queue_id,
+            queue_name=names[queue_id],
+            wait=_percentiles(pair.wait),
+            service=_percentiles(pair.service),
+        )
+        for queue_id, pair in sketches.items()
+        if queue_id in names
+    ]
+    queues.sort(key=lambda q: q.queue_name)
+    return LiveMetrics(since=since, queues=queues)
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -115,7 +188,7 @@ def _require_admin(user: User) -> None:
     description="Get overall analytics summary for a time period.",
 )
 async def get_analytics_summary(
-    days: int = Query(7, ge=1, le=90, description="Number of days to analyze"),
+    days: int = Query(7, ge=1, le=365, description="Number of days to analyze"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> AnalyticsSummary:
@@ -123,7 +196,7 @@ async def get_analytics_summary(
     Get analytics summary for the specified period.
 
     Args:
-        days: Number of days to analyze (1-90).
+        days: Number of days to analyze (1-365).
         current_user: Authenticated user (must be admin).
         db: Database session.
 
@@ -138,161 +211,58 @@ async def get_analytics_summary(
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
 
-    # Pre-aggregate check-in events to avoid per-day DB scans
-    checkin_rows = await db.execute(
-        select(
-            func.date_trunc("day", CheckInEvent.checked_in_at).label("day"),
-            func.extract("hour", CheckInEvent.checked_in_at).label("hour"),
-            CheckInEvent.check_in_method,
-            func.count(CheckInEvent.id).label("count"),
-        )
-        .where(
-            and_(
-                CheckInEvent.checked_in_at >= start_date,
-                CheckInEvent.checked_in_at <= end_date,
-            )
-        )
-        .group_by(
-            func.date_trunc("day", CheckInEvent.checked_in_at),
-            func.extract("hour", CheckInEvent.checked_in_at),
-            CheckInEvent.check_in_method,
-        )
+    # Closed days come from the rollups (cached), later days from the raw
+    # tables
+    report = await compute_split(
+        "summary",
+        start_date,
+        end_date,
+        await rollup_state(db),
+        partial(summary_counts, db),
+        SummaryCounts.merged,
     )
 
     daily_method_counts: dict[str, dict[str, int]] = {}
     daily_hour_counts: dict[str, dict[int, int]] = {}
     overall_hour_counts: dict[int, int] = {h: 0 for h in range(24)}
 
-    for row in checkin_rows:
-        day_key = row.day.date().isoformat()
-        hour_key = int(row.hour)
-        count = int(row.count)
-        method = row.check_in_method
-
-        method_bucket = "nfc" if method == CheckInMethod.NFC else "other"
-        daily_method_counts.setdefault(day_key, {"nfc": 0, "other": 0})[
-            method_bucket
-        ] += count
-        daily_hour_counts.setdefault(day_key, {}).setdefault(hour_key, 0)
-        daily_hour_counts[day_key][hour_key] += count
-        overall_hour_counts[hour_key] += count
-
-    # Get total tickets in period
-    total_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-            )
-        )
-    )
-    total_tickets = total_result.scalar() or 0
-
-    # Get completed tickets
-    completed_result = await db.execute(
-        select(func.count(Ticket.id)).where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-                Ticket.status == TicketStatus.COMPLETED,
-            )
-        )
-    )
-    total_completed = completed_result.scalar() or 0
-
-    # Get average wait time (for completed tickets)
-    avg_wait_result = await db.execute(
-        select(
-            func.avg(func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60)
-        ).where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-                Ticket.status == TicketStatus.COMPLETED,
-                Ticket.called_at.isnot(None),
-            )
-        )
-    )
-    avg_wait = avg_wait_result.scalar() or 0.0
+    for row in report.check_ins:
+        day_key = row.day.isoformat()
+        method_counts = daily_method_counts.setdefault(day_key, {"nfc": 0, "other": 0})
+        method_counts["nfc"] += row.nfc_count
+        method_counts["other"] += row.count - row.nfc_count
+        daily_hour_counts.setdefault(day_key, {}).setdefault(row.hour, 0)
+        daily_hour_counts[day_key][row.hour] += row.count
+        overall_hour_counts[row.hour] += row.count
+
+    first_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_counts, totals = report.days, report.totals
 
     # Daily breakdown
     daily_stats: list[DailyStats] = []
     for day_offset in range(days):
-        day_start = (start_date + timedelta(days=day_offset)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        day_end = day_start + timedelta(days=1)
-
-        day_tickets_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.created_at >= day_start,
-                    Ticket.created_at < day_end,
-                )
-            )
-        )
-        day_total = day_tickets_result.scalar() or 0
-
-        day_completed_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.created_at >= day_start,
-                    Ticket.created_at < day_end,
-                    Ticket.status == TicketStatus.COMPLETED,
-                )
-            )
-        )
-        day_completed = day_completed_result.scalar() or 0
-
-        day_noshow_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.created_at >= day_start,
-                    Ticket.created_at < day_end,
-                    Ticket.status == TicketStatus.NO_SHOW,
-                )
-            )
-        )
-        day_noshow = day_noshow_result.scalar() or 0
-
-        # Daily average wait time
-        day_avg_result = await db.execute(
-            select(
-                func.avg(
-                    func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60
-                )
-            ).where(
-                and_(
-                    Ticket.created_at >= day_start,
-                    Ticket.created_at < day_end,
-                    Ticket.status == TicketStatus.COMPLETED,
-                    Ticket.called_at.isnot(None),
-                )
-            )
-        )
-        day_avg_wait = day_avg_result.scalar() or 0.0
-
-        day_key = day_start.date().isoformat()
+        day_key = (first_day + timedelta(days=day_offset)).date().isoformat()
+        counts = day_counts.get(day_key, TicketCounts())
         day_nfc = daily_method_counts.get(day_key, {}).get("nfc", 0)
         day_manual = daily_method_counts.get(day_key, {}).get("other", 0)
         peak_hour = None
 
         if day_key in daily_hour_counts and daily_hour_counts[day_key]:
-            peak_hour = max(
-                daily_hour_counts[day_key], key=daily_hour_counts[day_key].get
-            )
+            # Earliest hour wins ties (row order of the query is arbitrary)
+            hour_counts = daily_hour_counts[day_key]
+            peak_hour = min(hour_counts, key=lambda h: (-hour_counts[h], h))
 
         # If no check-in events recorded, assume manual check-ins equal total tickets
         if day_nfc == 0 and day_manual == 0:
-            day_manual = day_total
+            day_manual = counts.total
 
         daily_stats.append(
             DailyStats(
-                date=day_start.strftime("%Y-%m-%d"),
-                total_tickets=day_total,
-                completed_tickets=day_completed,
-                no_show_tickets=day_noshow,
-                average_wait_minutes=round(day_avg_wait, 1),
+                date=day_key,
+                total_tickets=counts.total,
+                completed_tickets=counts.completed,
+                no_show_tickets=counts.no_show,
+                average_wait_minutes=round(counts.average_wait_minutes, 1),
                 peak_hour=peak_hour,
                 nfc_checkins=day_nfc,
                 manual_checkins=day_manual,
@@ -301,77 +271,20 @@ async def get_analytics_summary(
 
     # Queue performance
     queue_performance: list[QueuePerformance] = []
-    queues_result = await db.execute(select(Queue).where(Queue.is_active.is_(True)))
-    queues = list(queues_result.scalars().all())
-
-    for queue in queues:
-        q_total_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.queue_id == queue.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date,
-                )
-            )
+    for queue in report.queues:
+        counts = queue.counts
+        completion_rate = (
+            (counts.completed / counts.total * 100) if counts.total > 0 else 0.0
         )
-        q_total = q_total_result.scalar() or 0
-
-        q_completed_result = await db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.queue_id == queue.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date,
-                    Ticket.status == TicketStatus.COMPLETED,
-                )
-            )
-        )
-        q_completed = q_completed_result.scalar() or 0
-
-        q_avg_result = await db.execute(
-            select(
-                func.avg(
-                    func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60
-                )
-            ).where(
-                and_(
-                    Ticket.queue_id == queue.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date,
-                    Ticket.status == TicketStatus.COMPLETED,
-                    Ticket.called_at.isnot(None),
-                )
-            )
-        )
-        q_avg_wait = q_avg_result.scalar() or 0.0
-
-        q_max_result = await db.execute(
-            select(
-                func.max(
-                    func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60
-                )
-            ).where(
-                and_(
-                    Ticket.queue_id == queue.id,
-                    Ticket.created_at >= start_date,
-                    Ticket.created_at <= end_date,
-                    Ticket.status == TicketStatus.COMPLETED,
-                    Ticket.called_at.isnot(None),
-                )
-            )
-        )
-        q_max_wait = int(q_max_result.scalar() or 0)
-
-        completion_rate = (q_completed / q_total * 100) if q_total > 0 else 0.0
 
         queue_performance.append(
             QueuePerformance(
-                queue_id=queue.id,
-                queue_name=queue.name,
-                total_tickets=q_total,
-                completed_tickets=q_completed,
-                average_wait_minutes=round(q_avg_wait, 1),
-                max_wait_minutes=q_max_wait,
+                queue_id=queue.queue_id,
+                queue_name=queue.queue_name,
+                total_tickets=counts.total,
+                completed_tickets=counts.completed,
+                average_wait_minutes=round(counts.average_wait_minutes, 1),
+                max_wait_minutes=int(counts.max_wait_minutes),
                 completion_rate=round(completion_rate, 1),
             )
         )
@@ -390,9 +303,9 @@ async def get_analytics_summary(
 
     return AnalyticsSummary(
         period=f"Last {days} days",
-        total_tickets=total_tickets,
-        total_completed=total_completed,
-        average_wait_minutes=round(avg_wait, 1),
+        total_tickets=totals.total,
+        total_completed=totals.completed,
+        average_wait_minutes=round(totals.average_wait_minutes, 1),
         busiest_day=busiest_day,
         busiest_hour=busiest_hour,
         daily_breakdown=daily_stats,
@@ -406,62 +319,66 @@ async def get_analytics_summary(
     description="Get distribution of wait times for analysis.",
 )
 async def get_wait_time_distribution(
-    days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
+    days: int = Query(7, ge=1, le=365, description="Number of days to analyze"),
+    edges: Optional[str] = Query(
+        None,
+        description="Bucket edges in minutes, comma-separated (default 5,15,30)",
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get wait time distribution for the specified period.
 
-    Returns buckets: 0-5min, 5-15min, 15-30min, 30+min.
+    Returns bucket counts (default 0-5min, 5-15min, 15-30min, 30+min),
+    p50/p90/p95 wait in minutes, and the same per queue, all read from wait
+    sketches (within 1 %). Closed days come from the rolled-up sketches
+    (cached, independent of the edges), later days from the raw tickets.
+
+    Raises:
+        HTTPException: If user is not admin or the edges are invalid.
     """
     _require_admin(current_user)
+    try:
+        bucket_edges = parse_wait_edges(edges)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
 
-    # Get all completed tickets with wait times
-    result = await db.execute(
-        select(func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60).where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-                Ticket.status == TicketStatus.COMPLETED,
-                Ticket.called_at.isnot(None),
-            )
-        )
+    sketches = await compute_split(
+        "wait_times",
+        start_date,
+        end_date,
+        await rollup_state(db),
+        partial(completed_wait_sketches, db),
+        merge_wait_sketches,
     )
-    wait_times = [row for row in result.scalars().all()]
-
-    # Calculate distribution
-    buckets = {
-        "0-5": 0,
-        "5-15": 0,
-        "15-30": 0,
-        "30+": 0,
-    }
-
-    for wt in wait_times:
-        if wt is None:
-            continue
-        if wt < 5:
-            buckets["0-5"] += 1
-        elif wt < 15:
-            buckets["5-15"] += 1
-        elif wt < 30:
-            buckets["15-30"] += 1
-        else:
-            buckets["30+"] += 1
-
-    total = len([w for w in wait_times if w is not None])
+    overall, queues = await wait_time_distribution(db, sketches, bucket_edges)
+
+    def _report(distribution: WaitDistribution) -> dict:
+        total = distribution.total
+        return {
+            "total_completed": total,
+            "distribution": distribution.buckets,
+            "percentages": {
+                k: round(v / total * 100, 1) if total > 0 else 0
+                for k, v in distribution.buckets.items()
+            },
+            "percentiles": {
+                k: round(v, 1) if v is not None else None
+                for k, v in distribution.percentiles.items()
+            },
+        }
 
     return {
         "period_days": days,
-        "total_completed": total,
-        "distribution": buckets,
-        "percentages": {
-            k: round(v / total * 100, 1) if total > 0 else 0 for k, v in buckets.items()
-        },
+        **_report(overall),
+        "queues": [
+            {"queue_id": q.queue_id, "queue_name": q.queue_name, **_report(q.distribution)}
+            for q in queues
+        ],
     }
 
 
@@ -471,7 +388,7 @@ async def get_wait_time_distribution(
     description="Get check-in count by hour of day.",
 )
 async def get_hourly_pattern(
-    days: int = Query(7, ge=1, le=30, description="Number of days to analyze"),
+    days: int = Query(7, ge=1, le=365, description="Number of days to analyze"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -485,27 +402,17 @@ async def get_hourly_pattern(
     end_date = datetime.now(timezone.utc)
     start_date = end_date - timedelta(days=days)
 
-    # Initialize all hours to 0
-    hourly_counts = {str(h): 0 for h in range(24)}
-
-    # Get tickets with their creation hours
-    result = await db.execute(
-        select(
-            func.extract("hour", Ticket.created_at).label("hour"),
-            func.count(Ticket.id).label("count"),
-        )
-        .where(
-            and_(
-                Ticket.created_at >= start_date,
-                Ticket.created_at <= end_date,
-            )
-        )
-        .group_by(func.extract("hour", Ticket.created_at))
+    counts = await compute_split(
+        "hourly",
+        start_date,
+        end_date,
+        await rollup_state(db),
+        partial(hourly_ticket_counts, db),
+        lambda closed, live: {
+            h: closed.get(h, 0) + live.get(h, 0) for h in {*closed, *live}
+        },
     )
-
-    for row in result.all():
-        hour = int(row.hour)
-        hourly_counts[str(hour)] = row.count
+    hourly_counts = {str(h): counts.get(h, 0) for h in range(24)}
 
     # Find peak hour
     peak_hour = max(hourly_counts, key=hourly_counts.get)
@@ -516,3 +423,93 @@ async def get_hourly_pattern(
         "peak_hour": int(peak_hour),
         "peak_count": hourly_counts[peak_hour],
     }
+
+
+@router.get(
+    "/live",
+    response_model=LiveMetrics,
+    summary="Get live wait percentiles",
+    description=(
+        "p50/p90/p95 wait and service time per queue for the last hours, "
+        "from the streaming sketches of all workers."
+    ),
+)
+async def get_live_metrics(
+    hours: int = Query(
+        1, ge=1, le=24, description="Hours to include (the current hour counts)"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> LiveMetrics:
+    """
+    Get live wait and service time percentiles per queue.
+
+    Reads one sketch row per queue, hour and worker; no tickets are
+    scanned. Waits count when a ticket is called, service times when it is
+    completed, both by the hour the ticket was created (like the rollups).
+
+    Args:
+        hours: Hours to include, current hour first (1-24).
+        current_user: Authenticated user (must be admin).
+        db: Database session.
+
+    Returns:
+        LiveMetrics with one entry per queue with observations.
+
+    Raises:
+        HTTPException: If user is not admin.
+    """
+    _require_admin(current_user)
+
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    since = now - timedelta(hours=hours - 1)
+    sketches = await get_live_wait_sketches().queue_sketches(db, since)
+    return await _live_metrics(db, since, sketches)
+
+
+@router.get(
+    "/live/days",
+    response_model=LiveMetrics,
+    summary="Get wait percentiles of recent days",
+    description=(
+        "p50/p90/p95 wait and service time per queue, merged from the "
+        "rolled-up sketches of closed days and the live sketches of today."
+    ),
+)
+async def get_live_daily_metrics(
+    days: int = Query(7, ge=1, le=31, description="Days to include, today first"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> LiveMetrics:
+    """
+    Get wait and service time percentiles per queue over recent days.
+
+    Args:
+        days: Days to include, today first (1-31).
+        current_user: Authenticated user (must be admin).
+        db: Database session.
+
+    Returns:
+        LiveMetrics with one entry per queue with observations.
+
+    Raises:
+        HTTPException: If user is not admin.
+    """
+    _require_admin(current_user)
+
+    today = datetime.now(timezone.utc).date()
+    first_day = today - timedelta(days=days - 1)
+    state = await rollup_state(db)
+    closed = None
+    if state.closed_end(datetime.combine(first_day, datetime.min.time())):
+        # Merged sketches of the closed days (cached, see compute_split)
+        closed = await get_analytics_cache().get_or_compute(
+            "live_days",
+            ("live_days", first_day, state.rolled_up_until, state.version),
+            lambda: rollup_sketches(db, first_day, state.rolled_up_until.date()),
+        )
+    sketches = await sketches_since_day(
+        db, first_day, state.rolled_up_until, closed=closed
+    )
+    since = datetime.combine(first_day, datetime.min.time(), tzinfo=timezone.utc)
+    return await _live_metrics(db, since, sketches)
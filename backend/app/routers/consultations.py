@@ -10,6 +10,7 @@ Security:
 """
 
 import uuid
+from datetime import datetime, timezone
 from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -53,6 +54,7 @@ from app.services.consultation_service import (
     get_consultation,
     get_patient_consultations,
     get_doctor_consultations,
+    get_all_consultations,
     send_consultation_message,
     get_consultation_messages,
     mark_messages_read,
@@ -60,15 +62,12 @@ from app.services.consultation_service import (
     cancel_consultation,
 )
 from app.config import get_settings
+from app.routers.websocket import broadcast_webrtc_signal
+from app.services.webrtc_signaling import SignalRoom, get_signal_store
 
 
 router = APIRouter()
 
-# In-memory signaling store (in production, use Redis or similar)
-# Key: consultation_id, Value: list of signals
-_webrtc_signals: dict[str, list[dict]] = {}
-
-
 # =============================================================================
 # Patient Endpoints
 # =============================================================================
@@ -147,6 +146,8 @@ async def list_my_consultations(
     ] = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=256),
+    include_total: bool = True,
 ) -> ConsultationListResponse:
     """
     List my consultations.
@@ -157,17 +158,27 @@ async def list_my_consultations(
         status_filter: Optional status filter.
         page: Page number.
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page, then next_cursor).
+        include_total: Whether to count all matching consultations.
 
     Returns:
         ConsultationListResponse: Paginated list.
     """
-    consultations, total = await get_patient_consultations(
-        db=db,
-        patient_id=current_user.id,
-        status_filter=status_filter,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        consultations, total, next_cursor = await get_patient_consultations(
+            db=db,
+            patient_id=current_user.id,
+            status_filter=status_filter,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
     items = []
     for c in consultations:
@@ -199,6 +210,7 @@ async def list_my_consultations(
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -344,6 +356,8 @@ async def list_messages(
     current_user: Annotated[User, Depends(get_current_user)],
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=256),
+    include_total: bool = True,
 ) -> ConsultationMessageListResponse:
     """
     Get messages for a consultation.
@@ -354,19 +368,29 @@ async def list_messages(
         current_user: Authenticated user (patient or doctor).
         page: Page number.
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page, then next_cursor).
+        include_total: Whether to count all messages.
 
     Returns:
         ConsultationMessageListResponse: List of messages.
     """
-    messages, total = await get_consultation_messages(
-        db=db,
-        consultation_id=consultation_id,
-        user_id=current_user.id,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        messages, total, next_cursor = await get_consultation_messages(
+            db=db,
+            consultation_id=consultation_id,
+            user_id=current_user.id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    if not messages and total == 0:
+    if not messages and not total:
         # Check if consultation exists and user has access
         consultation = await get_consultation(db, consultation_id)
         if not consultation:
@@ -380,10 +404,18 @@ async def list_messages(
                 detail="Kein Zugriff auf diese Beratung",
             )
     
+    if cursor is not None:
+        has_more = next_cursor is not None
+    elif total is not None:
+        has_more = total > page * page_size
+    else:
+        has_more = len(messages) == page_size
+    
     return ConsultationMessageListResponse(
         items=[ConsultationMessageResponse.model_validate(m) for m in messages],
         total=total,
-        has_more=total > page * page_size,
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
@@ -533,6 +565,48 @@ async def get_room_info(
 # =============================================================================
 
 
+async def _signal_room(
+    db: AsyncSession,
+    consultation_id: uuid.UUID,
+    user: User,
+) -> SignalRoom:
+    """
+    Get the signaling room of a consultation the user takes part in.
+
+    Raises:
+        HTTPException: 404 if the consultation does not exist, 403 if the
+            user is neither its patient nor its doctor.
+    """
+    room = await get_signal_store().join(db, consultation_id, user.id)
+
+    if room is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Beratung nicht gefunden",
+        )
+
+    if not room.is_participant(user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Kein Zugriff auf diese Beratung",
+        )
+
+    return room
+
+
+async def _send_signal(
+    room: SignalRoom,
+    signal_type: str,
+    payload: dict,
+    sender: User,
+) -> None:
+    """Store a signal and push it to the room's WebSocket subscribers."""
+    signal = get_signal_store().add(room, signal_type, payload, sender.id)
+    await broadcast_webrtc_signal(
+        str(room.practice_id), str(room.consultation_id), signal.as_event()
+    )
+
+
 @router.post("/{consultation_id}/signal/offer", response_model=MessageResponse)
 async def send_offer(
     consultation_id: uuid.UUID,
@@ -543,36 +617,14 @@ async def send_offer(
     """
     Send WebRTC offer to peer.
 
+    The peer gets it pushed on the ``consultation:{id}`` WebSocket topic.
+
     Security: Only consultation participants can send signals.
     DSGVO: No SDP content logged, only metadata.
     """
-    consultation = await get_consultation(db, consultation_id)
-    
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Beratung nicht gefunden",
-        )
-    
-    if current_user.id not in [consultation.patient_id, consultation.doctor_id]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Kein Zugriff auf diese Beratung",
-        )
-    
-    # Store signal for peer to retrieve
-    room_key = str(consultation_id)
-    if room_key not in _webrtc_signals:
-        _webrtc_signals[room_key] = []
-    
-    from datetime import datetime, timezone
-    _webrtc_signals[room_key].append({
-        "signal_type": "offer",
-        "payload": {"sdp": offer.sdp, "type": offer.type},
-        "sender_id": str(current_user.id),
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    })
-    
+    room = await _signal_room(db, consultation_id, current_user)
+    await _send_signal(room, "offer", {"sdp": offer.sdp, "type": offer.type}, current_user)
+
     return MessageResponse(message="Offer gesendet", success=True)
 
 
@@ -588,32 +640,11 @@ async def send_answer(
 
     Security: Only consultation participants can send signals.
     """
-    consultation = await get_consultation(db, consultation_id)
-    
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Beratung nicht gefunden",
-        )
-    
-    if current_user.id not in [consultation.patient_id, consultation.doctor_id]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Kein Zugriff auf diese Beratung",
-        )
-    
-    room_key = str(consultation_id)
-    if room_key not in _webrtc_signals:
-        _webrtc_signals[room_key] = []
-    
-    from datetime import datetime, timezone
-    _webrtc_signals[room_key].append({
-        "signal_type": "answer",
-        "payload": {"sdp": answer.sdp, "type": answer.type},
-        "sender_id": str(current_user.id),
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    })
-    
+    room = await _signal_room(db, consultation_id, current_user)
+    await _send_signal(
+        room, "answer", {"sdp": answer.sdp, "type": answer.type}, current_user
+    )
+
     return MessageResponse(message="Answer gesendet", success=True)
 
 
@@ -629,36 +660,18 @@ async def send_ice_candidate(
 
     Security: Only consultation participants can send signals.
     """
-    consultation = await get_consultation(db, consultation_id)
-    
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Beratung nicht gefunden",
-        )
-    
-    if current_user.id not in [consultation.patient_id, consultation.doctor_id]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Kein Zugriff auf diese Beratung",
-        )
-    
-    room_key = str(consultation_id)
-    if room_key not in _webrtc_signals:
-        _webrtc_signals[room_key] = []
-    
-    from datetime import datetime, timezone
-    _webrtc_signals[room_key].append({
-        "signal_type": "ice-candidate",
-        "payload": {
+    room = await _signal_room(db, consultation_id, current_user)
+    await _send_signal(
+        room,
+        "ice-candidate",
+        {
             "candidate": candidate.candidate,
             "sdpMid": candidate.sdp_mid,
             "sdpMLineIndex": candidate.sdp_m_line_index,
         },
-        "sender_id": str(current_user.id),
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-    })
-    
+        current_user,
+    )
+
     return MessageResponse(message="ICE Candidate gesendet", success=True)
 
 
@@ -667,50 +680,36 @@ async def poll_signals(
     consultation_id: uuid.UUID,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
-    since: Optional[str] = Query(None, description="ISO timestamp to filter signals"),
+    since_seq: int = Query(0, ge=0, description="Last signal seq received"),
+    since: Optional[datetime] = Query(
+        None, description="ISO timestamp to filter signals (deprecated, use since_seq)"
+    ),
 ) -> list[WebRTCSignal]:
     """
-    Poll for pending WebRTC signals from peer.
+    Get pending WebRTC signals from peer.
+
+    Signals are pushed on the ``consultation:{id}`` WebSocket topic; this
+    endpoint is for catching up after a gap in ``seq`` and for clients
+    without WebSocket. Returns signals not sent by the current user.
 
-    Returns signals not sent by the current user.
     Security: Only consultation participants can poll.
     """
-    consultation = await get_consultation(db, consultation_id)
-    
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Beratung nicht gefunden",
+    room = await _signal_room(db, consultation_id, current_user)
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    return [
+        WebRTCSignal(
+            seq=signal.seq,
+            signal_type=signal.signal_type,
+            payload=signal.payload,
+            sender_id=signal.sender_id,
+            timestamp=signal.timestamp,
         )
-    
-    if current_user.id not in [consultation.patient_id, consultation.doctor_id]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Kein Zugriff auf diese Beratung",
-        )
-    
-    room_key = str(consultation_id)
-    signals = _webrtc_signals.get(room_key, [])
-    
-    # Filter: only signals from the OTHER user
-    from datetime import datetime
-    result = []
-    for sig in signals:
-        if sig["sender_id"] != str(current_user.id):
-            # Optional: filter by timestamp
-            if since:
-                sig_time = datetime.fromisoformat(sig["timestamp"].replace("Z", "+00:00"))
-                since_time = datetime.fromisoformat(since.replace("Z", "+00:00"))
-                if sig_time <= since_time:
-                    continue
-            result.append(WebRTCSignal(
-                signal_type=sig["signal_type"],
-                payload=sig["payload"],
-                sender_id=uuid.UUID(sig["sender_id"]),
-                timestamp=datetime.fromisoformat(sig["timestamp"].replace("Z", "+00:00")),
-            ))
-    
-    return result
+        for signal in get_signal_store().since(room, since_seq)
+        if signal.sender_id != current_user.id
+        and (since is None or signal.timestamp > since)
+    ]
 
 
 @router.delete("/{consultation_id}/signal", response_model=MessageResponse)
@@ -724,24 +723,9 @@ async def clear_signals(
 
     Call this when ending a call to clean up.
     """
-    consultation = await get_consultation(db, consultation_id)
-    
-    if not consultation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Beratung nicht gefunden",
-        )
-    
-    if current_user.id not in [consultation.patient_id, consultation.doctor_id]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Kein Zugriff auf diese Beratung",
-        )
-    
-    room_key = str(consultation_id)
-    if room_key in _webrtc_signals:
-        del _webrtc_signals[room_key]
-    
+    await _signal_room(db, consultation_id, current_user)
+    get_signal_store().clear(consultation_id)
+
     return MessageResponse(message="Signale gelöscht", success=True)
 
 
@@ -901,6 +885,8 @@ async def list_all_consultations(
     ] = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=256),
+    include_total: bool = True,
 ) -> ConsultationStaffListResponse:
     """
     List all consultations (staff view).
@@ -911,37 +897,39 @@ async def list_all_consultations(
         status_filter: Optional status filter.
         page: Page number.
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page, then next_cursor).
+        include_total: Whether to count all matching consultations.
 
     Returns:
         ConsultationStaffListResponse: Paginated list.
     """
-    # For doctors, filter to their assigned consultations
-    if current_user.role == UserRole.DOCTOR:
-        consultations, total = await get_doctor_consultations(
-            db=db,
-            doctor_id=current_user.id,
-            status_filter=status_filter,
-            page=page,
-            page_size=page_size,
-        )
-    else:
-        # Admin/MFA see all consultations
-        from sqlalchemy import select, func
-        from app.models.patient_consultation import PatientConsultation
-        
-        query = select(PatientConsultation).order_by(
-            PatientConsultation.created_at.desc()
+    try:
+        # For doctors, filter to their assigned consultations
+        if current_user.role == UserRole.DOCTOR:
+            consultations, total, next_cursor = await get_doctor_consultations(
+                db=db,
+                doctor_id=current_user.id,
+                status_filter=status_filter,
+                page=page,
+                page_size=page_size,
+                cursor=cursor,
+                include_total=include_total,
+            )
+        else:
+            # Admin/MFA see all consultations
+            consultations, total, next_cursor = await get_all_consultations(
+                db=db,
+                status_filter=status_filter,
+                page=page,
+                page_size=page_size,
+                cursor=cursor,
+                include_total=include_total,
+            )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
-        
-        if status_filter:
-            query = query.where(PatientConsultation.status.in_(status_filter))
-        
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await db.scalar(count_query) or 0
-        
-        query = query.offset((page - 1) * page_size).limit(page_size)
-        result = await db.execute(query)
-        consultations = list(result.scalars().all())
     
     # Build response with patient info
     items = []
@@ -998,6 +986,7 @@ async def list_all_consultations(
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
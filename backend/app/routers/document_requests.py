@@ -393,6 +393,8 @@ async def list_all_requests(
     assigned_to: Annotated[Optional[uuid.UUID], Query()] = None,
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, max_length=256),
+    include_total: bool = True,
 ) -> DocumentRequestStaffListResponse:
     """
     List all document requests (staff view).
@@ -406,6 +408,8 @@ async def list_all_requests(
         assigned_to: Filter by assigned staff.
         page: Page number.
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page, then next_cursor).
+        include_total: Whether to count all matching requests.
 
     Returns:
         DocumentRequestStaffListResponse: Paginated list with internal fields.
@@ -423,22 +427,31 @@ async def list_all_requests(
             detail="Keine Praxis gefunden",
         )
     
-    requests, total = await get_practice_document_requests(
-        db=db,
-        practice_id=practice.id,
-        status_filter=status_filter,
-        document_type_filter=type_filter,
-        priority_filter=priority_filter,
-        assigned_to_id=assigned_to,
-        page=page,
-        page_size=page_size,
-    )
+    try:
+        requests, total, next_cursor = await get_practice_document_requests(
+            db=db,
+            practice_id=practice.id,
+            status_filter=status_filter,
+            document_type_filter=type_filter,
+            priority_filter=priority_filter,
+            assigned_to_id=assigned_to,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
     return DocumentRequestStaffListResponse(
         items=[DocumentRequestStaffResponse.model_validate(r) for r in requests],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -0,0 +1,147 @@
+"""
+Server-Sent Events API Router for Real-Time Events.
+
+Read-only alternative to ``/ws/events`` for displays and browsers that only
+listen: one plain HTTP response, no upgrade, reconnect built into
+``EventSource``.
+
+Protocol:
+    - Same messages as ``/ws/events``, one ``data:`` line each; sequenced
+      broadcasts carry ``id: {epoch}:{seq}``.
+    - Fed by the WebSocket ``ConnectionManager``: streams are registered
+      there and get each broadcast as an SSE frame encoded once for all
+      streams (see ``app.routers.websocket``).
+    - ``Last-Event-ID`` (sent by ``EventSource`` on reconnect) or
+      ``?last_event_id=`` resumes from the replay buffer; if the events are
+      gone, a ``snapshot`` message follows ``connected`` instead.
+    - Heartbeats come from the manager's shared ticker and keep proxies
+      from closing idle streams.
+    - Frames queued at the same time are written as one chunk; responses
+      are not buffered by nginx (``X-Accel-Buffering: no``).
+    - Streams are served outside the per-request middleware stack
+      (``EventStreamMiddleware``), which would otherwise hold several
+      times the stream's own memory per idle connection; that middleware
+      caps open streams per client and adds the security headers.
+    - ``consultation:`` topics are WebSocket-only: they need an access
+      token, which must not travel in a URL (EventSource cannot set an
+      Authorization header). They are listed in ``rejected_topics``.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from app.routers.websocket import (
+    _dumps,
+    _send_topic_snapshots,
+    _snapshot_frame,
+    get_connection_manager,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+# Reconnect delay suggested to EventSource
+RETRY_MS = 3000
+
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+# Topics that need an access token (subscribe over /ws/events instead)
+PRIVATE_TOPIC_PREFIX = "consultation:"
+
+
+def _parse_event_id(event_id: Optional[str]) -> tuple[Optional[str], Optional[int]]:
+    """
+    Split an event ID into epoch and sequence number.
+
+    Args:
+        event_id: ``{epoch}:{seq}`` as sent in ``id:`` lines.
+
+    Returns:
+        tuple[Optional[str], Optional[int]]: Epoch and seq, or (None, None)
+        if the ID is missing or malformed.
+    """
+    if not event_id:
+        return None, None
+    epoch, _, seq = event_id.strip().rpartition(":")
+    if not epoch or not seq.isdigit():
+        return None, None
+    return epoch, int(seq)
+
+
+@router.get("/{practice_id}/stream")
+async def stream_events(
+    practice_id: str,
+    topics: Optional[str] = Query(None, description="Comma-separated topics"),
+    last_event_id: Optional[str] = Query(
+        None, description="Last event ID (for clients that cannot set headers)"
+    ),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of real-time events.
+
+    Topics as for ``/ws/events`` (``queue:``, ``ticket:`` and
+    ``wait_times`` start with a ``snapshot`` of the topic's state) except
+    ``consultation:`` topics, which are rejected. Without topics, all
+    practice broadcasts are delivered.
+
+    Example:
+        new EventSource("/api/v1/events/practice-123/stream?topics=led")
+
+    Frame format:
+        id: 3f2a9c0d1e4b:42
+        data: {"type": "ticket.called", "data": {...}, "seq": 42, ...}
+    """
+    topic_list = topics.split(",") if topics else None
+    rejected: list[str] = []
+    if topic_list:
+        rejected = [t for t in topic_list if t.startswith(PRIVATE_TOPIC_PREFIX)]
+        topic_list = [t for t in topic_list if not t.startswith(PRIVATE_TOPIC_PREFIX)]
+    epoch, since_seq = _parse_event_id(last_event_id_header or last_event_id)
+
+    async def event_stream():
+        manager = get_connection_manager()
+        stream = manager.open_stream(practice_id, topic_list)
+        try:
+            # Queue connected and the replay before yielding: replayed
+            # frames end exactly where live ones begin
+            await manager.send_personal_text(
+                stream,
+                _dumps(
+                    {
+                        "type": "connected",
+                        "data": {
+                            "practice_id": practice_id,
+                            "subscribed_topics": topic_list,
+                            "rejected_topics": rejected,
+                            "server_time": datetime.now(timezone.utc).isoformat(),
+                            "epoch": manager.epoch,
+                            "seq": manager.stream_position(practice_id),
+                        },
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    }
+                ),
+            )
+            resumed = since_seq is not None and manager.resume(stream, since_seq, epoch)
+            yield f"retry: {RETRY_MS}\n\n"
+            if since_seq is not None and not resumed:
+                await manager.send_personal_text(stream, await _snapshot_frame(practice_id))
+            if topic_list and not resumed:
+                await _send_topic_snapshots(stream, practice_id, topic_list)
+
+            async for chunk in stream.frames():
+                yield chunk
+        finally:
+            manager.disconnect(stream, practice_id)
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=STREAM_HEADERS
+    )
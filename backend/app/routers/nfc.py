@@ -50,8 +50,10 @@ from app.schemas.schemas import (
     NFCCheckInResponse,
 )
 from app.services.nfc_service import NFCService
-from app.services.led_service import LEDService
-from app.services.push_service import notify_check_in_success, notify_mfa_new_ticket
+from app.services.outbox import OutboxChannel, TICKET_CREATED, enqueue_ticket_event
+from app.services.queue_service import allocate_ticket_number
+from app.services.queue_state_cache import get_queue_state_cache
+from app.services.wait_time_estimator import get_wait_time_estimator
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +80,47 @@ def _verify_device_secret(plain_secret: str, hashed_secret: str) -> bool:
         return False
 
 
+async def _find_open_ticket(
+    db: AsyncSession, queue_id: UUID, patient: User
+) -> Optional[Ticket]:
+    """
+    Find a waiting or called ticket of the patient created today.
+
+    Args:
+        db: Database session.
+        queue_id: Queue UUID.
+        patient: Checked-in patient.
+
+    Returns:
+        Ticket or None.
+    """
+    today_start = datetime.now(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    result = await db.execute(
+        select(Ticket)
+        .where(Ticket.queue_id == queue_id)
+        .where(Ticket.patient_name == f"{patient.first_name} {patient.last_name}")
+        .where(Ticket.created_at >= today_start)
+        .where(Ticket.status.in_([TicketStatus.WAITING, TicketStatus.CALLED]))
+    )
+    return result.scalar_one_or_none()
+
+
+def _already_checked_in(
+    ticket: Ticket, queue: Queue, patient: User
+) -> NFCCheckInResponse:
+    """Build the response for a patient who already holds a ticket today."""
+    return NFCCheckInResponse(
+        success=True,
+        ticket_number=ticket.ticket_number,
+        queue_name=queue.name,
+        estimated_wait_minutes=ticket.estimated_wait_minutes,
+        patient_name=patient.first_name,
+        message=f"Sie sind bereits angemeldet. Ihre Nummer: {ticket.ticket_number}",
+    )
+
+
 # ============================================================================
 # NFC Check-In Endpoints
 # ============================================================================
@@ -107,7 +150,7 @@ async def nfc_check_in(
         2. Look up card in database.
         3. Check if patient has appointment today.
         4. Create ticket in appropriate queue.
-        5. Trigger wayfinding LED route.
+        5. Queue wayfinding LED route, push and realtime events (outbox).
 
     Args:
         request: NFC check-in request with UID and device credentials.
@@ -210,33 +253,11 @@ async def nfc_check_in(
         )
 
     # 5. Check for existing ticket today
-    today_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    existing_ticket_result = await db.execute(
-        select(Ticket)
-        .where(Ticket.queue_id == queue.id)
-        .where(Ticket.patient_name == f"{patient.first_name} {patient.last_name}")
-        .where(Ticket.created_at >= today_start)
-        .where(Ticket.status.in_([TicketStatus.WAITING, TicketStatus.CALLED]))
-    )
-    existing_ticket = existing_ticket_result.scalar_one_or_none()
-
+    existing_ticket = await _find_open_ticket(db, queue.id, patient)
     if existing_ticket:
-        return NFCCheckInResponse(
-            success=True,
-            ticket_number=existing_ticket.ticket_number,
-            queue_name=queue.name,
-            estimated_wait_minutes=existing_ticket.estimated_wait_minutes,
-            patient_name=patient.first_name,
-            message=f"Sie sind bereits angemeldet. Ihre Nummer: {existing_ticket.ticket_number}",
-        )
+        return _already_checked_in(existing_ticket, queue, patient)
 
     # 6. Create new ticket
-    # Get next ticket number
-    queue.current_number += 1
-    ticket_number = f"{queue.code}{queue.current_number:03d}"
-
     # Calculate estimated wait time from queue stats
     waiting_count_result = await db.execute(
         select(func.count(Ticket.id))
@@ -244,7 +265,33 @@ async def nfc_check_in(
         .where(Ticket.status == TicketStatus.WAITING)
     )
     waiting_count = waiting_count_result.scalar() or 0
-    estimated_wait = max(queue.average_wait_minutes * waiting_count, 5)
+    estimated_wait = max(
+        get_wait_time_estimator().estimate_wait(
+            queue.id, waiting_count, queue.average_wait_minutes
+        ),
+        5,
+    )
+
+    # Reserve the next ticket number (atomic UPDATE ... RETURNING). The
+    # counter row stays locked until commit, so this runs right before the
+    # insert.
+    allocation = await allocate_ticket_number(db, queue.id)
+    if allocation is None:
+        return NFCCheckInResponse(
+            success=False,
+            message="Keine aktive Warteschlange verfügbar.",
+        )
+    _, number, _ = allocation
+    ticket_number = f"{queue.code}{number:03d}"
+
+    # The counter row lock serializes concurrent taps on this queue; a tap
+    # that committed while this one waited for it shows up now.
+    existing_ticket = await _find_open_ticket(db, queue.id, patient)
+    if existing_ticket:
+        response = _already_checked_in(existing_ticket, queue, patient)
+        # Release the reserved number
+        await db.rollback()
+        return response
 
     ticket = Ticket(
         queue_id=queue.id,
@@ -273,7 +320,42 @@ async def nfc_check_in(
     # Update card last_used_at
     card.last_used_at = datetime.now(timezone.utc)
 
+    # 8. Wayfinding route to the queue zone (if configured)
+    wayfinding_route_id: Optional[UUID] = None
+    if queue.zone_id:
+        route_result = await db.execute(
+            select(WayfindingRoute.id)
+            .where(WayfindingRoute.to_zone_id == queue.zone_id)
+            .where(WayfindingRoute.is_active.is_(True))
+            .limit(1)
+        )
+        wayfinding_route_id = route_result.scalar_one_or_none()
+
+    # 9. LED, push and realtime events go through the outbox, committed
+    # with the ticket; the dispatcher delivers them after the response.
+    channels = [
+        OutboxChannel.WEBSOCKET,
+        OutboxChannel.MQTT,
+        OutboxChannel.PATIENT_PUSH,
+        OutboxChannel.STAFF_PUSH,
+    ]
+    if wayfinding_route_id:
+        channels.append(OutboxChannel.LED)
+    await enqueue_ticket_event(
+        db,
+        ticket,
+        TICKET_CREATED,
+        channels,
+        queue_name=queue.name,
+        patient_user_id=str(patient.id),
+        wayfinding_route_id=str(wayfinding_route_id) if wayfinding_route_id else None,
+    )
+    # The enqueue flushed the ticket, so its id is known now
+    check_in_event.ticket_id = ticket.id
+
     await db.commit()
+    await db.refresh(ticket)
+    get_queue_state_cache().apply_ticket(ticket, None)
 
     logger.info(
         "NFC check-in successful",
@@ -284,53 +366,6 @@ async def nfc_check_in(
         },
     )
 
-    # 8. Trigger wayfinding (if route configured for queue zone)
-    wayfinding_route_id: Optional[UUID] = None
-    if queue.zone_id:
-        route_result = await db.execute(
-            select(WayfindingRoute)
-            .where(WayfindingRoute.to_zone_id == queue.zone_id)
-            .where(WayfindingRoute.is_active.is_(True))
-            .limit(1)
-        )
-        route = route_result.scalar_one_or_none()
-        if route:
-            wayfinding_route_id = route.id
-            try:
-                led_service = LEDService(db)
-                await led_service.activate_wayfinding_route(route.id)
-            except Exception as e:
-                logger.warning("Wayfinding activation failed", extra={"error": str(e)})
-
-    # 9. Send push notifications (async, don't block response)
-    try:
-        # Notify patient of successful check-in
-        await notify_check_in_success(
-            db=db,
-            patient_user_id=patient.id,
-            ticket_number=ticket_number,
-            queue_name=queue.name,
-            estimated_wait_minutes=ticket.estimated_wait_minutes,
-        )
-
-        # Notify MFA staff about new ticket
-        mfa_users_result = await db.execute(
-            select(User.id).where(
-                User.role == UserRole.MFA,
-                User.is_active.is_(True),
-            )
-        )
-        mfa_user_ids = [row[0] for row in mfa_users_result.fetchall()]
-        if mfa_user_ids:
-            await notify_mfa_new_ticket(
-                db=db,
-                mfa_user_ids=mfa_user_ids,
-                ticket_number=ticket_number,
-                queue_name=queue.name,
-            )
-    except Exception as e:
-        logger.warning("Push notification failed", extra={"error": str(e)})
-
     return NFCCheckInResponse(
         success=True,
         ticket_number=ticket_number,
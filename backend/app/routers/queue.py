@@ -4,17 +4,21 @@ Queue router.
 Handles queue management and statistics.
 """
 
+import logging
 import uuid
 from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.dependencies import RequireAdmin, get_current_user
-from app.models.models import Queue, User
+from app.dependencies import RequireAdmin, RequireMFA, get_current_user
+from app.models.models import Practice, Queue, TicketStatus, User
+from app.routers.websocket import broadcast_day_closed
 from app.schemas.schemas import (
+    DayCloseRequest,
+    DayCloseResponse,
     MessageResponse,
     PublicQueueSummaryResponse,
     QueueCreate,
@@ -22,16 +26,24 @@ from app.schemas.schemas import (
     QueueStatsResponse,
     QueueUpdate,
 )
+from app.services.mqtt_service import get_mqtt_service
+from app.services.public_summary_cache import etag_matches, get_public_summary_cache
+from app.services.queue_state_cache import get_queue_state_cache
 from app.services.queue_service import (
+    close_practice_day,
     create_queue,
     get_queue,
     get_queue_stats,
-    get_public_queue_summary,
+    get_queue_stats_batch,
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+MAX_BATCH_QUEUE_IDS = 50
+
 
 @router.get("", response_model=list[QueueResponse])
 async def list_queues(
@@ -83,20 +95,73 @@ async def get_global_queue_stats(
     )
 
 
+@router.get("/stats/batch", response_model=list[QueueStatsResponse])
+async def get_queue_statistics_batch(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    queue_ids: Annotated[list[uuid.UUID], Query(min_length=1)],
+) -> list[QueueStatsResponse]:
+    """
+    Get statistics for several queues with a single aggregate query.
+
+    Args:
+        db: Database session.
+        current_user: Authenticated user.
+        queue_ids: Queue UUIDs (repeat the parameter for each queue).
+
+    Returns:
+        list[QueueStatsResponse]: Statistics of the known queues.
+
+    Raises:
+        HTTPException: If too many queues are requested.
+    """
+    if len(queue_ids) > MAX_BATCH_QUEUE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximal {MAX_BATCH_QUEUE_IDS} Warteschlangen pro Anfrage",
+        )
+    return await get_queue_stats_batch(db, queue_ids=list(dict.fromkeys(queue_ids)))
+
+
+@router.get("/stats/practice/{practice_id}", response_model=list[QueueStatsResponse])
+async def get_practice_queue_statistics(
+    practice_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+) -> list[QueueStatsResponse]:
+    """
+    Get statistics for all active queues of a practice.
+
+    Args:
+        practice_id: Practice UUID.
+        db: Database session.
+        current_user: Authenticated user.
+
+    Returns:
+        list[QueueStatsResponse]: Statistics per queue.
+    """
+    return await get_queue_stats_batch(db, practice_id=practice_id)
+
+
 @router.get("/public/summary", response_model=PublicQueueSummaryResponse)
 async def get_public_queue_summary_endpoint(
     db: Annotated[AsyncSession, Depends(get_db)],
     practice_id: Optional[uuid.UUID] = None,
-) -> PublicQueueSummaryResponse:
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
     """
     Get public queue summary for patient-facing screens.
 
+    Served from a per-practice cache of the serialized body. Clients that
+    send the last ETag in ``If-None-Match`` get 304 while nothing changed.
+
     Args:
         db: Database session.
         practice_id: Optional practice UUID for filtering.
+        if_none_match: ETag of the client's cached copy.
 
     Returns:
-        PublicQueueSummaryResponse: Public summary data.
+        Response: Summary JSON with ETag, or 304 Not Modified.
 
     Raises:
         HTTPException: If no active practice is found.
@@ -106,13 +171,18 @@ async def get_public_queue_summary_endpoint(
         - Safe for unauthenticated access by patients.
     """
     try:
-        return await get_public_queue_summary(db, practice_id)
+        entry = await get_public_summary_cache().get(db, practice_id)
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(exc),
         )
 
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 @router.get("/{queue_id}", response_model=QueueResponse)
 async def get_queue_by_id(
@@ -222,6 +292,7 @@ async def update_queue(
 
     await db.commit()
     await db.refresh(queue)
+    get_queue_state_cache().invalidate(queue.practice_id)
     return queue
 
 
@@ -252,6 +323,7 @@ async def delete_queue(
 
     queue.is_active = False
     await db.commit()
+    get_queue_state_cache().invalidate(queue.practice_id)
 
     return MessageResponse(message="Warteschlange erfolgreich deaktiviert")
 
@@ -288,3 +360,55 @@ async def reset_queue_counter(
     await db.refresh(queue)
 
     return queue
+
+
+@router.post(
+    "/practice/{practice_id}/close-day",
+    response_model=DayCloseResponse,
+    dependencies=[RequireMFA],
+)
+async def close_day(
+    practice_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    request: Optional[DayCloseRequest] = None,
+) -> DayCloseResponse:
+    """
+    Close the day for a practice (admin/MFA).
+
+    Marks all leftover waiting/called tickets as no-show (or cancelled) and
+    resets all queue counters in one transaction, then emits a single
+    aggregated WebSocket/MQTT event.
+
+    Args:
+        practice_id: Practice UUID.
+        db: Database session.
+        request: Outcome and counter options (defaults: no-show, reset).
+
+    Returns:
+        DayCloseResponse: Closed tickets per queue.
+    """
+    request = request or DayCloseRequest()
+    practice = await db.get(Practice, practice_id)
+    if not practice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Praxis nicht gefunden",
+        )
+
+    result = await close_practice_day(
+        db,
+        practice_id,
+        outcome=TicketStatus(request.outcome.value),
+        reset_counters=request.reset_counters,
+    )
+
+    payload = result.model_dump(mode="json")
+    await broadcast_day_closed(str(practice_id), payload)
+    try:
+        mqtt = get_mqtt_service()
+        if mqtt.is_connected:
+            await mqtt.publish_event(practice_id, "day_closed", payload)
+    except Exception as e:
+        logger.warning("MQTT day close event failed", extra={"error": str(e)})
+
+    return result
@@ -22,7 +22,9 @@ from app.schemas.schemas import (
     TicketUpdate,
 )
 from app.services.queue_service import (
+    MAX_CALL_NEXT_BATCH,
     call_next_ticket,
+    call_next_tickets,
     create_ticket,
     get_ticket_by_number,
     get_tickets_by_queue,
@@ -41,10 +43,15 @@ async def list_tickets(
     status_filter: Optional[TicketStatus] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=256),
+    include_total: bool = True,
 ) -> TicketListResponse:
     """
     List tickets with filters.
 
+    Pass ``cursor`` (empty for the first page, then ``next_cursor``) for
+    keyset pagination in creation order; ``page`` is ignored in that mode.
+
     Args:
         db: Database session.
         current_user: Authenticated user.
@@ -52,6 +59,8 @@ async def list_tickets(
         status_filter: Optional status filter.
         page: Page number.
         page_size: Items per page.
+        cursor: Keyset cursor from a previous response.
+        include_total: Whether to count all matching tickets.
 
     Returns:
         TicketListResponse: Paginated list of tickets.
@@ -63,15 +72,28 @@ async def list_tickets(
         )
 
     offset = (page - 1) * page_size
-    tickets, total = await get_tickets_by_queue(
-        db, queue_id, status_filter, page_size, offset
-    )
+    try:
+        tickets, total, next_cursor = await get_tickets_by_queue(
+            db,
+            queue_id,
+            status_filter,
+            page_size,
+            offset,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
 
     return TicketListResponse(
         items=tickets,
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -309,6 +331,39 @@ async def call_next_in_queue(
     return ticket
 
 
+@router.post("/queue/{queue_id}/call-next-batch", response_model=list[TicketResponse])
+async def call_next_batch_in_queue(
+    queue_id: uuid.UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    count: int = Query(5, ge=1, le=MAX_CALL_NEXT_BATCH),
+) -> list[Ticket]:
+    """
+    Claim the next waiting tickets of a queue for one counter.
+
+    Args:
+        queue_id: Queue UUID.
+        db: Database session.
+        current_user: Authenticated user (doctor/staff).
+        count: Maximum number of tickets to claim.
+
+    Returns:
+        list[TicketResponse]: Claimed tickets in call order (may be empty).
+    """
+    if current_user.role not in [
+        UserRole.ADMIN,
+        UserRole.DOCTOR,
+        UserRole.MFA,
+        UserRole.STAFF,
+    ]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Keine Berechtigung",
+        )
+
+    return await call_next_tickets(db, queue_id, current_user.id, count)
+
+
 @router.post("/{ticket_id}/complete", response_model=TicketResponse)
 async def complete_ticket(
     ticket_id: uuid.UUID,
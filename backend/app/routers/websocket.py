@@ -10,37 +10,675 @@ Provides real-time updates to Flutter apps and web clients:
 
 Protocol:
     - JSON messages with type field.
-    - Heartbeat every 30 seconds.
+    - Heartbeat every ``WS_HEARTBEAT_SECONDS`` (one shared ticker per
+      worker, one encoded frame per practice).
+    - Clients silent for ``WS_IDLE_TIMEOUT_SECONDS`` are disconnected
+      (the apps ping every 25 seconds).
     - Reconnection with exponential backoff.
+    - Bounded send queue per client; a full queue is handled by
+      ``WS_OVERFLOW_POLICY`` (drop oldest, coalesce state, or disconnect).
+    - With several workers, broadcasts are shared over the backplane
+      configured by ``WS_BACKPLANE`` (see ``app.services.ws_backplane``).
+    - Each broadcast is encoded once (orjson when installed) and the same
+      text frame is queued for every client.
+    - Wait time and LED updates are merged per queue/segment within
+      ``WS_COALESCE_WINDOW_MS``; clients get the latest state once per window.
+    - Practice broadcasts carry a ``seq`` that increases per practice within
+      the worker's ``epoch`` (both sent in ``connected``). A client
+      reconnecting with ``?since_seq=N&epoch=E`` gets the missed events from
+      a ring buffer of ``WS_REPLAY_BUFFER_SIZE`` frames, or one ``snapshot``
+      (the public queue summary) if they are gone or the epoch changed.
+    - Topic subscriptions are scoped to the connection's practice: a topic
+      broadcast of a practice (and its ``seq``) reaches only that
+      practice's subscribers. Broadcasts without a practice reach every
+      subscriber of the topic and carry no ``seq``.
+    - Subscribing to ``queue:``, ``ticket:`` or ``wait_times`` pushes a
+      ``snapshot`` of the topic's current state (``topic`` set) from
+      ``app.services.ws_snapshot_cache``.
+    - WebRTC signaling for a consultation is pushed on ``consultation:{id}``
+      (``webrtc.signal``); subscribing needs a participant's access token
+      and first delivers the room's pending signals.
+    - Read-only clients can use the Server-Sent Events stream in
+      ``app.routers.events`` instead; its clients are registered here and
+      get the same broadcasts as pre-encoded SSE frames.
 """
 
 import asyncio
 import json
 import logging
+import math
+import uuid
+from collections import deque
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
+from app.config import get_settings
+from app.database import async_session_maker
+from app.middleware.observability import (
+    record_ws_dropped,
+    record_ws_fanout,
+    record_ws_resume,
+)
+from app.services.auth_service import decode_token
+from app.services.public_summary_cache import get_public_summary_cache
+from app.services.wait_time_estimator import get_wait_time_estimator
+from app.services.webrtc_signaling import get_signal_store
+from app.services.ws_snapshot_cache import get_topic_snapshot_cache, is_snapshot_topic
+
+if TYPE_CHECKING:
+    from app.services.ws_backplane import Backplane
+
+try:
+    import orjson
+
+    def _dumps(message: dict[str, Any]) -> str:
+        """Encode a message as JSON text."""
+        return orjson.dumps(
+            message, default=str, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+except ImportError:
+
+    def _dumps(message: dict[str, Any]) -> str:
+        """Encode a message as JSON text."""
+        return json.dumps(message, default=str)
+
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
+# Resolution of the heartbeat ticker and the idle timing wheel
+HEARTBEAT_TICK_SECONDS = 5.0
+
+
+class OverflowPolicy:
+    """What to do when a client's send queue is full."""
+
+    # Drop the oldest queued message
+    DROP_OLDEST = "drop_oldest"
+    # Replace a queued state message (wait times, LED, ...) by its newer
+    # version; otherwise drop the oldest
+    COALESCE = "coalesce"
+    # Close the slow client; it reconnects and resyncs
+    DISCONNECT = "disconnect"
+
+
+class ClientConnection:
+    """
+    Outbound side of one WebSocket connection.
+
+    Broadcasts only append to a bounded queue; a writer task per connection
+    sends, so a stalled client delays nobody but itself. ``topics`` is the
+    reverse index of the client's subscriptions, so unregistering touches
+    only its own topics. Slotted: there is one record per open socket.
+    """
+
+    # Queues WebSocket text frames (StreamClient queues SSE frames)
+    sse = False
+
+    __slots__ = (
+        "websocket",
+        "practice_id",
+        "topics",
+        "wheel_slot",
+        "max_queue",
+        "overflow_policy",
+        "closed",
+        "_on_overflow",
+        "_queue",
+        "_coalescible",
+        "_ready",
+        "_writer",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        practice_id: str,
+        max_queue: int,
+        overflow_policy: str,
+        on_overflow: Callable[["ClientConnection"], None],
+    ) -> None:
+        """
+        Initialize the connection record.
+
+        Args:
+            websocket: Accepted WebSocket.
+            practice_id: Practice the client belongs to.
+            max_queue: Maximum queued outbound messages.
+            overflow_policy: One of ``OverflowPolicy``.
+            on_overflow: Called when the DISCONNECT policy drops this client.
+        """
+        self.websocket = websocket
+        self.practice_id = practice_id
+        self.topics: set[str] = set()
+        # Timing wheel slot of the last activity (None while not tracked)
+        self.wheel_slot: Optional[int] = None
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.closed = False
+        self._on_overflow = on_overflow
+        # Entries are [coalesce key, text] so coalescing can replace in place
+        self._queue: deque[list[Optional[str]]] = deque()
+        self._coalescible: dict[str, list[Optional[str]]] = {}
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Number of queued outbound messages."""
+        return len(self._queue)
+
+    def start(self) -> None:
+        """Start the writer task."""
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, text: str, coalesce_key: Optional[str] = None) -> Optional[str]:
+        """
+        Queue a serialized message without waiting for the client.
+
+        Args:
+            text: Serialized message.
+            coalesce_key: Key of state messages that supersede each other.
+
+        Returns:
+            Optional[str]: Drop reason for metrics (``overflow``,
+            ``coalesced``, ``disconnected``) or None if nothing was dropped.
+        """
+        if self.closed:
+            return None
+
+        coalescing = self.overflow_policy == OverflowPolicy.COALESCE
+        if coalescing and coalesce_key is not None:
+            queued = self._coalescible.get(coalesce_key)
+            if queued is not None:
+                queued[1] = text
+                return "coalesced"
+
+        reason = None
+        if len(self._queue) >= self.max_queue:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                self.close()
+                self._on_overflow(self)
+                return "disconnected"
+            dropped = self._queue.popleft()
+            if dropped[0] is not None and self._coalescible.get(dropped[0]) is dropped:
+                del self._coalescible[dropped[0]]
+            reason = "overflow"
+
+        entry = [coalesce_key, text]
+        self._queue.append(entry)
+        if coalescing and coalesce_key is not None:
+            self._coalescible[coalesce_key] = entry
+        self._ready.set()
+        return reason
+
+    def close(self) -> None:
+        """Stop the writer and discard queued messages."""
+        self.closed = True
+        self._queue.clear()
+        self._coalescible.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+
+    async def _write_loop(self) -> None:
+        """Send queued messages in order until the connection fails."""
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            entry = self._queue.popleft()
+            key, text = entry
+            if key is not None and self._coalescible.get(key) is entry:
+                del self._coalescible[key]
+            try:
+                await self.websocket.send_text(text)
+            except Exception as e:
+                # The receive loop notices the broken socket and unregisters
+                logger.warning("Failed to send message", extra={"error": str(e)})
+                self.closed = True
+                self._queue.clear()
+                self._coalescible.clear()
+                return
+
+
+class StreamClient(ClientConnection):
+    """
+    Outbound side of one Server-Sent Events stream.
+
+    Indexed and fanned out to like a WebSocket client, but it queues SSE
+    frames and has no writer task: the response body iterates ``frames``.
+    It is its own registry key (``websocket`` is the client itself).
+    """
+
+    __slots__ = ()
+
+    sse = True
+
+    def __init__(
+        self,
+        practice_id: str,
+        max_queue: int,
+        overflow_policy: str,
+        on_overflow: Callable[["ClientConnection"], None],
+    ) -> None:
+        """
+        Initialize the stream record.
+
+        Args:
+            practice_id: Practice the client belongs to.
+            max_queue: Maximum queued frames.
+            overflow_policy: One of ``OverflowPolicy``.
+            on_overflow: Called when the DISCONNECT policy drops this client.
+        """
+        super().__init__(self, practice_id, max_queue, overflow_policy, on_overflow)
+
+    def start(self) -> None:
+        """Nothing to start: the response pulls frames."""
+
+    def close(self) -> None:
+        """Discard queued frames and end ``frames``."""
+        super().close()
+        self._ready.set()
+
+    async def frames(self) -> AsyncIterator[str]:
+        """
+        Yield queued frames until the stream is closed.
+
+        Everything queued at a wakeup goes out as one chunk: fewer writes,
+        and a compressing proxy flushes whole frames together.
+
+        Yields:
+            str: One or more SSE frames.
+        """
+        while not self.closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            batch = []
+            while self._queue:
+                entry = self._queue.popleft()
+                key = entry[0]
+                if key is not None and self._coalescible.get(key) is entry:
+                    del self._coalescible[key]
+                batch.append(entry[1])
+            yield "".join(batch)
+
+
+def sse_frame(text: str, event_id: Optional[str] = None) -> str:
+    """
+    Frame a serialized message as a Server-Sent Event.
+
+    Frames always have the same layout (optional ``id``, one ``data``
+    line; JSON text has no raw newlines), which keeps them small and lets
+    a compressing proxy reuse most of the previous frame.
+
+    Args:
+        text: Serialized message.
+        event_id: Event ID for ``Last-Event-ID`` resume.
+
+    Returns:
+        str: SSE frame.
+    """
+    if event_id is None:
+        return f"data: {text}\n\n"
+    return f"id: {event_id}\ndata: {text}\n\n"
+
+
+def _coalesce_key(message: dict[str, Any]) -> Optional[str]:
+    """Key under which newer state messages replace queued older ones."""
+    msg_type = message.get("type")
+    if msg_type not in COALESCIBLE_TYPES:
+        return None
+    data = message.get("data") or {}
+    return f"{msg_type}:{data.get('queue_id') or data.get('segment_id') or ''}"
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel over client activity.
+
+    Each slot holds the clients last active during one tick. Activity moves
+    a client to the current slot in O(1); advancing the wheel returns the
+    clients whose slot comes round again, i.e. idle for a full revolution.
+    """
+
+    __slots__ = ("_slots", "_cursor")
+
+    def __init__(self, slots: int) -> None:
+        """
+        Initialize the wheel.
+
+        Args:
+            slots: Ticks per revolution (idle timeout / tick length).
+        """
+        self._slots: list[set[ClientConnection]] = [set() for _ in range(max(slots, 2))]
+        self._cursor = 0
+
+    def touch(self, client: ClientConnection) -> None:
+        """Record activity of a client in the current slot."""
+        slot = client.wheel_slot
+        if slot == self._cursor:
+            return
+        if slot is not None:
+            self._slots[slot].discard(client)
+        self._slots[self._cursor].add(client)
+        client.wheel_slot = self._cursor
+
+    def remove(self, client: ClientConnection) -> None:
+        """Stop tracking a client."""
+        if client.wheel_slot is not None:
+            self._slots[client.wheel_slot].discard(client)
+            client.wheel_slot = None
+
+    def advance(self) -> set[ClientConnection]:
+        """
+        Move to the next tick.
+
+        Returns:
+            set[ClientConnection]: Clients without activity for a revolution.
+        """
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        expired = self._slots[self._cursor]
+        self._slots[self._cursor] = set()
+        for client in expired:
+            client.wheel_slot = None
+        return expired
+
+
+class EncodedMessage:
+    """
+    A message with its JSON text, encoded once and shared by all recipients.
+
+    Frames stay text frames (the apps parse text); the text object itself is
+    what every client queue holds. Encoding waits for the first use, so the
+    practice sequence number assigned on broadcast is part of the one text.
+    """
+
+    __slots__ = ("message", "coalesce_key", "seq", "_text", "_sse")
+
+    def __init__(self, message: dict[str, Any]) -> None:
+        """
+        Wrap the message.
+
+        Args:
+            message: Message payload.
+        """
+        self.message = message
+        self.coalesce_key = _coalesce_key(message)
+        # Practice sequence number, assigned by the first broadcast
+        self.seq: Optional[int] = None
+        self._text: Optional[str] = None
+        self._sse: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """JSON text of the message."""
+        if self._text is None:
+            self._text = _dumps(self.message)
+        return self._text
+
+    def sse(self, epoch: str) -> str:
+        """
+        SSE frame of the message, encoded on first use.
+
+        Args:
+            epoch: Epoch of the sequence number (part of the event ID).
+
+        Returns:
+            str: SSE frame.
+        """
+        if self._sse is None:
+            event_id = None if self.seq is None else f"{epoch}:{self.seq}"
+            self._sse = sse_frame(self.text, event_id)
+        return self._sse
+
+    def sequence(self, seq: int) -> None:
+        """
+        Stamp the practice sequence number into the message.
+
+        Args:
+            seq: Sequence number.
+        """
+        self.message = {**self.message, "seq": seq}
+        self.seq = seq
+        self._text = None
+        self._sse = None
+
+
+def encode_message(message: dict[str, Any] | EncodedMessage) -> EncodedMessage:
+    """
+    Encode a message unless it already is.
+
+    Args:
+        message: Message payload or an ``EncodedMessage``.
+
+    Returns:
+        EncodedMessage: Message with its JSON text.
+    """
+    if isinstance(message, EncodedMessage):
+        return message
+    return EncodedMessage(message)
+
+
+class EventLog:
+    """
+    Sequence counter and replay buffer of one practice.
+
+    Keeps the last frames of the practice's sequenced broadcasts with their
+    topic, so a reconnecting client can be sent exactly what it missed. An
+    event broadcast to the practice and to a topic has two entries with the
+    same sequence number.
+    """
+
+    __slots__ = ("seq", "_entries", "_evicted")
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialize the log.
+
+        Args:
+            size: Frames kept for replay.
+        """
+        self.seq = 0
+        self._entries: deque[tuple[int, Optional[str], str]] = deque(maxlen=size)
+        # Highest sequence number with an entry no longer buffered
+        self._evicted = 0
+
+    def append(self, seq: int, topic: Optional[str], text: str) -> None:
+        """Buffer one sequenced frame."""
+        if len(self._entries) == self._entries.maxlen:
+            self._evicted = self._entries[0][0]
+        self._entries.append((seq, topic, text))
+
+    def since(self, seq: int) -> Optional[list[tuple[int, Optional[str], str]]]:
+        """
+        Frames sequenced after ``seq``.
+
+        Args:
+            seq: Last sequence number the client has.
+
+        Returns:
+            Optional[list[tuple[int, Optional[str], str]]]: (seq, topic,
+            text) in order, or None if some of them are no longer buffered.
+        """
+        if seq < self._evicted or seq > self.seq:
+            return None
+        return [entry for entry in self._entries if entry[0] > seq]
+
 
 class ConnectionManager:
     """
     WebSocket connection manager.
 
-    Manages active connections and broadcasts messages to clients.
+    Manages active connections and broadcasts messages to clients. Messages
+    are serialized once per broadcast and queued per client. With a backplane
+    attached, broadcasts are also published to the other workers, and theirs
+    arrive through ``deliver_remote``.
     """
 
-    def __init__(self) -> None:
-        """Initialize connection manager."""
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        coalesce_window_ms: Optional[int] = None,
+        heartbeat_seconds: Optional[int] = None,
+        idle_timeout_seconds: Optional[int] = None,
+        replay_buffer_size: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize connection manager.
+
+        Args:
+            max_queue: Per-client send queue size (default from settings).
+            overflow_policy: ``OverflowPolicy`` value (default from settings).
+            coalesce_window_ms: Window for merging ``WINDOWED_TYPES``
+                broadcasts (default from settings, 0 disables).
+            heartbeat_seconds: Heartbeat interval (default from settings).
+            idle_timeout_seconds: Disconnect clients silent this long
+                (default from settings, 0 disables).
+            replay_buffer_size: Frames kept per practice for resuming
+                clients (default from settings).
+        """
+        settings = get_settings()
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.WS_OVERFLOW_POLICY
+        if coalesce_window_ms is None:
+            coalesce_window_ms = settings.WS_COALESCE_WINDOW_MS
+        self.coalesce_window = coalesce_window_ms / 1000
+        if heartbeat_seconds is None:
+            heartbeat_seconds = settings.WS_HEARTBEAT_SECONDS
+        if idle_timeout_seconds is None:
+            idle_timeout_seconds = settings.WS_IDLE_TIMEOUT_SECONDS
+        # Practices heartbeat on different ticks (phase) to spread the frames
+        self._ticks_per_heartbeat = max(
+            1, round(heartbeat_seconds / HEARTBEAT_TICK_SECONDS)
+        )
+        self._wheel: Optional[TimingWheel] = None
+        if idle_timeout_seconds:
+            self._wheel = TimingWheel(
+                math.ceil(idle_timeout_seconds / HEARTBEAT_TICK_SECONDS)
+            )
+        self._tick = 0
+        self._ticker: Optional[asyncio.Task] = None
         # Connections by practice_id
-        self._active_connections: dict[str, list[WebSocket]] = {}
-        # Connections by specific topic (e.g., "ticket:123", "queue:abc")
-        self._topic_subscriptions: dict[str, list[WebSocket]] = {}
+        self._active_connections: dict[str, set[ClientConnection]] = {}
+        # Connections by (practice_id, topic), e.g. ("p1", "ticket:A-001");
+        # each ClientConnection.topics holds the reverse direction. Topic
+        # names such as ticket numbers repeat across practices.
+        self._topic_subscriptions: dict[tuple[str, str], set[ClientConnection]] = {}
+        self._clients: dict[WebSocket, ClientConnection] = {}
+        self._closing: set[asyncio.Task] = set()
+        self._backplane: Optional["Backplane"] = None
+        # Windowed broadcasts waiting for release: (practice, topic, key) -> args
+        self._held: dict[tuple, tuple[Optional[str], Optional[str], dict[str, Any]]] = {}
+        # Sequence numbers restart with every process; clients resume only
+        # within the same epoch
+        self.epoch = uuid.uuid4().hex[:12]
+        self.replay_buffer_size = replay_buffer_size or settings.WS_REPLAY_BUFFER_SIZE
+        self._logs: dict[str, EventLog] = {}
+        self._last_remote: Optional[tuple[Optional[str], dict[str, Any], EncodedMessage]] = None
+
+    def attach_backplane(self, backplane: Optional["Backplane"]) -> None:
+        """
+        Share broadcasts with other workers (None detaches).
+
+        Args:
+            backplane: Started backplane.
+        """
+        self._backplane = backplane
+
+    def deliver_remote(
+        self,
+        practice_id: Optional[str],
+        topic: Optional[str],
+        message: dict[str, Any],
+    ) -> None:
+        """
+        Fan out a broadcast received from another worker to local clients.
+
+        Args:
+            practice_id: Practice of a practice broadcast.
+            topic: Topic of a topic broadcast (None for practice broadcasts).
+            message: Message payload.
+        """
+        # Numbered in this worker's own sequence, like local broadcasts. The
+        # practice and topic copies of one event arrive back to back and
+        # share one number here too.
+        last = self._last_remote
+        if last is not None and last[0] == practice_id and last[1] == message:
+            encoded = last[2]
+        else:
+            encoded = EncodedMessage(message)
+            self._last_remote = (practice_id, message, encoded)
+        encoded = self._sequence(practice_id, topic, encoded)
+        clients = self._recipients(practice_id, topic)
+        if clients:
+            self._fan_out(clients, encoded)
+
+    def stream_position(self, practice_id: str) -> int:
+        """
+        Sequence number of the practice's latest broadcast.
+
+        Args:
+            practice_id: Practice ID.
+
+        Returns:
+            int: Latest sequence number (0 before the first broadcast).
+        """
+        log = self._logs.get(practice_id)
+        return log.seq if log is not None else 0
+
+    def resume(self, websocket: WebSocket, since_seq: int, epoch: Optional[str]) -> bool:
+        """
+        Queue the broadcasts a reconnecting client missed.
+
+        Only frames for the practice and the client's current topics are
+        replayed, in order. Call right after ``connect`` (no await in
+        between) so replayed and live frames neither overlap nor leave a gap.
+
+        Args:
+            websocket: Registered WebSocket.
+            since_seq: Last sequence number the client received.
+            epoch: Epoch that sequence number belongs to.
+
+        Returns:
+            bool: True if the client is caught up; False if it needs a
+            snapshot (other epoch, gap beyond the buffer, or more missed
+            frames than its send queue holds).
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return True
+        missed = None
+        if epoch == self.epoch:
+            log = self._logs.get(client.practice_id)
+            if log is not None:
+                missed = log.since(since_seq)
+            elif since_seq == 0:
+                missed = []
+        if missed is not None:
+            missed = [
+                sse_frame(text, f"{self.epoch}:{seq}") if client.sse else text
+                for seq, topic, text in missed
+                if topic is None or topic in client.topics
+            ]
+        if missed is None or len(missed) > client.max_queue:
+            record_ws_resume("snapshot")
+            return False
+
+        for text in missed:
+            reason = client.enqueue(text)
+            if reason:
+                record_ws_dropped(reason)
+        record_ws_resume("replayed")
+        return True
 
     async def connect(
         self,
@@ -58,22 +696,56 @@ class ConnectionManager:
         """
         await websocket.accept()
 
-        # Add to practice connections
-        if practice_id not in self._active_connections:
-            self._active_connections[practice_id] = []
-        self._active_connections[practice_id].append(websocket)
-
-        # Add to topic subscriptions
-        if topics:
-            for topic in topics:
-                if topic not in self._topic_subscriptions:
-                    self._topic_subscriptions[topic] = []
-                self._topic_subscriptions[topic].append(websocket)
+        client = ClientConnection(
+            websocket,
+            practice_id,
+            self.max_queue,
+            self.overflow_policy,
+            self._drop_slow_client,
+        )
+        self._register(client, topics)
+        if self._wheel is not None:
+            self._wheel.touch(client)
 
         logger.info(
             "WebSocket connected", extra={"practice_id": practice_id, "topics": topics}
         )
 
+    def open_stream(self, practice_id: str, topics: list[str] | None = None) -> StreamClient:
+        """
+        Register a Server-Sent Events client.
+
+        Streams only receive: they are not tracked for idle timeout (a dead
+        stream fails on the next heartbeat write). Unregister with
+        ``disconnect(stream, practice_id)``.
+
+        Args:
+            practice_id: Practice ID for broadcast filtering.
+            topics: Optional specific topics to subscribe to.
+
+        Returns:
+            StreamClient: Registered stream; iterate ``frames``.
+        """
+        client = StreamClient(
+            practice_id, self.max_queue, self.overflow_policy, self._drop_slow_client
+        )
+        self._register(client, topics)
+        return client
+
+    def _register(self, client: ClientConnection, topics: list[str] | None) -> None:
+        """Index a new client and make sure the ticker runs."""
+        self._clients[client.websocket] = client
+        client.start()
+        if self._ticker is None:
+            self._ticker = asyncio.create_task(self._run_ticker())
+
+        # Add to practice connections
+        self._active_connections.setdefault(client.practice_id, set()).add(client)
+
+        # Add to topic subscriptions
+        if topics:
+            self._subscribe(client, topics)
+
     def disconnect(self, websocket: WebSocket, practice_id: str) -> None:
         """
         Remove a WebSocket connection.
@@ -82,65 +754,283 @@ class ConnectionManager:
             websocket: WebSocket to remove.
             practice_id: Practice ID.
         """
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        client.close()
+        if self._wheel is not None:
+            self._wheel.remove(client)
+        if not self._clients and self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker = None
+
         # Remove from practice connections
-        if practice_id in self._active_connections:
-            if websocket in self._active_connections[practice_id]:
-                self._active_connections[practice_id].remove(websocket)
+        connections = self._active_connections.get(client.practice_id)
+        if connections is not None:
+            connections.discard(client)
+            if not connections:
+                del self._active_connections[client.practice_id]
 
-        # Remove from all topic subscriptions
-        for topic in list(self._topic_subscriptions.keys()):
-            if websocket in self._topic_subscriptions[topic]:
-                self._topic_subscriptions[topic].remove(websocket)
-            if not self._topic_subscriptions[topic]:
-                del self._topic_subscriptions[topic]
+        # Remove from the client's own topics only
+        self._unsubscribe(client, list(client.topics))
 
         logger.info("WebSocket disconnected", extra={"practice_id": practice_id})
 
+    def subscribe(self, websocket: WebSocket, topics: list[str]) -> None:
+        """
+        Add topic subscriptions to a registered connection.
+
+        Args:
+            websocket: Registered WebSocket.
+            topics: Topics to add; already subscribed ones are ignored.
+        """
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._subscribe(client, topics)
+
+    def unsubscribe(self, websocket: WebSocket, topics: list[str]) -> None:
+        """
+        Remove topic subscriptions from a registered connection.
+
+        Args:
+            websocket: Registered WebSocket.
+            topics: Topics to remove; unknown ones are ignored.
+        """
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._unsubscribe(client, topics)
+
+    def _subscribe(self, client: ClientConnection, topics: list[str]) -> None:
+        """Index the client under each topic and each topic under the client."""
+        for topic in topics:
+            key = (client.practice_id, topic)
+            self._topic_subscriptions.setdefault(key, set()).add(client)
+            client.topics.add(topic)
+
+    def _unsubscribe(self, client: ClientConnection, topics: list[str]) -> None:
+        """Drop both index directions; empty topics are removed."""
+        for topic in topics:
+            client.topics.discard(topic)
+            key = (client.practice_id, topic)
+            subscribers = self._topic_subscriptions.get(key)
+            if subscribers is None:
+                continue
+            subscribers.discard(client)
+            if not subscribers:
+                del self._topic_subscriptions[key]
+
+    def touch(self, websocket: WebSocket) -> None:
+        """
+        Record that a client is alive (it sent a message).
+
+        Args:
+            websocket: Registered WebSocket.
+        """
+        client = self._clients.get(websocket)
+        if client is not None and self._wheel is not None:
+            self._wheel.touch(client)
+
+    def _drop_slow_client(self, client: ClientConnection) -> None:
+        """Unregister and close a client whose send queue overflowed."""
+        logger.warning(
+            "Disconnecting slow WebSocket client",
+            extra={"practice_id": client.practice_id},
+        )
+        self._drop(client, 1013)  # try again later
+
+    def _drop(self, client: ClientConnection, code: int) -> None:
+        """Unregister a client and close its socket in the background."""
+        self.disconnect(client.websocket, client.practice_id)
+        if client.sse:
+            return  # disconnect ended its frames
+        task = asyncio.create_task(_close_quietly(client.websocket, code))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _run_ticker(self) -> None:
+        """Drive heartbeats and idle detection for all connections."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_TICK_SECONDS)
+            try:
+                self._on_tick()
+            except Exception as e:
+                logger.error("WebSocket ticker error", extra={"error": str(e)})
+
+    def _on_tick(self) -> None:
+        """One tick: heartbeat the practices due now, drop idle clients."""
+        self._tick += 1
+        phase = self._tick % self._ticks_per_heartbeat
+        now = datetime.now(timezone.utc).isoformat()
+        for practice_id, clients in list(self._active_connections.items()):
+            if hash(practice_id) % self._ticks_per_heartbeat != phase:
+                continue
+            # One frame per practice, shared by all its connections
+            self._fan_out(
+                clients,
+                {
+                    "type": MessageType.HEARTBEAT,
+                    "data": {"server_time": now, "connections": len(clients)},
+                    "timestamp": now,
+                },
+            )
+
+        if self._wheel is None:
+            return
+        for client in self._wheel.advance():
+            logger.info(
+                "Disconnecting idle WebSocket client",
+                extra={"practice_id": client.practice_id},
+            )
+            self._drop(client, 1001)  # going away
+
+    def _fan_out(
+        self,
+        clients: set[ClientConnection],
+        message: dict[str, Any] | EncodedMessage,
+    ) -> None:
+        """Encode once and queue the same text for every client."""
+        encoded = encode_message(message)
+        text, coalesce_key = encoded.text, encoded.coalesce_key
+        deepest = 0
+        # Copy: the DISCONNECT policy unregisters clients while iterating
+        for client in list(clients):
+            if client.sse:
+                reason = client.enqueue(encoded.sse(self.epoch), coalesce_key)
+            else:
+                reason = client.enqueue(text, coalesce_key)
+            if reason:
+                record_ws_dropped(reason)
+            depth = len(client._queue)
+            if depth > deepest:
+                deepest = depth
+        record_ws_fanout(deepest)
+
+    def _sequence(
+        self,
+        practice_id: Optional[str],
+        topic: Optional[str],
+        message: dict[str, Any] | EncodedMessage,
+    ) -> EncodedMessage:
+        """
+        Number a practice broadcast and keep its frame for replay.
+
+        The practice and topic broadcasts of one event share its number.
+        Broadcasts without a practice are not sequenced.
+        """
+        encoded = encode_message(message)
+        if practice_id is None:
+            return encoded
+        log = self._logs.get(practice_id)
+        if log is None:
+            log = self._logs[practice_id] = EventLog(self.replay_buffer_size)
+        if encoded.seq is None:
+            log.seq += 1
+            encoded.sequence(log.seq)
+            _remember_state(practice_id, encoded.message)
+        log.append(encoded.seq, topic, encoded.text)
+        return encoded
+
+    def _broadcast(
+        self,
+        practice_id: Optional[str],
+        topic: Optional[str],
+        message: dict[str, Any] | EncodedMessage,
+    ) -> None:
+        """Sequence, publish to the backplane and fan out to local clients."""
+        encoded = self._sequence(practice_id, topic, message)
+        if self._backplane is not None:
+            self._backplane.publish(practice_id, topic, encoded.message)
+        clients = self._recipients(practice_id, topic)
+        if clients:
+            self._fan_out(clients, encoded)
+
+    def _recipients(
+        self, practice_id: Optional[str], topic: Optional[str]
+    ) -> Optional[set[ClientConnection]]:
+        """
+        Local clients of a practice or topic broadcast.
+
+        A topic broadcast of a practice goes to that practice's subscribers
+        only, so its sequence number never reaches another practice's
+        stream; one without a practice goes to all subscribers.
+        """
+        if topic is None:
+            return self._active_connections.get(practice_id or "")
+        if practice_id is not None:
+            return self._topic_subscriptions.get((practice_id, topic))
+        clients: set[ClientConnection] = set()
+        for connected_practice in self._active_connections:
+            subscribers = self._topic_subscriptions.get((connected_practice, topic))
+            if subscribers:
+                clients |= subscribers
+        return clients
+
+    def _hold(
+        self,
+        practice_id: Optional[str],
+        topic: Optional[str],
+        message: dict[str, Any] | EncodedMessage,
+    ) -> bool:
+        """
+        Keep a windowed broadcast back until its window closes.
+
+        The first message of a (target, queue/segment) opens the window;
+        later ones replace it, and only the latest is encoded and sent.
+
+        Returns:
+            bool: True if held (the caller must not send it now).
+        """
+        raw = message.message if isinstance(message, EncodedMessage) else message
+        if not self.coalesce_window or raw.get("type") not in WINDOWED_TYPES:
+            return False
+        slot = (practice_id, topic, _coalesce_key(raw))
+        if slot not in self._held:
+            asyncio.get_running_loop().call_later(
+                self.coalesce_window, self._release, slot
+            )
+        self._held[slot] = (practice_id, topic, message)
+        return True
+
+    def _release(self, slot: tuple) -> None:
+        """Send the latest message held for a window."""
+        held = self._held.pop(slot, None)
+        if held is not None:
+            self._broadcast(*held)
+
     async def broadcast_to_practice(
         self,
         practice_id: str,
-        message: dict[str, Any],
+        message: dict[str, Any] | EncodedMessage,
     ) -> None:
         """
         Broadcast message to all connections in a practice.
 
         Args:
             practice_id: Target practice.
-            message: Message payload.
+            message: Message payload, or an ``EncodedMessage`` shared with
+                other broadcasts of the same event.
         """
-        if practice_id not in self._active_connections:
-            return
-
-        message_json = json.dumps(message, default=str)
-
-        for connection in self._active_connections[practice_id]:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.warning("Failed to send message", extra={"error": str(e)})
+        if not self._hold(practice_id, None, message):
+            self._broadcast(practice_id, None, message)
 
     async def broadcast_to_topic(
         self,
         topic: str,
-        message: dict[str, Any],
+        message: dict[str, Any] | EncodedMessage,
+        practice_id: Optional[str] = None,
     ) -> None:
         """
-        Broadcast message to all connections subscribed to a topic.
+        Broadcast message to the connections subscribed to a topic.
 
         Args:
             topic: Topic name (e.g., "ticket:123").
-            message: Message payload.
+            message: Message payload or ``EncodedMessage``.
+            practice_id: Practice the event belongs to; only its subscribers
+                get it, sequenced with the practice's other broadcasts. None
+                reaches the topic's subscribers in every practice, unsequenced.
         """
-        if topic not in self._topic_subscriptions:
-            return
-
-        message_json = json.dumps(message, default=str)
-
-        for connection in self._topic_subscriptions[topic]:
-            try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.warning("Failed to send topic message", extra={"error": str(e)})
+        if not self._hold(practice_id, topic, message):
+            self._broadcast(practice_id, topic, message)
 
     async def send_personal_message(
         self,
@@ -150,12 +1040,32 @@ class ConnectionManager:
         """
         Send message to a specific connection.
 
+        Registered connections get it through their send queue, behind any
+        broadcasts already queued.
+
         Args:
             websocket: Target connection.
             message: Message payload.
         """
-        message_json = json.dumps(message, default=str)
-        await websocket.send_text(message_json)
+        await self.send_personal_text(websocket, _dumps(message))
+
+    async def send_personal_text(self, websocket: WebSocket, text: str) -> None:
+        """
+        Send an already serialized message to a specific connection.
+
+        Args:
+            websocket: Target connection (or ``StreamClient``).
+            text: Serialized message.
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            await websocket.send_text(text)
+            return
+        if client.sse:
+            text = sse_frame(text)
+        reason = client.enqueue(text)
+        if reason:
+            record_ws_dropped(reason)
 
     def get_connection_count(self, practice_id: Optional[str] = None) -> int:
         """
@@ -168,8 +1078,25 @@ class ConnectionManager:
             Connection count.
         """
         if practice_id:
-            return len(self._active_connections.get(practice_id, []))
-        return sum(len(conns) for conns in self._active_connections.values())
+            return len(self._active_connections.get(practice_id, ()))
+        return len(self._clients)
+
+
+def _remember_state(practice_id: str, message: dict[str, Any]) -> None:
+    """Keep ticket states current for subscription snapshots."""
+    msg_type = message.get("type")
+    if msg_type in TICKET_EVENT_TYPES:
+        get_topic_snapshot_cache().remember_ticket(practice_id, message.get("data") or {})
+    elif msg_type == MessageType.DAY_CLOSED:
+        get_topic_snapshot_cache().forget_tickets(practice_id)
+
+
+async def _close_quietly(websocket: WebSocket, code: int) -> None:
+    """Close a WebSocket, ignoring errors from an already broken socket."""
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
 
 
 # Global connection manager instance
@@ -194,12 +1121,16 @@ class MessageType:
     TICKET_CALLED = "ticket.called"
     TICKET_COMPLETED = "ticket.completed"
     TICKET_CANCELLED = "ticket.cancelled"
+    TICKET_UPDATED = "ticket.updated"
     QUEUE_UPDATED = "queue.updated"
+    DAY_CLOSED = "queue.day_closed"
     CHECK_IN = "check_in"
     LED_STATUS = "led.status"
     WAIT_TIME_UPDATE = "wait_time.update"
     SYSTEM_NOTIFICATION = "system.notification"
     HEARTBEAT = "heartbeat"
+    SNAPSHOT = "snapshot"
+    WEBRTC_SIGNAL = "webrtc.signal"
 
     # Client -> Server
     SUBSCRIBE = "subscribe"
@@ -207,6 +1138,31 @@ class MessageType:
     PING = "ping"
 
 
+# Events carrying a ticket's public state (kept for ticket: snapshots)
+TICKET_EVENT_TYPES = frozenset(
+    {
+        MessageType.TICKET_CREATED,
+        MessageType.TICKET_CALLED,
+        MessageType.TICKET_COMPLETED,
+        MessageType.TICKET_CANCELLED,
+        MessageType.TICKET_UPDATED,
+    }
+)
+
+# High-frequency state messages merged within WS_COALESCE_WINDOW_MS
+WINDOWED_TYPES = frozenset({MessageType.WAIT_TIME_UPDATE, MessageType.LED_STATUS})
+
+# Messages that carry the latest state only; a newer one supersedes a queued one
+COALESCIBLE_TYPES = frozenset(
+    {
+        MessageType.QUEUE_UPDATED,
+        MessageType.LED_STATUS,
+        MessageType.WAIT_TIME_UPDATE,
+        MessageType.HEARTBEAT,
+    }
+)
+
+
 # ============================================================================
 # WebSocket Endpoints
 # ============================================================================
@@ -217,6 +1173,9 @@ async def websocket_events(
     websocket: WebSocket,
     practice_id: str,
     topics: Optional[str] = Query(None, description="Comma-separated topics"),
+    since_seq: Optional[int] = Query(None, ge=0, description="Last seq received"),
+    epoch: Optional[str] = Query(None, description="Epoch of since_seq"),
+    token: Optional[str] = Query(None, description="Access token for consultation topics"),
 ) -> None:
     """
     WebSocket endpoint for real-time events.
@@ -226,19 +1185,35 @@ async def websocket_events(
         - `ticket:{ticket_number}` - Updates for a specific ticket.
         - `led` - LED status changes.
         - `wait_times` - Wait time updates.
+        - `consultation:{consultation_id}` - WebRTC signals of a call
+          (needs `token`, the access token of the patient or doctor).
+
+    `queue:`, `ticket:` and `wait_times` subscriptions start with a
+    `snapshot` message per topic (`"topic": "queue:abc"`, `data` = state).
 
     Example connection:
         ws://localhost:8000/api/v1/ws/events/practice-123?topics=queue:abc,led
 
+    Resuming after a reconnect (values from the last ``seq`` received and
+    the ``epoch`` of the ``connected`` message):
+        ws://.../events/practice-123?topics=led&since_seq=41&epoch=3f2a9c0d1e4b
+
+    The missed events follow ``connected``; if they cannot be replayed, a
+    ``snapshot`` message with the public queue summary comes instead.
+
     Message format:
         {
             "type": "ticket.called",
             "data": {...},
+            "seq": 42,
             "timestamp": "2026-01-13T10:30:00Z"
         }
     """
     # Parse topics
     topic_list = topics.split(",") if topics else None
+    rejected: list[str] = []
+    if topic_list:
+        topic_list, rejected = await _authorize_topics(topic_list, token)
 
     await manager.connect(websocket, practice_id, topic_list)
 
@@ -251,39 +1226,40 @@ async def websocket_events(
                 "data": {
                     "practice_id": practice_id,
                     "subscribed_topics": topic_list,
+                    "rejected_topics": rejected,
                     "server_time": datetime.now(timezone.utc).isoformat(),
+                    "epoch": manager.epoch,
+                    "seq": manager.stream_position(practice_id),
                 },
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             },
         )
+        # No await between connect and resume: replayed frames end exactly
+        # where live ones begin
+        resumed = since_seq is not None and manager.resume(websocket, since_seq, epoch)
+        if since_seq is not None and not resumed:
+            await manager.send_personal_text(websocket, await _snapshot_frame(practice_id))
+        if topic_list and not resumed:
+            await _send_topic_snapshots(websocket, practice_id, topic_list)
+
+        # Heartbeats come from the manager's shared ticker
+        while True:
+            # Wait for messages from client
+            data = await websocket.receive_text()
+            manager.touch(websocket)
 
-        # Start heartbeat task
-        heartbeat_task = asyncio.create_task(_send_heartbeat(websocket, practice_id))
-
-        try:
-            while True:
-                # Wait for messages from client
-                data = await websocket.receive_text()
-
-                try:
-                    message = json.loads(data)
-                    await _handle_client_message(websocket, practice_id, message)
-                except json.JSONDecodeError:
-                    await manager.send_personal_message(
-                        websocket,
-                        {
-                            "type": "error",
-                            "data": {"message": "Invalid JSON"},
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
-                        },
-                    )
-
-        finally:
-            heartbeat_task.cancel()
             try:
-                await heartbeat_task
-            except asyncio.CancelledError:
-                pass
+                message = json.loads(data)
+                await _handle_client_message(websocket, practice_id, message, token)
+            except json.JSONDecodeError:
+                await manager.send_personal_message(
+                    websocket,
+                    {
+                        "type": "error",
+                        "data": {"message": "Invalid JSON"},
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
 
     except WebSocketDisconnect:
         manager.disconnect(websocket, practice_id)
@@ -292,36 +1268,154 @@ async def websocket_events(
         manager.disconnect(websocket, practice_id)
 
 
-async def _send_heartbeat(websocket: WebSocket, practice_id: str) -> None:
+async def _snapshot_frame(practice_id: str) -> str:
     """
-    Send periodic heartbeat to keep connection alive.
+    Build the resync message for a client that cannot be replayed to.
+
+    ``data`` is the public queue summary from ``PublicSummaryCache``, the
+    same serialized body ``/queue/public/summary`` serves, so a reconnect
+    storm costs at most one summary query per practice. It is null if the
+    practice ID is no UUID or the summary cannot be built; the client then
+    loads its state over REST.
 
     Args:
-        websocket: WebSocket connection.
-        practice_id: Practice ID.
+        practice_id: Practice ID from the URL.
+
+    Returns:
+        str: Serialized ``snapshot`` message.
+    """
+    body = "null"
+    try:
+        async with async_session_maker() as db:
+            entry = await get_public_summary_cache().get(db, uuid.UUID(practice_id))
+        body = entry.body.decode()
+    except Exception as e:
+        logger.warning(
+            "WebSocket snapshot unavailable",
+            extra={"practice_id": practice_id, "error": str(e)},
+        )
+    now = datetime.now(timezone.utc).isoformat()
+    # Read after the build: events queued meanwhile are covered by the summary
+    seq = manager.stream_position(practice_id)
+    # The cached body is already JSON; splice it in instead of re-encoding
+    return (
+        f'{{"type":"{MessageType.SNAPSHOT}","data":{body},"seq":{seq},'
+        f'"epoch":"{manager.epoch}","timestamp":"{now}"}}'
+    )
+
+
+async def _authorize_topics(
+    topics: list[str],
+    token: Optional[str],
+) -> tuple[list[str], list[str]]:
+    """
+    Split topics into those the client may subscribe to and the rest.
+
+    ``consultation:{id}`` topics carry SDP and ICE candidates and need the
+    access token of the consultation's patient or doctor; all other topics
+    are public.
+
+    Args:
+        topics: Requested topics.
+        token: JWT access token, if any.
+
+    Returns:
+        tuple[list[str], list[str]]: Allowed and rejected topics.
     """
-    while True:
-        await asyncio.sleep(30)
+    allowed: list[str] = []
+    rejected: list[str] = []
+    user_id: Optional[uuid.UUID] = None
+    for topic in topics:
+        if not topic.startswith("consultation:"):
+            allowed.append(topic)
+            continue
+        if user_id is None and token:
+            payload = decode_token(token)
+            if payload is not None and payload.type == "access":
+                try:
+                    user_id = uuid.UUID(payload.sub)
+                except ValueError:
+                    pass
         try:
+            consultation_id = uuid.UUID(topic.removeprefix("consultation:"))
+        except ValueError:
+            consultation_id = None
+        room = None
+        if user_id is not None and consultation_id is not None:
+            async with async_session_maker() as db:
+                room = await get_signal_store().join(db, consultation_id, user_id)
+        if room is not None and room.is_participant(user_id):
+            allowed.append(topic)
+        else:
+            rejected.append(topic)
+    return allowed, rejected
+
+
+async def _send_pending_signals(websocket: WebSocket, topics: list[str]) -> None:
+    """Deliver the stored signals of newly joined consultation rooms."""
+    store = get_signal_store()
+    for topic in topics:
+        if not topic.startswith("consultation:"):
+            continue
+        room = store.get(uuid.UUID(topic.removeprefix("consultation:")))
+        if room is None:
+            continue
+        for signal in store.since(room):
             await manager.send_personal_message(
                 websocket,
                 {
-                    "type": MessageType.HEARTBEAT,
-                    "data": {
-                        "server_time": datetime.now(timezone.utc).isoformat(),
-                        "connections": manager.get_connection_count(practice_id),
-                    },
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "type": MessageType.WEBRTC_SIGNAL,
+                    "data": signal.as_event(),
+                    "timestamp": signal.timestamp.isoformat(),
                 },
             )
-        except Exception:
-            break
+
+
+async def _send_topic_snapshots(
+    websocket: WebSocket,
+    practice_id: str,
+    topics: list[str],
+) -> None:
+    """
+    Push the current state of each subscribed topic that has one.
+
+    Consultation topics get their pending signals. Other states come serialized from the topic snapshot cache; the database is
+    only touched when the practice summary changed since the last build.
+
+    Args:
+        websocket: Registered WebSocket.
+        practice_id: Practice ID from the URL.
+        topics: Newly subscribed topics.
+    """
+    await _send_pending_signals(websocket, topics)
+    wanted = [topic for topic in topics if is_snapshot_topic(topic)]
+    if not wanted:
+        return
+    try:
+        async with async_session_maker() as db:
+            states = await get_topic_snapshot_cache().get(db, uuid.UUID(practice_id), wanted)
+    except Exception as e:
+        logger.warning(
+            "WebSocket topic snapshot unavailable",
+            extra={"practice_id": practice_id, "error": str(e)},
+        )
+        return
+
+    now = datetime.now(timezone.utc).isoformat()
+    seq = manager.stream_position(practice_id)
+    for topic, state in states.items():
+        await manager.send_personal_text(
+            websocket,
+            f'{{"type":"{MessageType.SNAPSHOT}","topic":{_dumps(topic)},'
+            f'"data":{state},"seq":{seq},"timestamp":"{now}"}}',
+        )
 
 
 async def _handle_client_message(
     websocket: WebSocket,
     practice_id: str,
     message: dict[str, Any],
+    token: Optional[str] = None,
 ) -> None:
     """
     Handle incoming message from client.
@@ -330,6 +1424,8 @@ async def _handle_client_message(
         websocket: WebSocket connection.
         practice_id: Practice ID.
         message: Parsed message.
+        token: Access token from the connection URL; a subscribe message
+            may carry its own ``token``.
     """
     msg_type = message.get("type", "")
 
@@ -345,29 +1441,26 @@ async def _handle_client_message(
 
     elif msg_type == MessageType.SUBSCRIBE:
         # Subscribe to additional topics
-        topics = message.get("data", {}).get("topics", [])
-        for topic in topics:
-            if topic not in manager._topic_subscriptions:
-                manager._topic_subscriptions[topic] = []
-            if websocket not in manager._topic_subscriptions[topic]:
-                manager._topic_subscriptions[topic].append(websocket)
+        data = message.get("data", {})
+        topics, rejected = await _authorize_topics(
+            data.get("topics", []), data.get("token") or token
+        )
+        manager.subscribe(websocket, topics)
 
         await manager.send_personal_message(
             websocket,
             {
                 "type": "subscribed",
-                "data": {"topics": topics},
+                "data": {"topics": topics, "rejected": rejected},
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             },
         )
+        await _send_topic_snapshots(websocket, practice_id, topics)
 
     elif msg_type == MessageType.UNSUBSCRIBE:
         # Unsubscribe from topics
         topics = message.get("data", {}).get("topics", [])
-        for topic in topics:
-            if topic in manager._topic_subscriptions:
-                if websocket in manager._topic_subscriptions[topic]:
-                    manager._topic_subscriptions[topic].remove(websocket)
+        manager.unsubscribe(websocket, topics)
 
         await manager.send_personal_message(
             websocket,
@@ -399,26 +1492,20 @@ async def broadcast_ticket_created(
     ticket_data: dict[str, Any],
 ) -> None:
     """Broadcast ticket created event."""
-    await manager.broadcast_to_practice(
-        practice_id,
+    # Encoded once for the practice and the queue topic
+    message = encode_message(
         {
             "type": MessageType.TICKET_CREATED,
             "data": ticket_data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
-        },
+        }
     )
+    await manager.broadcast_to_practice(practice_id, message)
 
     # Also broadcast to queue topic
     queue_id = ticket_data.get("queue_id")
     if queue_id:
-        await manager.broadcast_to_topic(
-            f"queue:{queue_id}",
-            {
-                "type": MessageType.TICKET_CREATED,
-                "data": ticket_data,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        )
+        await manager.broadcast_to_topic(f"queue:{queue_id}", message, practice_id)
 
 
 async def broadcast_ticket_called(
@@ -426,26 +1513,54 @@ async def broadcast_ticket_called(
     ticket_data: dict[str, Any],
 ) -> None:
     """Broadcast ticket called event."""
-    await manager.broadcast_to_practice(
-        practice_id,
+    message = encode_message(
         {
             "type": MessageType.TICKET_CALLED,
             "data": ticket_data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
-        },
+        }
     )
+    await manager.broadcast_to_practice(practice_id, message)
 
     # Broadcast to specific ticket topic
     ticket_number = ticket_data.get("ticket_number")
     if ticket_number:
-        await manager.broadcast_to_topic(
-            f"ticket:{ticket_number}",
-            {
-                "type": MessageType.TICKET_CALLED,
-                "data": ticket_data,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        )
+        await manager.broadcast_to_topic(f"ticket:{ticket_number}", message, practice_id)
+
+
+async def broadcast_ticket_status(
+    practice_id: str,
+    message_type: str,
+    ticket_data: dict[str, Any],
+) -> None:
+    """Broadcast a ticket status change (completed, cancelled, ...)."""
+    message = encode_message(
+        {
+            "type": message_type,
+            "data": ticket_data,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    await manager.broadcast_to_practice(practice_id, message)
+
+    ticket_number = ticket_data.get("ticket_number")
+    if ticket_number:
+        await manager.broadcast_to_topic(f"ticket:{ticket_number}", message, practice_id)
+
+
+async def broadcast_day_closed(
+    practice_id: str,
+    close_data: dict[str, Any],
+) -> None:
+    """Broadcast one aggregated end-of-day event instead of one per ticket."""
+    await manager.broadcast_to_practice(
+        practice_id,
+        {
+            "type": MessageType.DAY_CLOSED,
+            "data": close_data,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+    )
 
 
 async def broadcast_check_in(
@@ -467,7 +1582,21 @@ async def broadcast_wait_time_update(
     practice_id: str,
     wait_time_data: dict[str, Any],
 ) -> None:
-    """Broadcast wait time update."""
+    """
+    Broadcast wait time update.
+
+    If ``wait_time_data`` carries ``queue_id`` and ``waiting_count`` but no
+    ``estimated_wait_minutes``, the estimate is filled in from the online
+    wait time estimator (O(1), no database access).
+    """
+    queue_id = wait_time_data.get("queue_id")
+    if queue_id and "estimated_wait_minutes" not in wait_time_data:
+        wait_time_data = {
+            **wait_time_data,
+            "estimated_wait_minutes": get_wait_time_estimator().estimate_wait(
+                uuid.UUID(str(queue_id)), int(wait_time_data.get("waiting_count", 0))
+            ),
+        }
     await manager.broadcast_to_topic(
         "wait_times",
         {
@@ -475,6 +1604,7 @@ async def broadcast_wait_time_update(
             "data": wait_time_data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         },
+        practice_id,
     )
 
 
@@ -490,6 +1620,24 @@ async def broadcast_led_status(
             "data": led_data,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         },
+        practice_id,
+    )
+
+
+async def broadcast_webrtc_signal(
+    practice_id: str,
+    consultation_id: str,
+    signal_data: dict[str, Any],
+) -> None:
+    """Push a WebRTC signal to the participants of a consultation."""
+    await manager.broadcast_to_topic(
+        f"consultation:{consultation_id}",
+        {
+            "type": MessageType.WEBRTC_SIGNAL,
+            "data": signal_data,
+            "timestamp": signal_data["timestamp"],
+        },
+        practice_id,
     )
 
 
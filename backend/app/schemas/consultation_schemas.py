@@ -145,8 +145,9 @@ class ConsultationMessageListResponse(BaseModel):
     """List of consultation messages."""
 
     items: list[ConsultationMessageResponse]
-    total: int
+    total: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # =============================================================================
@@ -215,18 +216,20 @@ class ConsultationListResponse(BaseModel):
     """Paginated consultation list."""
 
     items: list[ConsultationPatientResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class ConsultationStaffListResponse(BaseModel):
     """Paginated consultation list for staff."""
 
     items: list[ConsultationStaffResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # =============================================================================
@@ -259,6 +262,7 @@ class WebRTCIceCandidate(BaseModel):
 class WebRTCSignal(BaseModel):
     """Generic WebRTC signal for real-time communication."""
 
+    seq: int = Field(0, description="Sequence number within the consultation room")
     signal_type: str = Field(..., description="offer, answer, ice-candidate")
     payload: dict
     sender_id: uuid.UUID
@@ -205,9 +205,10 @@ class DocumentRequestStaffListResponse(BaseModel):
     """Paginated document request list for staff."""
 
     items: list[DocumentRequestStaffResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # =============================================================================
@@ -8,7 +8,7 @@ import uuid
 from datetime import datetime
 from uuid import UUID
 from enum import Enum
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
@@ -306,10 +306,36 @@ class QueueStatsResponse(BaseModel):
     waiting_count: int
     in_progress_count: int
     completed_today: int
+    no_show_today: int = 0
     average_wait_time: int
     current_number: int
 
 
+class DayCloseRequest(BaseModel):
+    """End-of-day close request for a practice."""
+
+    outcome: Literal[TicketStatus.NO_SHOW, TicketStatus.CANCELLED] = TicketStatus.NO_SHOW
+    reset_counters: bool = True
+
+
+class DayCloseQueueResult(BaseModel):
+    """Tickets closed in one queue."""
+
+    queue_id: uuid.UUID
+    closed_tickets: int
+
+
+class DayCloseResponse(BaseModel):
+    """End-of-day close result."""
+
+    practice_id: uuid.UUID
+    outcome: TicketStatus
+    closed_tickets: int
+    counters_reset: int
+    queues: list[DayCloseQueueResult]
+    closed_at: datetime
+
+
 # ============================================================================
 # Ticket Schemas
 # ============================================================================
@@ -380,9 +406,10 @@ class TicketListResponse(BaseModel):
     """Paginated ticket list response."""
 
     items: list[TicketResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # ============================================================================
@@ -0,0 +1,197 @@
+"""
+Result cache for the rolled-up part of analytics reports.
+
+Closed days are read from the rollups (see ``analytics_rollup``) and do
+not change until the rollup job writes them again, which moves the data
+version (``analytics_rollup_state.updated_at``). The analytics endpoints
+therefore cache their rolled-up part under a key of endpoint, parameters,
+rollup boundary and data version, and recompute only the part after the
+boundary (usually today) on every request. Stale entries are never
+invalidated explicitly: a new version or window start makes a new key and
+the old entries age out of the LRU.
+
+Concurrent misses for the same key share one computation (no stampede when
+a dashboard with several panels is opened by several users at once).
+
+Security:
+    - Caches aggregates only (no patient fields).
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Hashable, Optional, TypeVar
+
+from app.config import get_settings
+from app.middleware.observability import record_analytics_cache_lookup
+from app.services.analytics_service import RollupState
+
+T = TypeVar("T")
+
+
+class AnalyticsCache:
+    """
+    Size-bounded LRU cache of computed report parts.
+
+    Values are shared between requests and must not be mutated by callers.
+
+    Usage:
+        cache = get_analytics_cache()
+        counts = await cache.get_or_compute("hourly", key, compute)
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries; 0 disables caching.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered without computing (0.0 without lookups)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Drop all entries and statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_compute(
+        self,
+        endpoint: str,
+        key: Hashable,
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Get a cached value, computing and storing it on a miss.
+
+        While a value is being computed, lookups of the same key wait for
+        it instead of computing it again. Failures are not cached.
+
+        Args:
+            endpoint: Endpoint name (metrics label).
+            key: Hashable cache key (should include ``endpoint``).
+            compute: Coroutine function producing the value.
+
+        Returns:
+            The cached or computed value.
+        """
+        if self.max_entries <= 0:
+            return await compute()
+
+        while True:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_analytics_cache_lookup(endpoint, "hit")
+                return self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                value = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this request was cancelled
+                continue  # the computing request was cancelled: take over
+            self.hits += 1
+            record_analytics_cache_lookup(endpoint, "shared")
+            return value
+
+        self.misses += 1
+        record_analytics_cache_lookup(endpoint, "miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters re-raise it; retrieved here so an unawaited
+                # future does not log "exception was never retrieved"
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(value)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+
+async def compute_split(
+    endpoint: str,
+    start: datetime,
+    end: datetime,
+    state: RollupState,
+    compute: Callable[[datetime, datetime, Optional[datetime]], Awaitable[T]],
+    merge: Callable[[T, T], T],
+) -> T:
+    """
+    Compute a report over a window with its rolled-up part cached.
+
+    ``compute(start, end, rolled_up_until)`` runs for the part up to the
+    rollup boundary, cached under endpoint, window start hour, boundary and
+    data version, and uncached for the rest of the window. Windows without
+    rolled-up days are computed in one go.
+
+    Args:
+        endpoint: Endpoint name (cache key and metrics label).
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        state: Result of ``rollup_state``.
+        compute: Coroutine function computing a part of the window.
+        merge: Combines the rolled-up and the later part without modifying
+            them (the first one is shared through the cache).
+
+    Returns:
+        The report of the whole window.
+    """
+    closed_end = state.closed_end(start)
+    if closed_end is None:
+        return await compute(start, end, state.rolled_up_until)
+
+    key = (
+        endpoint,
+        start.replace(minute=0, second=0, microsecond=0),
+        state.rolled_up_until,
+        state.version,
+    )
+    closed = await get_analytics_cache().get_or_compute(
+        endpoint, key, lambda: compute(start, closed_end, state.rolled_up_until)
+    )
+    return merge(closed, await compute(state.rolled_up_until, end, None))
+
+
+# Singleton instance
+_analytics_cache: Optional[AnalyticsCache] = None
+
+
+def get_analytics_cache() -> AnalyticsCache:
+    """
+    Get singleton analytics result cache.
+
+    Returns:
+        AnalyticsCache instance.
+    """
+    global _analytics_cache
+    if _analytics_cache is None:
+        _analytics_cache = AnalyticsCache(get_settings().ANALYTICS_CACHE_MAX_ENTRIES)
+    return _analytics_cache
@@ -0,0 +1,356 @@
+"""
+Hourly rollups of tickets and check-in events for analytics.
+
+Closed days (UTC) are aggregated into ``ticket_hourly_rollups`` (per queue
+and hour: counts by status, wait sum/count/min/max), ``ticket_hourly_sketches``
+(per queue and hour: wait and service time sketches) and
+``check_in_hourly_rollups`` (per practice, hour and method).
+``analytics_rollup_state`` holds the high-water mark, the last rolled-up
+day; the analytics queries read the rollups up to it and the raw tables
+after it, so a stale or missing rollup makes reports slower, never wrong.
+
+Incremental runs roll up the days after the high-water mark and re-roll
+the last ``settle_days`` closed days, because tickets keep changing after
+midnight (day close the next morning, late completions). Older changes
+need a backfill:
+
+    python -m app.services.analytics_rollup            # rebuild everything
+    python -m app.services.analytics_rollup --incremental
+
+Days are replaced as a whole (DELETE + INSERT ... SELECT) in transactions
+of up to ``CHUNK_DAYS`` days that also advance the high-water mark, so an
+interrupted backfill resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, Integer, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.models import (
+    AnalyticsRollupState,
+    CheckInEvent,
+    CheckInHourlyRollup,
+    Queue,
+    Ticket,
+    TicketHourlyRollup,
+    TicketHourlySketch,
+    TicketStatus,
+)
+from app.services.analytics_sketch import DDSketch, WaitSketches
+from app.services.analytics_service import (
+    ROLLUP_STATE_NAME,
+    WAIT_MINUTES,
+    WAITED,
+)
+
+logger = logging.getLogger(__name__)
+
+# Days per transaction
+CHUNK_DAYS = 31
+
+# Rows fetched per round-trip when building the sketches
+SKETCH_FETCH_ROWS = 10_000
+
+SERVICE_MINUTES = func.extract("epoch", Ticket.completed_at - Ticket.called_at) / 60
+
+
+async def roll_up_days(db: AsyncSession, first: date, last: date) -> None:
+    """
+    Replace the rollup rows of ``first``..``last`` from the raw tables.
+
+    Does not commit.
+
+    Args:
+        db: Database session.
+        first: First day (inclusive).
+        last: Last day (inclusive).
+    """
+    start = datetime.combine(first, time())
+    end = datetime.combine(last + timedelta(days=1), time())
+    for table in (TicketHourlyRollup, TicketHourlySketch, CheckInHourlyRollup):
+        await db.execute(delete(table).where(table.day.between(first, last)))
+
+    # Group by the labels (see analytics_service.check_in_counts)
+    day = cast(Ticket.created_at, Date).label("day")
+    hour = cast(func.extract("hour", Ticket.created_at), Integer).label("hour")
+    ticket_columns = {
+        "day": day,
+        "queue_id": Ticket.queue_id,
+        "hour": hour,
+        "practice_id": Queue.practice_id,
+        "total": func.count(Ticket.id),
+        **{
+            status.value: func.count(Ticket.id).filter(Ticket.status == status)
+            for status in TicketStatus
+        },
+        "waited": func.count(Ticket.id).filter(WAITED),
+        "wait_minutes_sum": func.coalesce(func.sum(WAIT_MINUTES).filter(WAITED), 0),
+        "wait_minutes_min": func.min(WAIT_MINUTES).filter(WAITED),
+        "wait_minutes_max": func.max(WAIT_MINUTES).filter(WAITED),
+    }
+    await db.execute(
+        insert(TicketHourlyRollup).from_select(
+            list(ticket_columns),
+            select(*ticket_columns.values())
+            .join(Queue, Queue.id == Ticket.queue_id)
+            .where(Ticket.created_at >= start, Ticket.created_at < end)
+            .group_by(day, Ticket.queue_id, hour, Queue.practice_id),
+        )
+    )
+    await _roll_up_sketches(db, start, end)
+
+    day = cast(CheckInEvent.checked_in_at, Date).label("day")
+    hour = cast(func.extract("hour", CheckInEvent.checked_in_at), Integer).label("hour")
+    await db.execute(
+        insert(CheckInHourlyRollup).from_select(
+            ["day", "practice_id", "hour", "check_in_method", "count"],
+            select(
+                day,
+                CheckInEvent.practice_id,
+                hour,
+                CheckInEvent.check_in_method,
+                func.count(CheckInEvent.id),
+            )
+            .where(
+                CheckInEvent.checked_in_at >= start, CheckInEvent.checked_in_at < end
+            )
+            .group_by(
+                day, CheckInEvent.practice_id, hour, CheckInEvent.check_in_method
+            ),
+        )
+    )
+
+
+async def _roll_up_sketches(db: AsyncSession, start: datetime, end: datetime) -> None:
+    """
+    Insert the sketches of the tickets created in ``start``..``end``.
+
+    Quantiles need the individual waits, so the called tickets are streamed
+    in key order and folded into one sketch pair per queue and hour, plus a
+    sketch of the waits of the completed ones.
+    """
+    day = cast(Ticket.created_at, Date).label("day")
+    hour = cast(func.extract("hour", Ticket.created_at), Integer).label("hour")
+    rows = await db.stream(
+        select(
+            day,
+            Ticket.queue_id,
+            hour,
+            WAIT_MINUTES.label("wait"),
+            SERVICE_MINUTES.label("service"),
+            Ticket.status,
+        )
+        .where(
+            Ticket.created_at >= start,
+            Ticket.created_at < end,
+            Ticket.called_at.isnot(None),
+        )
+        .order_by(day, Ticket.queue_id, hour)
+    )
+
+    sketch_rows: list[dict] = []
+    key = None
+    sketches = WaitSketches()
+    completed = DDSketch()
+    # Partitions: a row-by-row async iteration costs a context switch per row
+    async for partition in rows.partitions(SKETCH_FETCH_ROWS):
+        for row in partition:
+            if (row.day, row.queue_id, row.hour) != key:
+                if key is not None:
+                    sketch_rows.append(_sketch_row(key, sketches, completed))
+                key = (row.day, row.queue_id, row.hour)
+                sketches = WaitSketches()
+                completed = DDSketch()
+            sketches.wait.add(float(row.wait))
+            if row.status == TicketStatus.COMPLETED:
+                completed.add(float(row.wait))
+                if row.service is not None:
+                    sketches.service.add(float(row.service))
+    if key is not None:
+        sketch_rows.append(_sketch_row(key, sketches, completed))
+    if sketch_rows:
+        await db.execute(insert(TicketHourlySketch), sketch_rows)
+
+
+def _sketch_row(key: tuple, sketches: WaitSketches, completed: DDSketch) -> dict:
+    """Insert parameters of one queue and hour."""
+    day, queue_id, hour = key
+    return {
+        "day": day,
+        "queue_id": queue_id,
+        "hour": hour,
+        "wait_sketch": sketches.wait.to_bytes(),
+        "service_sketch": (
+            sketches.service.to_bytes() if sketches.service.count else None
+        ),
+        "completed_wait_sketch": completed.to_bytes() if completed.count else None,
+    }
+
+
+async def _first_data_day(db: AsyncSession) -> Optional[date]:
+    """Day of the oldest ticket or check-in event."""
+    oldest = [
+        await db.scalar(select(func.min(Ticket.created_at))),
+        await db.scalar(select(func.min(CheckInEvent.checked_in_at))),
+    ]
+    oldest = [value for value in oldest if value is not None]
+    return min(oldest).date() if oldest else None
+
+
+async def _ensure_state_row(db: AsyncSession, rolled_up_through: date) -> None:
+    """
+    Insert the high-water mark row unless it exists (does not commit).
+
+    ``INSERT ... ON CONFLICT DO NOTHING`` waits for a concurrent insert of
+    the row to commit instead of failing on the primary key.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    await db.execute(
+        dialect.insert(AnalyticsRollupState)
+        .values(
+            name=ROLLUP_STATE_NAME,
+            rolled_up_through=rolled_up_through,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
+
+
+async def _roll_up_range(
+    session_factory: async_sessionmaker, first: date, last: date
+) -> int:
+    """Roll up ``first``..``last`` chunk by chunk, advancing the high-water mark."""
+    days = 0
+    while first <= last:
+        chunk_last = min(first + timedelta(days=CHUNK_DAYS - 1), last)
+        async with session_factory() as db:
+            # Row lock serializes concurrent runs (several workers); the row
+            # must exist first, FOR UPDATE locks nothing on a fresh install
+            await _ensure_state_row(db, first - timedelta(days=1))
+            state = await db.scalar(
+                select(AnalyticsRollupState)
+                .where(AnalyticsRollupState.name == ROLLUP_STATE_NAME)
+                .with_for_update()
+            )
+            await roll_up_days(db, first, chunk_last)
+            state.rolled_up_through = max(state.rolled_up_through, chunk_last)
+            state.updated_at = datetime.now(timezone.utc)
+            await db.commit()
+        days += (chunk_last - first).days + 1
+        first = chunk_last + timedelta(days=1)
+    return days
+
+
+def _last_closed_day(today: Optional[date]) -> date:
+    """Yesterday (UTC) relative to ``today``."""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=1)
+
+
+async def roll_up(
+    session_factory: async_sessionmaker,
+    settle_days: int = 1,
+    today: Optional[date] = None,
+) -> int:
+    """
+    Roll up closed days after the high-water mark (incremental run).
+
+    Without a high-water mark, everything from the oldest ticket or
+    check-in event is rolled up.
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        settle_days: Already rolled-up closed days to roll up again.
+        today: Current UTC day (for tests).
+
+    Returns:
+        int: Number of days rolled up.
+    """
+    last = _last_closed_day(today)
+    async with session_factory() as db:
+        through = await db.scalar(
+            select(AnalyticsRollupState.rolled_up_through).where(
+                AnalyticsRollupState.name == ROLLUP_STATE_NAME
+            )
+        )
+        if through is None:
+            first = await _first_data_day(db)
+            if first is None:
+                return 0
+        else:
+            first = through + timedelta(days=1 - settle_days)
+    return await _roll_up_range(session_factory, first, last)
+
+
+async def backfill(
+    session_factory: async_sessionmaker, today: Optional[date] = None
+) -> int:
+    """
+    Rebuild the rollups of every closed day with data.
+
+    Rollup rows of days before the oldest raw row (purged history) are
+    kept.
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        today: Current UTC day (for tests).
+
+    Returns:
+        int: Number of days rolled up.
+    """
+    async with session_factory() as db:
+        first = await _first_data_day(db)
+    if first is None:
+        return 0
+    return await _roll_up_range(session_factory, first, _last_closed_day(today))
+
+
+async def run_rollup_loop(
+    session_factory: async_sessionmaker, interval_seconds: int, settle_days: int
+) -> None:
+    """
+    Roll up closed days periodically (run as background task).
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        interval_seconds: Seconds between runs.
+        settle_days: Closed days re-rolled on every run.
+    """
+    while True:
+        try:
+            days = await roll_up(session_factory, settle_days)
+            logger.debug("Analytics rollup finished", extra={"days": days})
+        except Exception as e:
+            logger.warning("Analytics rollup failed", extra={"error": str(e)})
+        await asyncio.sleep(interval_seconds)
+
+
+async def _main() -> None:
+    from app.config import get_settings
+    from app.database import async_session_maker
+
+    parser = argparse.ArgumentParser(description="Analytics-Rollups aufbauen")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="nur Tage nach der Hochwassermarke (statt vollständigem Neuaufbau)",
+    )
+    args = parser.parse_args()
+
+    if args.incremental:
+        days = await roll_up(
+            async_session_maker, get_settings().ANALYTICS_ROLLUP_SETTLE_DAYS
+        )
+    else:
+        days = await backfill(async_session_maker)
+    print(f"{days} Tage zusammengefasst")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,745 @@
+"""
+Analytics queries for the admin dashboard.
+
+Each report section is one grouped query (``COUNT(...) FILTER``,
+``SUM``/``MAX`` of the wait); per-day and per-queue
+figures are assembled in Python from the grouped rows, so the number of
+round-trips does not depend on the window length or the number of queues.
+
+Closed days up to the rollup high-water mark are read from the hourly
+rollup tables (see ``analytics_rollup``); only later days, usually just
+today, are aggregated from ``tickets`` and ``check_in_events``. Both parts
+are combined with ``UNION ALL`` in the same statement. Windows start at
+the full hour, the granularity of the rollups. The endpoints can also
+query the two parts separately (``RollupState.closed_end``) to cache the
+rolled-up one (see ``analytics_cache``).
+
+Wait time is ``called_at - created_at`` in minutes, counted for completed
+tickets that were called. Averages are kept as sum and count so groups can
+be merged; wait percentiles and buckets are read from mergeable sketches
+(see ``analytics_sketch``) for the same reason.
+
+Security:
+    - Aggregates only (no patient fields).
+"""
+
+import math
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    and_,
+    cast,
+    func,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import utc_naive
+from app.models.models import (
+    AnalyticsRollupState,
+    CheckInEvent,
+    CheckInHourlyRollup,
+    CheckInMethod,
+    Queue,
+    Ticket,
+    TicketHourlyRollup,
+    TicketHourlySketch,
+    TicketStatus,
+)
+from app.services.analytics_sketch import DDSketch
+
+WAIT_MINUTES = func.extract("epoch", Ticket.called_at - Ticket.created_at) / 60
+
+# Name of the rollup high-water mark in analytics_rollup_state
+ROLLUP_STATE_NAME = "hourly"
+
+# Wait distribution: default bucket edges (minutes) and reported percentiles
+DEFAULT_WAIT_EDGES: tuple[float, ...] = (5, 15, 30)
+MAX_WAIT_EDGES = 20
+WAIT_PERCENTILES: tuple[float, ...] = (0.5, 0.9, 0.95)
+
+# Rows fetched per round-trip when sketching the waits after the boundary
+WAIT_FETCH_ROWS = 10_000
+
+COMPLETED = Ticket.status == TicketStatus.COMPLETED
+WAITED = and_(COMPLETED, Ticket.called_at.isnot(None))
+
+
+def _hour_floor(value: datetime) -> datetime:
+    """Naive UTC start of the hour of ``value``."""
+    return utc_naive(value).replace(minute=0, second=0, microsecond=0)
+
+
+@dataclass(frozen=True, slots=True)
+class RollupState:
+    """Extent and version of the rolled-up data."""
+
+    # Naive UTC midnight after the last rolled-up day (exclusive)
+    rolled_up_until: Optional[datetime] = None
+    # Time of the last rollup write; changes whenever rolled-up days may have
+    version: Optional[datetime] = None
+
+    def closed_end(self, start: datetime) -> Optional[datetime]:
+        """
+        Inclusive end of the rolled-up part of a window.
+
+        Args:
+            start: Window start (rounded down to the hour).
+
+        Returns:
+            Optional[datetime]: Last instant before the boundary, or None
+            if no part of the window is rolled up.
+        """
+        if self.rolled_up_until is None or self.rolled_up_until <= _hour_floor(start):
+            return None
+        return self.rolled_up_until - timedelta(microseconds=1)
+
+
+async def rollup_state(db: AsyncSession) -> RollupState:
+    """
+    Get the rollup boundary and data version.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        RollupState: Empty state if nothing is rolled up yet.
+    """
+    row = (
+        await db.execute(
+            select(
+                AnalyticsRollupState.rolled_up_through,
+                AnalyticsRollupState.updated_at,
+            ).where(AnalyticsRollupState.name == ROLLUP_STATE_NAME)
+        )
+    ).first()
+    if row is None:
+        return RollupState()
+    return RollupState(
+        datetime.combine(row.rolled_up_through + timedelta(days=1), time()),
+        row.updated_at,
+    )
+
+
+async def rollup_boundary(db: AsyncSession) -> Optional[datetime]:
+    """
+    Get the end of the rolled-up days.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        Optional[datetime]: Naive UTC midnight after the last rolled-up day
+        (exclusive), or None if nothing is rolled up yet.
+    """
+    return (await rollup_state(db)).rolled_up_until
+
+
+@dataclass(frozen=True, slots=True)
+class _Window:
+    """Report window split into rolled-up hours and a live remainder."""
+
+    start: datetime
+    end: datetime
+    rolled_up_until: Optional[datetime]
+
+    @classmethod
+    def of(
+        cls, start: datetime, end: datetime, rolled_up_until: Optional[datetime]
+    ) -> "_Window":
+        """Window of naive UTC bounds, starting at the full hour."""
+        return cls(_hour_floor(start), utc_naive(end), rolled_up_until)
+
+    @property
+    def uses_rollups(self) -> bool:
+        """Whether part of the window is rolled up."""
+        return self.rolled_up_until is not None and self.rolled_up_until > self.start
+
+    @property
+    def live_start(self) -> datetime:
+        """Start of the part read from the raw tables."""
+        if self.uses_rollups:
+            return self.rolled_up_until
+        return self.start
+
+    def starts_by(self, table) -> ColumnElement[bool]:
+        """Rollup hours at or after the window start."""
+        first_hour = tuple_(self.start.date(), self.start.hour)
+        return tuple_(table.day, table.hour) >= first_hour
+
+    def live(self, column) -> ColumnElement[bool]:
+        """Raw rows (by timestamp ``column``) of the part not rolled up."""
+        return and_(column >= self.live_start, column <= self.end)
+
+    def rollup_hours(self, table) -> ColumnElement[bool]:
+        """Rollup hours inside the window."""
+        return and_(self.starts_by(table), table.day < self.rolled_up_until.date())
+
+
+def _combine(branches: list):
+    """``UNION ALL`` of the branches (a single branch is returned as is)."""
+    return branches[0] if len(branches) == 1 else union_all(*branches)
+
+
+@dataclass(slots=True)
+class TicketCounts:
+    """Ticket counts and wait aggregates of one group (day, queue, window)."""
+
+    total: int = 0
+    completed: int = 0
+    no_show: int = 0
+    wait_minutes_sum: float = 0.0
+    waited: int = 0
+    max_wait_minutes: float = 0.0
+
+    def add(self, other: "TicketCounts") -> None:
+        """
+        Merge another group into this one.
+
+        Args:
+            other: Counts to add.
+        """
+        self.total += other.total
+        self.completed += other.completed
+        self.no_show += other.no_show
+        self.wait_minutes_sum += other.wait_minutes_sum
+        self.waited += other.waited
+        self.max_wait_minutes = max(self.max_wait_minutes, other.max_wait_minutes)
+
+    @property
+    def average_wait_minutes(self) -> float:
+        """Average wait of completed, called tickets (0.0 if none)."""
+        return self.wait_minutes_sum / self.waited if self.waited else 0.0
+
+
+def _counts_columns() -> list:
+    """Aggregate columns over tickets matching ``_counts_from_row``."""
+    return [
+        func.count(Ticket.id).label("total"),
+        func.count(Ticket.id).filter(COMPLETED).label("completed"),
+        func.count(Ticket.id)
+        .filter(Ticket.status == TicketStatus.NO_SHOW)
+        .label("no_show"),
+        func.sum(WAIT_MINUTES).filter(WAITED).label("wait_sum"),
+        func.count(Ticket.id).filter(WAITED).label("waited"),
+        func.max(WAIT_MINUTES).filter(WAITED).label("wait_max"),
+    ]
+
+
+def _rollup_counts_columns() -> list:
+    """Aggregate columns over ticket rollups matching ``_counts_columns``."""
+    return [
+        func.sum(TicketHourlyRollup.total).label("total"),
+        func.sum(TicketHourlyRollup.completed).label("completed"),
+        func.sum(TicketHourlyRollup.no_show).label("no_show"),
+        func.sum(TicketHourlyRollup.wait_minutes_sum).label("wait_sum"),
+        func.sum(TicketHourlyRollup.waited).label("waited"),
+        func.max(TicketHourlyRollup.wait_minutes_max).label("wait_max"),
+    ]
+
+
+def _counts_from_row(row) -> TicketCounts:
+    """Build counts from a row with the ``_counts_columns`` columns."""
+    return TicketCounts(
+        total=int(row.total or 0),
+        completed=int(row.completed or 0),
+        no_show=int(row.no_show or 0),
+        wait_minutes_sum=float(row.wait_sum or 0.0),
+        waited=int(row.waited or 0),
+        max_wait_minutes=float(row.wait_max or 0.0),
+    )
+
+
+async def daily_ticket_counts(
+    db: AsyncSession,
+    first_day: datetime,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> tuple[dict[str, TicketCounts], TicketCounts]:
+    """
+    Get per-day ticket counts and the totals of a window in one query.
+
+    Days are whole UTC days from ``first_day`` (midnight) up to ``end``;
+    the totals cover ``start``..``end`` only, as the window may start
+    mid-day. Rows are grouped by day and by whether they fall inside the
+    window, so both come out of the same scan.
+
+    Args:
+        db: Database session.
+        first_day: Midnight of the first day of the breakdown (at or
+            before ``start``).
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Result of ``rollup_boundary``.
+
+    Returns:
+        tuple[dict[str, TicketCounts], TicketCounts]: Counts by ISO date
+        (days without tickets are missing) and the window totals.
+    """
+    window = _Window.of(start, end, rolled_up_until)
+    days_window = _Window.of(first_day, end, rolled_up_until)
+
+    day = cast(Ticket.created_at, Date).label("day")
+    in_window = (Ticket.created_at >= window.start).label("in_window")
+    branches = [
+        select(day, in_window, *_counts_columns())
+        .where(days_window.live(Ticket.created_at))
+        .group_by(day, in_window)
+    ]
+    if days_window.uses_rollups:
+        rollup_in_window = window.starts_by(TicketHourlyRollup).label("in_window")
+        branches.append(
+            select(TicketHourlyRollup.day, rollup_in_window, *_rollup_counts_columns())
+            .where(days_window.rollup_hours(TicketHourlyRollup))
+            .group_by(TicketHourlyRollup.day, rollup_in_window)
+        )
+    result = await db.execute(_combine(branches))
+
+    days: dict[str, TicketCounts] = {}
+    totals = TicketCounts()
+    for row in result:
+        counts = _counts_from_row(row)
+        days.setdefault(row.day.isoformat(), TicketCounts()).add(counts)
+        if row.in_window:
+            totals.add(counts)
+    return days, totals
+
+
+@dataclass(slots=True)
+class QueueCounts:
+    """Ticket counts of one active queue."""
+
+    queue_id: uuid.UUID
+    queue_name: str
+    counts: TicketCounts
+
+
+async def queue_ticket_counts(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> list[QueueCounts]:
+    """
+    Get ticket counts per active queue in one grouped query.
+
+    Queues without tickets in the window are included with zero counts.
+
+    Args:
+        db: Database session.
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Result of ``rollup_boundary``.
+
+    Returns:
+        list[QueueCounts]: One entry per active queue.
+    """
+    window = _Window.of(start, end, rolled_up_until)
+    branches = [
+        select(Ticket.queue_id.label("queue_id"), *_counts_columns())
+        .where(window.live(Ticket.created_at))
+        .group_by(Ticket.queue_id)
+    ]
+    if window.uses_rollups:
+        branches.append(
+            select(TicketHourlyRollup.queue_id, *_rollup_counts_columns())
+            .where(window.rollup_hours(TicketHourlyRollup))
+            .group_by(TicketHourlyRollup.queue_id)
+        )
+    counts = _combine(branches).subquery("queue_counts")
+
+    result = await db.execute(
+        select(
+            Queue.id,
+            Queue.name,
+            func.sum(counts.c.total).label("total"),
+            func.sum(counts.c.completed).label("completed"),
+            func.sum(counts.c.no_show).label("no_show"),
+            func.sum(counts.c.wait_sum).label("wait_sum"),
+            func.sum(counts.c.waited).label("waited"),
+            func.max(counts.c.wait_max).label("wait_max"),
+        )
+        .select_from(Queue)
+        .outerjoin(counts, counts.c.queue_id == Queue.id)
+        .where(Queue.is_active.is_(True))
+        .group_by(Queue.id, Queue.name)
+    )
+    return [QueueCounts(row.id, row.name, _counts_from_row(row)) for row in result]
+
+
+@dataclass(frozen=True, slots=True)
+class CheckInCount:
+    """Check-ins of one day and hour."""
+
+    day: date
+    hour: int
+    count: int
+    nfc_count: int
+
+
+async def check_in_counts(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> list[CheckInCount]:
+    """
+    Get check-in events per day and hour in one grouped query.
+
+    Methods are reduced to NFC and the rest in SQL, which keeps the result
+    at one row per hour.
+
+    Args:
+        db: Database session.
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Result of ``rollup_boundary``.
+
+    Returns:
+        list[CheckInCount]: One entry per hour with check-ins; an hour may
+        appear twice (rolled up and live) and must be summed by the caller.
+    """
+    window = _Window.of(start, end, rolled_up_until)
+    # Group by the labels: repeating the expressions would bind their
+    # arguments twice, and Postgres does not match them to the selected ones
+    day = cast(CheckInEvent.checked_in_at, Date).label("day")
+    hour = func.extract("hour", CheckInEvent.checked_in_at).label("hour")
+    branches = [
+        select(
+            day,
+            hour,
+            func.count(CheckInEvent.id).label("count"),
+            func.count(CheckInEvent.id)
+            .filter(CheckInEvent.check_in_method == CheckInMethod.NFC)
+            .label("nfc_count"),
+        )
+        .where(window.live(CheckInEvent.checked_in_at))
+        .group_by(day, hour)
+    ]
+    if window.uses_rollups:
+        branches.append(
+            select(
+                CheckInHourlyRollup.day,
+                CheckInHourlyRollup.hour,
+                func.sum(CheckInHourlyRollup.count),
+                func.coalesce(
+                    func.sum(CheckInHourlyRollup.count).filter(
+                        CheckInHourlyRollup.check_in_method == CheckInMethod.NFC
+                    ),
+                    0,
+                ),
+            )
+            .where(window.rollup_hours(CheckInHourlyRollup))
+            .group_by(CheckInHourlyRollup.day, CheckInHourlyRollup.hour)
+        )
+    result = await db.execute(_combine(branches))
+    return [
+        CheckInCount(row.day, int(row.hour), int(row.count), int(row.nfc_count))
+        for row in result
+    ]
+
+
+async def hourly_ticket_counts(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> dict[int, int]:
+    """
+    Get tickets created per hour of day (UTC) in one grouped query.
+
+    Args:
+        db: Database session.
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Result of ``rollup_boundary``.
+
+    Returns:
+        dict[int, int]: Ticket count by hour (hours without tickets missing).
+    """
+    window = _Window.of(start, end, rolled_up_until)
+    hour = func.extract("hour", Ticket.created_at).label("hour")
+    branches = [
+        select(hour, func.count(Ticket.id).label("count"))
+        .where(window.live(Ticket.created_at))
+        .group_by(hour)
+    ]
+    if window.uses_rollups:
+        branches.append(
+            select(TicketHourlyRollup.hour, func.sum(TicketHourlyRollup.total))
+            .where(window.rollup_hours(TicketHourlyRollup))
+            .group_by(TicketHourlyRollup.hour)
+        )
+    hourly: dict[int, int] = {}
+    for row in await db.execute(_combine(branches)):
+        hourly[int(row.hour)] = hourly.get(int(row.hour), 0) + int(row.count)
+    return hourly
+
+
+@dataclass(slots=True)
+class SummaryCounts:
+    """Figures of the analytics summary for one part of a window."""
+
+    check_ins: list[CheckInCount]
+    days: dict[str, TicketCounts]
+    totals: TicketCounts
+    queues: list[QueueCounts]
+
+    def merged(self, later: "SummaryCounts") -> "SummaryCounts":
+        """
+        Combine with the figures of the following part of the window.
+
+        Builds new objects and modifies neither part (parts may be cached).
+        The queue list (active queues, current names) is taken from
+        ``later``.
+
+        Args:
+            later: Figures of the part after this one.
+
+        Returns:
+            SummaryCounts: Figures of both parts.
+        """
+        days: dict[str, TicketCounts] = {}
+        for part in (self.days, later.days):
+            for day, counts in part.items():
+                days.setdefault(day, TicketCounts()).add(counts)
+        totals = TicketCounts()
+        totals.add(self.totals)
+        totals.add(later.totals)
+        earlier = {queue.queue_id: queue.counts for queue in self.queues}
+        queues = []
+        for queue in later.queues:
+            counts = TicketCounts()
+            counts.add(queue.counts)
+            counts.add(earlier.get(queue.queue_id, TicketCounts()))
+            queues.append(QueueCounts(queue.queue_id, queue.queue_name, counts))
+        return SummaryCounts(self.check_ins + later.check_ins, days, totals, queues)
+
+
+async def summary_counts(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> SummaryCounts:
+    """
+    Get the figures of the analytics summary in three grouped queries.
+
+    The daily breakdown starts at midnight of the first day.
+
+    Args:
+        db: Database session.
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Result of ``rollup_boundary``.
+
+    Returns:
+        SummaryCounts: Check-ins, daily and queue counts.
+    """
+    first_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    check_ins = await check_in_counts(db, start, end, rolled_up_until)
+    days, totals = await daily_ticket_counts(
+        db, first_day, start, end, rolled_up_until
+    )
+    queues = await queue_ticket_counts(db, start, end, rolled_up_until)
+    return SummaryCounts(check_ins, days, totals, queues)
+
+
+def parse_wait_edges(value: Optional[str]) -> tuple[float, ...]:
+    """
+    Parse comma-separated wait bucket edges in minutes.
+
+    Args:
+        value: e.g. ``"5,15,30"``; None or empty for ``DEFAULT_WAIT_EDGES``.
+
+    Returns:
+        tuple[float, ...]: Strictly increasing, positive edges.
+
+    Raises:
+        ValueError: If the edges are not finite numbers, not increasing or
+            too many.
+    """
+    if not value:
+        return DEFAULT_WAIT_EDGES
+    try:
+        edges = tuple(float(edge) for edge in value.split(","))
+    except ValueError:
+        raise ValueError("Wartezeit-Grenzen müssen Zahlen sein") from None
+    if not all(math.isfinite(edge) for edge in edges):
+        raise ValueError("Wartezeit-Grenzen müssen endliche Zahlen sein")
+    if len(edges) > MAX_WAIT_EDGES:
+        raise ValueError(f"Höchstens {MAX_WAIT_EDGES} Wartezeit-Grenzen erlaubt")
+    if edges[0] <= 0 or any(a >= b for a, b in zip(edges, edges[1:])):
+        raise ValueError("Wartezeit-Grenzen müssen positiv und aufsteigend sein")
+    return edges
+
+
+def wait_bucket_labels(edges: tuple[float, ...]) -> list[str]:
+    """
+    Labels of the buckets defined by ``edges`` (e.g. ``0-5`` ... ``30+``).
+
+    Args:
+        edges: Result of ``parse_wait_edges``.
+
+    Returns:
+        list[str]: One label per bucket (``len(edges) + 1``).
+    """
+    bounds = [0.0, *edges]
+    labels = [f"{lower:g}-{upper:g}" for lower, upper in zip(bounds, edges)]
+    return [*labels, f"{edges[-1]:g}+"]
+
+
+@dataclass(slots=True)
+class WaitDistribution:
+    """Wait distribution of completed, called tickets."""
+
+    total: int
+    buckets: dict[str, int]
+    # "p50", "p90", "p95" in minutes (None without tickets)
+    percentiles: dict[str, Optional[float]]
+
+
+@dataclass(slots=True)
+class QueueWaitDistribution:
+    """Wait distribution of one queue."""
+
+    queue_id: uuid.UUID
+    queue_name: str
+    distribution: WaitDistribution
+
+
+async def completed_wait_sketches(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    rolled_up_until: Optional[datetime] = None,
+) -> dict[uuid.UUID, DDSketch]:
+    """
+    Sketch the waits of completed, called tickets per queue.
+
+    Rolled-up hours merge their ``completed_wait_sketch`` from
+    ``ticket_hourly_sketches`` (one row per queue and hour, however many
+    tickets); the waits after the boundary are streamed from ``tickets``
+    and added like the rollup job adds them, so both paths give the same
+    sketch for the same tickets.
+
+    Args:
+        db: Database session.
+        start: Window start (inclusive, rounded down to the hour).
+        end: Window end (inclusive).
+        rolled_up_until: Rollup boundary (see ``rollup_boundary``).
+
+    Returns:
+        dict[uuid.UUID, DDSketch]: Wait sketch by queue.
+    """
+    window = _Window.of(start, end, rolled_up_until)
+    sketches: dict[uuid.UUID, DDSketch] = {}
+    if window.uses_rollups:
+        result = await db.execute(
+            select(
+                TicketHourlySketch.queue_id, TicketHourlySketch.completed_wait_sketch
+            ).where(
+                window.rollup_hours(TicketHourlySketch),
+                TicketHourlySketch.completed_wait_sketch.isnot(None),
+            )
+        )
+        for row in result:
+            sketches.setdefault(row.queue_id, DDSketch()).merge(
+                DDSketch.from_bytes(row.completed_wait_sketch)
+            )
+    if window.live_start > window.end:
+        return sketches
+
+    rows = await db.stream(
+        select(Ticket.queue_id, WAIT_MINUTES.label("wait")).where(
+            window.live(Ticket.created_at), WAITED
+        )
+    )
+    async for partition in rows.partitions(WAIT_FETCH_ROWS):
+        for row in partition:
+            sketches.setdefault(row.queue_id, DDSketch()).add(float(row.wait))
+    return sketches
+
+
+def merge_wait_sketches(
+    closed: dict[uuid.UUID, DDSketch], later: dict[uuid.UUID, DDSketch]
+) -> dict[uuid.UUID, DDSketch]:
+    """
+    Merge two results of ``completed_wait_sketches`` into new sketches.
+
+    Args:
+        closed: Rolled-up part (shared through the cache, not modified).
+        later: Part after the rollup boundary.
+
+    Returns:
+        dict[uuid.UUID, DDSketch]: Merged sketch by queue.
+    """
+    merged: dict[uuid.UUID, DDSketch] = {}
+    for part in (closed, later):
+        for queue_id, sketch in part.items():
+            merged.setdefault(queue_id, DDSketch()).merge(sketch)
+    return merged
+
+
+def _wait_distribution(sketch: DDSketch, edges: tuple[float, ...]) -> WaitDistribution:
+    """Distribution of one sketch."""
+    return WaitDistribution(
+        total=sketch.count,
+        buckets=dict(zip(wait_bucket_labels(edges), sketch.bucket_counts(edges))),
+        percentiles={
+            f"p{fraction * 100:g}": sketch.quantile(fraction)
+            for fraction in WAIT_PERCENTILES
+        },
+    )
+
+
+async def wait_time_distribution(
+    db: AsyncSession,
+    sketches: dict[uuid.UUID, DDSketch],
+    edges: tuple[float, ...] = DEFAULT_WAIT_EDGES,
+) -> tuple[WaitDistribution, list[QueueWaitDistribution]]:
+    """
+    Get the wait distribution and percentiles overall and per queue.
+
+    Percentiles and bucket counts are read from the sketches, so they are
+    exact up to the sketch accuracy (``RELATIVE_ACCURACY``): a wait within
+    1 % of an edge may be counted in the neighbouring bucket. Queues that
+    no longer exist are left out, overall too.
+
+    Args:
+        db: Database session.
+        sketches: Result of ``completed_wait_sketches`` for the window.
+        edges: Bucket edges in minutes (see ``parse_wait_edges``).
+
+    Returns:
+        tuple[WaitDistribution, list[QueueWaitDistribution]]: Overall
+        distribution and one entry per queue with completed tickets.
+    """
+    names = {}
+    if sketches:
+        result = await db.execute(
+            select(Queue.id, Queue.name).where(Queue.id.in_(list(sketches)))
+        )
+        names = dict(result.all())
+
+    overall = DDSketch()
+    queues: list[QueueWaitDistribution] = []
+    for queue_id, sketch in sketches.items():
+        if queue_id not in names:
+            continue
+        overall.merge(sketch)
+        queues.append(
+            QueueWaitDistribution(
+                queue_id, names[queue_id], _wait_distribution(sketch, edges)
+            )
+        )
+    queues.sort(key=lambda q: q.queue_name)
+    return _wait_distribution(overall, edges), queues
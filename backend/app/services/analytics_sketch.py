@@ -0,0 +1,576 @@
+"""
+Mergeable quantile sketches of wait and service times.
+
+``DDSketch`` counts values in logarithmic buckets, so every quantile is
+answered within a fixed relative error (1 %) from a few hundred counters,
+and two sketches merge by adding their counters. Sketches therefore combine
+across workers, hours and days without touching individual tickets.
+
+Two stores hold serialized sketches per queue and hour (UTC):
+    - ``live_queue_sketches``: built by each worker from ticket transitions
+      (wait when a ticket is called, service time when it is completed) and
+      flushed periodically under the worker's ``source`` id. Kept for
+      ``LIVE_RETENTION_DAYS``.
+    - ``ticket_hourly_sketches``: built from the raw tickets of closed days
+      by the rollup job, with the waits of completed tickets in a third
+      sketch for ``/analytics/wait-times``.
+
+Both are keyed by the hour the ticket was created, like the other rollups,
+so the rollup boundary splits them at the same tickets: a ticket created
+before midnight and called after it belongs to the closed day in both.
+
+Readers merge the rows of all sources with the worker's unflushed state,
+so ``/analytics/live`` answers from one row per queue, hour and worker.
+
+Security:
+    - Aggregates only (no patient fields).
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import struct
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import utc_naive
+from app.models.models import (
+    LiveQueueSketch,
+    Ticket,
+    TicketHourlySketch,
+    TicketStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+# Relative error of every quantile; sketches only merge with equal accuracy
+RELATIVE_ACCURACY = 0.01
+
+# Bucket limit; beyond it the lowest buckets are collapsed into one
+MAX_BINS = 1024
+
+# Values below this (minutes) are counted as zero
+MIN_INDEXED_VALUE = 1e-3
+
+# Days of live sketches kept (the rollups take over for closed days)
+LIVE_RETENTION_DAYS = 2
+
+# version, relative accuracy, count, zero count, sum, min, max, bucket count
+_HEADER = struct.Struct("<BdQQdddI")
+# bucket index, count
+_BIN = struct.Struct("<iQ")
+_FORMAT_VERSION = 1
+
+
+class DDSketch:
+    """
+    Quantile sketch with relative error guarantee (DDSketch).
+
+    Bucket ``k`` counts the values in ``(gamma**(k-1), gamma**k]`` with
+    ``gamma = (1 + a) / (1 - a)``; the quantile estimate of a bucket is
+    within ``a`` of every value in it.
+
+    Usage:
+        sketch = DDSketch()
+        sketch.add(12.5)
+        sketch.merge(DDSketch.from_bytes(blob))
+        p90 = sketch.quantile(0.9)
+    """
+
+    __slots__ = (
+        "relative_accuracy",
+        "bins",
+        "zero_count",
+        "count",
+        "sum",
+        "min",
+        "max",
+        "_gamma",
+        "_log_gamma",
+    )
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY) -> None:
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Relative error of quantiles, between 0 and 1.
+
+        Raises:
+            ValueError: If the accuracy is out of range.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, value: float) -> None:
+        """
+        Record a value (negative values count as zero).
+
+        Args:
+            value: Value to record.
+        """
+        value = max(value, 0.0)
+        if value < MIN_INDEXED_VALUE:
+            self.zero_count += 1
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > MAX_BINS:
+                self._collapse()
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> None:
+        """
+        Add the values of another sketch.
+
+        Args:
+            other: Sketch with the same relative accuracy.
+
+        Raises:
+            ValueError: If the accuracies differ.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches of different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _collapse(self) -> None:
+        """Fold the lowest buckets into one to stay within ``MAX_BINS``."""
+        keys = sorted(self.bins)
+        excess = len(keys) - MAX_BINS
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1.
+
+        Returns:
+            Optional[float]: Estimate within the relative accuracy, or None
+            for an empty sketch.
+
+        Raises:
+            ValueError: If q is out of range.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * self._gamma**key / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def bucket_counts(self, edges: Sequence[float]) -> list[int]:
+        """
+        Estimate how many values fall between consecutive edges.
+
+        Each sketch bucket is counted where its estimate (as in
+        ``quantile``) falls, so only values within the relative accuracy
+        of an edge may land on the wrong side of it.
+
+        Args:
+            edges: Strictly increasing edges.
+
+        Returns:
+            list[int]: ``len(edges) + 1`` counts: below the first edge,
+            between each pair and at or above the last edge.
+        """
+        counts = [0] * (len(edges) + 1)
+        if self.zero_count:
+            counts[bisect.bisect_right(edges, self.min)] += self.zero_count
+        for key, count in self.bins.items():
+            estimate = 2 * self._gamma**key / (self._gamma + 1)
+            estimate = min(max(estimate, self.min), self.max)
+            counts[bisect.bisect_right(edges, estimate)] += count
+        return counts
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact little-endian binary format."""
+        header = _HEADER.pack(
+            _FORMAT_VERSION,
+            self.relative_accuracy,
+            self.count,
+            self.zero_count,
+            self.sum,
+            self.min,
+            self.max,
+            len(self.bins),
+        )
+        return header + b"".join(
+            _BIN.pack(key, self.bins[key]) for key in sorted(self.bins)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DDSketch":
+        """
+        Deserialize a sketch written by ``to_bytes``.
+
+        Args:
+            data: Serialized sketch.
+
+        Returns:
+            DDSketch: Restored sketch.
+
+        Raises:
+            ValueError: If the data is truncated or of another version.
+        """
+        try:
+            version, accuracy, count, zero_count, total, low, high, size = (
+                _HEADER.unpack_from(data)
+            )
+        except struct.error as e:
+            raise ValueError(f"Invalid sketch: {e}") from e
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch version {version}")
+        if len(data) != _HEADER.size + size * _BIN.size:
+            raise ValueError("Invalid sketch: wrong length")
+        sketch = cls(accuracy)
+        sketch.bins = dict(_BIN.iter_unpack(data[_HEADER.size :]))
+        sketch.count = count
+        sketch.zero_count = zero_count
+        sketch.sum = total
+        sketch.min = low
+        sketch.max = high
+        return sketch
+
+
+def _blob(sketch: DDSketch) -> Optional[bytes]:
+    """Serialized sketch, None when empty."""
+    return sketch.to_bytes() if sketch.count else None
+
+
+@dataclass(slots=True)
+class WaitSketches:
+    """Wait (until called) and service (call to completion) minutes."""
+
+    wait: DDSketch = field(default_factory=DDSketch)
+    service: DDSketch = field(default_factory=DDSketch)
+
+    def merge(self, other: "WaitSketches") -> None:
+        """Add the values of another pair."""
+        self.wait.merge(other.wait)
+        self.service.merge(other.service)
+
+    def merge_blobs(
+        self, wait: Optional[bytes], service: Optional[bytes]
+    ) -> None:
+        """Add serialized sketches (None for empty ones)."""
+        if wait:
+            self.wait.merge(DDSketch.from_bytes(wait))
+        if service:
+            self.service.merge(DDSketch.from_bytes(service))
+
+
+def _minutes(start: datetime, end: datetime) -> float:
+    """Minutes between two timestamps (naive ones are UTC)."""
+    return (utc_naive(end) - utc_naive(start)).total_seconds() / 60
+
+
+# (queue_id, day, hour) in UTC
+HourKey = tuple[uuid.UUID, date, int]
+
+
+class LiveWaitSketches:
+    """
+    Wait and service time sketches of this worker per queue and hour.
+
+    Usage:
+        live = get_live_wait_sketches()
+        live.observe_ticket(ticket, previous_status)  # after commit
+        await live.flush(session_factory)  # periodically
+        per_queue = await live.queue_sketches(db, since)
+    """
+
+    def __init__(self, source: Optional[str] = None) -> None:
+        """
+        Initialize empty state.
+
+        Args:
+            source: Id of the rows this worker writes (default: random).
+        """
+        self.source = source or uuid.uuid4().hex
+        self._hours: dict[HourKey, WaitSketches] = {}
+        self._dirty: set[HourKey] = set()
+
+    def clear(self) -> None:
+        """Drop all state (tests)."""
+        self._hours.clear()
+        self._dirty.clear()
+
+    def _slot(self, queue_id: uuid.UUID, at: datetime) -> WaitSketches:
+        at = utc_naive(at)
+        key = (queue_id, at.date(), at.hour)
+        self._dirty.add(key)
+        sketches = self._hours.get(key)
+        if sketches is None:
+            sketches = self._hours[key] = WaitSketches()
+        return sketches
+
+    def observe_ticket(
+        self, ticket: Ticket, previous_status: Optional[TicketStatus]
+    ) -> None:
+        """
+        Record a committed ticket transition.
+
+        Values are filed under the hour of ``ticket.created_at`` (see the
+        module docstring), not the hour of the transition.
+
+        Args:
+            ticket: Ticket after the change.
+            previous_status: Status before the change, None for new tickets.
+        """
+        if ticket.status == previous_status:
+            return
+        if ticket.status == TicketStatus.CALLED and ticket.called_at:
+            self._slot(ticket.queue_id, ticket.created_at).wait.add(
+                _minutes(ticket.created_at, ticket.called_at)
+            )
+        elif (
+            ticket.status == TicketStatus.COMPLETED
+            and ticket.called_at
+            and ticket.completed_at
+        ):
+            self._slot(ticket.queue_id, ticket.created_at).service.add(
+                _minutes(ticket.called_at, ticket.completed_at)
+            )
+
+    async def flush(
+        self, session_factory: async_sessionmaker, now: Optional[datetime] = None
+    ) -> int:
+        """
+        Write changed hours to ``live_queue_sketches`` and expire old rows.
+
+        Hours older than the retention are dropped from memory afterwards.
+
+        Args:
+            session_factory: Factory for a dedicated session.
+            now: Current time (for tests).
+
+        Returns:
+            int: Number of rows written.
+        """
+        now = utc_naive(now or datetime.now(timezone.utc))
+        keys, self._dirty = self._dirty, set()
+        # Serialized before the first await, so concurrent observations
+        # land in the next flush
+        rows = [
+            {
+                "queue_id": queue_id,
+                "day": day,
+                "hour": hour,
+                "source": self.source,
+                "wait_sketch": _blob(self._hours[queue_id, day, hour].wait),
+                "service_sketch": _blob(self._hours[queue_id, day, hour].service),
+                "updated_at": now,
+            }
+            for queue_id, day, hour in keys
+        ]
+        oldest_day = now.date() - timedelta(days=LIVE_RETENTION_DAYS)
+        try:
+            async with session_factory() as db:
+                if rows:
+                    await db.execute(
+                        delete(LiveQueueSketch).where(
+                            LiveQueueSketch.source == self.source,
+                            tuple_(
+                                LiveQueueSketch.queue_id,
+                                LiveQueueSketch.day,
+                                LiveQueueSketch.hour,
+                            ).in_(list(keys)),
+                        )
+                    )
+                    await db.execute(insert(LiveQueueSketch), rows)
+                await db.execute(
+                    delete(LiveQueueSketch).where(LiveQueueSketch.day < oldest_day)
+                )
+                await db.commit()
+        except Exception:
+            self._dirty |= keys
+            raise
+
+        for key in [key for key in self._hours if key[1] < oldest_day]:
+            if key not in self._dirty:
+                del self._hours[key]
+        return len(rows)
+
+    async def queue_sketches(
+        self, db: AsyncSession, since: datetime
+    ) -> dict[uuid.UUID, WaitSketches]:
+        """
+        Merge the sketches of all workers per queue.
+
+        Args:
+            db: Database session.
+            since: Start of the window (ticket creation), rounded down to
+                the hour.
+
+        Returns:
+            dict[uuid.UUID, WaitSketches]: Merged sketches by queue.
+        """
+        since = utc_naive(since)
+        first = (since.date(), since.hour)
+        result = await db.execute(
+            select(
+                LiveQueueSketch.queue_id,
+                LiveQueueSketch.day,
+                LiveQueueSketch.hour,
+                LiveQueueSketch.source,
+                LiveQueueSketch.wait_sketch,
+                LiveQueueSketch.service_sketch,
+            ).where(tuple_(LiveQueueSketch.day, LiveQueueSketch.hour) >= first)
+        )
+        merged: dict[uuid.UUID, WaitSketches] = {}
+        for row in result:
+            key = (row.queue_id, row.day, row.hour)
+            if row.source == self.source and key in self._hours:
+                continue  # memory is at least as recent
+            merged.setdefault(row.queue_id, WaitSketches()).merge_blobs(
+                row.wait_sketch, row.service_sketch
+            )
+        for (queue_id, day, hour), sketches in self._hours.items():
+            if (day, hour) >= first:
+                merged.setdefault(queue_id, WaitSketches()).merge(sketches)
+        return merged
+
+
+async def rollup_sketches(
+    db: AsyncSession, first_day: date, until_day: date
+) -> dict[uuid.UUID, WaitSketches]:
+    """
+    Merge the rolled-up sketches of closed days per queue.
+
+    Args:
+        db: Database session.
+        first_day: First day (inclusive).
+        until_day: End day (exclusive), at most the rollup boundary.
+
+    Returns:
+        dict[uuid.UUID, WaitSketches]: Merged sketches by queue.
+    """
+    result = await db.execute(
+        select(
+            TicketHourlySketch.queue_id,
+            TicketHourlySketch.wait_sketch,
+            TicketHourlySketch.service_sketch,
+        ).where(
+            TicketHourlySketch.day >= first_day,
+            TicketHourlySketch.day < until_day,
+        )
+    )
+    merged: dict[uuid.UUID, WaitSketches] = {}
+    for row in result:
+        merged.setdefault(row.queue_id, WaitSketches()).merge_blobs(
+            row.wait_sketch, row.service_sketch
+        )
+    return merged
+
+
+async def sketches_since_day(
+    db: AsyncSession,
+    first_day: date,
+    rolled_up_until: Optional[datetime],
+    live: Optional[LiveWaitSketches] = None,
+    closed: Optional[dict[uuid.UUID, WaitSketches]] = None,
+) -> dict[uuid.UUID, WaitSketches]:
+    """
+    Merge rolled-up and live sketches per queue from ``first_day`` on.
+
+    Tickets created before the rollup boundary come from the rollups,
+    later ones from the live sketches. Days after the boundary that are older
+    than ``LIVE_RETENTION_DAYS`` (rollup job stalled) are missing.
+
+    Args:
+        db: Database session.
+        first_day: First UTC day (inclusive).
+        rolled_up_until: Rollup boundary (see ``rollup_boundary``).
+        live: Live sketches (default: this worker's singleton).
+        closed: Result of ``rollup_sketches`` for the closed days (e.g.
+            cached; not modified), read from the rollups if None.
+
+    Returns:
+        dict[uuid.UUID, WaitSketches]: Merged sketches by queue.
+    """
+    live = live or get_live_wait_sketches()
+    live_start = datetime.combine(first_day, time())
+    merged: dict[uuid.UUID, WaitSketches] = {}
+    if rolled_up_until is not None and rolled_up_until > live_start:
+        if closed is None:
+            closed = await rollup_sketches(db, first_day, rolled_up_until.date())
+        for queue_id, sketches in closed.items():
+            merged.setdefault(queue_id, WaitSketches()).merge(sketches)
+        live_start = rolled_up_until
+    for queue_id, sketches in (await live.queue_sketches(db, live_start)).items():
+        merged.setdefault(queue_id, WaitSketches()).merge(sketches)
+    return merged
+
+
+async def run_sketch_flush_loop(
+    session_factory: async_sessionmaker, interval_seconds: float
+) -> None:
+    """
+    Flush the live sketches periodically (run as background task).
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        interval_seconds: Seconds between flushes.
+    """
+    live = get_live_wait_sketches()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await live.flush(session_factory)
+        except Exception as e:
+            logger.warning("Live sketch flush failed", extra={"error": str(e)})
+
+
+# Singleton instance
+_live_wait_sketches: Optional[LiveWaitSketches] = None
+
+
+def get_live_wait_sketches() -> LiveWaitSketches:
+    """
+    Get singleton live sketches of this worker.
+
+    Returns:
+        LiveWaitSketches instance.
+    """
+    global _live_wait_sketches
+    if _live_wait_sketches is None:
+        _live_wait_sketches = LiveWaitSketches()
+    return _live_wait_sketches
@@ -15,7 +15,7 @@ import secrets
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import ColumnElement, Select, select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -33,6 +33,7 @@ from app.schemas.consultation_schemas import (
     ConsultationStatusUpdate,
     ConsultationMessageCreate,
 )
+from app.services.pagination import apply_keyset, finish_keyset_page
 
 
 logger = logging.getLogger(__name__)
@@ -294,7 +295,9 @@ async def get_patient_consultations(
     status_filter: Optional[list[ConsultationStatus]] = None,
     page: int = 1,
     page_size: int = 20,
-) -> tuple[list[PatientConsultation], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[PatientConsultation], Optional[int], Optional[str]]:
     """
     Get all consultations for a patient.
 
@@ -302,30 +305,28 @@ async def get_patient_consultations(
         db: Database session.
         patient_id: Patient's user ID.
         status_filter: Optional status filter.
-        page: Page number (1-based).
+        page: Page number (1-based, offset mode only).
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page), newest first.
+        include_total: Run the COUNT query for the total.
 
     Returns:
-        tuple: (list of consultations, total count)
+        tuple: (list of consultations, total count or None, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
     query = select(PatientConsultation).where(
         PatientConsultation.patient_id == patient_id
-    ).order_by(PatientConsultation.created_at.desc())
+    )
     
     if status_filter:
         query = query.where(PatientConsultation.status.in_(status_filter))
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
-    
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    
-    result = await db.execute(query)
-    consultations = result.scalars().all()
-    
-    return list(consultations), total
+    return await _paginate_consultations(
+        db, query, page, page_size, cursor, include_total,
+        PatientConsultation.created_at.desc(),
+    )
 
 
 async def get_doctor_consultations(
@@ -336,25 +337,35 @@ async def get_doctor_consultations(
     date_to: Optional[datetime] = None,
     page: int = 1,
     page_size: int = 20,
-) -> tuple[list[PatientConsultation], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[PatientConsultation], Optional[int], Optional[str]]:
     """
     Get all consultations for a doctor.
 
+    Offset pages are ordered by schedule; keyset pages by creation time,
+    newest first.
+
     Args:
         db: Database session.
         doctor_id: Doctor's user ID.
         status_filter: Optional status filter.
         date_from: Start date filter.
         date_to: End date filter.
-        page: Page number (1-based).
+        page: Page number (1-based, offset mode only).
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page).
+        include_total: Run the COUNT query for the total.
 
     Returns:
-        tuple: (list of consultations, total count)
+        tuple: (list of consultations, total count or None, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
     query = select(PatientConsultation).where(
         PatientConsultation.doctor_id == doctor_id
-    ).order_by(PatientConsultation.scheduled_at.asc())
+    )
     
     if status_filter:
         query = query.where(PatientConsultation.status.in_(status_filter))
@@ -365,17 +376,84 @@ async def get_doctor_consultations(
     if date_to:
         query = query.where(PatientConsultation.scheduled_at <= date_to)
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
+    return await _paginate_consultations(
+        db, query, page, page_size, cursor, include_total,
+        PatientConsultation.scheduled_at.asc(),
+    )
+
+
+async def get_all_consultations(
+    db: AsyncSession,
+    status_filter: Optional[list[ConsultationStatus]] = None,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[PatientConsultation], Optional[int], Optional[str]]:
+    """
+    Get all consultations (admin/MFA view), newest first.
+
+    Args:
+        db: Database session.
+        status_filter: Optional status filter.
+        page: Page number (1-based, offset mode only).
+        page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page).
+        include_total: Run the COUNT query for the total.
+
+    Returns:
+        tuple: (list of consultations, total count or None, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    query = select(PatientConsultation)
     
-    # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    if status_filter:
+        query = query.where(PatientConsultation.status.in_(status_filter))
+    
+    return await _paginate_consultations(
+        db, query, page, page_size, cursor, include_total,
+        PatientConsultation.created_at.desc(),
+    )
+
+
+async def _paginate_consultations(
+    db: AsyncSession,
+    query: Select,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool,
+    offset_order: ColumnElement,
+) -> tuple[list[PatientConsultation], Optional[int], Optional[str]]:
+    """Count and page a filtered consultation query (offset or keyset)."""
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await db.scalar(count_query) or 0
+    
+    if cursor is not None:
+        query = apply_keyset(
+            query,
+            PatientConsultation.created_at,
+            PatientConsultation.id,
+            cursor,
+            page_size,
+            descending=True,
+        )
+        result = await db.execute(query)
+        consultations, next_cursor = finish_keyset_page(
+            result.scalars().all(), page_size
+        )
+        return consultations, total, next_cursor
+    
+    query = query.order_by(offset_order).offset((page - 1) * page_size).limit(page_size)
     
     result = await db.execute(query)
     consultations = result.scalars().all()
     
-    return list(consultations), total
+    return list(consultations), total, None
 
 
 async def send_consultation_message(
@@ -452,7 +530,9 @@ async def get_consultation_messages(
     user_id: uuid.UUID,
     page: int = 1,
     page_size: int = 50,
-) -> tuple[list[PatientConsultationMessage], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[PatientConsultationMessage], Optional[int], Optional[str]]:
     """
     Get messages for a consultation.
 
@@ -460,36 +540,57 @@ async def get_consultation_messages(
         db: Database session.
         consultation_id: Consultation ID.
         user_id: Requesting user's ID (for authorization).
-        page: Page number (1-based).
+        page: Page number (1-based, offset mode only).
         page_size: Items per page.
+        cursor: Keyset cursor ("" for the first page), oldest first.
+        include_total: Run the COUNT query for the total.
 
     Returns:
-        tuple: (list of messages, total count)
+        tuple: (list of messages, total count or None, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
     # Verify user is participant
     consultation = await get_consultation(db, consultation_id)
     
     if not consultation:
-        return [], 0
+        return [], 0, None
     
     if user_id not in [consultation.patient_id, consultation.doctor_id]:
-        return [], 0
+        return [], 0, None
     
     query = select(PatientConsultationMessage).where(
         PatientConsultationMessage.consultation_id == consultation_id
-    ).order_by(PatientConsultationMessage.created_at.asc())
+    )
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await db.scalar(count_query) or 0
+    
+    if cursor is not None:
+        query = apply_keyset(
+            query,
+            PatientConsultationMessage.created_at,
+            PatientConsultationMessage.id,
+            cursor,
+            page_size,
+        )
+        result = await db.execute(query)
+        messages, next_cursor = finish_keyset_page(result.scalars().all(), page_size)
+        return messages, total, next_cursor
     
     # Paginate (from end for chat)
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = query.order_by(
+        PatientConsultationMessage.created_at.asc()
+    ).offset((page - 1) * page_size).limit(page_size)
     
     result = await db.execute(query)
     messages = result.scalars().all()
     
-    return list(messages), total
+    return list(messages), total, None
 
 
 async def mark_messages_read(
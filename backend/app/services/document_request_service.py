@@ -27,6 +27,7 @@ from app.schemas.document_request_schemas import (
     DocumentRequestCreate,
     DocumentRequestUpdate,
 )
+from app.services.pagination import apply_keyset, finish_keyset_page
 
 
 logger = logging.getLogger(__name__)
@@ -145,10 +146,15 @@ async def get_practice_document_requests(
     assigned_to_id: Optional[uuid.UUID] = None,
     page: int = 1,
     page_size: int = 20,
-) -> tuple[list[DocumentRequest], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[DocumentRequest], Optional[int], Optional[str]]:
     """
     Get all document requests for a practice (staff view).
 
+    With a cursor ("" for the first page) requests are paged by keyset on
+    ``(created_at, id)`` in FIFO order instead of priority/offset order.
+
     Args:
         db: Database session.
         practice_id: Practice ID.
@@ -156,17 +162,19 @@ async def get_practice_document_requests(
         document_type_filter: Optional type filter.
         priority_filter: Optional priority filter.
         assigned_to_id: Filter by assigned staff.
-        page: Page number (1-based).
+        page: Page number (1-based, offset mode only).
         page_size: Items per page.
+        cursor: Keyset cursor from a previous page.
+        include_total: Run the COUNT query for the total.
 
     Returns:
-        tuple: (list of requests, total count)
+        tuple: (list of requests, total count or None, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
     query = select(DocumentRequest).where(
         DocumentRequest.practice_id == practice_id
-    ).order_by(
-        DocumentRequest.priority.desc(),  # Urgent first
-        DocumentRequest.created_at.asc(),  # FIFO within priority
     )
     
     if status_filter:
@@ -182,16 +190,29 @@ async def get_practice_document_requests(
         query = query.where(DocumentRequest.assigned_to_id == assigned_to_id)
     
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = await db.scalar(count_query) or 0
+    total = None
+    if include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = await db.scalar(count_query) or 0
     
     # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    if cursor is not None:
+        query = apply_keyset(
+            query, DocumentRequest.created_at, DocumentRequest.id, cursor, page_size
+        )
+        result = await db.execute(query)
+        requests, next_cursor = finish_keyset_page(result.scalars().all(), page_size)
+        return requests, total, next_cursor
+
+    query = query.order_by(
+        DocumentRequest.priority.desc(),  # Urgent first
+        DocumentRequest.created_at.asc(),  # FIFO within priority
+    ).offset((page - 1) * page_size).limit(page_size)
     
     result = await db.execute(query)
     requests = result.scalars().all()
     
-    return list(requests), total
+    return list(requests), total, None
 
 
 async def get_document_request(
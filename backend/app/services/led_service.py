@@ -31,6 +31,7 @@ from app.models.models import (
     WayfindingRoute,
 )
 from app.services.mqtt_service import get_mqtt_service
+from app.services.wait_time_estimator import get_wait_time_estimator
 
 logger = logging.getLogger(__name__)
 
@@ -362,7 +363,9 @@ class LEDService:
     async def update_wait_time_indicator(
         self,
         zone_id: UUID,
-        average_wait_minutes: int,
+        average_wait_minutes: Optional[int] = None,
+        queue_id: Optional[UUID] = None,
+        waiting_count: int = 0,
     ) -> bool:
         """
         Update waiting area LED color based on wait time.
@@ -375,11 +378,21 @@ class LEDService:
 
         Args:
             zone_id: Waiting area zone UUID.
-            average_wait_minutes: Current average wait time.
+            average_wait_minutes: Current average wait time. If omitted, it
+                is estimated for ``queue_id`` and ``waiting_count``.
+            queue_id: Queue whose estimate drives the indicator.
+            waiting_count: Patients waiting in ``queue_id``.
 
         Returns:
             True if updated.
         """
+        if average_wait_minutes is None:
+            if queue_id is None:
+                return False
+            average_wait_minutes = get_wait_time_estimator().estimate_wait(
+                queue_id, waiting_count
+            )
+
         # Determine color based on wait time
         if average_wait_minutes < 10:
             color = "#00FF00"  # Green
@@ -22,7 +22,7 @@ from typing import Optional
 from uuid import UUID
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.models import (
@@ -38,10 +38,34 @@ from app.models.models import (
     Zone,
 )
 from app.services.mqtt_service import get_mqtt_service
+from app.services.queue_service import allocate_ticket_number, format_ticket_number
+from app.services.queue_state_cache import get_queue_state_cache
+from app.services.wait_time_estimator import get_wait_time_estimator
 
 logger = logging.getLogger(__name__)
 
 
+def waiting_ticket_query(practice_id: UUID, patient_id: UUID) -> Select:
+    """
+    Build the duplicate check for a patient's waiting ticket in a practice.
+
+    Args:
+        practice_id: Practice UUID.
+        patient_id: Patient user UUID.
+
+    Returns:
+        Select: Waiting tickets of the patient, newest first.
+    """
+    return (
+        select(Ticket)
+        .join(Queue)
+        .where(Queue.practice_id == practice_id)
+        .where(Ticket.status == TicketStatus.WAITING)
+        .where(Ticket.created_by_id == patient_id)
+        .order_by(Ticket.created_at.desc())
+    )
+
+
 class NFCService:
     """
     Service for NFC card operations and automated check-in.
@@ -239,33 +263,25 @@ class NFCService:
         ticket = None
         if patient_id:
             result = await self._db.execute(
-                select(Ticket)
-                .join(Queue)
-                .where(Queue.practice_id == practice_id)
-                .where(Ticket.status == TicketStatus.WAITING)
-                .where(Ticket.created_by_id == patient_id)
-                .order_by(Ticket.created_at.desc())
+                waiting_ticket_query(practice_id, patient_id)
             )
             ticket = result.scalar_one_or_none()
 
         # Step 3: Create ticket if needed
         if not ticket and queue_id:
-            # Get queue
-            queue_result = await self._db.execute(
-                select(Queue).where(Queue.id == queue_id)
-            )
-            queue = queue_result.scalar_one_or_none()
+            allocation = await allocate_ticket_number(self._db, queue_id)
 
-            if queue:
-                queue.current_number += 1
-                ticket_number = f"{queue.code}-{queue.current_number:03d}"
+            if allocation:
+                queue_code, number, average_wait_minutes = allocation
 
                 ticket = Ticket(
                     queue_id=queue_id,
-                    ticket_number=ticket_number,
+                    ticket_number=format_ticket_number(queue_code, number),
                     status=TicketStatus.WAITING,
                     priority=TicketPriority.NORMAL,
-                    estimated_wait_minutes=queue.average_wait_minutes,
+                    estimated_wait_minutes=get_wait_time_estimator().estimate_wait(
+                        queue_id, 1, average_wait_minutes
+                    ),
                     created_by_id=patient_id,
                 )
                 self._db.add(ticket)
@@ -349,6 +365,7 @@ class NFCService:
         await self._db.commit()
         if ticket:
             await self._db.refresh(ticket)
+            get_queue_state_cache().apply_ticket(ticket, None)
         await self._db.refresh(event)
 
         # Publish event for real-time updates
@@ -0,0 +1,522 @@
+"""
+Transactional outbox for ticket lifecycle side effects.
+
+Ticket changes add an ``OutboxEvent`` to the same transaction instead of
+calling WebSocket, MQTT, push or LED services after commit, so a request
+costs one commit no matter how slow FCM or a WLED controller is. A
+background dispatcher drains the table:
+
+    - Batching: up to ``OUTBOX_BATCH_SIZE`` events are claimed with one
+      ``UPDATE ... (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING`` and
+      delivered concurrently; several workers can share the table.
+    - Ordering: an event is only claimed once every earlier event of the
+      same ticket is delivered or given up, so clients never see
+      "completed" before "called".
+    - Retries: failed channels are retried with exponential backoff;
+      channels that already succeeded are not repeated.
+    - Claims are leases: if a worker dies mid-batch, its events become due
+      again after ``LEASE_SECONDS`` (at-least-once delivery).
+
+Security:
+    - Payloads carry public ticket fields only (no patient name or phone).
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import delete, event, exists, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, aliased
+
+from app.config import get_settings
+from app.middleware.observability import record_outbox_dispatch, record_outbox_failure
+from app.models.models import OutboxEvent, Queue, Ticket, TicketStatus, User, UserRole
+from app.schemas.schemas import PublicTicketResponse
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxChannel:
+    """Delivery channels of an outbox event."""
+
+    WEBSOCKET = "websocket"
+    MQTT = "mqtt"
+    PATIENT_PUSH = "patient_push"
+    STAFF_PUSH = "staff_push"
+    LED = "led"
+
+
+DEFAULT_CHANNELS = (OutboxChannel.WEBSOCKET, OutboxChannel.MQTT)
+
+# Event types match the WebSocket message types
+TICKET_CREATED = "ticket.created"
+TICKET_CALLED = "ticket.called"
+TICKET_UPDATED = "ticket.updated"
+STATUS_EVENT_TYPES = {
+    TicketStatus.CALLED: TICKET_CALLED,
+    TicketStatus.COMPLETED: "ticket.completed",
+    TicketStatus.CANCELLED: "ticket.cancelled",
+    TicketStatus.NO_SHOW: "ticket.cancelled",
+}
+
+# Seconds a claimed event stays invisible to other workers
+LEASE_SECONDS = 60
+MAX_BACKOFF_SECONDS = 300
+# Concurrent channel calls per batch (push/LED open their own sessions)
+MAX_CONCURRENT_DELIVERIES = 20
+
+_PENDING_KEY = "outbox_pending"
+
+
+def ticket_event_data(ticket: Ticket) -> dict[str, Any]:
+    """
+    Build the public event representation of a ticket.
+
+    Args:
+        ticket: Flushed ticket.
+
+    Returns:
+        dict: JSON-serializable ticket fields without PII.
+    """
+    data = PublicTicketResponse.model_validate(ticket).model_dump(mode="json")
+    data["id"] = str(ticket.id)
+    data["priority"] = ticket.priority.value if ticket.priority else None
+    return data
+
+
+def status_event_type(status: TicketStatus) -> str:
+    """
+    Map a ticket status to its outbox event type.
+
+    Args:
+        status: New ticket status.
+
+    Returns:
+        str: Event type (``ticket.updated`` for statuses without own event).
+    """
+    return STATUS_EVENT_TYPES.get(status, TICKET_UPDATED)
+
+
+async def enqueue_ticket_event(
+    db: AsyncSession,
+    ticket: Ticket,
+    event_type: str,
+    channels: Iterable[str] = DEFAULT_CHANNELS,
+    **extra: Any,
+) -> OutboxEvent:
+    """
+    Add a ticket event to the outbox of the current transaction.
+
+    Does not commit; the event becomes visible to the dispatcher together
+    with the ticket change.
+
+    Args:
+        db: Database session holding the ticket change.
+        ticket: Created or updated ticket.
+        event_type: Event type (e.g., ``TICKET_CALLED``).
+        channels: Channels to deliver to.
+        **extra: Additional payload fields for the channel handlers.
+
+    Returns:
+        OutboxEvent: Pending outbox row.
+    """
+    if ticket.id is None or ticket.created_at is None:
+        # Sessions do not autoflush; defaults are assigned on flush
+        await db.flush()
+
+    outbox_event = OutboxEvent(
+        ticket_id=ticket.id,
+        queue_id=ticket.queue_id,
+        event_type=event_type,
+        payload=json.dumps({"ticket": ticket_event_data(ticket), **extra}, default=str),
+        channels=",".join(channels),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(outbox_event)
+    db.info[_PENDING_KEY] = True
+    return outbox_event
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_dispatcher(session: Session) -> None:
+    """Wake the local dispatcher once outbox rows are committed."""
+    if session.info.pop(_PENDING_KEY, False):
+        get_outbox_dispatcher().wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    """Forget enqueued rows that were rolled back."""
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps from the database as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# ============================================================================
+# Channel handlers
+# ============================================================================
+
+
+async def _send_websocket(
+    session_factory: async_sessionmaker,
+    event_type: str,
+    practice_id: uuid.UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Broadcast the event to the practice's WebSocket clients."""
+    # Imported here: the routers package imports the services that enqueue
+    from app.routers import websocket
+
+    ticket = payload["ticket"]
+    if event_type == TICKET_CREATED:
+        await websocket.broadcast_ticket_created(str(practice_id), ticket)
+    elif event_type == TICKET_CALLED:
+        await websocket.broadcast_ticket_called(str(practice_id), ticket)
+    else:
+        await websocket.broadcast_ticket_status(str(practice_id), event_type, ticket)
+
+
+async def _send_mqtt(
+    session_factory: async_sessionmaker,
+    event_type: str,
+    practice_id: uuid.UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Publish the event on the practice's MQTT event topic."""
+    from app.services.mqtt_service import get_mqtt_service
+
+    mqtt = get_mqtt_service()
+    if not mqtt.is_connected:
+        # No broker configured for this deployment
+        return
+    await mqtt.publish_event(practice_id, event_type.replace(".", "_"), payload["ticket"])
+
+
+async def _send_patient_push(
+    session_factory: async_sessionmaker,
+    event_type: str,
+    practice_id: uuid.UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Confirm the check-in to the patient's devices."""
+    from app.services.push_service import notify_check_in_success
+
+    ticket = payload["ticket"]
+    async with session_factory() as db:
+        await notify_check_in_success(
+            db=db,
+            patient_user_id=uuid.UUID(payload["patient_user_id"]),
+            ticket_number=ticket["ticket_number"],
+            queue_name=payload.get("queue_name", ""),
+            estimated_wait_minutes=ticket["estimated_wait_minutes"],
+        )
+
+
+async def _send_staff_push(
+    session_factory: async_sessionmaker,
+    event_type: str,
+    practice_id: uuid.UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Notify active MFA staff about a new ticket."""
+    from app.services.push_service import notify_mfa_new_ticket
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(User.id).where(User.role == UserRole.MFA, User.is_active.is_(True))
+        )
+        mfa_user_ids = list(result.scalars().all())
+        if mfa_user_ids:
+            await notify_mfa_new_ticket(
+                db=db,
+                mfa_user_ids=mfa_user_ids,
+                ticket_number=payload["ticket"]["ticket_number"],
+                queue_name=payload.get("queue_name", ""),
+            )
+
+
+async def _send_led(
+    session_factory: async_sessionmaker,
+    event_type: str,
+    practice_id: uuid.UUID,
+    payload: dict[str, Any],
+) -> None:
+    """Light the wayfinding route to the ticket's zone."""
+    from app.services.led_service import LEDService
+
+    async with session_factory() as db:
+        led_service = LEDService(db)
+        try:
+            await led_service.activate_wayfinding_route(
+                uuid.UUID(payload["wayfinding_route_id"])
+            )
+        finally:
+            await led_service.close()
+
+
+ChannelHandler = Callable[
+    [async_sessionmaker, str, uuid.UUID, dict[str, Any]], Awaitable[None]
+]
+
+CHANNEL_HANDLERS: dict[str, ChannelHandler] = {
+    OutboxChannel.WEBSOCKET: _send_websocket,
+    OutboxChannel.MQTT: _send_mqtt,
+    OutboxChannel.PATIENT_PUSH: _send_patient_push,
+    OutboxChannel.STAFF_PUSH: _send_staff_push,
+    OutboxChannel.LED: _send_led,
+}
+
+
+# ============================================================================
+# Dispatcher
+# ============================================================================
+
+
+class OutboxDispatcher:
+    """
+    Drains the outbox table in batches.
+
+    Run ``run_outbox_dispatcher`` as a background task; ``dispatch_batch``
+    processes a single batch (used by tests and benchmarks).
+    """
+
+    def __init__(self, batch_size: int = 100, max_attempts: int = 8) -> None:
+        """
+        Initialize the dispatcher.
+
+        Args:
+            batch_size: Maximum events claimed per batch.
+            max_attempts: Deliveries before an event is given up.
+        """
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.handlers: dict[str, ChannelHandler] = dict(CHANNEL_HANDLERS)
+        self._practice_ids: dict[uuid.UUID, uuid.UUID] = {}
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        """Start the next batch now instead of after the poll interval."""
+        self._wakeup.set()
+
+    async def wait(self, timeout: float) -> None:
+        """
+        Sleep until woken or until ``timeout`` seconds have passed.
+
+        Args:
+            timeout: Poll interval in seconds.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def dispatch_batch(self, session_factory: async_sessionmaker) -> int:
+        """
+        Claim, deliver and settle one batch of due events.
+
+        Args:
+            session_factory: Factory for dedicated sessions.
+
+        Returns:
+            int: Number of events processed (delivered or failed).
+        """
+        async with session_factory() as db:
+            events = await self._claim(db)
+            if not events:
+                return 0
+            practice_ids = await self._practice_ids_for(db, events)
+
+        # At most one event per ticket is claimed, so a batch runs concurrently
+        limit = asyncio.Semaphore(MAX_CONCURRENT_DELIVERIES)
+        results = await asyncio.gather(
+            *(
+                self._deliver(
+                    session_factory, e, practice_ids.get(e.queue_id), limit
+                )
+                for e in events
+            )
+        )
+        await self._settle(session_factory, events, results)
+        return len(events)
+
+    async def _claim(self, db: AsyncSession) -> list[OutboxEvent]:
+        """Lease the next due events, oldest first."""
+        now = datetime.now(timezone.utc)
+        earlier = aliased(OutboxEvent)
+        blocked = exists().where(
+            earlier.ticket_id == OutboxEvent.ticket_id,
+            earlier.failed_at.is_(None),
+            tuple_(earlier.created_at, earlier.id)
+            < tuple_(OutboxEvent.created_at, OutboxEvent.id),
+        )
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.failed_at.is_(None))
+            .where(OutboxEvent.available_at <= now)
+            .where(~blocked)
+            .order_by(OutboxEvent.created_at, OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("due_events")
+            .prefix_with("MATERIALIZED", dialect="postgresql")
+        )
+        result = await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id == due.c.id)
+            .values(
+                attempts=OutboxEvent.attempts + 1,
+                available_at=now + timedelta(seconds=LEASE_SECONDS),
+            )
+            .returning(OutboxEvent)
+            .execution_options(synchronize_session=False)
+        )
+        events = sorted(result.scalars().all(), key=lambda e: (e.created_at, e.id))
+        await db.commit()
+        return events
+
+    async def _practice_ids_for(
+        self, db: AsyncSession, events: list[OutboxEvent]
+    ) -> dict[uuid.UUID, uuid.UUID]:
+        """Resolve (and remember) the practice of each event's queue."""
+        missing = {e.queue_id for e in events} - self._practice_ids.keys()
+        if missing:
+            result = await db.execute(
+                select(Queue.id, Queue.practice_id).where(Queue.id.in_(missing))
+            )
+            self._practice_ids.update({row[0]: row[1] for row in result.all()})
+        return self._practice_ids
+
+    async def _deliver(
+        self,
+        session_factory: async_sessionmaker,
+        outbox_event: OutboxEvent,
+        practice_id: Optional[uuid.UUID],
+        limit: asyncio.Semaphore,
+    ) -> tuple[list[str], Optional[str]]:
+        """Run every pending channel; return the failed ones and last error."""
+        payload = json.loads(outbox_event.payload)
+        channels = [c for c in outbox_event.channels.split(",") if c]
+
+        async def send(channel: str) -> Optional[str]:
+            try:
+                handler = self.handlers.get(channel)
+                if handler is None:
+                    raise ValueError(f"Unknown outbox channel: {channel}")
+                if practice_id is None:
+                    raise ValueError("Queue of outbox event not found")
+                async with limit:
+                    await handler(
+                        session_factory, outbox_event.event_type, practice_id, payload
+                    )
+                return None
+            except Exception as e:
+                logger.warning(
+                    "Outbox delivery failed",
+                    extra={
+                        "event_id": str(outbox_event.id),
+                        "event_type": outbox_event.event_type,
+                        "channel": channel,
+                        "attempt": outbox_event.attempts,
+                        "error": str(e),
+                    },
+                )
+                return f"{channel}: {e}"
+
+        # Channels are independent; order only matters within a channel
+        errors = await asyncio.gather(*(send(c) for c in channels))
+        failed = [c for c, error in zip(channels, errors) if error]
+        last_error = next((error for error in reversed(errors) if error), None)
+        return failed, last_error
+
+    async def _settle(
+        self,
+        session_factory: async_sessionmaker,
+        events: list[OutboxEvent],
+        results: list[tuple[list[str], Optional[str]]],
+    ) -> None:
+        """Delete delivered events; reschedule or give up failed ones."""
+        now = datetime.now(timezone.utc)
+        delivered = [e for e, (failed, _) in zip(events, results) if not failed]
+
+        async with session_factory() as db:
+            if delivered:
+                await db.execute(
+                    delete(OutboxEvent).where(
+                        OutboxEvent.id.in_([e.id for e in delivered])
+                    )
+                )
+            for outbox_event, (failed, error) in zip(events, results):
+                if not failed:
+                    continue
+                final = outbox_event.attempts >= self.max_attempts
+                values: dict[str, Any] = {
+                    "channels": ",".join(failed),
+                    "last_error": error,
+                }
+                if final:
+                    values["failed_at"] = now
+                else:
+                    backoff = min(2 ** (outbox_event.attempts - 1), MAX_BACKOFF_SECONDS)
+                    values["available_at"] = now + timedelta(seconds=backoff)
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == outbox_event.id)
+                    .values(**values)
+                )
+                record_outbox_failure(outbox_event.event_type, final)
+            await db.commit()
+
+        for outbox_event in delivered:
+            lag = (now - _as_utc(outbox_event.created_at)).total_seconds()
+            record_outbox_dispatch(outbox_event.event_type, lag)
+
+
+async def run_outbox_dispatcher(
+    session_factory: async_sessionmaker, poll_seconds: float
+) -> None:
+    """
+    Drain the outbox continuously (run as background task).
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        poll_seconds: Idle wait between polls; commits in this process wake
+            the dispatcher earlier.
+    """
+    dispatcher = get_outbox_dispatcher()
+    while True:
+        try:
+            processed = await dispatcher.dispatch_batch(session_factory)
+        except Exception as e:
+            logger.warning("Outbox dispatch failed", extra={"error": str(e)})
+            processed = 0
+        if not processed:
+            await dispatcher.wait(poll_seconds)
+
+
+# Singleton instance
+_outbox_dispatcher: Optional[OutboxDispatcher] = None
+
+
+def get_outbox_dispatcher() -> OutboxDispatcher:
+    """
+    Get singleton outbox dispatcher.
+
+    Returns:
+        OutboxDispatcher instance.
+    """
+    global _outbox_dispatcher
+    if _outbox_dispatcher is None:
+        settings = get_settings()
+        _outbox_dispatcher = OutboxDispatcher(
+            batch_size=settings.OUTBOX_BATCH_SIZE,
+            max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+        )
+    return _outbox_dispatcher
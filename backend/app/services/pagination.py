@@ -0,0 +1,129 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Offset pagination makes the database walk and discard every skipped row, so
+deep pages get slower the further back a client scrolls. Keyset pagination
+continues after the last row of the previous page on ``(created_at, id)``,
+which an index answers with a seek regardless of the page number.
+
+Cursors are opaque, URL-safe strings. Clients pass back ``next_cursor``
+from the previous response and must not build or inspect them.
+
+Security:
+    - Cursors only carry a timestamp and a row UUID; the caller's filters
+      (practice, queue, patient) are still applied on every request.
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Sequence, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+T = TypeVar("T")
+
+INVALID_CURSOR_DETAIL = "Ungültiger Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """
+    Encode a keyset position as an opaque cursor.
+
+    Args:
+        created_at: Creation time of the last row on the page.
+        row_id: UUID of the last row on the page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    payload = json.dumps(
+        {"c": created_at.isoformat(), "i": str(row_id)}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor string from a previous response.
+
+    Returns:
+        tuple: (created_at, id) of the row to continue after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), uuid.UUID(payload["i"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError,
+            KeyError, TypeError, ValueError) as exc:
+        raise ValueError(INVALID_CURSOR_DETAIL) from exc
+
+
+def apply_keyset(
+    query: Select,
+    created_at: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    """
+    Order a query by ``(created_at, id)`` and continue after a cursor.
+
+    Fetches one extra row so ``finish_keyset_page`` can tell whether a
+    next page exists without a COUNT.
+
+    Args:
+        query: Filtered select without ORDER BY/LIMIT.
+        created_at: Timestamp column of the listed model.
+        row_id: Primary key column of the listed model.
+        cursor: Cursor from the previous page, None for the first page.
+        limit: Page size.
+        descending: Newest first instead of oldest first.
+
+    Returns:
+        Select: Query ready to execute.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if cursor:
+        after_created, after_id = decode_cursor(cursor)
+        key = tuple_(created_at, row_id)
+        position = tuple_(after_created, after_id)
+        query = query.where(key < position if descending else key > position)
+
+    if descending:
+        query = query.order_by(created_at.desc(), row_id.desc())
+    else:
+        query = query.order_by(created_at.asc(), row_id.asc())
+    return query.limit(limit + 1)
+
+
+def finish_keyset_page(
+    rows: Sequence[T], limit: int
+) -> tuple[list[T], Optional[str]]:
+    """
+    Trim the look-ahead row and build the next cursor.
+
+    Args:
+        rows: Rows returned by a query from ``apply_keyset``.
+        limit: Page size passed to ``apply_keyset``.
+
+    Returns:
+        tuple: (rows of this page, next cursor or None on the last page)
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    last: Any = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,220 @@
+"""
+Response cache for the public queue summary.
+
+Waiting-room displays and patient phones poll ``/queue/public/summary``
+every few seconds. This module keeps the serialized JSON body per practice
+together with a strong ETag, so unchanged polls are answered from memory
+(or with 304) without touching the database.
+
+Entries are dropped whenever the queue state cache reports a change for the
+practice (ticket created, called, completed, ...). A TTL bounds staleness for
+edits that do not go through ticket events (practice/queue settings, writes
+from other workers).
+
+Security:
+    - Caches the public, PII-free summary only.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.services.queue_service import get_public_queue_summary
+from app.services.queue_state_cache import get_queue_state_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedSummary:
+    """Serialized summary of one practice."""
+
+    practice_id: uuid.UUID
+    body: bytes
+    etag: str
+    fingerprint: str
+    created_at: float
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an ``If-None-Match`` header against an ETag.
+
+    Uses the weak comparison required for ``If-None-Match`` (RFC 9110).
+
+    Args:
+        if_none_match: Raw header value.
+        etag: Current strong ETag (quoted).
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class PublicSummaryCache:
+    """
+    Per-practice cache of serialized public summaries.
+
+    Usage:
+        cache = get_public_summary_cache()
+        entry = await cache.get(db, practice_id)
+    """
+
+    def __init__(self, ttl_seconds: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Maximum entry age; 0 disables caching.
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[uuid.UUID, CachedSummary] = {}
+        self._last: dict[uuid.UUID, CachedSummary] = {}
+        self._generation = 0
+        # Build locks of requested practice IDs, held only while in use (the
+        # IDs come from an unauthenticated query parameter)
+        self._locks: dict[Optional[uuid.UUID], asyncio.Lock] = {}
+        self._lock_users: dict[Optional[uuid.UUID], int] = {}
+        self._default_practice_id: Optional[uuid.UUID] = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, practice_id: Optional[uuid.UUID] = None) -> None:
+        """
+        Drop cached summaries.
+
+        Args:
+            practice_id: Practice to drop, or None for all practices.
+        """
+        self._generation += 1
+        if practice_id is None:
+            self._entries.clear()
+            self._default_practice_id = None
+        else:
+            self._entries.pop(practice_id, None)
+
+    def _lookup(self, practice_id: Optional[uuid.UUID]) -> Optional[CachedSummary]:
+        """Return a fresh entry or None."""
+        key = practice_id or self._default_practice_id
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.created_at > self.ttl_seconds:
+            return None
+        return entry
+
+    async def get(
+        self, db: AsyncSession, practice_id: Optional[uuid.UUID] = None
+    ) -> CachedSummary:
+        """
+        Get the serialized summary, building it on a miss.
+
+        Concurrent misses for the same practice share one build.
+
+        Args:
+            db: Database session (used only on a miss).
+            practice_id: Practice UUID, None for the default practice.
+
+        Returns:
+            CachedSummary: Body and ETag.
+
+        Raises:
+            ValueError: If no active practice can be resolved.
+        """
+        entry = self._lookup(practice_id) if self.ttl_seconds > 0 else None
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        lock = self._locks.get(practice_id)
+        if lock is None:
+            lock = self._locks[practice_id] = asyncio.Lock()
+        self._lock_users[practice_id] = self._lock_users.get(practice_id, 0) + 1
+        try:
+            async with lock:
+                if self.ttl_seconds > 0:
+                    entry = self._lookup(practice_id)
+                    if entry is not None:
+                        return entry
+                return await self._build(db, practice_id)
+        finally:
+            self._lock_users[practice_id] -= 1
+            if not self._lock_users[practice_id]:
+                del self._lock_users[practice_id]
+                del self._locks[practice_id]
+
+    async def _build(
+        self, db: AsyncSession, practice_id: Optional[uuid.UUID]
+    ) -> CachedSummary:
+        """Build, serialize and (if still current) store a summary."""
+        generation = self._generation
+        summary = await get_public_queue_summary(db, practice_id)
+        resolved_id = summary.practice_id
+
+        # The ETag covers the content, not the generation time, so a rebuild
+        # with unchanged data keeps serving the previous bytes and ETag.
+        fingerprint = hashlib.sha256(
+            summary.model_dump_json(exclude={"generated_at"}).encode()
+        ).hexdigest()
+        previous = self._last.get(resolved_id)
+        if previous is not None and previous.fingerprint == fingerprint:
+            body, etag = previous.body, previous.etag
+        else:
+            body = summary.model_dump_json().encode()
+            etag = f'"{fingerprint[:32]}"'
+
+        entry = CachedSummary(
+            practice_id=resolved_id,
+            body=body,
+            etag=etag,
+            fingerprint=fingerprint,
+            created_at=time.monotonic(),
+        )
+        # Skip storing if a ticket event arrived while the summary was built
+        self._last[resolved_id] = entry
+        if self.ttl_seconds > 0 and self._generation == generation:
+            self._entries[resolved_id] = entry
+            if practice_id is None:
+                self._default_practice_id = resolved_id
+        return entry
+
+
+# Singleton instance
+_public_summary_cache: Optional[PublicSummaryCache] = None
+
+
+def get_public_summary_cache() -> PublicSummaryCache:
+    """
+    Get singleton public summary cache.
+
+    The cache subscribes to queue state changes on first use.
+
+    Returns:
+        PublicSummaryCache instance.
+    """
+    global _public_summary_cache
+    if _public_summary_cache is None:
+        _public_summary_cache = PublicSummaryCache(
+            get_settings().PUBLIC_SUMMARY_CACHE_TTL_SECONDS
+        )
+        get_queue_state_cache().add_listener(_public_summary_cache.invalidate)
+    return _public_summary_cache
@@ -8,17 +8,59 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.models.models import Practice, Queue, Ticket, TicketPriority, TicketStatus
 from app.schemas.schemas import (
+    DayCloseQueueResult,
+    DayCloseResponse,
     PublicQueueSummaryItem,
     PublicQueueSummaryResponse,
     QueueCreate,
     QueueStatsResponse,
     TicketCreate,
 )
+from app.services.analytics_sketch import get_live_wait_sketches
+from app.services.outbox import (
+    TICKET_CALLED,
+    TICKET_CREATED,
+    enqueue_ticket_event,
+    status_event_type,
+)
+from app.services.pagination import apply_keyset, finish_keyset_page
+from app.services.queue_state_cache import get_queue_state_cache
+from app.services.wait_time_estimator import get_wait_time_estimator
+
+
+# Lower rank is called first. Enums are stored by name, so ordering by the
+# raw column would sort alphabetically instead of by urgency.
+PRIORITY_RANK = {
+    TicketPriority.EMERGENCY: 0,
+    TicketPriority.HIGH: 1,
+    TicketPriority.NORMAL: 2,
+}
+
+MAX_CALL_NEXT_BATCH = 20
+
+# Statuses left over at closing time; in-progress tickets are finished by staff
+DAY_CLOSE_STATUSES = (TicketStatus.WAITING, TicketStatus.CALLED)
+
+
+def priority_rank():
+    """
+    SQL expression ranking tickets by urgency (emergency first).
+
+    Returns:
+        ColumnElement: CASE expression usable in ORDER BY.
+    """
+    return case(
+        *[
+            (Ticket.priority == priority, rank)
+            for priority, rank in PRIORITY_RANK.items()
+        ],
+        else_=len(PRIORITY_RANK),
+    )
 
 
 async def get_queue(db: AsyncSession, queue_id: uuid.UUID) -> Optional[Queue]:
@@ -80,9 +122,72 @@ async def create_queue(db: AsyncSession, queue_data: QueueCreate) -> Queue:
     db.add(queue)
     await db.commit()
     await db.refresh(queue)
+    get_queue_state_cache().register_queue(queue.practice_id, queue.id)
     return queue
 
 
+async def get_queue_stats_batch(
+    db: AsyncSession,
+    queue_ids: Optional[list[uuid.UUID]] = None,
+    practice_id: Optional[uuid.UUID] = None,
+) -> list[QueueStatsResponse]:
+    """
+    Get statistics for several queues.
+
+    Counts come from the queue state cache. Only practices missing from the
+    cache are loaded, each with one grouped aggregate over all its queues.
+
+    Args:
+        db: Database session.
+        queue_ids: Queues to include.
+        practice_id: Include all active queues of this practice instead.
+
+    Returns:
+        list[QueueStatsResponse]: Statistics ordered by queue name; unknown
+        queue IDs are omitted.
+    """
+    query = select(
+        Queue.id,
+        Queue.practice_id,
+        Queue.name,
+        Queue.current_number,
+        Queue.average_wait_minutes,
+    )
+    if queue_ids is not None:
+        if not queue_ids:
+            return []
+        query = query.where(Queue.id.in_(queue_ids))
+    if practice_id is not None:
+        query = query.where(Queue.practice_id == practice_id).where(
+            Queue.is_active.is_(True)
+        )
+
+    result = await db.execute(query.order_by(Queue.name))
+    rows = result.all()
+
+    cache = get_queue_state_cache()
+    states = {}
+    for row_practice_id in dict.fromkeys(row.practice_id for row in rows):
+        states[row_practice_id] = await cache.get_practice_state(db, row_practice_id)
+
+    stats = []
+    for row in rows:
+        counts = states[row.practice_id].counts(row.id)
+        stats.append(
+            QueueStatsResponse(
+                queue_id=row.id,
+                queue_name=row.name,
+                waiting_count=counts.waiting,
+                in_progress_count=counts.in_progress,
+                completed_today=counts.completed_today,
+                no_show_today=counts.no_show_today,
+                average_wait_time=row.average_wait_minutes * counts.waiting,
+                current_number=row.current_number,
+            )
+        )
+    return stats
+
+
 async def get_queue_stats(db: AsyncSession, queue_id: uuid.UUID) -> QueueStatsResponse:
     """
     Get statistics for a queue.
@@ -93,52 +198,14 @@ async def get_queue_stats(db: AsyncSession, queue_id: uuid.UUID) -> QueueStatsRe
 
     Returns:
         QueueStatsResponse: Queue statistics.
+
+    Raises:
+        ValueError: If queue not found.
     """
-    queue = await get_queue(db, queue_id)
-    if not queue:
+    stats = await get_queue_stats_batch(db, queue_ids=[queue_id])
+    if not stats:
         raise ValueError("Queue not found")
-
-    today_start = datetime.now(timezone.utc).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-
-    # Count waiting tickets
-    waiting_result = await db.execute(
-        select(func.count(Ticket.id))
-        .where(Ticket.queue_id == queue_id)
-        .where(Ticket.status == TicketStatus.WAITING)
-    )
-    waiting_count = waiting_result.scalar() or 0
-
-    # Count in-progress tickets
-    in_progress_result = await db.execute(
-        select(func.count(Ticket.id))
-        .where(Ticket.queue_id == queue_id)
-        .where(Ticket.status == TicketStatus.IN_PROGRESS)
-    )
-    in_progress_count = in_progress_result.scalar() or 0
-
-    # Count completed today
-    completed_result = await db.execute(
-        select(func.count(Ticket.id))
-        .where(Ticket.queue_id == queue_id)
-        .where(Ticket.status == TicketStatus.COMPLETED)
-        .where(Ticket.completed_at >= today_start)
-    )
-    completed_today = completed_result.scalar() or 0
-
-    # Calculate average wait time
-    average_wait = queue.average_wait_minutes * waiting_count
-
-    return QueueStatsResponse(
-        queue_id=queue.id,
-        queue_name=queue.name,
-        waiting_count=waiting_count,
-        in_progress_count=in_progress_count,
-        completed_today=completed_today,
-        average_wait_time=average_wait,
-        current_number=queue.current_number,
-    )
+    return stats[0]
 
 
 async def get_public_queue_summary(
@@ -179,36 +246,8 @@ async def get_public_queue_summary(
         .order_by(Queue.code)
     )
     queues = list(queues_result.scalars().all())
-    queue_ids = [queue.id for queue in queues]
-
-    waiting_counts: dict[uuid.UUID, int] = {}
-    if queue_ids:
-        waiting_result = await db.execute(
-            select(Ticket.queue_id, func.count(Ticket.id))
-            .where(Ticket.queue_id.in_(queue_ids))
-            .where(Ticket.status == TicketStatus.WAITING)
-            .group_by(Ticket.queue_id)
-        )
-        waiting_counts = {row[0]: row[1] for row in waiting_result.all()}
-
-    now_serving_ticket = None
-    if queue_ids:
-        now_serving_result = await db.execute(
-            select(Ticket.ticket_number)
-            .where(Ticket.queue_id.in_(queue_ids))
-            .where(
-                Ticket.status.in_(
-                    [TicketStatus.CALLED, TicketStatus.IN_PROGRESS]
-                )
-            )
-            .order_by(
-                Ticket.called_at.is_(None),
-                Ticket.called_at.desc(),
-                Ticket.created_at.desc(),
-            )
-            .limit(1)
-        )
-        now_serving_ticket = now_serving_result.scalar_one_or_none()
+
+    state = await get_queue_state_cache().get_practice_state(db, practice.id)
 
     summary_items = [
         PublicQueueSummaryItem(
@@ -217,7 +256,7 @@ async def get_public_queue_summary(
             code=queue.code,
             color=queue.color,
             average_wait_minutes=queue.average_wait_minutes,
-            waiting_count=waiting_counts.get(queue.id, 0),
+            waiting_count=state.counts(queue.id).waiting,
         )
         for queue in queues
     ]
@@ -227,12 +266,61 @@ async def get_public_queue_summary(
         practice_name=practice.name,
         opening_hours=practice.opening_hours,
         average_wait_time_minutes=practice.average_wait_time_minutes,
-        now_serving_ticket=now_serving_ticket,
+        now_serving_ticket=state.now_serving_ticket,
         queues=summary_items,
         generated_at=datetime.now(timezone.utc),
     )
 
 
+def format_ticket_number(queue_code: str, number: int) -> str:
+    """
+    Build the display number for a ticket.
+
+    Args:
+        queue_code: Queue code (e.g., "A").
+        number: Allocated sequence number within the queue.
+
+    Returns:
+        str: Display number (e.g., "A-001").
+    """
+    return f"{queue_code}-{number:03d}"
+
+
+async def allocate_ticket_number(
+    db: AsyncSession, queue_id: uuid.UUID
+) -> Optional[tuple[str, int, int]]:
+    """
+    Atomically reserve the next ticket number of a queue.
+
+    Increments the counter with a single ``UPDATE ... RETURNING`` so that
+    concurrent check-ins never read the same value. The row lock is held
+    until the caller commits, so allocate as late as possible in the
+    transaction (right before inserting the ticket).
+
+    Args:
+        db: Database session.
+        queue_id: Queue UUID.
+
+    Returns:
+        tuple: (queue code, allocated number, average wait minutes) or None
+        if the queue does not exist.
+
+    Security Implications:
+        - Prevents duplicate ticket numbers under concurrent check-ins.
+    """
+    result = await db.execute(
+        update(Queue)
+        .where(Queue.id == queue_id)
+        .values(current_number=Queue.current_number + 1)
+        .returning(Queue.code, Queue.current_number, Queue.average_wait_minutes)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return row[0], row[1], row[2]
+
+
 async def create_ticket(
     db: AsyncSession,
     ticket_data: TicketCreate,
@@ -241,6 +329,8 @@ async def create_ticket(
     """
     Create a new ticket in the queue.
 
+    The ``ticket.created`` outbox event is committed together with the ticket.
+
     Args:
         db: Database session.
         ticket_data: Ticket creation data.
@@ -252,31 +342,36 @@ async def create_ticket(
     Raises:
         ValueError: If queue not found.
     """
-    queue = await get_queue(db, ticket_data.queue_id)
-    if not queue:
-        raise ValueError("Queue not found")
-
-    # Increment queue number
-    queue.current_number += 1
-    ticket_number = f"{queue.code}-{queue.current_number:03d}"
+    # Count before allocating so the counter row lock is held only for the insert
+    waiting_result = await db.execute(
+        select(func.count(Ticket.id))
+        .where(Ticket.queue_id == ticket_data.queue_id)
+        .where(Ticket.status == TicketStatus.WAITING)
+    )
+    waiting_count = waiting_result.scalar() or 0
 
-    # Calculate estimated wait time
-    stats = await get_queue_stats(db, queue.id)
-    estimated_wait = queue.average_wait_minutes * (stats.waiting_count + 1)
+    allocation = await allocate_ticket_number(db, ticket_data.queue_id)
+    if allocation is None:
+        raise ValueError("Queue not found")
+    queue_code, number, average_wait_minutes = allocation
 
     ticket = Ticket(
-        queue_id=queue.id,
-        ticket_number=ticket_number,
+        queue_id=ticket_data.queue_id,
+        ticket_number=format_ticket_number(queue_code, number),
         patient_name=ticket_data.patient_name,
         patient_phone=ticket_data.patient_phone,
         priority=ticket_data.priority,
         notes=ticket_data.notes,
-        estimated_wait_minutes=estimated_wait,
+        estimated_wait_minutes=get_wait_time_estimator().estimate_wait(
+            ticket_data.queue_id, waiting_count + 1, average_wait_minutes
+        ),
         created_by_id=created_by_id,
     )
     db.add(ticket)
+    await enqueue_ticket_event(db, ticket, TICKET_CREATED)
     await db.commit()
     await db.refresh(ticket)
+    get_queue_state_cache().apply_ticket(ticket, None)
     return ticket
 
 
@@ -286,19 +381,32 @@ async def get_tickets_by_queue(
     status: Optional[TicketStatus] = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[Ticket], int]:
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[list[Ticket], Optional[int], Optional[str]]:
     """
     Get tickets for a queue with optional status filter.
 
+    Without a cursor, tickets are ordered by priority then creation time and
+    paged with ``offset``. With a cursor ("" for the first page), tickets
+    are ordered by ``(created_at, id)`` and paged by keyset, which stays
+    fast on deep pages.
+
     Args:
         db: Database session.
         queue_id: Queue UUID.
         status: Optional status filter.
         limit: Maximum number of results.
-        offset: Number of results to skip.
+        offset: Number of results to skip (offset mode only).
+        cursor: Keyset cursor; "" requests the first keyset page.
+        include_total: Run the COUNT query for ``total``.
 
     Returns:
-        tuple: List of tickets and total count.
+        tuple: List of tickets, total count (None if skipped) and the next
+            cursor (None in offset mode or on the last page).
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
     query = select(Ticket).where(Ticket.queue_id == queue_id)
     count_query = select(func.count(Ticket.id)).where(Ticket.queue_id == queue_id)
@@ -307,23 +415,30 @@ async def get_tickets_by_queue(
         query = query.where(Ticket.status == status)
         count_query = count_query.where(Ticket.status == status)
 
-    # Order by priority (emergency first) then by creation time
-    query = (
-        query.order_by(
-            Ticket.priority.desc(),
-            Ticket.created_at.asc(),
+    next_cursor = None
+    if cursor is not None:
+        query = apply_keyset(query, Ticket.created_at, Ticket.id, cursor, limit)
+        result = await db.execute(query)
+        tickets, next_cursor = finish_keyset_page(result.scalars().all(), limit)
+    else:
+        # Order by priority (emergency first) then by creation time
+        query = (
+            query.order_by(
+                priority_rank(),
+                Ticket.created_at.asc(),
+            )
+            .limit(limit)
+            .offset(offset)
         )
-        .limit(limit)
-        .offset(offset)
-    )
+        result = await db.execute(query)
+        tickets = list(result.scalars().all())
 
-    result = await db.execute(query)
-    tickets = list(result.scalars().all())
-
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+    total = None
+    if include_total:
+        count_result = await db.execute(count_query)
+        total = count_result.scalar() or 0
 
-    return tickets, total
+    return tickets, total, next_cursor
 
 
 async def update_ticket_status(
@@ -335,6 +450,9 @@ async def update_ticket_status(
     """
     Update ticket status.
 
+    A status change adds its outbox event to the same commit; WebSocket and
+    MQTT delivery is left to the outbox dispatcher.
+
     Args:
         db: Database session.
         ticket_id: Ticket UUID.
@@ -350,6 +468,7 @@ async def update_ticket_status(
     if not ticket:
         return None
 
+    previous_status = ticket.status
     ticket.status = status
 
     if assigned_to_id:
@@ -360,8 +479,12 @@ async def update_ticket_status(
     elif status == TicketStatus.COMPLETED:
         ticket.completed_at = datetime.now(timezone.utc)
 
+    if status != previous_status:
+        await enqueue_ticket_event(db, ticket, status_event_type(status))
     await db.commit()
     await db.refresh(ticket)
+    get_queue_state_cache().apply_ticket(ticket, previous_status)
+    get_live_wait_sketches().observe_ticket(ticket, previous_status)
     return ticket
 
 
@@ -384,8 +507,82 @@ async def get_ticket_by_number(
     return result.scalar_one_or_none()
 
 
+async def call_next_tickets(
+    db: AsyncSession,
+    queue_id: uuid.UUID,
+    assigned_to_id: Optional[uuid.UUID],
+    count: int = 1,
+) -> list[Ticket]:
+    """
+    Atomically claim the next waiting tickets of a queue.
+
+    Selects the next ``count`` tickets in priority order and marks them
+    CALLED in a single ``WITH ... (SELECT ... FOR UPDATE SKIP LOCKED)
+    UPDATE ... RETURNING``. Concurrent counters skip rows another counter
+    is claiming instead of waiting for it, and the ``status = WAITING``
+    guard keeps the update conditional on databases without row locks
+    (SQLite serializes writers instead).
+
+    Args:
+        db: Database session.
+        queue_id: Queue UUID.
+        assigned_to_id: ID of the user calling the tickets.
+        count: Maximum number of tickets to claim.
+
+    Returns:
+        list[Ticket]: Claimed tickets in call order (empty if queue empty).
+
+    Security Implications:
+        - A ticket is never handed to two counters.
+    """
+    # Materialized so the locking subquery runs exactly once; an inlined
+    # IN (...) may be rescanned per outer row and lock several tickets.
+    next_tickets = (
+        select(Ticket.id)
+        .where(Ticket.queue_id == queue_id)
+        .where(Ticket.status == TicketStatus.WAITING)
+        .order_by(priority_rank(), Ticket.created_at.asc(), Ticket.id.asc())
+        .limit(count)
+        .with_for_update(skip_locked=True)
+        .cte("next_tickets")
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    values = {
+        "status": TicketStatus.CALLED,
+        "called_at": datetime.now(timezone.utc),
+    }
+    if assigned_to_id:
+        values["assigned_to_id"] = assigned_to_id
+
+    result = await db.execute(
+        update(Ticket)
+        .where(Ticket.id == next_tickets.c.id)
+        .where(Ticket.status == TicketStatus.WAITING)
+        .values(**values)
+        .returning(Ticket)
+        .execution_options(synchronize_session="fetch")
+    )
+    tickets = list(result.scalars().all())
+    tickets.sort(
+        key=lambda ticket: (
+            PRIORITY_RANK.get(ticket.priority, len(PRIORITY_RANK)),
+            ticket.created_at,
+        )
+    )
+    for ticket in tickets:
+        await enqueue_ticket_event(db, ticket, TICKET_CALLED)
+    await db.commit()
+
+    cache = get_queue_state_cache()
+    live_sketches = get_live_wait_sketches()
+    for ticket in tickets:
+        cache.apply_ticket(ticket, TicketStatus.WAITING)
+        live_sketches.observe_ticket(ticket, TicketStatus.WAITING)
+    return tickets
+
+
 async def call_next_ticket(
-    db: AsyncSession, queue_id: uuid.UUID, assigned_to_id: uuid.UUID
+    db: AsyncSession, queue_id: uuid.UUID, assigned_to_id: Optional[uuid.UUID]
 ) -> Optional[Ticket]:
     """
     Call the next waiting ticket in a queue.
@@ -398,19 +595,73 @@ async def call_next_ticket(
     Returns:
         Ticket: Called ticket or None if queue empty.
     """
-    # Get next waiting ticket (priority order)
+    tickets = await call_next_tickets(db, queue_id, assigned_to_id, count=1)
+    return tickets[0] if tickets else None
+
+
+async def close_practice_day(
+    db: AsyncSession,
+    practice_id: uuid.UUID,
+    outcome: TicketStatus = TicketStatus.NO_SHOW,
+    reset_counters: bool = True,
+) -> DayCloseResponse:
+    """
+    Close the day for a practice.
+
+    Marks every waiting or called ticket of the practice as ``outcome``
+    with one set-based UPDATE and resets all queue counters with a second
+    one, both in a single transaction.
+
+    Args:
+        db: Database session.
+        practice_id: Practice UUID.
+        outcome: NO_SHOW or CANCELLED.
+        reset_counters: Reset ``current_number`` of all practice queues.
+
+    Returns:
+        DayCloseResponse: Closed tickets per queue.
+
+    Raises:
+        ValueError: If ``outcome`` is not a closing status.
+    """
+    if outcome not in (TicketStatus.NO_SHOW, TicketStatus.CANCELLED):
+        raise ValueError("Ungültiger Abschlussstatus")
+
+    practice_queues = select(Queue.id).where(Queue.practice_id == practice_id)
     result = await db.execute(
-        select(Ticket)
-        .where(Ticket.queue_id == queue_id)
-        .where(Ticket.status == TicketStatus.WAITING)
-        .order_by(Ticket.priority.desc(), Ticket.created_at.asc())
-        .limit(1)
+        update(Ticket)
+        .where(Ticket.queue_id.in_(practice_queues))
+        .where(Ticket.status.in_(DAY_CLOSE_STATUSES))
+        .values(status=outcome)
+        .returning(Ticket.queue_id)
+        .execution_options(synchronize_session=False)
     )
-    ticket = result.scalar_one_or_none()
-
-    if not ticket:
-        return None
+    closed_per_queue: dict[uuid.UUID, int] = {}
+    for queue_id in result.scalars():
+        closed_per_queue[queue_id] = closed_per_queue.get(queue_id, 0) + 1
+
+    counters_reset = 0
+    if reset_counters:
+        reset = await db.execute(
+            update(Queue)
+            .where(Queue.practice_id == practice_id)
+            .values(current_number=0)
+            .execution_options(synchronize_session=False)
+        )
+        counters_reset = reset.rowcount
 
-    return await update_ticket_status(
-        db, ticket.id, TicketStatus.CALLED, assigned_to_id
+    await db.commit()
+    # Counts changed wholesale; reload instead of applying per ticket
+    get_queue_state_cache().invalidate(practice_id)
+
+    return DayCloseResponse(
+        practice_id=practice_id,
+        outcome=outcome,
+        closed_tickets=sum(closed_per_queue.values()),
+        counters_reset=counters_reset,
+        queues=[
+            DayCloseQueueResult(queue_id=queue_id, closed_tickets=closed)
+            for queue_id, closed in closed_per_queue.items()
+        ],
+        closed_at=datetime.now(timezone.utc),
     )
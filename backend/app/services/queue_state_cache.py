@@ -0,0 +1,641 @@
+"""
+In-memory queue state cache.
+
+Keeps per-practice ticket counts (waiting, called, in progress, completed
+today) and the currently served ticket in memory. State is loaded from the
+database once per practice and then maintained incrementally from the ticket
+transitions in ``queue_service``. A background task periodically reconciles
+the cached state against the database to repair drift (e.g. direct SQL).
+
+With several workers, every worker's transitions are shared over the
+WebSocket backplane (``queue_state`` messages, see ``attach_backplane``)
+and applied by the other workers' caches, so counts stay exact across
+processes. Without a backplane (``WS_BACKPLANE=none``), or for messages the
+backplane loses, another worker's changes show up at the next
+reconciliation pass (``QUEUE_CACHE_RECONCILE_SECONDS``); run a backplane
+whenever more than one worker serves requests.
+
+Loads run across ``await``s while transitions keep arriving. Every change is
+stamped with a sequence number per queue and practice, and a load is only
+installed if nothing it covers changed while it ran; otherwise it is retried
+(reads) or skipped until the next pass (reconciliation).
+
+Security:
+    - Holds aggregated counts and display numbers only (no PII).
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import utc_naive
+from app.middleware.observability import (
+    record_queue_cache_drift,
+    record_queue_cache_lookup,
+)
+from app.models.models import Queue, Ticket, TicketStatus
+
+if TYPE_CHECKING:
+    from app.services.ws_backplane import Backplane
+
+logger = logging.getLogger(__name__)
+
+# Backplane message kind of shared cache changes
+BACKPLANE_KIND = "queue_state"
+
+_ACTIVE_STATUSES = (TicketStatus.CALLED, TicketStatus.IN_PROGRESS)
+
+# Loads retried on a read before the state is served without being cached
+_LOAD_ATTEMPTS = 3
+
+
+def _today() -> date:
+    """Current UTC date."""
+    return datetime.now(timezone.utc).date()
+
+
+def _day_start(day: date) -> datetime:
+    """Midnight UTC of ``day``."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def queue_counts_query(today_start: datetime) -> Select:
+    """
+    Build the grouped per-queue ticket count query.
+
+    Returns one row per queue with its display fields and
+    ``COUNT(...) FILTER (WHERE ...)`` columns for waiting, called,
+    in-progress, completed-today and no-show-today tickets. Callers narrow
+    it with ``.where(Queue.id.in_(...))`` or ``.where(Queue.practice_id ==
+    ...)``. The join only pulls open tickets and tickets touched today, so
+    closed history is not scanned.
+
+    Args:
+        today_start: Start of the current day (UTC).
+
+    Returns:
+        Select: Aggregate statement, grouped by queue.
+    """
+    return (
+        select(
+            Queue.id,
+            Queue.practice_id,
+            Queue.name,
+            Queue.current_number,
+            Queue.average_wait_minutes,
+            func.count(Ticket.id)
+            .filter(Ticket.status == TicketStatus.WAITING)
+            .label("waiting"),
+            func.count(Ticket.id)
+            .filter(Ticket.status == TicketStatus.CALLED)
+            .label("called"),
+            func.count(Ticket.id)
+            .filter(Ticket.status == TicketStatus.IN_PROGRESS)
+            .label("in_progress"),
+            func.count(Ticket.id)
+            .filter(
+                and_(
+                    Ticket.status == TicketStatus.COMPLETED,
+                    Ticket.completed_at >= today_start,
+                )
+            )
+            .label("completed_today"),
+            func.count(Ticket.id)
+            .filter(
+                and_(
+                    Ticket.status == TicketStatus.NO_SHOW,
+                    Ticket.created_at >= today_start,
+                )
+            )
+            .label("no_show_today"),
+        )
+        .select_from(Queue)
+        .outerjoin(
+            Ticket,
+            and_(
+                Ticket.queue_id == Queue.id,
+                or_(
+                    Ticket.status.in_(
+                        [
+                            TicketStatus.WAITING,
+                            TicketStatus.CALLED,
+                            TicketStatus.IN_PROGRESS,
+                        ]
+                    ),
+                    Ticket.completed_at >= today_start,
+                    Ticket.created_at >= today_start,
+                ),
+            ),
+        )
+        .group_by(Queue.id)
+    )
+
+
+class QueueCounts:
+    """Ticket counts for a single queue."""
+
+    __slots__ = (
+        "waiting",
+        "called",
+        "in_progress",
+        "completed_today",
+        "no_show_today",
+    )
+
+    def __init__(self) -> None:
+        self.waiting = 0
+        self.called = 0
+        self.in_progress = 0
+        self.completed_today = 0
+        self.no_show_today = 0
+
+    def as_tuple(self) -> tuple[int, int, int, int, int]:
+        """Return counts as a comparable tuple."""
+        return (
+            self.waiting,
+            self.called,
+            self.in_progress,
+            self.completed_today,
+            self.no_show_today,
+        )
+
+
+class PracticeQueueState:
+    """
+    Cached queue state of one practice.
+
+    Attributes:
+        practice_id: Practice UUID.
+        day: UTC date the "today" counters refer to.
+        queues: Counts per queue ID.
+        active: Called/in-progress tickets as
+            ticket_id -> (called_at, created_at, ticket_number).
+    """
+
+    def __init__(self, practice_id: uuid.UUID, day: date) -> None:
+        self.practice_id = practice_id
+        self.day = day
+        self.queues: dict[uuid.UUID, QueueCounts] = {}
+        self.active: dict[
+            uuid.UUID, tuple[Optional[datetime], Optional[datetime], str]
+        ] = {}
+
+    def counts(self, queue_id: uuid.UUID) -> QueueCounts:
+        """Counts for a queue (zero counts if the queue has no tickets)."""
+        return self.queues.get(queue_id) or QueueCounts()
+
+    @property
+    def now_serving_ticket(self) -> Optional[str]:
+        """
+        Most recently called ticket number of the practice.
+
+        Mirrors the SQL ordering ``called_at IS NULL, called_at DESC,
+        created_at DESC``.
+        """
+        if not self.active:
+            return None
+        called_at, created_at, ticket_number = max(
+            self.active.values(),
+            key=lambda item: (
+                item[0] is not None,
+                item[0] or datetime.min,
+                item[1] or datetime.min,
+            ),
+        )
+        return ticket_number
+
+
+class QueueStateCache:
+    """
+    Process-local cache of practice queue state.
+
+    Usage:
+        cache = get_queue_state_cache()
+        state = await cache.get_practice_state(db, practice_id)
+        cache.apply_ticket(ticket, previous_status)  # after commit
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._practices: dict[uuid.UUID, PracticeQueueState] = {}
+        self._queue_practice: dict[uuid.UUID, uuid.UUID] = {}
+        # Load locks of practices being loaded, held only while in use
+        self._load_locks: dict[uuid.UUID, asyncio.Lock] = {}
+        self._load_lock_users: dict[uuid.UUID, int] = {}
+        self._listeners: list[Callable[[Optional[uuid.UUID]], None]] = []
+        # Sequence number of the last change per queue / practice / cache
+        self._seq = 0
+        self._queue_changed: dict[uuid.UUID, int] = {}
+        self._practice_changed: dict[uuid.UUID, int] = {}
+        self._cleared = 0
+        self._backplane: Optional["Backplane"] = None
+        self.hits = 0
+        self.misses = 0
+        self.drift = 0
+
+    def add_listener(self, listener: Callable[[Optional[uuid.UUID]], None]) -> None:
+        """
+        Register a callback run whenever a practice's state changes.
+
+        The callback receives the practice ID, or None if all practices
+        changed (e.g. after ``clear``). Used to invalidate derived caches.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _notify(self, practice_id: Optional[uuid.UUID]) -> None:
+        """Inform listeners about a state change."""
+        for listener in self._listeners:
+            listener(practice_id)
+
+    def attach_backplane(self, backplane: Optional["Backplane"]) -> None:
+        """
+        Share changes with the caches of other workers.
+
+        Local transitions, invalidations and new queues are published as
+        ``queue_state`` messages; the other workers' messages are applied
+        as if they had happened here (without publishing them again).
+
+        Args:
+            backplane: Started backplane, or None to stop sharing.
+        """
+        self._backplane = backplane
+        if backplane is not None:
+            backplane.add_handler(BACKPLANE_KIND, self._received)
+
+    def _share(self, practice_id: Optional[uuid.UUID], message: dict[str, Any]) -> None:
+        """Publish a local change to the other workers."""
+        if self._backplane is not None:
+            self._backplane.publish(
+                str(practice_id) if practice_id else None,
+                None,
+                message,
+                kind=BACKPLANE_KIND,
+            )
+
+    def _received(self, practice_id: Optional[str], message: dict[str, Any]) -> None:
+        """Apply a change published by another worker."""
+        try:
+            practice = uuid.UUID(practice_id) if practice_id else None
+            op = message.get("op")
+            if op == "ticket":
+                ticket = _ticket_from_message(message["ticket"])
+                previous = message.get("previous_status")
+                self._apply_ticket(
+                    ticket, TicketStatus(previous) if previous else None, practice
+                )
+            elif op == "invalidate" and practice is not None:
+                self._invalidate(practice)
+            elif op == "queue" and practice is not None:
+                self._register_queue(practice, uuid.UUID(message["queue_id"]))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Invalid queue state message", extra={"error": str(e)})
+
+    def _changed_since(self, state: PracticeQueueState, seq: int) -> bool:
+        """Whether anything covered by ``state`` changed after ``seq``."""
+        if self._cleared > seq:
+            return True
+        if self._practice_changed.get(state.practice_id, 0) > seq:
+            return True
+        return any(
+            self._queue_changed.get(queue_id, 0) > seq for queue_id in state.queues
+        )
+
+    def clear(self) -> None:
+        """Drop all cached state."""
+        self._seq += 1
+        self._cleared = self._seq
+        self._practices.clear()
+        self._queue_practice.clear()
+        self._notify(None)
+
+    def invalidate(self, practice_id: uuid.UUID) -> None:
+        """Drop cached state of one practice (reloaded on next read)."""
+        self._invalidate(practice_id)
+        self._share(practice_id, {"op": "invalidate"})
+
+    def _invalidate(self, practice_id: uuid.UUID) -> None:
+        self._seq += 1
+        self._practice_changed[practice_id] = self._seq
+        self._practices.pop(practice_id, None)
+        self._notify(practice_id)
+
+    def register_queue(self, practice_id: uuid.UUID, queue_id: uuid.UUID) -> None:
+        """Track a newly created queue of an already cached practice."""
+        self._register_queue(practice_id, queue_id)
+        self._share(practice_id, {"op": "queue", "queue_id": str(queue_id)})
+
+    def _register_queue(self, practice_id: uuid.UUID, queue_id: uuid.UUID) -> None:
+        self._seq += 1
+        self._practice_changed[practice_id] = self._seq
+        state = self._practices.get(practice_id)
+        if state is not None:
+            self._queue_practice[queue_id] = practice_id
+            state.queues.setdefault(queue_id, QueueCounts())
+        self._notify(practice_id)
+
+    async def get_practice_state(
+        self, db: AsyncSession, practice_id: uuid.UUID
+    ) -> PracticeQueueState:
+        """
+        Get cached state for a practice, loading it on a miss.
+
+        Args:
+            db: Database session (used only on a miss).
+            practice_id: Practice UUID.
+
+        Returns:
+            PracticeQueueState: Cached state.
+        """
+        state = self._practices.get(practice_id)
+        if state is not None and state.day == _today():
+            self.hits += 1
+            record_queue_cache_lookup(hit=True)
+            return state
+
+        self.misses += 1
+        record_queue_cache_lookup(hit=False)
+        # One load per practice at a time; other practices load in parallel
+        lock = self._load_locks.get(practice_id)
+        if lock is None:
+            lock = self._load_locks[practice_id] = asyncio.Lock()
+        users = self._load_lock_users
+        users[practice_id] = users.get(practice_id, 0) + 1
+        try:
+            async with lock:
+                state = self._practices.get(practice_id)
+                if state is None or state.day != _today():
+                    for _ in range(_LOAD_ATTEMPTS):
+                        seq = self._seq
+                        state = await self._load(db, practice_id)
+                        if not self._changed_since(state, seq):
+                            self._store(state)
+                            break
+                        # A transition arrived during the load and may be
+                        # missing from it; derived results built meanwhile too.
+                        self._notify(practice_id)
+        finally:
+            self._load_lock_users[practice_id] -= 1
+            if not self._load_lock_users[practice_id]:
+                del self._load_lock_users[practice_id]
+                del self._load_locks[practice_id]
+        return state
+
+    def apply_ticket(
+        self, ticket: Ticket, previous_status: Optional[TicketStatus]
+    ) -> None:
+        """
+        Apply a committed ticket transition to the cached state.
+
+        Args:
+            ticket: Ticket after the change.
+            previous_status: Status before the change, None for new tickets.
+        """
+        practice_id = self._apply_ticket(ticket, previous_status)
+        self._share(
+            practice_id,
+            {
+                "op": "ticket",
+                "ticket": _ticket_message(ticket),
+                "previous_status": previous_status.value if previous_status else None,
+            },
+        )
+
+    def _apply_ticket(
+        self,
+        ticket: Ticket,
+        previous_status: Optional[TicketStatus],
+        practice_hint: Optional[uuid.UUID] = None,
+    ) -> Optional[uuid.UUID]:
+        """
+        Apply a ticket transition; returns the queue's practice if known.
+
+        ``practice_hint`` is the practice named by another worker, used
+        when this cache does not know the queue.
+        """
+        self._seq += 1
+        self._queue_changed[ticket.queue_id] = self._seq
+        practice_id = self._queue_practice.get(ticket.queue_id) or practice_hint
+        state = self._practices.get(practice_id) if practice_id else None
+        if state is None:
+            # Practice not cached; the next read loads fresh state. Derived
+            # caches still drop their copy (all practices if the queue's
+            # practice is unknown).
+            self._notify(practice_id)
+            return practice_id
+
+        counts = state.queues.setdefault(ticket.queue_id, QueueCounts())
+        if previous_status is not None:
+            self._adjust(state, counts, previous_status, ticket, -1)
+        self._adjust(state, counts, ticket.status, ticket, 1)
+
+        if ticket.status in _ACTIVE_STATUSES:
+            state.active[ticket.id] = (
+                utc_naive(ticket.called_at),
+                utc_naive(ticket.created_at),
+                ticket.ticket_number,
+            )
+        else:
+            state.active.pop(ticket.id, None)
+        self._notify(practice_id)
+        return practice_id
+
+    @staticmethod
+    def _adjust(
+        state: PracticeQueueState,
+        counts: QueueCounts,
+        status: TicketStatus,
+        ticket: Ticket,
+        delta: int,
+    ) -> None:
+        """Add ``delta`` to the counter that tracks ``status``."""
+        if status == TicketStatus.WAITING:
+            counts.waiting = max(counts.waiting + delta, 0)
+        elif status == TicketStatus.CALLED:
+            counts.called = max(counts.called + delta, 0)
+        elif status == TicketStatus.IN_PROGRESS:
+            counts.in_progress = max(counts.in_progress + delta, 0)
+        elif status == TicketStatus.COMPLETED:
+            completed_at = utc_naive(ticket.completed_at)
+            if completed_at is not None and completed_at.date() == state.day:
+                counts.completed_today = max(counts.completed_today + delta, 0)
+        elif status == TicketStatus.NO_SHOW:
+            created_at = utc_naive(ticket.created_at)
+            if created_at is not None and created_at.date() == state.day:
+                counts.no_show_today = max(counts.no_show_today + delta, 0)
+
+    async def reconcile(self, session_factory: async_sessionmaker) -> int:
+        """
+        Compare all cached practices against the database and repair drift.
+
+        Args:
+            session_factory: Factory for a dedicated session.
+
+        Returns:
+            int: Number of queues whose cached counts differed.
+        """
+        drifted = 0
+        for practice_id in list(self._practices):
+            seq = self._seq
+            async with session_factory() as db:
+                fresh = await self._load(db, practice_id)
+
+            cached = self._practices.get(practice_id)
+            if cached is None or self._changed_since(fresh, seq):
+                # Transitions applied meanwhile are in the cached state but
+                # maybe not in the load; check again on the next pass.
+                continue
+            practice_drift = 0
+            if cached.day == fresh.day:
+                queue_ids = set(cached.queues) | set(fresh.queues)
+                for queue_id in queue_ids:
+                    if (
+                        cached.counts(queue_id).as_tuple()
+                        != fresh.counts(queue_id).as_tuple()
+                    ):
+                        practice_drift += 1
+            changed = (
+                practice_drift
+                or cached.day != fresh.day
+                or cached.now_serving_ticket != fresh.now_serving_ticket
+            )
+            self._store(fresh)
+            if changed:
+                self._notify(practice_id)
+            drifted += practice_drift
+
+        if drifted:
+            self.drift += drifted
+            record_queue_cache_drift(drifted)
+            logger.warning("Queue state cache drift repaired", extra={"queues": drifted})
+        return drifted
+
+    def _store(self, state: PracticeQueueState) -> None:
+        """Install freshly loaded state."""
+        self._practices[state.practice_id] = state
+        for queue_id in state.queues:
+            self._queue_practice[queue_id] = state.practice_id
+
+    @staticmethod
+    async def _load(db: AsyncSession, practice_id: uuid.UUID) -> PracticeQueueState:
+        """
+        Load the queue state of a practice from the database.
+
+        Args:
+            db: Database session.
+            practice_id: Practice UUID.
+
+        Returns:
+            PracticeQueueState: Fresh state.
+        """
+        day = _today()
+        state = PracticeQueueState(practice_id, day)
+
+        counts_result = await db.execute(
+            queue_counts_query(_day_start(day)).where(
+                Queue.practice_id == practice_id
+            )
+        )
+        for row in counts_result.all():
+            counts = QueueCounts()
+            counts.waiting = row.waiting
+            counts.called = row.called
+            counts.in_progress = row.in_progress
+            counts.completed_today = row.completed_today
+            counts.no_show_today = row.no_show_today
+            state.queues[row.id] = counts
+
+        if not state.queues:
+            return state
+
+        active_result = await db.execute(
+            select(
+                Ticket.id, Ticket.called_at, Ticket.created_at, Ticket.ticket_number
+            )
+            .where(Ticket.queue_id.in_(state.queues.keys()))
+            .where(Ticket.status.in_(_ACTIVE_STATUSES))
+        )
+        for ticket_id, called_at, created_at, ticket_number in active_result.all():
+            state.active[ticket_id] = (
+                utc_naive(called_at),
+                utc_naive(created_at),
+                ticket_number,
+            )
+
+        return state
+
+
+def _ticket_message(ticket: Ticket) -> dict[str, Any]:
+    """Fields of a ticket the caches use, as JSON."""
+
+    def timestamp(value: Optional[datetime]) -> Optional[str]:
+        value = utc_naive(value)
+        return value.isoformat() if value is not None else None
+
+    return {
+        "id": str(ticket.id),
+        "queue_id": str(ticket.queue_id),
+        "status": ticket.status.value,
+        "ticket_number": ticket.ticket_number,
+        "created_at": timestamp(ticket.created_at),
+        "called_at": timestamp(ticket.called_at),
+        "completed_at": timestamp(ticket.completed_at),
+    }
+
+
+def _ticket_from_message(data: dict[str, Any]) -> Ticket:
+    """Transient ticket built from ``_ticket_message`` output."""
+
+    def timestamp(value: Optional[str]) -> Optional[datetime]:
+        return datetime.fromisoformat(value) if value else None
+
+    return Ticket(
+        id=uuid.UUID(data["id"]),
+        queue_id=uuid.UUID(data["queue_id"]),
+        status=TicketStatus(data["status"]),
+        ticket_number=data["ticket_number"],
+        created_at=timestamp(data["created_at"]),
+        called_at=timestamp(data["called_at"]),
+        completed_at=timestamp(data["completed_at"]),
+    )
+
+
+async def run_reconciliation_loop(
+    session_factory: async_sessionmaker, interval_seconds: int
+) -> None:
+    """
+    Periodically reconcile the queue state cache (run as background task).
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        interval_seconds: Seconds between reconciliation passes.
+    """
+    cache = get_queue_state_cache()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await cache.reconcile(session_factory)
+        except Exception as e:
+            logger.warning("Queue state reconciliation failed", extra={"error": str(e)})
+
+
+# Singleton instance
+_queue_state_cache: Optional[QueueStateCache] = None
+
+
+def get_queue_state_cache() -> QueueStateCache:
+    """
+    Get singleton queue state cache.
+
+    Returns:
+        QueueStateCache instance.
+    """
+    global _queue_state_cache
+    if _queue_state_cache is None:
+        _queue_state_cache = QueueStateCache()
+    return _queue_state_cache
@@ -0,0 +1,364 @@
+"""
+Online wait time estimator.
+
+Learns how many minutes each waiting position costs per queue and hour of
+day (UTC) with exponentially weighted moving averages (EWMA). Estimates are
+O(1) dictionary lookups, so ticket creation, wait time broadcasts and LED
+indicators can ask for them on every event.
+
+Signals:
+    - Interval between consecutive calls of a queue (drain rate), divided by
+      the number of tickets called at once.
+    - Service duration of completed tickets (fallback when calls are sparse).
+    - ``WaitTimeLog`` snapshots (average wait / waiting count).
+
+Observations are read from the database, not from the transitions of the
+own process, so every worker sees the calls of all workers. At startup the
+state is rebuilt from a bounded window of recent tickets and logs; a
+background task then reads the rows added since the last pass. Each pass
+merges calls, completions and logs into one stream in time order.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.models.models import Ticket, WaitTimeLog
+
+logger = logging.getLogger(__name__)
+
+# Gaps longer than this are breaks/closing time, not queue throughput
+MAX_CALL_INTERVAL_MINUTES = 120.0
+
+# Rows younger than this are left for the next pass, so transactions that
+# stamped a time before committing are not skipped
+SYNC_LAG_SECONDS = 5.0
+
+# Observation kinds, in the order they are replayed at equal times
+_CALL, _COMPLETION, _LOG = range(3)
+
+# Samples required before an hour-of-day slot is trusted over the queue-wide value
+MIN_SLOT_SAMPLES = 3
+
+# Matches the Queue.average_wait_minutes column default
+DEFAULT_MINUTES_PER_TICKET = 15
+
+
+def _utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class Ewma:
+    """Exponentially weighted moving average with a sample count."""
+
+    __slots__ = ("value", "samples")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.samples = 0
+
+    def update(self, sample: float, alpha: float) -> None:
+        """Fold a new sample into the average."""
+        if self.samples == 0:
+            self.value = sample
+        else:
+            self.value += alpha * (sample - self.value)
+        self.samples += 1
+
+
+class WaitTimeEstimator:
+    """
+    Per-queue, per-hour wait time model.
+
+    Usage:
+        estimator = get_wait_time_estimator()
+        minutes = estimator.estimate_wait(queue_id, positions=3, fallback_minutes=15)
+        await estimator.sync(session_factory)  # periodically
+    """
+
+    def __init__(self, alpha: float = 0.2) -> None:
+        """
+        Initialize an empty estimator.
+
+        Args:
+            alpha: EWMA smoothing factor (0-1, higher reacts faster).
+        """
+        self.alpha = alpha
+        self._slots: dict[tuple[uuid.UUID, int], Ewma] = {}
+        self._queues: dict[uuid.UUID, Ewma] = {}
+        self._service: dict[uuid.UUID, Ewma] = {}
+        self._last_call: dict[uuid.UUID, datetime] = {}
+        self._synced_until: Optional[datetime] = None
+
+    def clear(self) -> None:
+        """Drop all learned state."""
+        self._slots.clear()
+        self._queues.clear()
+        self._service.clear()
+        self._last_call.clear()
+        self._synced_until = None
+
+    def _observe_per_ticket(
+        self, queue_id: uuid.UUID, at: datetime, minutes: float
+    ) -> None:
+        """Record minutes-per-position for a queue at a point in time."""
+        slot = self._slots.get((queue_id, at.hour))
+        if slot is None:
+            slot = self._slots[(queue_id, at.hour)] = Ewma()
+        slot.update(minutes, self.alpha)
+        overall = self._queues.get(queue_id)
+        if overall is None:
+            overall = self._queues[queue_id] = Ewma()
+        overall.update(minutes, self.alpha)
+
+    def observe_call(
+        self, queue_id: uuid.UUID, called_at: datetime, count: int = 1
+    ) -> None:
+        """
+        Record that tickets of a queue were called.
+
+        Args:
+            queue_id: Queue UUID.
+            called_at: Call timestamp.
+            count: Number of tickets called at this moment (batch call).
+        """
+        called_at = _utc(called_at)
+        previous = self._last_call.get(queue_id)
+        if previous is not None and called_at <= previous:
+            return
+        self._last_call[queue_id] = called_at
+        if previous is None:
+            return
+        interval = (called_at - previous).total_seconds() / 60
+        if interval <= MAX_CALL_INTERVAL_MINUTES:
+            self._observe_per_ticket(queue_id, called_at, interval / max(count, 1))
+
+    def observe_completion(
+        self, queue_id: uuid.UUID, called_at: datetime, completed_at: datetime
+    ) -> None:
+        """
+        Record the service duration of a completed ticket.
+
+        Args:
+            queue_id: Queue UUID.
+            called_at: Call timestamp.
+            completed_at: Completion timestamp.
+        """
+        minutes = (_utc(completed_at) - _utc(called_at)).total_seconds() / 60
+        if 0 < minutes <= MAX_CALL_INTERVAL_MINUTES:
+            service = self._service.get(queue_id)
+            if service is None:
+                service = self._service[queue_id] = Ewma()
+            service.update(minutes, self.alpha)
+
+    def observe_wait_log(self, log: WaitTimeLog) -> None:
+        """
+        Record a wait time snapshot.
+
+        Args:
+            log: WaitTimeLog row.
+        """
+        if log.waiting_count > 0 and log.average_wait_minutes > 0:
+            self._observe_per_ticket(
+                log.queue_id,
+                _utc(log.recorded_at),
+                log.average_wait_minutes / log.waiting_count,
+            )
+
+    def minutes_per_ticket(
+        self,
+        queue_id: uuid.UUID,
+        fallback_minutes: float = DEFAULT_MINUTES_PER_TICKET,
+        at: Optional[datetime] = None,
+    ) -> float:
+        """
+        Current minutes-per-position estimate for a queue.
+
+        Prefers the hour-of-day slot, then the queue-wide average, then the
+        service duration, then ``fallback_minutes``.
+
+        Args:
+            queue_id: Queue UUID.
+            fallback_minutes: Value used without any observations.
+            at: Time of interest (default: now).
+
+        Returns:
+            float: Minutes per waiting position.
+        """
+        hour = (at or datetime.now(timezone.utc)).hour
+        slot = self._slots.get((queue_id, hour))
+        if slot is not None and slot.samples >= MIN_SLOT_SAMPLES:
+            return slot.value
+        overall = self._queues.get(queue_id)
+        if overall is not None and overall.samples:
+            return overall.value
+        service = self._service.get(queue_id)
+        if service is not None and service.samples:
+            return service.value
+        return fallback_minutes
+
+    def estimate_wait(
+        self,
+        queue_id: uuid.UUID,
+        positions: int,
+        fallback_minutes: float = DEFAULT_MINUTES_PER_TICKET,
+        at: Optional[datetime] = None,
+    ) -> int:
+        """
+        Estimate the wait in minutes for a given queue position.
+
+        Args:
+            queue_id: Queue UUID.
+            positions: Number of positions until served (1 = next).
+            fallback_minutes: Minutes per position without observations.
+            at: Time of interest (default: now).
+
+        Returns:
+            int: Estimated wait in whole minutes.
+        """
+        per_ticket = self.minutes_per_ticket(queue_id, fallback_minutes, at)
+        return round(per_ticket * max(positions, 0))
+
+    async def rebuild(
+        self, session_factory: async_sessionmaker, window_days: int
+    ) -> int:
+        """
+        Rebuild state from recent tickets and wait time logs.
+
+        Only the last ``window_days`` are read, so startup cost does not
+        grow with the history.
+
+        Args:
+            session_factory: Factory for a dedicated session.
+            window_days: Days of history to replay.
+
+        Returns:
+            int: Number of replayed observations.
+        """
+        self.clear()
+        self._synced_until = datetime.now(timezone.utc) - timedelta(days=window_days)
+        replayed = await self.sync(session_factory)
+        logger.info(
+            "Wait time estimator rebuilt",
+            extra={"observations": replayed, "window_days": window_days},
+        )
+        return replayed
+
+    async def sync(self, session_factory: async_sessionmaker) -> int:
+        """
+        Replay the calls, completions and logs recorded since the last pass.
+
+        Args:
+            session_factory: Factory for a dedicated session.
+
+        Returns:
+            int: Number of replayed observations.
+        """
+        until = datetime.now(timezone.utc) - timedelta(seconds=SYNC_LAG_SECONDS)
+        since = self._synced_until
+        if since is None:
+            since = until - timedelta(days=get_settings().WAIT_ESTIMATOR_WINDOW_DAYS)
+        if until <= since:
+            return 0
+
+        async with session_factory() as db:
+            observations = await self._read_observations(db, since, until)
+        # One stream in time order; at equal times calls come before the
+        # completions and logs they caused
+        observations.sort(key=lambda item: (item[0], item[1]))
+        for at, kind, queue_id, value in observations:
+            if kind == _CALL:
+                self.observe_call(queue_id, at, value)
+            elif kind == _COMPLETION:
+                self.observe_completion(queue_id, value, at)
+            else:
+                self.observe_wait_log(value)
+        self._synced_until = until
+        return len(observations)
+
+    @staticmethod
+    async def _read_observations(
+        db: AsyncSession, since: datetime, until: datetime
+    ) -> list[tuple]:
+        """
+        Read observations in ``(since, until]``.
+
+        Returns:
+            list[tuple]: ``(time, kind, queue_id, value)``; the value is the
+            number of tickets called at that time for ``_CALL``, the call
+            time for ``_COMPLETION`` and the WaitTimeLog row for ``_LOG``.
+        """
+        observations: list[tuple] = []
+
+        calls = await db.execute(
+            select(Ticket.queue_id, Ticket.called_at, func.count())
+            .where(Ticket.called_at > since)
+            .where(Ticket.called_at <= until)
+            .group_by(Ticket.queue_id, Ticket.called_at)
+        )
+        for queue_id, called_at, count in calls.all():
+            observations.append((_utc(called_at), _CALL, queue_id, count))
+
+        completions = await db.execute(
+            select(Ticket.queue_id, Ticket.called_at, Ticket.completed_at)
+            .where(Ticket.completed_at > since)
+            .where(Ticket.completed_at <= until)
+            .where(Ticket.called_at.is_not(None))
+        )
+        for queue_id, called_at, completed_at in completions.all():
+            observations.append((_utc(completed_at), _COMPLETION, queue_id, called_at))
+
+        logs = await db.execute(
+            select(WaitTimeLog)
+            .where(WaitTimeLog.recorded_at > since)
+            .where(WaitTimeLog.recorded_at <= until)
+        )
+        for log in logs.scalars():
+            observations.append((_utc(log.recorded_at), _LOG, log.queue_id, log))
+
+        return observations
+
+
+async def run_estimator_sync_loop(
+    session_factory: async_sessionmaker, interval_seconds: float
+) -> None:
+    """
+    Periodically feed new observations into the estimator (background task).
+
+    Args:
+        session_factory: Factory for dedicated sessions.
+        interval_seconds: Seconds between passes.
+    """
+    estimator = get_wait_time_estimator()
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await estimator.sync(session_factory)
+        except Exception as e:
+            logger.warning("Wait time estimator sync failed", extra={"error": str(e)})
+
+
+# Singleton instance
+_wait_time_estimator: Optional[WaitTimeEstimator] = None
+
+
+def get_wait_time_estimator() -> WaitTimeEstimator:
+    """
+    Get singleton wait time estimator.
+
+    Returns:
+        WaitTimeEstimator instance.
+    """
+    global _wait_time_estimator
+    if _wait_time_estimator is None:
+        _wait_time_estimator = WaitTimeEstimator(get_settings().WAIT_ESTIMATOR_ALPHA)
+    return _wait_time_estimator
@@ -0,0 +1,252 @@
+"""
+WebRTC signaling store for consultation calls.
+
+Offers, answers and ICE candidates are kept per consultation room for
+``WEBRTC_SIGNAL_TTL_SECONDS`` (at most ``WEBRTC_SIGNALS_PER_ROOM`` per room)
+so a peer joining late still gets the offer. Every signal gets the room's
+next sequence number; peers receive signals pushed over ``/ws/events`` on
+the ``consultation:{id}`` topic and ask for ``since_seq`` only after a gap.
+
+Rooms also remember their participants, so sending a signal needs no
+consultation lookup once the room is known. Idle rooms are evicted.
+
+Security:
+    - Only the consultation's patient and doctor may send or receive.
+    - SDP and ICE payloads are never logged.
+"""
+
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.patient_consultation import PatientConsultation
+
+
+@dataclass(slots=True)
+class Signal:
+    """One stored signal."""
+
+    seq: int
+    signal_type: str
+    payload: dict[str, Any]
+    sender_id: uuid.UUID
+    timestamp: datetime
+    stored_at: float
+
+    def as_event(self) -> dict[str, Any]:
+        """
+        Build the WebSocket event data.
+
+        Returns:
+            dict: JSON-serializable signal.
+        """
+        return {
+            "seq": self.seq,
+            "signal_type": self.signal_type,
+            "payload": self.payload,
+            "sender_id": str(self.sender_id),
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+@dataclass(slots=True)
+class SignalRoom:
+    """Signals and participants of one consultation."""
+
+    consultation_id: uuid.UUID
+    practice_id: uuid.UUID
+    patient_id: uuid.UUID
+    doctor_id: Optional[uuid.UUID]
+    seq: int = 0
+    signals: deque[Signal] = field(default_factory=deque)
+    last_active: float = field(default_factory=time.monotonic)
+
+    def is_participant(self, user_id: uuid.UUID) -> bool:
+        """Check whether a user takes part in the consultation."""
+        return user_id == self.patient_id or user_id == self.doctor_id
+
+
+class SignalStore:
+    """
+    Bounded, TTL-evicted signal rooms.
+
+    Usage:
+        store = get_signal_store()
+        room = await store.join(db, consultation_id, user.id)
+        signal = store.add(room, "offer", payload, user.id)
+    """
+
+    def __init__(self, max_per_room: int, ttl_seconds: float) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            max_per_room: Signals kept per room (oldest go first).
+            ttl_seconds: Signal lifetime; rooms idle this long are dropped.
+        """
+        self.max_per_room = max_per_room
+        self.ttl_seconds = ttl_seconds
+        self._rooms: dict[uuid.UUID, SignalRoom] = {}
+        self._last_sweep = time.monotonic()
+
+    async def join(
+        self, db: AsyncSession, consultation_id: uuid.UUID, user_id: uuid.UUID
+    ) -> Optional[SignalRoom]:
+        """
+        Get the room of a consultation, loading its participants on a miss.
+
+        A cached room whose participants do not include the user is reloaded
+        once (the doctor may have been assigned since).
+
+        Args:
+            db: Database session (used only on a miss).
+            consultation_id: Consultation ID.
+            user_id: User asking to take part.
+
+        Returns:
+            Optional[SignalRoom]: Room, or None if the consultation does not
+            exist. Check ``is_participant`` before using it.
+        """
+        self._sweep()
+        room = self._rooms.get(consultation_id)
+        if room is not None and room.is_participant(user_id):
+            room.last_active = time.monotonic()
+            return room
+
+        result = await db.execute(
+            select(
+                PatientConsultation.practice_id,
+                PatientConsultation.patient_id,
+                PatientConsultation.doctor_id,
+            ).where(PatientConsultation.id == consultation_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        room = self._rooms.get(consultation_id)
+        if room is None:
+            room = SignalRoom(consultation_id, *row)
+            self._rooms[consultation_id] = room
+        else:
+            room.practice_id, room.patient_id, room.doctor_id = row
+        return room
+
+    def get(self, consultation_id: uuid.UUID) -> Optional[SignalRoom]:
+        """
+        Get a known room without loading it.
+
+        Args:
+            consultation_id: Consultation ID.
+
+        Returns:
+            Optional[SignalRoom]: Room, or None if not known (or evicted).
+        """
+        return self._rooms.get(consultation_id)
+
+    def add(
+        self,
+        room: SignalRoom,
+        signal_type: str,
+        payload: dict[str, Any],
+        sender_id: uuid.UUID,
+    ) -> Signal:
+        """
+        Store a signal under the room's next sequence number.
+
+        Args:
+            room: Room from ``join``.
+            signal_type: ``offer``, ``answer`` or ``ice-candidate``.
+            payload: Signal payload.
+            sender_id: Sending participant.
+
+        Returns:
+            Signal: Stored signal.
+        """
+        now = time.monotonic()
+        room.seq += 1
+        signal = Signal(
+            seq=room.seq,
+            signal_type=signal_type,
+            payload=payload,
+            sender_id=sender_id,
+            timestamp=datetime.now(timezone.utc),
+            stored_at=now,
+        )
+        room.signals.append(signal)
+        if len(room.signals) > self.max_per_room:
+            room.signals.popleft()
+        room.last_active = now
+        # Re-register a room swept while the caller held it
+        self._rooms.setdefault(room.consultation_id, room)
+        return signal
+
+    def since(self, room: SignalRoom, seq: int = 0) -> list[Signal]:
+        """
+        Live signals after a sequence number, oldest first.
+
+        Args:
+            room: Room from ``join``.
+            seq: Last sequence number the caller has.
+
+        Returns:
+            list[Signal]: Newer signals that have not expired.
+        """
+        self._expire(room, time.monotonic())
+        if seq <= 0:
+            return list(room.signals)
+        return [signal for signal in room.signals if signal.seq > seq]
+
+    def clear(self, consultation_id: uuid.UUID) -> None:
+        """
+        Drop a room (call ended).
+
+        Args:
+            consultation_id: Consultation ID.
+        """
+        self._rooms.pop(consultation_id, None)
+
+    def _expire(self, room: SignalRoom, now: float) -> None:
+        """Drop expired signals; they are ordered by storage time."""
+        signals = room.signals
+        while signals and now - signals[0].stored_at > self.ttl_seconds:
+            signals.popleft()
+
+    def _sweep(self) -> None:
+        """Drop idle rooms, at most once per TTL."""
+        now = time.monotonic()
+        if now - self._last_sweep < self.ttl_seconds:
+            return
+        self._last_sweep = now
+        for key in [
+            key
+            for key, room in self._rooms.items()
+            if now - room.last_active > self.ttl_seconds
+        ]:
+            del self._rooms[key]
+
+
+# Singleton instance
+_signal_store: Optional[SignalStore] = None
+
+
+def get_signal_store() -> SignalStore:
+    """
+    Get singleton signal store.
+
+    Returns:
+        SignalStore instance.
+    """
+    global _signal_store
+    if _signal_store is None:
+        settings = get_settings()
+        _signal_store = SignalStore(
+            settings.WEBRTC_SIGNALS_PER_ROOM, settings.WEBRTC_SIGNAL_TTL_SECONDS
+        )
+    return _signal_store
@@ -0,0 +1,454 @@
+"""
+Cross-worker backplane for WebSocket broadcasts.
+
+Each worker process has its own ``ConnectionManager`` and only sees its own
+sockets. With a backplane, a broadcast is fanned out locally right away and
+published once; every other worker receives it and fans it out to its own
+clients.
+
+Transports:
+    - ``postgres``: ``LISTEN``/``NOTIFY`` on the application database.
+      Envelopes beyond the 8000 byte ``NOTIFY`` limit (SDP offers, day
+      close payloads) are split into chunks notified in one transaction
+      and reassembled by the listeners.
+    - ``mqtt``: the Mosquitto broker used for the IoT devices.
+
+Envelope (JSON):
+    {"o": origin, "s": seq, "p": practice_id, "t": topic, "m": message,
+     "at": publish time, "k": kind}
+
+    ``k`` is only set for worker-internal messages (e.g. ``queue_state``
+    for the queue state caches); they go to the handler registered for the
+    kind instead of the clients.
+
+Ordering and deduplication:
+    Every worker numbers its broadcasts per practice (``s``). Both transports
+    deliver one publisher's messages in publish order (one publishing
+    connection, one MQTT topic, QoS 1), so a receiver keeps the last
+    sequence per (origin, practice) and drops anything not newer: MQTT QoS 1
+    redeliveries and a worker's own echoes never reach clients twice, and a
+    practice's events from one worker never overtake each other. A jump in
+    the sequence means messages were lost and is counted as a gap.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from app.config import Settings
+from app.middleware.observability import record_ws_backplane
+
+
+logger = logging.getLogger(__name__)
+
+# Deliver callback: (practice_id, topic, message) -> None
+Deliver = Callable[[Optional[str], Optional[str], dict[str, Any]], None]
+
+# Handler of worker-internal messages: (practice_id, message) -> None
+Handler = Callable[[Optional[str], dict[str, Any]], None]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7999
+
+# Prefix of a chunk of a larger envelope: "#<id> <index> <count> <part>"
+# (envelopes themselves are JSON objects)
+_CHUNK_MARK = "#"
+
+# Room for the chunk header within NOTIFY_MAX_BYTES
+_CHUNK_HEADER_BYTES = 64
+
+# Incomplete chunked envelopes a listener keeps (oldest dropped first)
+MAX_PENDING_CHUNKED = 100
+
+MQTT_TOPIC = "sanad/backplane/ws"
+
+# Broadcasts waiting to be published while the transport is slow or down
+PUBLISH_QUEUE_SIZE = 10_000
+
+# (origin, practice) streams remembered for deduplication
+MAX_TRACKED_STREAMS = 10_000
+
+
+def _notify_payloads(payload: str) -> list[str]:
+    """
+    Split an envelope into ``NOTIFY`` payloads below the size limit.
+
+    Args:
+        payload: Envelope as JSON text.
+
+    Returns:
+        list[str]: The envelope itself if it fits, else its chunks.
+    """
+    if len(payload.encode()) <= NOTIFY_MAX_BYTES:
+        return [payload]
+    size = NOTIFY_MAX_BYTES - _CHUNK_HEADER_BYTES
+    if not payload.isascii():
+        size //= 4  # up to 4 bytes per character in UTF-8
+    parts = [payload[i : i + size] for i in range(0, len(payload), size)]
+    chunk_id = uuid.uuid4().hex
+    return [
+        f"{_CHUNK_MARK}{chunk_id} {index} {len(parts)} {part}"
+        for index, part in enumerate(parts)
+    ]
+
+
+class BackplaneTransport(ABC):
+    """Carries serialized envelopes between workers."""
+
+    name = "none"
+
+    @abstractmethod
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        """
+        Connect and start receiving.
+
+        Args:
+            on_message: Called with every received envelope (JSON text, or
+                already parsed if the transport decodes JSON itself).
+        """
+
+    @abstractmethod
+    async def publish(self, payload: str) -> None:
+        """
+        Publish one envelope to all workers.
+
+        Args:
+            payload: Envelope as JSON text.
+        """
+
+    async def stop(self) -> None:
+        """Disconnect."""
+
+
+class PostgresTransport(BackplaneTransport):
+    """``LISTEN``/``NOTIFY`` on a dedicated pair of asyncpg connections."""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            dsn: Plain ``postgresql://`` DSN.
+            channel: Notification channel name.
+        """
+        self._dsn = dsn
+        self._channel = channel
+        self._on_message: Optional[Callable[[str], None]] = None
+        self._listen_conn = None
+        self._publish_conn = None
+        self._lost = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+        self._pending: OrderedDict[str, dict[int, str]] = OrderedDict()
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        """Connect, ``LISTEN`` and keep the listener connected."""
+        self._on_message = on_message
+        await self._listen()
+        self._supervisor = asyncio.create_task(self._keep_listening())
+
+    async def publish(self, payload: str) -> None:
+        """
+        ``NOTIFY`` the channel; reconnects after a broken connection.
+
+        Oversized envelopes are notified as chunks in one transaction, so
+        listeners get all of them or none.
+        """
+        import asyncpg
+
+        if self._publish_conn is None or self._publish_conn.is_closed():
+            self._publish_conn = await asyncpg.connect(self._dsn)
+        notify = "SELECT pg_notify($1, $2)"
+        payloads = _notify_payloads(payload)
+        try:
+            if len(payloads) == 1:
+                await self._publish_conn.execute(notify, self._channel, payload)
+            else:
+                async with self._publish_conn.transaction():
+                    for chunk in payloads:
+                        await self._publish_conn.execute(notify, self._channel, chunk)
+        except (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError):
+            await self._publish_conn.close(timeout=1)
+            self._publish_conn = None
+            raise
+
+    async def stop(self) -> None:
+        """Stop listening and close both connections."""
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close(timeout=1)
+
+    async def _listen(self) -> None:
+        """Open the listener connection."""
+        import asyncpg
+
+        self._lost.clear()
+        conn = await asyncpg.connect(self._dsn)
+        conn.add_termination_listener(lambda _conn: self._lost.set())
+        await conn.add_listener(self._channel, self._notified)
+        self._listen_conn = conn
+
+    async def _keep_listening(self) -> None:
+        """Reconnect the listener with backoff when its connection drops."""
+        backoff = 1.0
+        while True:
+            await self._lost.wait()
+            logger.warning("Backplane listener connection lost, reconnecting")
+            while True:
+                await asyncio.sleep(backoff)
+                try:
+                    await self._listen()
+                    backoff = 1.0
+                    break
+                except Exception as e:
+                    logger.warning("Backplane reconnect failed", extra={"error": str(e)})
+                    backoff = min(backoff * 2, 30.0)
+
+    def _notified(self, _conn, _pid: int, _channel: str, payload: str) -> None:
+        """asyncpg notification callback."""
+        if payload.startswith(_CHUNK_MARK):
+            payload = self._reassemble(payload)
+        if payload is not None and self._on_message is not None:
+            self._on_message(payload)
+
+    def _reassemble(self, chunk: str) -> Optional[str]:
+        """
+        Collect one chunk of an oversized envelope.
+
+        Args:
+            chunk: Payload written by ``_notify_payloads``.
+
+        Returns:
+            Optional[str]: The envelope once all its chunks arrived, else None.
+        """
+        try:
+            chunk_id, index, count, part = chunk[len(_CHUNK_MARK) :].split(" ", 3)
+            index, count = int(index), int(count)
+        except ValueError:
+            logger.warning("Invalid backplane chunk")
+            return None
+        parts = self._pending.setdefault(chunk_id, {})
+        parts[index] = part
+        if len(parts) < count:
+            while len(self._pending) > MAX_PENDING_CHUNKED:
+                self._pending.popitem(last=False)
+            return None
+        del self._pending[chunk_id]
+        return "".join(parts[i] for i in range(count))
+
+
+class MQTTTransport(BackplaneTransport):
+    """Publish/subscribe on one broker topic via ``MQTTService``."""
+
+    name = "mqtt"
+
+    def __init__(self, mqtt_service, topic: str = MQTT_TOPIC) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            mqtt_service: Shared ``MQTTService``.
+            topic: Broker topic for envelopes.
+        """
+        self._mqtt = mqtt_service
+        self._topic = topic
+        self._connected_here = False
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        """Connect the MQTT service if needed and subscribe."""
+        if not self._mqtt.is_connected:
+            await self._mqtt.connect()
+            self._connected_here = True
+
+        async def handler(_topic: str, payload: dict) -> None:
+            # MQTTService hands over parsed JSON
+            on_message(payload)
+
+        await self._mqtt.subscribe(self._topic, handler, qos=1)
+
+    async def publish(self, payload: str) -> None:
+        """Publish with QoS 1 (at least once; duplicates are dropped on receipt)."""
+        await self._mqtt.publish(self._topic, json.loads(payload), qos=1)
+
+    async def stop(self) -> None:
+        """Disconnect if this transport opened the connection."""
+        if self._connected_here:
+            await self._mqtt.disconnect()
+
+
+class Backplane:
+    """
+    Ordered, deduplicated broadcast exchange between workers.
+
+    ``publish`` never waits for the transport: envelopes go through a bounded
+    queue drained by one task, which keeps each worker's publish order.
+    """
+
+    def __init__(self, transport: BackplaneTransport, origin: Optional[str] = None) -> None:
+        """
+        Initialize the backplane.
+
+        Args:
+            transport: Transport carrying the envelopes.
+            origin: Unique worker id (random by default).
+        """
+        self.transport = transport
+        self.origin = origin or uuid.uuid4().hex
+        self._deliver: Optional[Deliver] = None
+        self._handlers: dict[str, Handler] = {}
+        self._next_seq: dict[str, int] = {}
+        self._last_seen: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._outgoing: asyncio.Queue[str] = asyncio.Queue(PUBLISH_QUEUE_SIZE)
+        self._publisher: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        """
+        Connect the transport and start publishing.
+
+        Args:
+            deliver: Local fan-out for broadcasts from other workers.
+        """
+        self._deliver = deliver
+        await self.transport.start(self._received)
+        self._publisher = asyncio.create_task(self._publish_loop())
+        logger.info(
+            "WebSocket backplane started",
+            extra={"backend": self.transport.name, "origin": self.origin},
+        )
+
+    async def stop(self) -> None:
+        """Stop publishing and disconnect."""
+        if self._publisher is not None:
+            self._publisher.cancel()
+        await self.transport.stop()
+
+    def add_handler(self, kind: str, handler: Handler) -> None:
+        """
+        Receive the worker-internal messages of one kind.
+
+        Args:
+            kind: Message kind (``publish(..., kind=...)``).
+            handler: Called with practice ID and message of every message
+                of that kind from another worker.
+        """
+        self._handlers[kind] = handler
+
+    def publish(
+        self,
+        practice_id: Optional[str],
+        topic: Optional[str],
+        message: dict[str, Any],
+        kind: Optional[str] = None,
+    ) -> None:
+        """
+        Queue a broadcast for the other workers.
+
+        Args:
+            practice_id: Practice the broadcast belongs to (ordering key).
+            topic: Topic for topic broadcasts, None for practice broadcasts.
+            message: Message payload.
+            kind: Kind of a worker-internal message (not sent to clients).
+        """
+        key = practice_id or ""
+        seq = self._next_seq.get(key, 0) + 1
+        self._next_seq[key] = seq
+        envelope = {
+            "o": self.origin,
+            "s": seq,
+            "p": practice_id,
+            "t": topic,
+            "m": message,
+            "at": time.time(),
+        }
+        if kind is not None:
+            envelope["k"] = kind
+        try:
+            self._outgoing.put_nowait(json.dumps(envelope, default=str))
+        except asyncio.QueueFull:
+            record_ws_backplane(self.transport.name, "failed")
+            logger.warning("Backplane publish queue full, broadcast not shared")
+
+    async def _publish_loop(self) -> None:
+        """Publish queued envelopes one by one, in order."""
+        while True:
+            payload = await self._outgoing.get()
+            try:
+                await self.transport.publish(payload)
+                record_ws_backplane(self.transport.name, "published")
+            except Exception as e:
+                record_ws_backplane(self.transport.name, "failed")
+                logger.warning("Backplane publish failed", extra={"error": str(e)})
+
+    def _received(self, envelope: str | dict[str, Any]) -> None:
+        """Deduplicate, order-check and fan out one envelope."""
+        if isinstance(envelope, str):
+            try:
+                envelope = json.loads(envelope)
+            except json.JSONDecodeError:
+                logger.warning("Invalid backplane payload")
+                return
+        origin = envelope.get("o")
+        if origin == self.origin:
+            return
+
+        stream = (origin, envelope.get("p") or "")
+        seq = envelope.get("s", 0)
+        last = self._last_seen.get(stream)
+        if last is not None and seq <= last:
+            record_ws_backplane(self.transport.name, "duplicate")
+            return
+        if last is not None and seq > last + 1:
+            record_ws_backplane(self.transport.name, "gap")
+            logger.warning(
+                "Backplane messages lost",
+                extra={"origin": origin, "practice_id": stream[1], "missing": seq - last - 1},
+            )
+        self._last_seen[stream] = seq
+        self._last_seen.move_to_end(stream)
+        if len(self._last_seen) > MAX_TRACKED_STREAMS:
+            self._last_seen.popitem(last=False)
+
+        record_ws_backplane(
+            self.transport.name, "received", max(time.time() - envelope.get("at", 0), 0.0)
+        )
+        kind = envelope.get("k")
+        if kind is not None:
+            handler = self._handlers.get(kind)
+            if handler is not None:
+                handler(envelope.get("p"), envelope.get("m") or {})
+        elif self._deliver is not None:
+            self._deliver(envelope.get("p"), envelope.get("t"), envelope.get("m") or {})
+
+
+def create_backplane(settings: Settings) -> Optional[Backplane]:
+    """
+    Build the backplane configured by ``WS_BACKPLANE``.
+
+    Args:
+        settings: Application settings.
+
+    Returns:
+        Optional[Backplane]: Backplane, or None for single-process setups.
+
+    Raises:
+        ValueError: If ``postgres`` is configured without a Postgres database.
+    """
+    if settings.WS_BACKPLANE == "postgres":
+        url = settings.async_database_url
+        if not url.startswith("postgresql+asyncpg://"):
+            raise ValueError("WS_BACKPLANE=postgres benötigt eine PostgreSQL-Datenbank")
+        dsn = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        return Backplane(PostgresTransport(dsn, settings.WS_BACKPLANE_CHANNEL))
+    if settings.WS_BACKPLANE == "mqtt":
+        from app.services.mqtt_service import get_mqtt_service
+
+        return Backplane(MQTTTransport(get_mqtt_service()))
+    return None
@@ -0,0 +1,253 @@
+"""
+Initial state for WebSocket topic subscriptions.
+
+A client subscribing to ``queue:{id}``, ``ticket:{number}`` or
+``wait_times`` gets the topic's current state right away instead of loading
+it over REST. States are kept serialized per practice:
+
+    - ``queue:`` and ``wait_times`` are derived from the public summary of
+      ``PublicSummaryCache`` and rebuilt only when its ETag changes.
+    - ``ticket:`` entries are written through from the ticket events the
+      connection manager broadcasts (local and from the backplane); an open
+      ticket not seen since startup is loaded once. Numbers restart every
+      day, so only open (waiting, called, in progress) tickets are looked up,
+      and numbers without one are remembered as misses for a few seconds.
+
+Security:
+    - Public, PII-free data only (same fields as the public summary and
+      ticket events).
+"""
+
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import Queue, Ticket, TicketStatus
+from app.services.outbox import ticket_event_data
+from app.services.public_summary_cache import PublicSummaryCache, get_public_summary_cache
+from app.services.wait_time_estimator import get_wait_time_estimator
+
+logger = logging.getLogger(__name__)
+
+# Ticket states remembered across all practices
+MAX_TICKETS = 20_000
+
+# Seconds a ticket number without an open ticket is not looked up again
+TICKET_MISS_TTL_SECONDS = 5.0
+
+# Tickets whose state a ``ticket:`` subscription can start from
+OPEN_STATUSES = (TicketStatus.WAITING, TicketStatus.CALLED, TicketStatus.IN_PROGRESS)
+
+
+def is_snapshot_topic(topic: str) -> bool:
+    """
+    Check whether a topic has an initial state.
+
+    Args:
+        topic: Subscription topic.
+
+    Returns:
+        bool: True for ``queue:``, ``ticket:`` and ``wait_times``.
+    """
+    return topic == "wait_times" or topic.startswith(("queue:", "ticket:"))
+
+
+def _dumps(value: Any) -> str:
+    """Encode a state as compact JSON text."""
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+@dataclass(frozen=True)
+class SummaryStates:
+    """Topic states derived from one version of a practice summary."""
+
+    etag: str
+    queues: dict[str, str]
+    wait_times: str
+
+
+class TopicSnapshotCache:
+    """
+    Serialized topic states per practice.
+
+    Usage:
+        cache = get_topic_snapshot_cache()
+        states = await cache.get(db, practice_id, ["queue:abc", "wait_times"])
+    """
+
+    def __init__(self, summary_cache: PublicSummaryCache, max_tickets: int = MAX_TICKETS) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            summary_cache: Source of the practice summaries.
+            max_tickets: Ticket states kept (least recently updated go first).
+        """
+        self._summary_cache = summary_cache
+        self._max_tickets = max_tickets
+        self._summaries: dict[uuid.UUID, SummaryStates] = {}
+        # (practice_id, ticket_number) -> serialized public ticket data
+        self._tickets: OrderedDict[tuple[str, str], str] = OrderedDict()
+        # (practice_id, ticket_number) -> monotonic expiry of a failed lookup
+        self._misses: OrderedDict[tuple[str, str], float] = OrderedDict()
+
+    def remember_ticket(self, practice_id: str, ticket_data: dict[str, Any]) -> None:
+        """
+        Store the latest state of a ticket from a ticket event.
+
+        Args:
+            practice_id: Practice of the event.
+            ticket_data: Public ticket data as broadcast.
+        """
+        number = ticket_data.get("ticket_number")
+        if not number:
+            return
+        key = (str(practice_id), str(number).upper())
+        self._tickets[key] = _dumps(ticket_data)
+        self._tickets.move_to_end(key)
+        self._misses.pop(key, None)
+        if len(self._tickets) > self._max_tickets:
+            self._tickets.popitem(last=False)
+
+    def forget_tickets(self, practice_id: str) -> None:
+        """
+        Drop the ticket states of a practice (end of day).
+
+        Args:
+            practice_id: Practice ID.
+        """
+        practice_key = str(practice_id)
+        for key in [key for key in self._tickets if key[0] == practice_key]:
+            del self._tickets[key]
+        for key in [key for key in self._misses if key[0] == practice_key]:
+            del self._misses[key]
+
+    async def get(
+        self, db: AsyncSession, practice_id: uuid.UUID, topics: list[str]
+    ) -> dict[str, str]:
+        """
+        Get the serialized state of each topic.
+
+        Touches the database only on a summary cache miss or for a ticket
+        not seen since startup.
+
+        Args:
+            db: Database session (used only on a miss).
+            practice_id: Practice UUID.
+            topics: Subscribed topics; topics without a state are skipped.
+
+        Returns:
+            dict[str, str]: Topic -> JSON state, for topics with a state.
+
+        Raises:
+            ValueError: If the practice does not exist or is inactive.
+        """
+        states: dict[str, str] = {}
+        summary: Optional[SummaryStates] = None
+        for topic in topics:
+            if topic == "wait_times" or topic.startswith("queue:"):
+                if summary is None:
+                    summary = await self._summary_states(db, practice_id)
+                if topic == "wait_times":
+                    states[topic] = summary.wait_times
+                elif topic[6:] in summary.queues:
+                    states[topic] = summary.queues[topic[6:]]
+            elif topic.startswith("ticket:"):
+                ticket = await self._ticket_state(db, practice_id, topic[7:])
+                if ticket is not None:
+                    states[topic] = ticket
+        return states
+
+    async def _summary_states(
+        self, db: AsyncSession, practice_id: uuid.UUID
+    ) -> SummaryStates:
+        """Queue and wait time states of the current summary version."""
+        entry = await self._summary_cache.get(db, practice_id)
+        cached = self._summaries.get(practice_id)
+        if cached is not None and cached.etag == entry.etag:
+            return cached
+
+        summary = json.loads(entry.body)
+        estimator = get_wait_time_estimator()
+        queues: dict[str, str] = {}
+        wait_times = []
+        for item in summary["queues"]:
+            queues[item["queue_id"]] = _dumps(
+                {**item, "now_serving_ticket": summary["now_serving_ticket"]}
+            )
+            wait_times.append(
+                {
+                    "queue_id": item["queue_id"],
+                    "waiting_count": item["waiting_count"],
+                    "estimated_wait_minutes": estimator.estimate_wait(
+                        uuid.UUID(item["queue_id"]), item["waiting_count"]
+                    ),
+                }
+            )
+        cached = SummaryStates(
+            etag=entry.etag, queues=queues, wait_times=_dumps({"queues": wait_times})
+        )
+        self._summaries[practice_id] = cached
+        return cached
+
+    async def _ticket_state(
+        self, db: AsyncSession, practice_id: uuid.UUID, ticket_number: str
+    ) -> Optional[str]:
+        """Ticket state from events, loaded once if not seen yet."""
+        key = (str(practice_id), ticket_number.upper())
+        state = self._tickets.get(key)
+        if state is not None:
+            return state
+        now = time.monotonic()
+        expires = self._misses.get(key)
+        if expires is not None:
+            if expires > now:
+                return None
+            del self._misses[key]
+
+        # Numbers restart every day: closed tickets are earlier days' ones
+        result = await db.execute(
+            select(Ticket)
+            .join(Queue, Queue.id == Ticket.queue_id)
+            .where(Ticket.ticket_number == key[1])
+            .where(Queue.practice_id == practice_id)
+            .where(Ticket.status.in_(OPEN_STATUSES))
+            .order_by(Ticket.created_at.desc())
+            .limit(1)
+        )
+        ticket = result.scalars().first()
+        if ticket is None:
+            if key not in self._tickets:
+                self._misses[key] = now + TICKET_MISS_TTL_SECONDS
+                self._misses.move_to_end(key)
+                if len(self._misses) > self._max_tickets:
+                    self._misses.popitem(last=False)
+            return self._tickets.get(key)
+        # An event may have arrived while loading; it is newer
+        if key not in self._tickets:
+            self.remember_ticket(key[0], ticket_event_data(ticket))
+        return self._tickets.get(key)
+
+
+# Singleton instance
+_topic_snapshot_cache: Optional[TopicSnapshotCache] = None
+
+
+def get_topic_snapshot_cache() -> TopicSnapshotCache:
+    """
+    Get singleton topic snapshot cache.
+
+    Returns:
+        TopicSnapshotCache instance.
+    """
+    global _topic_snapshot_cache
+    if _topic_snapshot_cache is None:
+        _topic_snapshot_cache = TopicSnapshotCache(get_public_summary_cache())
+    return _topic_snapshot_cache
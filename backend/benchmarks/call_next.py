@@ -0,0 +1,154 @@
+"""
+Benchmark: several counters draining one queue with "call next".
+
+Seeds a queue with N waiting tickets (mixed priorities) and lets C counters
+call tickets concurrently until the queue is empty. Reports throughput and
+whether any ticket was handed to more than one counter.
+
+Modes:
+    legacy  - the previous SELECT + ``update_ticket_status`` path.
+    atomic  - ``queue_service.call_next_ticket`` (UPDATE ... SKIP LOCKED).
+    batch   - ``queue_service.call_next_tickets`` claiming --batch-size at once.
+
+Usage:
+    python backend/benchmarks/call_next.py [--tickets 500] [--counters 10] [--mode all]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from _common import Stopwatch, create_bench_engine, percentile
+from sqlalchemy import select
+
+from app.models.models import Practice, Queue, Ticket, TicketPriority, TicketStatus
+from app.services.queue_service import (
+    call_next_ticket,
+    call_next_tickets,
+    update_ticket_status,
+)
+
+
+async def _legacy_call_next(session, queue_id: uuid.UUID) -> list[Ticket]:
+    """Replica of the pre-SKIP LOCKED call-next path (for comparison only)."""
+    result = await session.execute(
+        select(Ticket)
+        .where(Ticket.queue_id == queue_id)
+        .where(Ticket.status == TicketStatus.WAITING)
+        .order_by(Ticket.priority.desc(), Ticket.created_at.asc())
+        .limit(1)
+    )
+    ticket = result.scalar_one_or_none()
+    if not ticket:
+        return []
+    return [await update_ticket_status(session, ticket.id, TicketStatus.CALLED)]
+
+
+async def _seed(factory, tickets: int) -> uuid.UUID:
+    """Create a queue with ``tickets`` waiting tickets."""
+    rng = random.Random(42)
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queue = Queue(
+            practice_id=practice.id, name="Allgemein", code="A", current_number=tickets
+        )
+        session.add(queue)
+        await session.flush()
+        session.add_all(
+            Ticket(
+                queue_id=queue.id,
+                ticket_number=f"A-{i + 1:03d}",
+                priority=rng.choices(
+                    list(TicketPriority), weights=[90, 8, 2]
+                )[0],
+                created_at=start + timedelta(seconds=i),
+            )
+            for i in range(tickets)
+        )
+        await session.commit()
+        return queue.id
+
+
+async def run(mode: str, tickets: int, counters: int, batch_size: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    engine, factory = await create_bench_engine()
+    queue_id = await _seed(factory, tickets)
+
+    latencies: list[float] = []
+    errors: Counter = Counter()
+    claimed: list[uuid.UUID] = []
+
+    async def counter() -> None:
+        empty_polls = 0
+        while empty_polls < 2:
+            started = time.perf_counter()
+            try:
+                async with factory() as session:
+                    if mode == "legacy":
+                        batch = await _legacy_call_next(session, queue_id)
+                    elif mode == "atomic":
+                        ticket = await call_next_ticket(session, queue_id, None)
+                        batch = [ticket] if ticket else []
+                    else:
+                        batch = await call_next_tickets(
+                            session, queue_id, None, batch_size
+                        )
+            except Exception as exc:  # noqa: BLE001 - benchmark records failures
+                errors[type(exc).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            # SKIP LOCKED may return nothing while others hold the last rows
+            empty_polls = 0 if batch else empty_polls + 1
+            claimed.extend(ticket.id for ticket in batch)
+
+    with Stopwatch() as watch:
+        await asyncio.gather(*[counter() for _ in range(counters)])
+
+    double_claims = sum(count - 1 for count in Counter(claimed).values() if count > 1)
+
+    await engine.dispose()
+
+    return {
+        "mode": mode,
+        "tickets": tickets,
+        "counters": counters,
+        "batch_size": batch_size if mode == "batch" else 1,
+        "claimed": len(claimed),
+        "unique_claimed": len(set(claimed)),
+        "double_claims": double_claims,
+        "errors": dict(errors),
+        "seconds": round(watch.elapsed, 3),
+        "tickets_per_second": round(len(set(claimed)) / watch.elapsed, 1),
+        "call_latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "call_latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--counters", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument(
+        "--mode", choices=["legacy", "atomic", "batch", "all"], default="all"
+    )
+    args = parser.parse_args()
+
+    modes = ["legacy", "atomic", "batch"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        result = await run(mode, args.tickets, args.counters, args.batch_size)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+Benchmark: closing the day for a practice.
+
+Seeds Q queues with N leftover waiting/called tickets on top of a closed
+history and closes the day. Reports wall time, SQL statements and realtime
+events emitted.
+
+Modes:
+    legacy  - one ``update_ticket_status`` (and one event) per ticket, then
+              ``reset_queue_counter`` per queue, as staff did it before.
+    bulk    - ``queue_service.close_practice_day`` (two set-based UPDATEs,
+              one transaction, one aggregated event).
+
+Usage:
+    python backend/benchmarks/day_close.py [--tickets 5000] [--queues 4] [--history 50000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from _common import Stopwatch, create_bench_engine
+from sqlalchemy import event, func, insert, select
+
+from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.services.queue_service import close_practice_day, update_ticket_status
+
+
+async def _legacy_close(factory, practice_id: uuid.UUID) -> int:
+    """Replica of the per-ticket closing workflow (for comparison only)."""
+    events = 0
+    async with factory() as session:
+        leftover = (
+            await session.execute(
+                select(Ticket.id)
+                .join(Queue)
+                .where(Queue.practice_id == practice_id)
+                .where(Ticket.status.in_([TicketStatus.WAITING, TicketStatus.CALLED]))
+            )
+        ).scalars().all()
+        for ticket_id in leftover:
+            await update_ticket_status(session, ticket_id, TicketStatus.NO_SHOW)
+            events += 1
+        queues = (
+            await session.execute(select(Queue).where(Queue.practice_id == practice_id))
+        ).scalars().all()
+        for queue in queues:
+            queue.current_number = 0
+            await session.commit()
+    return events
+
+
+async def _seed(engine, factory, tickets: int, queues: int, history: int) -> uuid.UUID:
+    """Create a practice with leftover tickets and closed history."""
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queue_rows = [
+            Queue(practice_id=practice.id, name=f"Queue {i}", code=chr(65 + i))
+            for i in range(queues)
+        ]
+        session.add_all(queue_rows)
+        await session.commit()
+        practice_id = practice.id
+        queue_ids = [queue.id for queue in queue_rows]
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "queue_id": rng.choice(queue_ids),
+            "ticket_number": f"X-{i % 1000:03d}",
+            "status": TicketStatus.COMPLETED,
+            "created_at": now - timedelta(minutes=rng.randint(600, 90 * 1440)),
+        }
+        for i in range(history)
+    ] + [
+        {
+            "id": uuid.uuid4(),
+            "queue_id": rng.choice(queue_ids),
+            "ticket_number": f"A-{i % 1000:03d}",
+            "status": rng.choice([TicketStatus.WAITING, TicketStatus.CALLED]),
+            "created_at": now - timedelta(minutes=rng.randint(1, 480)),
+        }
+        for i in range(tickets)
+    ]
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), 10_000):
+            await conn.execute(insert(Ticket), rows[start:start + 10_000])
+    return practice_id
+
+
+async def run(mode: str, tickets: int, queues: int, history: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    engine, factory = await create_bench_engine()
+    practice_id = await _seed(engine, factory, tickets, queues, history)
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    with Stopwatch() as watch:
+        if mode == "legacy":
+            events = await _legacy_close(factory, practice_id)
+        else:
+            async with factory() as session:
+                await close_practice_day(session, practice_id)
+            events = 1
+
+    async with factory() as session:
+        leftover = await session.scalar(
+            select(func.count(Ticket.id)).where(
+                Ticket.status.in_([TicketStatus.WAITING, TicketStatus.CALLED])
+            )
+        )
+    await engine.dispose()
+
+    return {
+        "mode": mode,
+        "tickets": tickets,
+        "queues": queues,
+        "history": history,
+        "leftover_after": leftover,
+        "sql_statements": statements,
+        "events": events,
+        "milliseconds": round(watch.elapsed * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--queues", type=int, default=4)
+    parser.add_argument("--history", type=int, default=50_000)
+    parser.add_argument("--mode", choices=["legacy", "bulk", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["legacy", "bulk"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run(mode, args.tickets, args.queues, args.history)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""
+Benchmark: check-in request latency with side effects inline vs. outbox.
+
+Runs N check-ins (C concurrent) on one queue. Each check-in has the side
+effects of an NFC tap: WebSocket broadcast, MQTT publish, patient push,
+staff push and LED wayfinding. External services are simulated with a
+fixed delay per channel (``--push-ms``, ``--led-ms``) so the numbers do not
+depend on FCM or a WLED controller being reachable.
+
+Modes:
+    inline  - commit, then await every side effect in the request (the
+              previous ``nfc_check_in`` shape).
+    outbox  - ``enqueue_ticket_event`` + one commit in the request; an
+              ``OutboxDispatcher`` drains the table concurrently. Reports
+              dispatcher lag (commit -> delivered) and throughput as well.
+
+Usage:
+    python backend/benchmarks/outbox_dispatch.py [--checkins 500] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from _common import Stopwatch, create_bench_engine, percentile
+from sqlalchemy import func, select
+
+from app.models.models import OutboxEvent, Practice, Queue, Ticket
+from app.services.outbox import (
+    TICKET_CREATED,
+    OutboxChannel,
+    OutboxDispatcher,
+    enqueue_ticket_event,
+)
+from app.services.queue_service import allocate_ticket_number, format_ticket_number
+
+CHANNELS = [
+    OutboxChannel.WEBSOCKET,
+    OutboxChannel.MQTT,
+    OutboxChannel.PATIENT_PUSH,
+    OutboxChannel.STAFF_PUSH,
+    OutboxChannel.LED,
+]
+
+
+def _channel_delays(push_ms: float, led_ms: float) -> dict[str, float]:
+    """Simulated latency of each external service in seconds."""
+    return {
+        OutboxChannel.WEBSOCKET: 0.0005,
+        OutboxChannel.MQTT: 0.002,
+        OutboxChannel.PATIENT_PUSH: push_ms / 1000,
+        OutboxChannel.STAFF_PUSH: push_ms / 1000,
+        OutboxChannel.LED: led_ms / 1000,
+    }
+
+
+async def _check_in(session, queue_id: uuid.UUID, use_outbox: bool, delays) -> None:
+    """One check-in request: allocate, insert, side effects."""
+    queue_code, number, _ = await allocate_ticket_number(session, queue_id)
+    ticket = Ticket(queue_id=queue_id, ticket_number=format_ticket_number(queue_code, number))
+    session.add(ticket)
+    if use_outbox:
+        await enqueue_ticket_event(
+            session,
+            ticket,
+            TICKET_CREATED,
+            CHANNELS,
+            patient_user_id=str(uuid.uuid4()),
+            wayfinding_route_id=str(uuid.uuid4()),
+        )
+        await session.commit()
+        return
+
+    await session.commit()
+    for channel in CHANNELS:
+        await asyncio.sleep(delays[channel])
+
+
+def _simulated_dispatcher(delays, delivered: list[float]) -> OutboxDispatcher:
+    """Dispatcher whose channels sleep instead of calling external services."""
+    dispatcher = OutboxDispatcher(batch_size=100)
+
+    def handler(channel: str):
+        async def send(_factory, _event_type, _practice_id, _payload) -> None:
+            await asyncio.sleep(delays[channel])
+            if channel == CHANNELS[-1]:
+                delivered.append(time.perf_counter())
+
+        return send
+
+    dispatcher.handlers = {channel: handler(channel) for channel in CHANNELS}
+    return dispatcher
+
+
+async def run(mode: str, checkins: int, concurrency: int, delays) -> dict:
+    """Run one benchmark mode and return its result record."""
+    engine, factory = await create_bench_engine()
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queue = Queue(practice_id=practice.id, name="Allgemein", code="A")
+        session.add(queue)
+        await session.commit()
+        queue_id = queue.id
+
+    use_outbox = mode == "outbox"
+    latencies: list[float] = []
+    committed: list[float] = []
+    delivered: list[float] = []
+    slots = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async def request() -> None:
+        async with slots:
+            started = time.perf_counter()
+            async with factory() as session:
+                await _check_in(session, queue_id, use_outbox, delays)
+            finished = time.perf_counter()
+            latencies.append(finished - started)
+            committed.append(finished)
+
+    async def drain(dispatcher: OutboxDispatcher) -> None:
+        while True:
+            if not await dispatcher.dispatch_batch(factory):
+                if done.is_set():
+                    return
+                await asyncio.sleep(0.01)
+
+    with Stopwatch() as watch:
+        drainer = None
+        if use_outbox:
+            drainer = asyncio.create_task(drain(_simulated_dispatcher(delays, delivered)))
+        await asyncio.gather(*[request() for _ in range(checkins)])
+        requests_seconds = time.perf_counter() - watch.start
+        done.set()
+        if drainer:
+            await drainer
+
+    async with factory() as session:
+        pending = await session.scalar(select(func.count(OutboxEvent.id)))
+    await engine.dispose()
+
+    record = {
+        "mode": mode,
+        "checkins": checkins,
+        "concurrency": concurrency,
+        "request_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "request_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "requests_per_second": round(checkins / requests_seconds, 1),
+    }
+    if use_outbox:
+        # Lag is approximated per rank: n-th commit vs. n-th delivery
+        lags = [d - c for c, d in zip(sorted(committed), sorted(delivered))]
+        record.update(
+            {
+                "dispatch_lag_p50_ms": round(percentile(lags, 50) * 1000, 2),
+                "dispatch_lag_p99_ms": round(percentile(lags, 99) * 1000, 2),
+                "events_per_second": round(len(delivered) / watch.elapsed, 1),
+                "outbox_pending_after": pending,
+            }
+        )
+    return record
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checkins", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--push-ms", type=float, default=80.0)
+    parser.add_argument("--led-ms", type=float, default=40.0)
+    parser.add_argument("--mode", choices=["inline", "outbox", "all"], default="all")
+    args = parser.parse_args()
+
+    delays = _channel_delays(args.push_ms, args.led_ms)
+    modes = ["inline", "outbox"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run(mode, args.checkins, args.concurrency, delays)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
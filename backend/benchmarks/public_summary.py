@@ -0,0 +1,200 @@
+"""
+Benchmark: waiting-room displays polling the public queue summary.
+
+Simulates D displays that each poll ``/queue/public/summary`` once per poll
+interval while a few ticket events happen between polls. Counts the SQL
+statements issued by the polls and reports them as DB queries per second
+of simulated time.
+
+Modes:
+    legacy    - the previous 4-query ``get_public_queue_summary`` per poll.
+    uncached  - the endpoint with the response cache disabled.
+    cached    - the endpoint with the response cache and If-None-Match.
+
+Usage:
+    python backend/benchmarks/public_summary.py [--displays 500] [--rounds 12]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Optional
+
+from _common import Stopwatch, create_bench_engine, percentile
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, func, select
+
+from app.database import get_db
+from app.main import app
+from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.schemas.schemas import TicketCreate
+from app.services.public_summary_cache import get_public_summary_cache
+from app.services.queue_service import call_next_ticket, create_ticket
+from app.services.queue_state_cache import get_queue_state_cache
+
+
+async def _legacy_summary(session, practice_id: uuid.UUID) -> None:
+    """Replica of the pre-cache summary queries (for comparison only)."""
+    practice = (
+        await session.execute(select(Practice).where(Practice.id == practice_id))
+    ).scalar_one()
+    queues = list(
+        (
+            await session.execute(
+                select(Queue)
+                .where(Queue.practice_id == practice.id)
+                .where(Queue.is_active.is_(True))
+            )
+        ).scalars()
+    )
+    queue_ids = [queue.id for queue in queues]
+    await session.execute(
+        select(Ticket.queue_id, func.count(Ticket.id))
+        .where(Ticket.queue_id.in_(queue_ids))
+        .where(Ticket.status == TicketStatus.WAITING)
+        .group_by(Ticket.queue_id)
+    )
+    await session.execute(
+        select(Ticket.ticket_number)
+        .where(Ticket.queue_id.in_(queue_ids))
+        .where(Ticket.status.in_([TicketStatus.CALLED, TicketStatus.IN_PROGRESS]))
+        .order_by(Ticket.called_at.desc())
+        .limit(1)
+    )
+
+
+async def run(
+    mode: str,
+    displays: int,
+    rounds: int,
+    poll_seconds: float,
+    events: int,
+    event_every: int,
+) -> dict:
+    """Run one benchmark mode and return its result record."""
+    engine, factory = await create_bench_engine()
+    get_queue_state_cache().clear()
+    get_public_summary_cache().ttl_seconds = 30 if mode == "cached" else 0
+
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queues = [
+            Queue(practice_id=practice.id, name=f"Queue {code}", code=code)
+            for code in "ABC"
+        ]
+        session.add_all(queues)
+        await session.commit()
+        practice_id = practice.id
+        queue_ids = [queue.id for queue in queues]
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    async def override_get_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = ASGITransport(app=app)
+    url = f"/api/v1/queue/public/summary?practice_id={practice_id}"
+    etags: list[Optional[str]] = [None] * displays
+    latencies: list[float] = []
+    status_counts = {200: 0, 304: 0}
+    poll_statements = 0
+
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def poll(display: int) -> None:
+            started = time.perf_counter()
+            if mode == "legacy":
+                async with factory() as session:
+                    await _legacy_summary(session, practice_id)
+                status_counts[200] += 1
+            else:
+                headers = {}
+                if mode == "cached" and etags[display]:
+                    headers["If-None-Match"] = etags[display]
+                response = await client.get(url, headers=headers)
+                status_counts[response.status_code] = (
+                    status_counts.get(response.status_code, 0) + 1
+                )
+                etags[display] = response.headers.get("ETag")
+            latencies.append(time.perf_counter() - started)
+
+        with Stopwatch() as watch:
+            for round_index in range(rounds):
+                round_events = events if round_index % event_every == 0 else 0
+                async with factory() as session:
+                    for i in range(round_events):
+                        queue_id = queue_ids[(round_index + i) % len(queue_ids)]
+                        if i % 2:
+                            await call_next_ticket(session, queue_id, None)
+                        else:
+                            await create_ticket(session, TicketCreate(queue_id=queue_id))
+
+                before = statements
+                await asyncio.gather(*[poll(d) for d in range(displays)])
+                poll_statements += statements - before
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+    simulated_seconds = rounds * poll_seconds
+    return {
+        "mode": mode,
+        "displays": displays,
+        "rounds": rounds,
+        "poll_seconds": poll_seconds,
+        "ticket_events": events * len(range(0, rounds, event_every)),
+        "polls": displays * rounds,
+        "responses": {str(code): count for code, count in status_counts.items()},
+        "db_queries": poll_statements,
+        "db_queries_per_second": round(poll_statements / simulated_seconds, 1),
+        "wall_seconds": round(watch.elapsed, 3),
+        "poll_latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "poll_latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--displays", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--poll-seconds", type=float, default=5.0)
+    parser.add_argument("--events-per-round", type=int, default=2)
+    parser.add_argument(
+        "--event-every", type=int, default=2, help="Ticket events every N rounds"
+    )
+    parser.add_argument(
+        "--mode", choices=["legacy", "uncached", "cached", "all"], default="all"
+    )
+    args = parser.parse_args()
+    # Per-request logging would dominate the timings
+    logging.disable(logging.WARNING)
+
+    modes = ["legacy", "uncached", "cached"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        result = await run(
+            mode,
+            args.displays,
+            args.rounds,
+            args.poll_seconds,
+            args.events_per_round,
+            args.event_every,
+        )
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""
+Benchmark: memory per idle connection, Server-Sent Events vs WebSocket.
+
+Opens N connections through the full ASGI application (middleware stack,
+router, endpoint) over in-memory channels, waits until every client has its
+``connected`` message, and reports the memory held per idle connection
+(Python allocations via tracemalloc, and process RSS growth). Then one
+broadcast is fanned out to all of them and timed until it is delivered.
+
+Modes:
+    ws   - ``/api/v1/ws/events/{practice_id}``: endpoint task waiting on
+           ``receive_text`` plus the client's writer task.
+    sse  - ``/api/v1/events/{practice_id}/stream``: the response body
+           generator pulling frames (no writer task) and the response's
+           disconnect listener, routed around the per-request middleware.
+
+The in-memory channels leave out the server's protocol objects and socket
+buffers, which exist in both modes.
+
+Usage:
+    python backend/benchmarks/sse_memory.py [--connections 5000] [--practices 50]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import tracemalloc
+
+import _common  # noqa: F401  (sets up the import path and environment)
+from _common import Stopwatch
+
+from app.main import app
+from app.routers.websocket import MessageType, get_connection_manager
+
+
+class BenchConnection:
+    """In-memory ASGI client that stays idle until told to disconnect."""
+
+    def __init__(self, mode: str, practice_id: str) -> None:
+        self.mode = mode
+        self.practice_id = practice_id
+        self.connected = asyncio.Event()
+        self.received = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._opened = False
+        self._frames = 0
+
+    def scope(self) -> dict:
+        common = {
+            "asgi": {"version": "3.0"},
+            "query_string": b"",
+            "headers": [(b"host", b"localhost")],
+            "server": ("localhost", 8000),
+            "client": ("127.0.0.1", 50000),
+            "root_path": "",
+        }
+        if self.mode == "ws":
+            path = f"/api/v1/ws/events/{self.practice_id}"
+            return {**common, "type": "websocket", "scheme": "ws", "path": path,
+                    "raw_path": path.encode(), "subprotocols": []}
+        path = f"/api/v1/events/{self.practice_id}/stream"
+        return {**common, "type": "http", "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode()}
+
+    async def receive(self) -> dict:
+        if not self._opened:
+            self._opened = True
+            if self.mode == "ws":
+                return {"type": "websocket.connect"}
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._closing.wait()
+        if self.mode == "ws":
+            return {"type": "websocket.disconnect", "code": 1000}
+        return {"type": "http.disconnect"}
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "websocket.send":
+            text = message["text"]
+        elif message["type"] == "http.response.body":
+            text = message.get("body", b"").decode()
+        else:
+            return
+        if not text or text.startswith("retry:"):
+            return
+        self._frames += 1
+        if self._frames == 1:
+            self.connected.set()
+        else:
+            self.received.set()
+
+    def close(self) -> None:
+        self._closing.set()
+
+
+def _rss_bytes() -> int:
+    with open(f"/proc/{os.getpid()}/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def run(mode: str, connections: int, practices: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    manager = get_connection_manager()
+    clients = [BenchConnection(mode, f"practice-{i % practices}") for i in range(connections)]
+
+    gc.collect()
+    tracemalloc.start()
+    rss_before = _rss_bytes()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(app(c.scope(), c.receive, c.send)) for c in clients]
+    await asyncio.gather(*(c.connected.wait() for c in clients))
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0] - traced_before
+    tasks_running = len(asyncio.all_tasks()) - 1
+    rss = _rss_bytes() - rss_before
+    tracemalloc.stop()
+
+    message = {"type": MessageType.TICKET_CALLED, "data": {"ticket_number": "A-001"}}
+    with Stopwatch() as fanout:
+        for p in range(practices):
+            await manager.broadcast_to_practice(f"practice-{p}", message)
+        await asyncio.gather(*(c.received.wait() for c in clients))
+
+    for client in clients:
+        client.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "mode": mode,
+        "connections": connections,
+        "traced_bytes_per_connection": round(traced / connections),
+        "rss_bytes_per_connection": round(rss / connections),
+        "tasks_per_connection": round(tasks_running / connections, 2),
+        "fanout_ms": round(fanout.elapsed * 1000, 2),
+        "registered_after_close": manager.get_connection_count(),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--practices", type=int, default=50)
+    parser.add_argument("--mode", choices=["ws", "sse", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["ws", "sse"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run(mode, args.connections, args.practices)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Benchmark: concurrent ticket number allocation on a single queue.
+
+Simulates a kiosk/NFC burst of N simultaneous check-ins on one queue and
+reports throughput plus whether any ticket number was handed out twice.
+
+Modes:
+    atomic  - ``queue_service.create_ticket`` (UPDATE ... RETURNING).
+    legacy  - the previous read-modify-write of ``Queue.current_number``.
+
+Usage:
+    python backend/benchmarks/ticket_allocation.py [--checkins 200] [--mode both]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+
+from _common import Stopwatch, create_bench_engine, percentile
+from sqlalchemy import func, select
+
+from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.schemas.schemas import TicketCreate
+from app.services.queue_service import create_ticket
+
+
+async def _legacy_create(session, queue_id: uuid.UUID) -> Ticket:
+    """Replica of the pre-atomic allocation path (for comparison only)."""
+    queue = await session.get(Queue, queue_id)
+    queue.current_number += 1
+    number = queue.current_number
+    waiting = await session.execute(
+        select(func.count(Ticket.id))
+        .where(Ticket.queue_id == queue_id)
+        .where(Ticket.status == TicketStatus.WAITING)
+    )
+    ticket = Ticket(
+        queue_id=queue_id,
+        ticket_number=f"{queue.code}-{number:03d}",
+        estimated_wait_minutes=queue.average_wait_minutes * ((waiting.scalar() or 0) + 1),
+    )
+    session.add(ticket)
+    await session.commit()
+    return ticket
+
+
+async def run(mode: str, checkins: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    engine, factory = await create_bench_engine()
+
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queue = Queue(practice_id=practice.id, name="Allgemein", code="A")
+        session.add(queue)
+        await session.commit()
+        queue_id = queue.id
+
+    latencies: list[float] = []
+    errors: Counter = Counter()
+
+    async def check_in() -> str | None:
+        started = time.perf_counter()
+        try:
+            async with factory() as session:
+                if mode == "atomic":
+                    ticket = await create_ticket(session, TicketCreate(queue_id=queue_id))
+                else:
+                    ticket = await _legacy_create(session, queue_id)
+                return ticket.ticket_number
+        except Exception as exc:  # noqa: BLE001 - benchmark records failures
+            errors[type(exc).__name__] += 1
+            return None
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    with Stopwatch() as watch:
+        numbers = await asyncio.gather(*[check_in() for _ in range(checkins)])
+
+    issued = [n for n in numbers if n]
+    duplicates = sum(count - 1 for count in Counter(issued).values() if count > 1)
+
+    async with factory() as session:
+        final_counter = (await session.get(Queue, queue_id)).current_number
+
+    await engine.dispose()
+
+    return {
+        "mode": mode,
+        "checkins": checkins,
+        "issued": len(issued),
+        "duplicates": duplicates,
+        "errors": dict(errors),
+        "final_counter": final_counter,
+        "seconds": round(watch.elapsed, 3),
+        "tickets_per_second": round(len(issued) / watch.elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checkins", type=int, default=200)
+    parser.add_argument("--mode", choices=["atomic", "legacy", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["legacy", "atomic"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run(mode, args.checkins)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
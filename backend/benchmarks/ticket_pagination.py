@@ -0,0 +1,179 @@
+"""
+Benchmark: deep pages of a large ticket listing.
+
+Seeds one queue with N tickets (default 1M) and times fetching selected
+pages through ``queue_service.get_tickets_by_queue``. Offset pages make the
+database walk every skipped row; keyset pages seek straight to the cursor.
+The cursor for page P is derived once (untimed) from the row before it, as
+a client walking the pages would have received it.
+
+Modes:
+    offset         - ``page``/``offset`` with COUNT (previous behaviour).
+    offset_nototal - ``page``/``offset`` with ``include_total=false``.
+    keyset         - ``cursor`` with ``include_total=false``.
+
+Keyset pagination relies on an index over the sort key, so the script
+creates ``(queue_id, created_at, id)`` on the benchmark table before timing;
+all modes run against the same indexed table.
+
+Usage:
+    python backend/benchmarks/ticket_pagination.py [--tickets 1000000] [--pages 1,100,1000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from _common import Stopwatch, create_bench_engine, percentile
+from sqlalchemy import insert, select, text
+
+from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.services.pagination import encode_cursor
+from app.services.queue_service import get_tickets_by_queue
+
+SEED_CHUNK = 10_000
+
+
+async def _seed(engine, factory, tickets: int) -> uuid.UUID:
+    """Bulk-insert ``tickets`` completed tickets into one queue."""
+    async with factory() as session:
+        practice = Practice(
+            name="Bench Praxis", address="-", phone="-", email="bench@example.de"
+        )
+        session.add(practice)
+        await session.flush()
+        queue = Queue(practice_id=practice.id, name="Queue A", code="A")
+        session.add(queue)
+        await session.commit()
+        queue_id = queue.id
+
+    # Two tickets per second over the seeded period, so timestamps tie
+    start = datetime.now(timezone.utc) - timedelta(seconds=tickets // 2 + 1)
+    async with engine.begin() as conn:
+        for offset in range(0, tickets, SEED_CHUNK):
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "queue_id": queue_id,
+                    "ticket_number": f"A-{i % 1000:03d}",
+                    "status": TicketStatus.COMPLETED,
+                    "created_at": start + timedelta(seconds=i // 2),
+                    "updated_at": start + timedelta(seconds=i // 2),
+                }
+                for i in range(offset, min(offset + SEED_CHUNK, tickets))
+            ]
+            await conn.execute(insert(Ticket), rows)
+        await conn.execute(
+            text(
+                "CREATE INDEX ix_bench_tickets_queue_created "
+                "ON tickets (queue_id, created_at, id)"
+            )
+        )
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE tickets"))
+        else:
+            await conn.execute(text("ANALYZE"))
+    return queue_id
+
+
+async def _cursor_for_page(factory, queue_id: uuid.UUID, page: int, page_size: int):
+    """Cursor a client would hold after reading ``page - 1`` keyset pages."""
+    if page == 1:
+        return ""
+    async with factory() as session:
+        row = (
+            await session.execute(
+                select(Ticket.created_at, Ticket.id)
+                .where(Ticket.queue_id == queue_id)
+                .order_by(Ticket.created_at, Ticket.id)
+                .offset((page - 1) * page_size - 1)
+                .limit(1)
+            )
+        ).one()
+    return encode_cursor(row.created_at, row.id)
+
+
+async def run(
+    mode: str,
+    factory,
+    queue_id: uuid.UUID,
+    tickets: int,
+    pages: list[int],
+    page_size: int,
+    repeat: int,
+) -> list[dict]:
+    """Time each requested page in one mode."""
+    records = []
+    for page in pages:
+        cursor = None
+        if mode == "keyset":
+            cursor = await _cursor_for_page(factory, queue_id, page, page_size)
+
+        latencies: list[float] = []
+        items = 0
+        with Stopwatch() as watch:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                async with factory() as session:
+                    rows, _total, _next = await get_tickets_by_queue(
+                        session,
+                        queue_id,
+                        limit=page_size,
+                        offset=(page - 1) * page_size,
+                        cursor=cursor,
+                        include_total=mode == "offset",
+                    )
+                latencies.append(time.perf_counter() - started)
+                items = len(rows)
+
+        records.append(
+            {
+                "mode": mode,
+                "tickets": tickets,
+                "page": page,
+                "page_size": page_size,
+                "items": items,
+                "repeat": repeat,
+                "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "wall_seconds": round(watch.elapsed, 3),
+            }
+        )
+    return records
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--pages", default="1,100,1000")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--mode",
+        choices=["offset", "offset_nototal", "keyset", "all"],
+        default="all",
+    )
+    args = parser.parse_args()
+    pages = [int(page) for page in args.pages.split(",")]
+
+    engine, factory = await create_bench_engine()
+    with Stopwatch() as seeding:
+        queue_id = await _seed(engine, factory, args.tickets)
+    print(json.dumps({"seeded": args.tickets, "seed_seconds": round(seeding.elapsed, 1)}))
+
+    modes = (
+        ["offset", "offset_nototal", "keyset"] if args.mode == "all" else [args.mode]
+    )
+    for mode in modes:
+        for record in await run(
+            mode, factory, queue_id, args.tickets, pages, args.page_size, args.repeat
+        ):
+            print(json.dumps(record))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
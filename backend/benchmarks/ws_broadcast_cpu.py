@@ -0,0 +1,158 @@
+"""
+Benchmark: CPU per WebSocket broadcast (encoding and wait-time coalescing).
+
+Connects N in-memory clients to one practice, all subscribed to
+``wait_times`` and each to its own ``ticket:`` topic, then runs two
+workloads and reports process CPU time until every client queue is drained:
+
+    ticket  - ``--events`` ticket.called events (practice + ticket topic)
+              with a realistic public ticket payload.
+    burst   - 20 wait time updates for one queue within 200 ms, repeated
+              ``--bursts`` times.
+
+Modes:
+    legacy  - ``json.dumps`` per broadcast target and no coalescing window
+              (the previous helpers, replicated here).
+    current - ``encode_message`` once per event (orjson when installed)
+              and ``WS_COALESCE_WINDOW_MS``.
+
+Usage:
+    python backend/benchmarks/ws_broadcast_cpu.py [--connections 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+import _common  # noqa: F401  (sets up the import path and environment)
+
+import app.routers.websocket as websocket_router
+from app.routers.websocket import (
+    ConnectionManager,
+    MessageType,
+    broadcast_ticket_called,
+    broadcast_wait_time_update,
+)
+
+
+class BenchWebSocket:
+    """In-memory WebSocket counting frames."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.frames += 1
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _ticket_data(n: int) -> dict:
+    """Public ticket payload as built by ``ticket_event_data``."""
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()),
+        "queue_id": uuid.uuid4(),
+        "ticket_number": f"A-{n:03d}",
+        "status": "called",
+        "estimated_wait_minutes": 12,
+        "called_at": now,
+        "completed_at": None,
+        "created_at": now,
+        "priority": "normal",
+    }
+
+
+async def _legacy_ticket_called(manager: ConnectionManager, practice_id: str, data) -> None:
+    """Previous helper: one dict (and one encode) per target."""
+    for topic in (None, f"ticket:{data['ticket_number']}"):
+        message = {
+            "type": MessageType.TICKET_CALLED,
+            "data": data,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        if topic is None:
+            await manager.broadcast_to_practice(practice_id, message)
+        else:
+            await manager.broadcast_to_topic(topic, message, practice_id)
+
+
+async def _drained(clients: list[BenchWebSocket], expected: int) -> None:
+    """Wait until every client has sent ``expected`` frames in total."""
+    while sum(c.frames for c in clients) < expected:
+        await asyncio.sleep(0.001)
+
+
+async def run(mode: str, connections: int, events: int, bursts: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    legacy = mode == "legacy"
+    if legacy:
+        websocket_router._dumps = lambda message: json.dumps(message, default=str)
+    manager = ConnectionManager(coalesce_window_ms=0 if legacy else None)
+    websocket_router.manager = manager
+    clients = [BenchWebSocket() for _ in range(connections)]
+    for i, client in enumerate(clients):
+        await manager.connect(client, "practice-1", ["wait_times", f"ticket:A-{i:03d}"])
+
+    # ticket.called: every client once, the ticket's own client twice
+    cpu_start = time.process_time()
+    for n in range(events):
+        data = _ticket_data(n)
+        if legacy:
+            await _legacy_ticket_called(manager, "practice-1", data)
+        else:
+            await broadcast_ticket_called("practice-1", data)
+        await asyncio.sleep(0)
+    await _drained(clients, events * (connections + 1))
+    ticket_cpu = time.process_time() - cpu_start
+
+    frames_before = sum(c.frames for c in clients)
+    cpu_start = time.process_time()
+    for _ in range(bursts):
+        for waiting in range(20):
+            await broadcast_wait_time_update(
+                "practice-1",
+                {"queue_id": "q1", "waiting_count": waiting, "estimated_wait_minutes": waiting},
+            )
+            await asyncio.sleep(0.009)
+        await asyncio.sleep(manager.coalesce_window + 0.06)
+    burst_cpu = time.process_time() - cpu_start
+    burst_frames = sum(c.frames for c in clients) - frames_before
+
+    for client in clients:
+        manager.disconnect(client, "practice-1")
+    return {
+        "mode": mode,
+        "connections": connections,
+        "ticket_events": events,
+        "ticket_cpu_ms_per_event": round(ticket_cpu / events * 1000, 2),
+        "wait_time_updates": bursts * 20,
+        "wait_time_frames_per_client": round(burst_frames / connections, 1),
+        "wait_time_cpu_ms_per_burst": round(burst_cpu / bursts * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--mode", choices=["legacy", "current", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["legacy", "current"] if args.mode == "all" else [args.mode]
+    original_dumps = websocket_router._dumps
+    for mode in modes:
+        websocket_router._dumps = original_dumps
+        print(json.dumps(await run(mode, args.connections, args.events, args.bursts)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+"""
+Benchmark: WebSocket fan-out latency with slow readers.
+
+Connects N in-memory clients to one practice, a share of them slow (each
+send takes ``--slow-ms``, like a mobile client on a bad link), and issues
+broadcasts at a fixed interval. Reports the time from broadcast to each
+client's send completing, split by fast and slow clients.
+
+Modes:
+    legacy  - sequential ``await send_text`` per client (the previous
+              ``ConnectionManager`` loop, replicated here).
+    queued  - ``ConnectionManager`` with per-client send queues and writer
+              tasks (``--policy`` selects the overflow policy).
+
+No network or database is involved; the numbers isolate the fan-out.
+
+Usage:
+    python backend/benchmarks/ws_fanout.py [--connections 2000] [--slow-share 0.05]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from _common import Stopwatch, percentile
+
+from app.routers.websocket import ConnectionManager, MessageType, OverflowPolicy
+
+
+class BenchWebSocket:
+    """In-memory WebSocket recording when each broadcast arrived."""
+
+    def __init__(self, slow_seconds: float, issued: dict[int, float]) -> None:
+        self.slow_seconds = slow_seconds
+        self.issued = issued
+        self.latencies: list[float] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.slow_seconds:
+            await asyncio.sleep(self.slow_seconds)
+        else:
+            await asyncio.sleep(0)
+        seq = json.loads(text)["data"]["seq"]
+        self.latencies.append(time.perf_counter() - self.issued[seq])
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+class LegacyManager:
+    """Replica of the sequential broadcast loop (for comparison only)."""
+
+    def __init__(self) -> None:
+        self.connections: list[BenchWebSocket] = []
+
+    async def connect(self, websocket: BenchWebSocket, practice_id: str) -> None:
+        await websocket.accept()
+        self.connections.append(websocket)
+
+    async def broadcast_to_practice(self, practice_id: str, message: dict) -> None:
+        message_json = json.dumps(message, default=str)
+        for connection in self.connections:
+            await connection.send_text(message_json)
+
+
+async def run(
+    mode: str,
+    connections: int,
+    slow_share: float,
+    slow_ms: float,
+    broadcasts: int,
+    interval_ms: float,
+    policy: str,
+) -> dict:
+    """Run one benchmark mode and return its result record."""
+    issued: dict[int, float] = {}
+    slow_count = int(connections * slow_share)
+    clients = [
+        BenchWebSocket(slow_ms / 1000 if i < slow_count else 0.0, issued)
+        for i in range(connections)
+    ]
+    if mode == "legacy":
+        manager = LegacyManager()
+    else:
+        manager = ConnectionManager(overflow_policy=policy)
+    for client in clients:
+        await manager.connect(client, "practice-1")
+
+    call_times: list[float] = []
+
+    async def broadcast(seq: int) -> None:
+        issued[seq] = time.perf_counter()
+        await manager.broadcast_to_practice(
+            "practice-1",
+            {"type": MessageType.TICKET_CALLED, "data": {"seq": seq}, "timestamp": ""},
+        )
+        call_times.append(time.perf_counter() - issued[seq])
+
+    with Stopwatch() as watch:
+        tasks = []
+        for seq in range(broadcasts):
+            tasks.append(asyncio.create_task(broadcast(seq)))
+            await asyncio.sleep(interval_ms / 1000)
+        await asyncio.gather(*tasks)
+        # Let writer tasks drain (fast clients first, slow ones last)
+        deadline = time.perf_counter() + broadcasts * slow_ms / 1000 + 5
+        while time.perf_counter() < deadline and any(
+            len(c.latencies) < broadcasts for c in clients[slow_count:]
+        ):
+            await asyncio.sleep(0.01)
+
+    fast = [lat for c in clients[slow_count:] for lat in c.latencies]
+    slow = [lat for c in clients[:slow_count] for lat in c.latencies]
+    if mode != "legacy":
+        for client in clients:
+            manager.disconnect(client, "practice-1")
+
+    return {
+        "mode": mode if mode == "legacy" else f"queued/{policy}",
+        "connections": connections,
+        "slow_clients": slow_count,
+        "broadcasts": broadcasts,
+        "fast_delivered": len(fast),
+        "fast_p50_ms": round(percentile(fast, 50) * 1000, 2),
+        "fast_p99_ms": round(percentile(fast, 99) * 1000, 2),
+        "slow_p99_ms": round(percentile(slow, 99) * 1000, 2),
+        "broadcast_call_p50_ms": round(percentile(call_times, 50) * 1000, 2),
+        "broadcast_call_p99_ms": round(percentile(call_times, 99) * 1000, 2),
+        "wall_seconds": round(watch.elapsed, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    parser.add_argument("--broadcasts", type=int, default=20)
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--policy",
+        choices=[
+            OverflowPolicy.DROP_OLDEST,
+            OverflowPolicy.COALESCE,
+            OverflowPolicy.DISCONNECT,
+        ],
+        default=OverflowPolicy.COALESCE,
+    )
+    parser.add_argument("--mode", choices=["legacy", "queued", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["legacy", "queued"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(
+            json.dumps(
+                await run(
+                    mode,
+                    args.connections,
+                    args.slow_share,
+                    args.slow_ms,
+                    args.broadcasts,
+                    args.interval_ms,
+                    args.policy,
+                )
+            )
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark: heartbeat cost for many idle connections.
+
+Registers N in-memory connections spread over P practices and runs
+``--rounds`` heartbeat rounds (every connection gets one heartbeat per
+round). Reports process CPU per round and the number of heartbeat tasks.
+
+Modes:
+    legacy  - one ``_send_heartbeat`` task per socket: sleep, count all
+              connections with a sum over practices, encode and send (the
+              previous endpoint, replicated here).
+    shared  - ``ConnectionManager``'s ticker: one frame per practice per
+              round (idle detection off: these clients never ping).
+
+Usage:
+    python backend/benchmarks/ws_heartbeat.py [--connections 10000] [--practices 200]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import _common  # noqa: F401  (sets up the import path and environment)
+
+from app.routers.websocket import ConnectionManager, MessageType
+
+
+class BenchWebSocket:
+    """In-memory WebSocket counting frames."""
+
+    def __init__(self) -> None:
+        self.frames = 0
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.frames += 1
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+async def _legacy_heartbeat(
+    websocket: BenchWebSocket,
+    connections: dict[str, list],
+    interval: float,
+) -> None:
+    """Previous per-socket heartbeat loop."""
+    while True:
+        await asyncio.sleep(interval)
+        count = sum(len(conns) for conns in connections.values())
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": MessageType.HEARTBEAT,
+                    "data": {
+                        "server_time": datetime.now(timezone.utc).isoformat(),
+                        "connections": count,
+                    },
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+            )
+        )
+
+
+async def _wait_frames(sockets: list[BenchWebSocket], expected: int) -> None:
+    while sum(ws.frames for ws in sockets) < expected:
+        await asyncio.sleep(0.001)
+
+
+async def run(mode: str, connections: int, practices: int, rounds: int) -> dict:
+    """Run one benchmark mode and return its result record."""
+    sockets = [BenchWebSocket() for _ in range(connections)]
+    if mode == "legacy":
+        registry: dict[str, list] = {}
+        for i, websocket in enumerate(sockets):
+            registry.setdefault(f"practice-{i % practices}", []).append(websocket)
+        interval = 0.2
+        tasks = [
+            asyncio.create_task(_legacy_heartbeat(ws, registry, interval)) for ws in sockets
+        ]
+        heartbeat_tasks = len(tasks)
+        cpu_start = time.process_time()
+        await _wait_frames(sockets, connections * rounds)
+        cpu = time.process_time() - cpu_start
+        for task in tasks:
+            task.cancel()
+    else:
+        manager = ConnectionManager(heartbeat_seconds=30, idle_timeout_seconds=0)
+        for i, websocket in enumerate(sockets):
+            await manager.connect(websocket, f"practice-{i % practices}")
+        cpu_start = time.process_time()
+        for _ in range(rounds):
+            # One heartbeat round = ticks_per_heartbeat ticks
+            for _ in range(manager._ticks_per_heartbeat):
+                manager._on_tick()
+            await _wait_frames(sockets, connections)
+            for websocket in sockets:
+                websocket.frames = 0
+        cpu = time.process_time() - cpu_start
+        heartbeat_tasks = 1  # the ticker
+        for i, websocket in enumerate(sockets):
+            manager.disconnect(websocket, f"practice-{i % practices}")
+
+    return {
+        "mode": mode,
+        "connections": connections,
+        "practices": practices,
+        "heartbeat_tasks": heartbeat_tasks,
+        "cpu_ms_per_round": round(cpu / rounds * 1000, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--practices", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mode", choices=["legacy", "shared", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["legacy", "shared"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        print(json.dumps(await run(mode, args.connections, args.practices, args.rounds)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,427 @@
+"""
+Benchmark: WebSocket fan-out load test against a running app.
+
+Starts the app with uvicorn in a child process (plus the outbox dispatcher
+that turns ticket changes into broadcasts) on the database given by
+``BENCH_DATABASE_URL``, opens N simulated clients on
+``/api/v1/ws/events/{practice_id}`` and drives ticket create/call traffic
+through the REST API. Prints one JSON record per run so results can be
+compared between versions.
+
+Clients (spread over ``--practices``):
+    display - ``queue:{id}``, ``wait_times`` and ``led`` (waiting room).
+    phone   - ``ticket:{number}`` of one upcoming ticket (patient app).
+    staff   - no topics: every practice broadcast.
+    All clients ping every 25 seconds, like the apps.
+
+Reported:
+    fanout_*_ms     - broadcast ``timestamp`` to client receipt, per
+                      delivered ticket event.
+    missing_events  - ticket events of its practice a client never got
+                      (counted by distinct ``seq``).
+    dropped         - the server's ``sanad_ws_messages_dropped_total``.
+    server_rss_bytes_per_connection - server RSS growth while connecting.
+    server_loop_lag_*_ms - server event loop lag from the start of the
+                      traffic until the end; client_loop_lag_p99_ms shows
+                      whether the clients (one process) kept up.
+
+Usage:
+    python backend/benchmarks/ws_load.py [--displays 600] [--phones 300] [--staff 100]
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python backend/benchmarks/ws_load.py
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import _common
+import httpx
+import uvicorn
+import websockets
+from _common import BENCH_DATABASE_URL, Stopwatch, create_bench_engine, percentile
+
+from app.config import get_settings
+from app.database import async_session_maker, engine
+from app.main import app
+from app.middleware.observability import PROMETHEUS_AVAILABLE
+from app.models.models import Practice, Queue, User, UserRole
+from app.services.auth_service import create_access_token, hash_password
+from app.services.outbox import run_outbox_dispatcher
+from app.services.queue_service import format_ticket_number
+
+TICKET_EVENTS = {"ticket.created", "ticket.called"}
+PING_SECONDS = 25
+LAG_INTERVAL = 0.05
+
+
+async def _measure_lag(samples: list[float]) -> None:
+    """Record how late the event loop wakes up from short sleeps."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(time.perf_counter() - started - LAG_INTERVAL)
+
+
+def _ms(values: list[float], pct: float) -> float:
+    return round(percentile(values, pct) * 1000, 2)
+
+
+def _rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+# ============================================================================
+# Server (child process)
+# ============================================================================
+
+
+def _dropped_messages() -> dict[str, int]:
+    """Current values of the dropped-messages counter, by reason."""
+    if not PROMETHEUS_AVAILABLE:
+        return {}
+    from app.middleware.observability import WS_DROPPED
+
+    return {
+        sample.labels["reason"]: int(sample.value)
+        for metric in WS_DROPPED.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_total")
+    }
+
+
+async def serve(port: int) -> None:
+    """Run the app until stdin closes, then print server-side stats."""
+    if not BENCH_DATABASE_URL.startswith("sqlite"):
+        _common._install_timestamp_codec(engine)
+    # Per-request logging would dominate the timings
+    logging.disable(logging.WARNING)
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            lifespan="off",
+            ws="websockets",
+            log_level="error",
+        )
+    )
+    lag: list[float] = []
+    background = [
+        asyncio.create_task(_measure_lag(lag)),
+        asyncio.create_task(
+            run_outbox_dispatcher(async_session_maker, get_settings().OUTBOX_POLL_SECONDS)
+        ),
+    ]
+
+    async def follow_parent() -> None:
+        # A line starts the measured phase; EOF stops the server
+        while await asyncio.to_thread(sys.stdin.readline):
+            lag.clear()
+        server.should_exit = True
+
+    stopper = asyncio.create_task(follow_parent())
+    await server.serve()
+    for task in [*background, stopper]:
+        task.cancel()
+    print(
+        json.dumps(
+            {
+                "loop_lag_p50_ms": _ms(lag, 50),
+                "loop_lag_p99_ms": _ms(lag, 99),
+                "loop_lag_max_ms": round(max(lag, default=0) * 1000, 2),
+                "dropped": _dropped_messages(),
+            }
+        ),
+        flush=True,
+    )
+
+
+# ============================================================================
+# Load generator (parent process)
+# ============================================================================
+
+
+class LoadClient:
+    """One simulated app connection recording ticket event deliveries."""
+
+    def __init__(self, kind: str, practice_id: str, topics: list[str]) -> None:
+        self.kind = kind
+        self.practice_id = practice_id
+        self.topics = topics
+        self.websocket = None
+        self.seqs: set[int] = set()
+        self.latencies: list[float] = []
+        self.closed_early = False
+
+    async def connect(self, base_url: str) -> None:
+        url = f"{base_url}/api/v1/ws/events/{self.practice_id}"
+        if self.topics:
+            url += "?topics=" + ",".join(self.topics)
+        self.websocket = await websockets.connect(url, open_timeout=60, max_queue=None)
+        await self.websocket.recv()  # connected
+
+    async def listen(self) -> None:
+        try:
+            async for frame in self.websocket:
+                received = time.time()
+                message = json.loads(frame)
+                if message["type"] not in TICKET_EVENTS:
+                    continue
+                sent = datetime.fromisoformat(message["timestamp"]).timestamp()
+                self.latencies.append(received - sent)
+                self.seqs.add(message["seq"])
+        except websockets.ConnectionClosed:
+            self.closed_early = True
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _seed(practices: int) -> tuple[list[dict], str]:
+    """Create practices with three queues each and a staff user."""
+    bench_engine, factory = await create_bench_engine()
+    seeded = []
+    async with factory() as session:
+        staff = User(
+            email="staff@bench.example.de",
+            hashed_password=hash_password("BenchPass123!"),
+            first_name="Bench",
+            last_name="Staff",
+            role=UserRole.STAFF,
+            is_active=True,
+        )
+        session.add(staff)
+        for p in range(practices):
+            practice = Practice(
+                name=f"Bench Praxis {p}",
+                address="-",
+                phone="-",
+                email=f"p{p}@bench.example.de",
+            )
+            session.add(practice)
+            await session.flush()
+            queues = [
+                Queue(practice_id=practice.id, name=f"Queue {code}", code=code)
+                for code in "ABC"
+            ]
+            session.add_all(queues)
+            await session.flush()
+            seeded.append(
+                {
+                    "id": str(practice.id),
+                    "queues": [(str(queue.id), queue.code) for queue in queues],
+                }
+            )
+        await session.commit()
+        token = create_access_token(staff.id, staff.role)
+    await bench_engine.dispose()
+    return seeded, token
+
+
+def _clients(
+    practices: list[dict], displays: int, phones: int, staff: int, tickets: int
+) -> list[LoadClient]:
+    """Build the client mix, spread round-robin over the practices."""
+    clients = []
+    for i in range(displays):
+        practice = practices[i % len(practices)]
+        queue_id, _ = practice["queues"][i % 3]
+        clients.append(
+            LoadClient("display", practice["id"], [f"queue:{queue_id}", "wait_times", "led"])
+        )
+    for i in range(phones):
+        practice = practices[i % len(practices)]
+        _, code = practice["queues"][i % 3]
+        number = format_ticket_number(code, 1 + i % max(tickets // 3, 1))
+        clients.append(LoadClient("phone", practice["id"], [f"ticket:{number}"]))
+    for i in range(staff):
+        clients.append(LoadClient("staff", practices[i % len(practices)]["id"], []))
+    return clients
+
+
+async def _connect_all(clients: list[LoadClient], base_url: str, concurrency: int) -> None:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def connect(client: LoadClient) -> None:
+        async with limit:
+            await client.connect(base_url)
+
+    await asyncio.gather(*(connect(client) for client in clients))
+
+
+async def _ping_all(clients: list[LoadClient]) -> None:
+    """Keep clients from hitting the server's idle timeout."""
+    ping = json.dumps({"type": "ping"})
+    while True:
+        await asyncio.sleep(PING_SECONDS)
+        for client in clients:
+            if not client.closed_early:
+                try:
+                    await client.websocket.send(ping)
+                except websockets.ConnectionClosed:
+                    client.closed_early = True
+
+
+async def _drive_traffic(
+    http: httpx.AsyncClient, practices: list[dict], tickets: int, rate: float
+) -> tuple[dict[str, int], list[float]]:
+    """Create tickets and call every other one, paced at ``rate`` requests/s."""
+    events = {practice["id"]: 0 for practice in practices}
+    latencies: list[float] = []
+    started = time.perf_counter()
+    request = 0
+    for n in range(tickets):
+        for practice in practices:
+            queue_id, _ = practice["queues"][n % 3]
+            calls = [("/api/v1/tickets", {"queue_id": queue_id})]
+            if n % 2:
+                calls.append((f"/api/v1/tickets/queue/{queue_id}/call-next", None))
+            for path, body in calls:
+                delay = started + request / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                request += 1
+                with Stopwatch() as watch:
+                    response = await http.post(path, json=body)
+                latencies.append(watch.elapsed)
+                if response.status_code < 300:
+                    events[practice["id"]] += 1
+    return events, latencies
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run one load test and return its result record."""
+    practices, token = await _seed(args.practices)
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, __file__, "--serve", "--port", str(port)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    base_http = f"http://127.0.0.1:{port}"
+    client_lag: list[float] = []
+    lag_probe = asyncio.create_task(_measure_lag(client_lag))
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_http, headers={"Authorization": f"Bearer {token}"}, timeout=30
+        ) as http:
+            for _ in range(300):
+                try:
+                    await http.get("/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+
+            clients = _clients(
+                practices, args.displays, args.phones, args.staff, args.tickets
+            )
+            gc.collect()
+            rss_before = _rss_bytes(server.pid)
+            with Stopwatch() as connecting:
+                await _connect_all(clients, f"ws://127.0.0.1:{port}", args.connect_concurrency)
+            await asyncio.sleep(1)  # let the server settle
+            rss_connected = _rss_bytes(server.pid)
+            listeners = [asyncio.create_task(client.listen()) for client in clients]
+            pinger = asyncio.create_task(_ping_all(clients))
+
+            server.stdin.write("traffic\n")
+            server.stdin.flush()
+            with Stopwatch() as driving:
+                events, rest_latencies = await _drive_traffic(
+                    http, practices, args.tickets, args.rate
+                )
+            # Wait for the outbox and the fan-out to catch up
+            deadline = time.perf_counter() + args.settle
+            while time.perf_counter() < deadline and any(
+                len(client.seqs) < events[client.practice_id]
+                for client in clients
+                if not client.closed_early
+            ):
+                await asyncio.sleep(0.1)
+
+            pinger.cancel()
+            for client in clients:
+                await client.websocket.close()
+            await asyncio.gather(*listeners, return_exceptions=True)
+    finally:
+        lag_probe.cancel()
+        server_stats = {}
+        stdout, _ = server.communicate(timeout=60)
+        if stdout.strip():
+            server_stats = json.loads(stdout.strip().splitlines()[-1])
+
+    latencies = [value for client in clients for value in client.latencies]
+    connections = len(clients)
+    return {
+        "database": BENCH_DATABASE_URL.split(":", 1)[0].split("+", 1)[0],
+        "app_version": get_settings().APP_VERSION,
+        "connections": connections,
+        "clients": {
+            "display": args.displays,
+            "phone": args.phones,
+            "staff": args.staff,
+        },
+        "practices": args.practices,
+        "connect_seconds": round(connecting.elapsed, 2),
+        "ticket_events": sum(events.values()),
+        "traffic_seconds": round(driving.elapsed, 2),
+        "rest_p50_ms": _ms(rest_latencies, 50),
+        "rest_p99_ms": _ms(rest_latencies, 99),
+        "deliveries": len(latencies),
+        "fanout_p50_ms": _ms(latencies, 50),
+        "fanout_p95_ms": _ms(latencies, 95),
+        "fanout_p99_ms": _ms(latencies, 99),
+        "fanout_max_ms": round(max(latencies, default=0) * 1000, 2),
+        "missing_events": sum(
+            max(0, events[client.practice_id] - len(client.seqs)) for client in clients
+        ),
+        "closed_early": sum(client.closed_early for client in clients),
+        "dropped": server_stats.get("dropped", {}),
+        "server_rss_bytes_per_connection": round(
+            (rss_connected - rss_before) / max(connections, 1)
+        ),
+        "server_loop_lag_p50_ms": server_stats.get("loop_lag_p50_ms"),
+        "server_loop_lag_p99_ms": server_stats.get("loop_lag_p99_ms"),
+        "server_loop_lag_max_ms": server_stats.get("loop_lag_max_ms"),
+        "client_loop_lag_p99_ms": _ms(client_lag, 99),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--displays", type=int, default=600)
+    parser.add_argument("--phones", type=int, default=300)
+    parser.add_argument("--staff", type=int, default=100)
+    parser.add_argument("--practices", type=int, default=10)
+    parser.add_argument("--tickets", type=int, default=30, help="Tickets per practice")
+    parser.add_argument("--rate", type=float, default=20.0, help="REST requests per second")
+    parser.add_argument(
+        "--settle", type=float, default=10.0, help="Seconds to wait for stragglers"
+    )
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        await serve(args.port)
+        return
+    print(json.dumps(await run(args)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
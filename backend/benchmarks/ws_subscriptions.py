@@ -0,0 +1,162 @@
+"""
+Benchmark: WebSocket subscription bookkeeping under a reconnect storm.
+
+Registers N in-memory connections with ``--topics-per-connection`` topic
+subscriptions each (one personal ``ticket:`` topic, the rest drawn from a
+pool of shared ``queue:`` topics), then measures:
+
+    connect     - registering all connections with their topics.
+    subscribe   - one runtime subscribe + unsubscribe per connection.
+    storm       - ``--storm-share`` of the connections disconnect and
+                  reconnect at once (Wi-Fi blip in a waiting room).
+
+Modes:
+    legacy  - lists per practice/topic; disconnect scans every topic key
+              (the previous ``ConnectionManager``, replicated here).
+    indexed - ``ConnectionManager`` with sets and a per-connection reverse
+              topic index.
+
+No network or database is involved; the numbers isolate the bookkeeping.
+
+Usage:
+    python backend/benchmarks/ws_subscriptions.py [--connections 10000] [--topics-per-connection 5]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from _common import Stopwatch
+
+from app.routers.websocket import ConnectionManager
+
+
+class BenchWebSocket:
+    """In-memory WebSocket that discards everything sent to it."""
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+class LegacyManager:
+    """Replica of the list-based bookkeeping (for comparison only)."""
+
+    def __init__(self) -> None:
+        self._active_connections: dict[str, list[BenchWebSocket]] = {}
+        self._topic_subscriptions: dict[str, list[BenchWebSocket]] = {}
+
+    async def connect(self, websocket, practice_id: str, topics=None) -> None:
+        await websocket.accept()
+        self._active_connections.setdefault(practice_id, []).append(websocket)
+        for topic in topics or []:
+            self._topic_subscriptions.setdefault(topic, []).append(websocket)
+
+    def disconnect(self, websocket, practice_id: str) -> None:
+        if websocket in self._active_connections.get(practice_id, []):
+            self._active_connections[practice_id].remove(websocket)
+        for topic in list(self._topic_subscriptions.keys()):
+            if websocket in self._topic_subscriptions[topic]:
+                self._topic_subscriptions[topic].remove(websocket)
+            if not self._topic_subscriptions[topic]:
+                del self._topic_subscriptions[topic]
+
+    def subscribe(self, websocket, topics: list[str]) -> None:
+        for topic in topics:
+            subscribers = self._topic_subscriptions.setdefault(topic, [])
+            if websocket not in subscribers:
+                subscribers.append(websocket)
+
+    def unsubscribe(self, websocket, topics: list[str]) -> None:
+        for topic in topics:
+            if websocket in self._topic_subscriptions.get(topic, []):
+                self._topic_subscriptions[topic].remove(websocket)
+
+
+def _topics_for(index: int, per_connection: int, queue_topics: int, rng) -> list[str]:
+    """One personal ticket topic plus shared queue topics."""
+    shared = rng.sample(range(queue_topics), per_connection - 1)
+    return [f"ticket:{index}", *(f"queue:{q}" for q in shared)]
+
+
+async def run(
+    mode: str,
+    connections: int,
+    per_connection: int,
+    queue_topics: int,
+    storm_share: float,
+) -> dict:
+    """Run one benchmark mode and return its result record."""
+    rng = random.Random(42)
+    practice_id = "practice-1"
+    sockets = [BenchWebSocket() for _ in range(connections)]
+    topics = [_topics_for(i, per_connection, queue_topics, rng) for i in range(connections)]
+    manager = LegacyManager() if mode == "legacy" else ConnectionManager()
+
+    with Stopwatch() as connect_watch:
+        for websocket, client_topics in zip(sockets, topics):
+            await manager.connect(websocket, practice_id, client_topics)
+
+    # Runtime subscribe/unsubscribe of a topic not yet held by the client
+    with Stopwatch() as subscribe_watch:
+        for websocket in sockets:
+            manager.subscribe(websocket, ["led"])
+            manager.unsubscribe(websocket, ["led"])
+
+    storm = sockets[: int(connections * storm_share)]
+    with Stopwatch() as storm_watch:
+        for websocket in storm:
+            manager.disconnect(websocket, practice_id)
+        for i, websocket in enumerate(storm):
+            await manager.connect(websocket, practice_id, topics[i])
+
+    subscriptions = sum(len(s) for s in manager._topic_subscriptions.values())
+    if mode != "legacy":
+        for websocket in sockets:
+            manager.disconnect(websocket, practice_id)
+
+    return {
+        "mode": mode,
+        "connections": connections,
+        "subscriptions": subscriptions,
+        "topics": queue_topics + connections,
+        "connect_seconds": round(connect_watch.elapsed, 3),
+        "subscribe_unsubscribe_us": round(subscribe_watch.elapsed / connections * 1e6, 2),
+        "storm_connections": len(storm),
+        "storm_seconds": round(storm_watch.elapsed, 3),
+        "storm_per_connection_us": round(storm_watch.elapsed / max(len(storm), 1) * 1e6, 2),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--topics-per-connection", type=int, default=5)
+    parser.add_argument("--queue-topics", type=int, default=200)
+    parser.add_argument("--storm-share", type=float, default=0.2)
+    parser.add_argument("--mode", choices=["legacy", "indexed", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["legacy", "indexed"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        started = time.perf_counter()
+        record = await run(
+            mode,
+            args.connections,
+            args.topics_per_connection,
+            args.queue_topics,
+            args.storm_share,
+        )
+        record["wall_seconds"] = round(time.perf_counter() - started, 2)
+        print(json.dumps(record))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,7 +4,8 @@ Test configuration and fixtures.
 
 import base64
 import os
-from typing import AsyncGenerator
+import uuid
+from typing import AsyncGenerator, Awaitable, Callable
 
 import pytest_asyncio
 from httpx import AsyncClient
@@ -25,6 +26,8 @@ os.environ.setdefault(
 
 from app.database import Base, get_db  # noqa: E402
 from app.main import app  # noqa: E402
+from app.models.models import Practice, Queue  # noqa: E402
+from app.services.queue_state_cache import get_queue_state_cache  # noqa: E402
 
 
 # Use file-backed SQLite for concurrent sessions in tests
@@ -66,6 +69,7 @@ async def async_session_factory() -> AsyncGenerator[sessionmaker, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
     await engine.dispose()
+    get_queue_state_cache().clear()
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -91,6 +95,58 @@ async def db_session(
         yield session
 
 
+@pytest_asyncio.fixture(scope="function")
+async def practice_with_queue(
+    async_session_factory: sessionmaker,
+) -> Callable[..., Awaitable[tuple]]:
+    """
+    Factory creating a practice with queues.
+
+    ``await practice_with_queue()`` returns ``(practice, queue)`` with one
+    queue ``A``; ``await practice_with_queue("A", "B")`` returns
+    ``(practice, queue_a, queue_b)``. Each queue is named as given and
+    coded with its first letter. Every call creates a new practice.
+
+    Params:
+        async_session_factory: Session factory fixture.
+
+    Returns:
+        Callable: Coroutine function creating and committing the rows.
+
+    Raises:
+        None.
+
+    Security Implications:
+        - Uses synthetic test data only.
+    """
+
+    async def create(*queue_names: str) -> tuple:
+        practice = Practice(
+            id=uuid.uuid4(),
+            name="Praxis Test",
+            address="Teststraße 1, 12345 Teststadt",
+            phone="+49 123 456789",
+            email="praxis@test.de",
+            is_active=True,
+        )
+        queues = [
+            Queue(
+                id=uuid.uuid4(),
+                practice_id=practice.id,
+                name=name,
+                code=name[0].upper(),
+                is_active=True,
+            )
+            for name in queue_names or ("A",)
+        ]
+        async with async_session_factory() as session:
+            session.add_all([practice, *queues])
+            await session.commit()
+        return (practice, *queues)
+
+    return create
+
+
 @pytest_asyncio.fixture(scope="function")
 async def client(
     async_session_factory: sessionmaker,
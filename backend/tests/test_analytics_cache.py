@@ -0,0 +1,168 @@
+"""
+Analytics result cache tests.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+from app.services.analytics_cache import (
+    AnalyticsCache,
+    compute_split,
+    get_analytics_cache,
+)
+from app.services.analytics_service import RollupState
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_hit_rate() -> None:
+    """The least recently used entry is evicted beyond the size bound."""
+    cache = AnalyticsCache(max_entries=2)
+    computed: list[str] = []
+
+    async def compute(key: str) -> str:
+        computed.append(key)
+        return key.upper()
+
+    for key in ("a", "b", "a", "c", "a", "b"):
+        assert await cache.get_or_compute("test", key, lambda: compute(key)) == key.upper()
+
+    # "b" was evicted by "c" (least recently used after "a" was read)
+    assert computed == ["a", "b", "c", "b"]
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.hit_rate == pytest.approx(2 / 6)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation() -> None:
+    """Identical concurrent lookups wait for the first computation."""
+    cache = AnalyticsCache(max_entries=8)
+    calls = 0
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("test", "key", compute) for _ in range(10))
+    )
+
+    assert results == [42] * 10
+    assert calls == 1
+    assert (cache.hits, cache.misses) == (9, 1)
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_but_not_cached() -> None:
+    """Waiters get the error of the running computation; the next lookup retries."""
+    cache = AnalyticsCache(max_entries=8)
+    calls = 0
+
+    async def failing() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("kaputt")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("test", "key", failing) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert calls == 1
+
+    async def working() -> int:
+        return 7
+
+    assert await cache.get_or_compute("test", "key", working) == 7
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_computing_request_is_cancelled() -> None:
+    """A cancelled computation does not cancel the requests waiting for it."""
+    cache = AnalyticsCache(max_entries=8)
+    started = asyncio.Event()
+
+    async def slow() -> int:
+        started.set()
+        await asyncio.sleep(10)
+        return 1
+
+    async def fast() -> int:
+        return 2
+
+    owner = asyncio.create_task(cache.get_or_compute("test", "key", slow))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_compute("test", "key", fast))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == 2
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_computes() -> None:
+    """max_entries=0 turns the cache off."""
+    cache = AnalyticsCache(max_entries=0)
+    calls = 0
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert [await cache.get_or_compute("test", "key", compute) for _ in range(2)] == [1, 2]
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_compute_split_caches_rolled_up_part() -> None:
+    """Only the part after the rollup boundary is recomputed per request."""
+    get_analytics_cache().clear()
+    boundary = datetime(2024, 3, 4)
+    start, end = datetime(2024, 3, 1, 9, 37), datetime(2024, 3, 4, 11, 5)
+    calls: list[tuple] = []
+
+    async def compute(
+        part_start: datetime, part_end: datetime, rolled_up_until: Optional[datetime]
+    ) -> list[tuple]:
+        calls.append((part_start, part_end, rolled_up_until))
+        return [(part_start, part_end)]
+
+    def merge(closed: list, later: list) -> list:
+        return closed + later
+
+    state = RollupState(boundary, datetime(2024, 3, 4, 0, 15))
+    for _ in range(2):
+        assert await compute_split("test", start, end, state, compute, merge) == [
+            (start, boundary - timedelta(microseconds=1)),
+            (boundary, end),
+        ]
+    assert calls == [
+        (start, boundary - timedelta(microseconds=1), boundary),
+        (boundary, end, None),
+        (boundary, end, None),
+    ]
+
+    # A rollup write (new version) recomputes the closed part
+    calls.clear()
+    newer = RollupState(boundary, datetime(2024, 3, 4, 0, 30))
+    await compute_split("test", start, end, newer, compute, merge)
+    assert len(calls) == 2
+
+    # Windows without rolled-up days are computed in one go
+    calls.clear()
+    late_start = boundary + timedelta(hours=2)
+    assert await compute_split("test", late_start, end, state, compute, merge) == [
+        (late_start, end)
+    ]
+    assert calls == [(late_start, end, boundary)]
+    get_analytics_cache().clear()
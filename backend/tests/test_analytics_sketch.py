@@ -0,0 +1,170 @@
+"""
+Quantile sketch and live wait metrics tests.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models.models import LiveQueueSketch, Ticket, TicketStatus, UserRole
+from app.services.analytics_sketch import (
+    DDSketch,
+    LiveWaitSketches,
+    get_live_wait_sketches,
+)
+from tests.test_analytics import _auth_headers
+
+
+def _called(queue_id: uuid.UUID, called_at: datetime, wait: float, service: float = 0):
+    """Ticket called after ``wait`` minutes and completed ``service`` minutes later."""
+    return Ticket(
+        queue_id=queue_id,
+        ticket_number="A-001",
+        status=TicketStatus.CALLED,
+        created_at=called_at - timedelta(minutes=wait),
+        called_at=called_at,
+        completed_at=called_at + timedelta(minutes=service) if service else None,
+    )
+
+
+def _complete(ticket: Ticket) -> Ticket:
+    ticket.status = TicketStatus.COMPLETED
+    return ticket
+
+
+def test_quantiles_within_relative_accuracy() -> None:
+    """Every quantile is within 1 % of the exact value at that rank."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(2.5, 0.8) for _ in range(10_000)] + [0.0] * 50
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+
+    values.sort()
+    for q in (0.0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1.0):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01, abs=1e-3)
+    assert sketch.count == len(values)
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_merge_of_serialized_parts_equals_whole() -> None:
+    """Sketches of parts merge into the sketch of the whole, also via bytes."""
+    rng = random.Random(11)
+    whole = DDSketch()
+    parts = [DDSketch() for _ in range(3)]
+    for i in range(3000):
+        value = rng.expovariate(1 / 12)
+        whole.add(value)
+        parts[i % 3].add(value)
+
+    merged = DDSketch()
+    for part in parts:
+        merged.merge(DDSketch.from_bytes(part.to_bytes()))
+
+    assert merged.bins == whole.bins
+    assert merged.count == whole.count
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert merged.quantile(0.9) == whole.quantile(0.9)
+    assert len(whole.to_bytes()) < 4096
+
+    with pytest.raises(ValueError):
+        DDSketch.from_bytes(whole.to_bytes()[:-1])
+    with pytest.raises(ValueError):
+        merged.merge(DDSketch(relative_accuracy=0.02))
+
+
+def test_bucket_counts_follow_edges() -> None:
+    """Values away from the edges are counted in their bucket."""
+    values = [0.0, 2.0, 4.9, 5.2, 14.0, 15.5, 29.0, 31.0, 90.0]
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.bucket_counts((5, 15, 30)) == [3, 2, 2, 2]
+    assert sketch.bucket_counts((100,)) == [9, 0]
+    assert DDSketch().bucket_counts((5, 15)) == [0, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_live_sketches_merge_workers(async_session_factory) -> None:
+    """Flushed sketches of other workers merge with the unflushed local state."""
+    queue_id = uuid.uuid4()
+    # Late enough in the hour that every ticket below was created in it
+    now = datetime(2024, 3, 4, 10, 50, tzinfo=timezone.utc)
+    worker_a, worker_b = LiveWaitSketches("a"), LiveWaitSketches("b")
+
+    for wait in (10, 20, 30):
+        worker_a.observe_ticket(_called(queue_id, now, wait), TicketStatus.WAITING)
+    worker_a.observe_ticket(
+        _complete(_called(queue_id, now, 10, service=8)), TicketStatus.CALLED
+    )
+    # Earlier hour, outside the window below
+    worker_a.observe_ticket(
+        _called(queue_id, now - timedelta(hours=2), 90), TicketStatus.WAITING
+    )
+    worker_b.observe_ticket(_called(queue_id, now, 40), TicketStatus.WAITING)
+    # Unchanged status is not a transition
+    worker_b.observe_ticket(_called(queue_id, now, 50), TicketStatus.CALLED)
+
+    assert await worker_a.flush(async_session_factory, now) == 2
+    # Flushing again replaces the worker's rows
+    worker_a.observe_ticket(_called(queue_id, now, 25), TicketStatus.WAITING)
+    assert await worker_a.flush(async_session_factory, now) == 1
+
+    async with async_session_factory() as session:
+        merged = await worker_b.queue_sketches(session, now.replace(minute=0))
+        rows = await session.scalar(select(func.count()).select_from(LiveQueueSketch))
+
+    assert rows == 2
+    assert merged[queue_id].wait.count == 5
+    assert merged[queue_id].wait.quantile(0.5) == pytest.approx(25, rel=0.01)
+    assert merged[queue_id].service.count == 1
+
+    # Rows beyond the retention expire with the next flush
+    await worker_b.flush(async_session_factory, now + timedelta(days=3))
+    async with async_session_factory() as session:
+        rows = await session.scalar(select(func.count()).select_from(LiveQueueSketch))
+    assert rows == 0
+
+
+@pytest.mark.asyncio
+async def test_live_endpoint_reports_queue_percentiles(
+    client: AsyncClient, db_session, practice_with_queue
+) -> None:
+    """/analytics/live serves per-queue percentiles of observed transitions."""
+    _, queue = await practice_with_queue("Anmeldung")
+    headers = await _auth_headers(db_session, UserRole.ADMIN)
+
+    live = get_live_wait_sketches()
+    live.clear()
+    now = datetime.now(timezone.utc)
+    try:
+        for wait in range(1, 11):
+            live.observe_ticket(
+                _complete(_called(queue.id, now, wait, service=5)), TicketStatus.IN_PROGRESS
+            )
+            live.observe_ticket(_called(queue.id, now, wait * 3), TicketStatus.WAITING)
+
+        # Tickets created in the previous hour count there
+        response = await client.get(
+            "/api/v1/analytics/live", params={"hours": 2}, headers=headers
+        )
+    finally:
+        live.clear()
+
+    assert response.status_code == 200
+    [metrics] = response.json()["queues"]
+    assert metrics["queue_name"] == "Anmeldung"
+    assert metrics["wait"]["count"] == 10
+    assert metrics["wait"]["p50"] == pytest.approx(15, rel=0.01)
+    assert metrics["service"] == {"count": 10, "p50": 5.0, "p90": 5.0, "p95": 5.0}
+
+    mfa_headers = await _auth_headers(db_session, UserRole.MFA)
+    for path in ("/live", "/live/days"):
+        response = await client.get(f"/api/v1/analytics{path}", headers=mfa_headers)
+        assert response.status_code == 403
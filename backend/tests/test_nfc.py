@@ -19,13 +19,16 @@ import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from passlib.context import CryptContext
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.models import (
+    CheckInEvent,
     DeviceStatus,
     DeviceType,
     IoTDevice,
     NFCCardType,
+    OutboxEvent,
     PatientNFCCard,
     Practice,
     Queue,
@@ -192,6 +195,35 @@ async def test_nfc_checkin_success(
     assert "message" in data
 
 
+@pytest.mark.asyncio
+async def test_nfc_checkin_queues_side_effects_in_outbox(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    queue: Queue,
+    iot_device: tuple[IoTDevice, str],
+    nfc_card: tuple[PatientNFCCard, str],
+):
+    """Test push/realtime side effects are committed to the outbox, not sent inline."""
+    device, device_secret = iot_device
+    _, nfc_uid = nfc_card
+
+    response = await client.post(
+        "/api/v1/nfc/check-in",
+        json={
+            "nfc_uid": nfc_uid,
+            "device_id": str(device.id),
+            "device_secret": device_secret,
+        },
+    )
+    assert response.status_code == 200
+
+    event = (await db_session.execute(select(OutboxEvent))).scalar_one()
+    check_in = (await db_session.execute(select(CheckInEvent))).scalar_one()
+    assert event.event_type == "ticket.created"
+    assert event.channels == "websocket,mqtt,patient_push,staff_push"
+    assert check_in.ticket_id == event.ticket_id
+
+
 @pytest.mark.asyncio
 async def test_nfc_checkin_returns_wayfinding_route_id(
     client: AsyncClient,
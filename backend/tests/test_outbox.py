@@ -0,0 +1,122 @@
+"""
+Transactional outbox tests.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.models import OutboxEvent, TicketStatus
+from app.schemas.schemas import TicketCreate
+from app.services.outbox import OutboxChannel, OutboxDispatcher
+from app.services.queue_service import (
+    call_next_ticket,
+    create_ticket,
+    update_ticket_status,
+)
+
+
+def _recording_dispatcher(delivered: list, fail: dict[str, int]) -> OutboxDispatcher:
+    """Dispatcher whose channels record deliveries and fail on demand."""
+    dispatcher = OutboxDispatcher(batch_size=50, max_attempts=3)
+
+    def handler(channel: str):
+        async def send(_factory, event_type, practice_id, payload) -> None:
+            if fail.get(channel, 0) > 0:
+                fail[channel] -= 1
+                raise RuntimeError(f"{channel} down")
+            delivered.append((channel, event_type, payload["ticket"]["ticket_number"]))
+
+        return send
+
+    dispatcher.handlers = {
+        channel: handler(channel) for channel in dispatcher.handlers
+    }
+    return dispatcher
+
+
+async def _make_due(async_session_factory) -> None:
+    """Skip retry backoff."""
+    async with async_session_factory() as session:
+        await session.execute(
+            update(OutboxEvent).values(
+                available_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_ticket_changes_write_outbox_and_dispatch_in_order(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Lifecycle events are committed with the ticket and delivered per ticket in order."""
+    practice, queue = await practice_with_queue()
+
+    async with async_session_factory() as session:
+        ticket = await create_ticket(session, TicketCreate(queue_id=queue.id))
+        await call_next_ticket(session, queue.id, None)
+        await update_ticket_status(session, ticket.id, TicketStatus.COMPLETED)
+        # Same status again is not an event
+        await update_ticket_status(session, ticket.id, TicketStatus.COMPLETED)
+
+        events = (
+            await session.execute(select(OutboxEvent).order_by(OutboxEvent.created_at))
+        ).scalars().all()
+        assert [e.event_type for e in events] == [
+            "ticket.created",
+            "ticket.called",
+            "ticket.completed",
+        ]
+        assert "patient_name" not in events[0].payload
+
+    delivered: list = []
+    dispatcher = _recording_dispatcher(delivered, {})
+    # One event per ticket and batch keeps the order
+    assert await dispatcher.dispatch_batch(async_session_factory) == 1
+    while await dispatcher.dispatch_batch(async_session_factory):
+        pass
+
+    websocket_events = [e for c, e, _ in delivered if c == OutboxChannel.WEBSOCKET]
+    assert websocket_events == ["ticket.created", "ticket.called", "ticket.completed"]
+    assert len(delivered) == 6
+
+    async with async_session_factory() as session:
+        remaining = (await session.execute(select(OutboxEvent))).scalars().all()
+    assert remaining == []
+
+
+@pytest.mark.asyncio
+async def test_failed_channel_is_retried_alone_and_given_up(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Only failed channels are retried; exhausted events stop blocking the ticket."""
+    practice, queue = await practice_with_queue()
+
+    async with async_session_factory() as session:
+        ticket = await create_ticket(session, TicketCreate(queue_id=queue.id))
+        await update_ticket_status(session, ticket.id, TicketStatus.CANCELLED)
+
+    delivered: list = []
+    dispatcher = _recording_dispatcher(delivered, {OutboxChannel.MQTT: 3})
+
+    for _ in range(3):
+        assert await dispatcher.dispatch_batch(async_session_factory) == 1
+        await _make_due(async_session_factory)
+
+    # WebSocket went out once; MQTT failed max_attempts times
+    assert delivered == [(OutboxChannel.WEBSOCKET, "ticket.created", ticket.ticket_number)]
+    async with async_session_factory() as session:
+        failed = (
+            await session.execute(
+                select(OutboxEvent).where(OutboxEvent.failed_at.is_not(None))
+            )
+        ).scalar_one()
+    assert failed.channels == OutboxChannel.MQTT
+    assert failed.attempts == 3
+    assert "mqtt down" in failed.last_error
+
+    # The cancel event behind the given-up event is delivered now
+    assert await dispatcher.dispatch_batch(async_session_factory) == 1
+    assert [e for _, e, _ in delivered[1:]] == ["ticket.cancelled", "ticket.cancelled"]
@@ -9,6 +9,9 @@ import pytest
 from httpx import AsyncClient
 
 from app.models.models import Practice, Queue, Ticket, TicketStatus
+from app.schemas.schemas import TicketCreate
+from app.services.public_summary_cache import get_public_summary_cache
+from app.services.queue_service import create_ticket
 
 
 @pytest.mark.asyncio
@@ -122,3 +125,87 @@ async def test_public_queue_summary(
     assert data["practice_name"] == "Praxis Test"
     assert data["now_serving_ticket"] == "A-004"
     assert data["queues"][0]["waiting_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_public_queue_summary_etag(
+    client: AsyncClient, db_session
+) -> None:
+    """Test summary ETag revalidation and invalidation on ticket events.
+
+    Args:
+        client: Async test client.
+        db_session: Async DB session fixture.
+
+    Returns:
+        None.
+
+    Raises:
+        None.
+
+    Security Implications:
+        - Uses synthetic test data only.
+    """
+    practice = Practice(
+        id=uuid.uuid4(),
+        name="Praxis Test",
+        address="Teststraße 1, 12345 Teststadt",
+        phone="+49 123 456789",
+        email="praxis@test.de",
+        is_active=True,
+    )
+    queue = Queue(
+        id=uuid.uuid4(),
+        practice_id=practice.id,
+        name="Allgemeinmedizin",
+        code="A",
+        is_active=True,
+    )
+    db_session.add_all([practice, queue])
+    await db_session.commit()
+
+    url = f"/api/v1/queue/public/summary?practice_id={practice.id}"
+    first = await client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"')
+
+    not_modified = await client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    await create_ticket(db_session, TicketCreate(queue_id=queue.id))
+
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["queues"][0]["waiting_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_public_queue_summary_unknown_practice_leaves_no_state(
+    client: AsyncClient,
+) -> None:
+    """Test that lookups of unknown practice IDs do not accumulate locks.
+
+    Args:
+        client: Async test client.
+
+    Returns:
+        None.
+
+    Raises:
+        None.
+
+    Security Implications:
+        - The practice ID is an unauthenticated query parameter.
+    """
+    cache = get_public_summary_cache()
+    for _ in range(3):
+        response = await client.get(
+            f"/api/v1/queue/public/summary?practice_id={uuid.uuid4()}"
+        )
+        assert response.status_code == 404
+
+    assert cache._locks == {}
+    assert cache._lock_users == {}
@@ -2,8 +2,23 @@
 Queue and ticket endpoint tests.
 """
 
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.models import Queue, Ticket, TicketPriority, TicketStatus
+from app.routers import websocket
+from app.schemas.schemas import TicketCreate
+from app.services.queue_service import (
+    call_next_ticket,
+    call_next_tickets,
+    create_ticket,
+    update_ticket_status,
+)
 
 
 async def get_auth_headers(client: AsyncClient) -> dict:
@@ -71,3 +86,214 @@ async def test_queue_stats(client: AsyncClient) -> None:
     # Global stats endpoint is intentionally not implemented yet
     response = await client.get("/api/v1/queue/stats", headers=headers)
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ticket_numbers_are_unique(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Concurrent ticket creation on one queue must not reuse numbers."""
+    _, queue = await practice_with_queue()
+
+    async def _create() -> str:
+        async with async_session_factory() as session:
+            ticket = await create_ticket(session, TicketCreate(queue_id=queue.id))
+            return ticket.ticket_number
+
+    numbers = await asyncio.gather(*[_create() for _ in range(20)])
+
+    assert len(set(numbers)) == 20
+    assert sorted(numbers) == [f"A-{i:03d}" for i in range(1, 21)]
+
+    async with async_session_factory() as session:
+        refreshed = await session.get(Queue, queue.id)
+        assert refreshed.current_number == 20
+
+
+@pytest.mark.asyncio
+async def test_call_next_respects_priority_and_never_double_claims(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Concurrent counters claim disjoint tickets, most urgent first."""
+    _, queue = await practice_with_queue()
+    async with async_session_factory() as session:
+        normal = await create_ticket(session, TicketCreate(queue_id=queue.id))
+        for _ in range(8):
+            await create_ticket(session, TicketCreate(queue_id=queue.id))
+        high = await create_ticket(
+            session, TicketCreate(queue_id=queue.id, priority=TicketPriority.HIGH)
+        )
+        emergency = await create_ticket(
+            session, TicketCreate(queue_id=queue.id, priority=TicketPriority.EMERGENCY)
+        )
+
+        batch = await call_next_tickets(session, queue.id, None, count=3)
+        assert [t.id for t in batch] == [emergency.id, high.id, normal.id]
+        assert all(t.status == TicketStatus.CALLED for t in batch)
+
+    async def _counter() -> list[uuid.UUID]:
+        claimed = []
+        while True:
+            async with async_session_factory() as session:
+                ticket = await call_next_ticket(session, queue.id, None)
+            if ticket is None:
+                return claimed
+            claimed.append(ticket.id)
+
+    results = await asyncio.gather(*[_counter() for _ in range(4)])
+    claimed = [ticket_id for result in results for ticket_id in result]
+
+    assert len(claimed) == 8
+    assert len(set(claimed)) == 8
+
+
+@pytest.mark.asyncio
+async def test_queue_stats_batch(
+    client: AsyncClient, async_session_factory, practice_with_queue
+) -> None:
+    """Batch and practice stats aggregate all queues in one response."""
+    headers = await get_auth_headers(client)
+    practice, queue_a, queue_b = await practice_with_queue("A", "B")
+    async with async_session_factory() as session:
+        for _ in range(3):
+            await create_ticket(session, TicketCreate(queue_id=queue_a.id))
+        no_show = await create_ticket(session, TicketCreate(queue_id=queue_b.id))
+        await update_ticket_status(session, no_show.id, TicketStatus.NO_SHOW)
+        done = await call_next_ticket(session, queue_a.id, None)
+        await update_ticket_status(session, done.id, TicketStatus.COMPLETED)
+
+    response = await client.get(
+        "/api/v1/queue/stats/batch",
+        params=[("queue_ids", str(queue_a.id)), ("queue_ids", str(queue_b.id))],
+        headers=headers,
+    )
+    assert response.status_code == 200
+    stats = {item["queue_name"]: item for item in response.json()}
+    assert stats["A"]["waiting_count"] == 2
+    assert stats["A"]["completed_today"] == 1
+    assert stats["A"]["current_number"] == 3
+    assert stats["B"]["waiting_count"] == 0
+    assert stats["B"]["no_show_today"] == 1
+
+    response = await client.get(
+        f"/api/v1/queue/stats/practice/{practice.id}", headers=headers
+    )
+    assert response.status_code == 200
+    assert [item["queue_name"] for item in response.json()] == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_list_tickets_keyset_pagination(
+    client: AsyncClient, async_session_factory, practice_with_queue
+) -> None:
+    """Cursor pages walk (created_at, id) without gaps, duplicates or COUNT."""
+    headers = await get_auth_headers(client)
+    start = datetime(2024, 3, 4, 9, 0, tzinfo=timezone.utc)
+    _, queue = await practice_with_queue()
+    async with async_session_factory() as session:
+        # Pairs share a timestamp so the id tie-breaker is exercised
+        tickets = [
+            Ticket(
+                queue_id=queue.id,
+                ticket_number=f"A-{i:03d}",
+                created_at=start + timedelta(minutes=i // 2),
+            )
+            for i in range(7)
+        ]
+        session.add_all(tickets)
+        await session.commit()
+    expected = [
+        str(t.id) for t in sorted(tickets, key=lambda t: (t.created_at, t.id))
+    ]
+
+    seen: list[str] = []
+    cursor = ""
+    while cursor is not None:
+        response = await client.get(
+            "/api/v1/tickets",
+            params={
+                "queue_id": str(queue.id),
+                "page_size": 3,
+                "cursor": cursor,
+                "include_total": "false",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] is None
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+    assert seen == expected
+
+    # Offset mode keeps working and still reports the total
+    response = await client.get(
+        "/api/v1/tickets",
+        params={"queue_id": str(queue.id), "page": 3, "page_size": 3},
+        headers=headers,
+    )
+    assert response.json()["total"] == 7
+    assert len(response.json()["items"]) == 1
+    assert response.json()["next_cursor"] is None
+
+    response = await client.get(
+        "/api/v1/tickets",
+        params={"queue_id": str(queue.id), "cursor": "kaputt"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_close_day_bulk_updates_and_single_event(
+    client: AsyncClient, async_session_factory, practice_with_queue, monkeypatch
+) -> None:
+    """Leftover tickets are closed in bulk, counters reset, one event sent."""
+    events: list[dict] = []
+
+    async def _record(practice_id: str, message: dict) -> None:
+        events.append(message)
+
+    monkeypatch.setattr(websocket.manager, "broadcast_to_practice", _record)
+    headers = await get_auth_headers(client)
+    practice, queue_a, queue_b = await practice_with_queue("A", "B")
+    async with async_session_factory() as session:
+        for _ in range(3):
+            await create_ticket(session, TicketCreate(queue_id=queue_a.id))
+        await create_ticket(session, TicketCreate(queue_id=queue_b.id))
+        await call_next_ticket(session, queue_a.id, None)
+        in_progress = await call_next_ticket(session, queue_b.id, None)
+        await update_ticket_status(session, in_progress.id, TicketStatus.IN_PROGRESS)
+
+    response = await client.post(
+        f"/api/v1/queue/practice/{practice.id}/close-day", headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["closed_tickets"] == 3
+    assert body["counters_reset"] == 2
+    assert body["queues"] == [{"queue_id": str(queue_a.id), "closed_tickets": 3}]
+    assert [event["type"] for event in events] == ["queue.day_closed"]
+
+    async with async_session_factory() as session:
+        statuses = (
+            await session.execute(select(Ticket.status).order_by(Ticket.ticket_number))
+        ).scalars().all()
+        counters = (await session.execute(select(Queue.current_number))).scalars().all()
+    assert sorted(statuses) == sorted(
+        [TicketStatus.NO_SHOW] * 3 + [TicketStatus.IN_PROGRESS]
+    )
+    assert counters == [0, 0]
+
+    stats = await client.get(
+        f"/api/v1/queue/stats/practice/{practice.id}", headers=headers
+    )
+    assert [item["waiting_count"] for item in stats.json()] == [0, 0]
+    assert stats.json()[0]["no_show_today"] == 3
+
+    response = await client.post(
+        f"/api/v1/queue/practice/{practice.id}/close-day",
+        json={"outcome": "completed"},
+        headers=headers,
+    )
+    assert response.status_code == 422
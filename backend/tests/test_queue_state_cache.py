@@ -0,0 +1,266 @@
+"""
+Queue state cache tests.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.models.models import Queue, Ticket, TicketStatus
+from app.schemas.schemas import TicketCreate
+from app.services.queue_service import (
+    call_next_ticket,
+    create_ticket,
+    get_public_queue_summary,
+    get_queue_stats,
+    update_ticket_status,
+)
+from app.services.queue_state_cache import QueueStateCache, get_queue_state_cache
+from app.services.ws_backplane import Backplane
+from tests.test_ws_backplane import HubTransport
+
+
+@pytest.mark.asyncio
+async def test_cache_follows_ticket_transitions(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Cached counts and now-serving follow create/call/complete transitions."""
+    practice, queue = await practice_with_queue()
+    cache = get_queue_state_cache()
+
+    async with async_session_factory() as session:
+        # Warm the cache before any ticket exists
+        summary = await get_public_queue_summary(session, practice.id)
+        assert summary.queues[0].waiting_count == 0
+
+        first = await create_ticket(session, TicketCreate(queue_id=queue.id))
+        await create_ticket(session, TicketCreate(queue_id=queue.id))
+        called = await call_next_ticket(session, queue.id, None)
+        assert called.id == first.id
+        await update_ticket_status(session, first.id, TicketStatus.COMPLETED)
+        second_called = await call_next_ticket(session, queue.id, None)
+
+        misses_before, hits_before = cache.misses, cache.hits
+        summary = await get_public_queue_summary(session, practice.id)
+        stats = await get_queue_stats(session, queue.id)
+
+    assert cache.misses == misses_before
+    assert cache.hits == hits_before + 2
+    assert summary.queues[0].waiting_count == 0
+    assert summary.now_serving_ticket == second_called.ticket_number
+    assert stats.waiting_count == 0
+    assert stats.completed_today == 1
+
+    # A fresh load from the database agrees with the incrementally kept state
+    fresh = QueueStateCache()
+    async with async_session_factory() as session:
+        state = await fresh.get_practice_state(session, practice.id)
+    cached = await cache.get_practice_state(None, practice.id)
+    assert state.counts(queue.id).as_tuple() == cached.counts(queue.id).as_tuple()
+    assert state.now_serving_ticket == cached.now_serving_ticket
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_drift(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Writes that bypass the service are detected and repaired."""
+    practice, queue = await practice_with_queue()
+    cache = get_queue_state_cache()
+
+    async with async_session_factory() as session:
+        await create_ticket(session, TicketCreate(queue_id=queue.id))
+        await create_ticket(session, TicketCreate(queue_id=queue.id))
+        await get_public_queue_summary(session, practice.id)
+
+        await session.execute(
+            update(Ticket)
+            .where(Ticket.queue_id == queue.id)
+            .values(status=TicketStatus.CANCELLED)
+        )
+        await session.commit()
+
+    drift_before = cache.drift
+    assert await cache.reconcile(async_session_factory) >= 1
+    assert cache.drift > drift_before
+
+    async with async_session_factory() as session:
+        summary = await get_public_queue_summary(session, practice.id)
+    assert summary.queues[0].waiting_count == 0
+
+
+async def _add_waiting_ticket(async_session_factory, queue: Queue) -> Ticket:
+    """Commit a waiting ticket directly (as another request would)."""
+    async with async_session_factory() as session:
+        ticket = Ticket(
+            queue_id=queue.id, ticket_number="A-001", status=TicketStatus.WAITING
+        )
+        session.add(ticket)
+        await session.commit()
+        await session.refresh(ticket)
+    return ticket
+
+
+@pytest.mark.asyncio
+async def test_transition_during_load_is_not_lost(
+    async_session_factory, practice_with_queue
+) -> None:
+    """A load that raced with a transition is retried instead of installed."""
+    practice, queue = await practice_with_queue()
+    cache = QueueStateCache()
+    notified: list = []
+    cache.add_listener(notified.append)
+    real_load = cache._load
+    loads = 0
+
+    async def racing_load(db, practice_id):
+        nonlocal loads
+        loads += 1
+        state = await real_load(db, practice_id)
+        if loads == 1:
+            # Committed and applied after the counts were read
+            ticket = await _add_waiting_ticket(async_session_factory, queue)
+            cache.apply_ticket(ticket, None)
+        return state
+
+    cache._load = racing_load
+    async with async_session_factory() as session:
+        state = await cache.get_practice_state(session, practice.id)
+
+    assert loads == 2
+    assert state.counts(queue.id).waiting == 1
+    assert practice.id in notified
+
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_transitions_applied_during_load(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Reconciliation does not overwrite state that changed while it loaded."""
+    practice, queue = await practice_with_queue()
+    cache = QueueStateCache()
+    async with async_session_factory() as session:
+        await cache.get_practice_state(session, practice.id)
+    real_load = cache._load
+
+    async def racing_load(db, practice_id):
+        state = await real_load(db, practice_id)
+        ticket = await _add_waiting_ticket(async_session_factory, queue)
+        cache.apply_ticket(ticket, None)
+        return state
+
+    cache._load = racing_load
+    assert await cache.reconcile(async_session_factory) == 0
+    assert cache._practices[practice.id].counts(queue.id).waiting == 1
+
+
+@pytest.mark.asyncio
+async def test_transition_of_uncached_practice_notifies(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Listeners learn about transitions even if the practice is not cached."""
+    practice, queue = await practice_with_queue()
+    cache = QueueStateCache()
+    notified: list = []
+    cache.add_listener(notified.append)
+    ticket = await _add_waiting_ticket(async_session_factory, queue)
+
+    # Queue never seen: its practice is unknown, so everything is stale
+    cache.apply_ticket(ticket, None)
+    assert notified == [None]
+
+    async with async_session_factory() as session:
+        await cache.get_practice_state(session, practice.id)
+    cache.invalidate(practice.id)
+    notified.clear()
+    cache.apply_ticket(ticket, TicketStatus.WAITING)
+    assert notified == [practice.id]
+
+
+@pytest.mark.asyncio
+async def test_workers_share_transitions_over_backplane(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Other workers' caches follow over the backplane, else at reconciliation."""
+    practice, queue = await practice_with_queue()
+    worker_a = get_queue_state_cache()  # the one queue_service updates
+    worker_b = QueueStateCache()
+    members: list = []
+    backplanes = [Backplane(HubTransport(members), origin) for origin in ("a", "b")]
+    for backplane in backplanes:
+        await backplane.start(lambda *_: None)
+
+    async with async_session_factory() as session:
+        await worker_b.get_practice_state(session, practice.id)
+        # No backplane yet: worker B keeps its stale counts
+        await create_ticket(session, TicketCreate(queue_id=queue.id))
+    assert worker_b._practices[practice.id].counts(queue.id).waiting == 0
+    assert await worker_b.reconcile(async_session_factory) == 1
+    assert worker_b._practices[practice.id].counts(queue.id).waiting == 1
+
+    worker_a.attach_backplane(backplanes[0])
+    worker_b.attach_backplane(backplanes[1])
+    try:
+        async with async_session_factory() as session:
+            await create_ticket(session, TicketCreate(queue_id=queue.id))
+            called = await call_next_ticket(session, queue.id, None)
+            await update_ticket_status(session, called.id, TicketStatus.COMPLETED)
+            await call_next_ticket(session, queue.id, None)
+        await asyncio.sleep(0.01)
+
+        misses = worker_b.misses
+        async with async_session_factory() as session:
+            shared = await worker_b.get_practice_state(session, practice.id)
+            fresh = await QueueStateCache().get_practice_state(session, practice.id)
+        assert worker_b.misses == misses
+        assert shared.counts(queue.id).as_tuple() == fresh.counts(queue.id).as_tuple()
+        assert shared.counts(queue.id).as_tuple() == (0, 1, 0, 1, 0)
+        assert shared.now_serving_ticket == fresh.now_serving_ticket
+
+        # Day close and other wholesale changes drop the other copies
+        worker_a.invalidate(practice.id)
+        await asyncio.sleep(0.01)
+        assert practice.id not in worker_b._practices
+    finally:
+        worker_a.attach_backplane(None)
+        for backplane in backplanes:
+            await backplane.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_load_blocks_only_its_practice(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Cold loads of different practices run in parallel, one per practice."""
+    slow_practice, _ = await practice_with_queue()
+    other_practice, other_queue = await practice_with_queue()
+    cache = QueueStateCache()
+    real_load = cache._load
+    release = asyncio.Event()
+    loads: list[uuid.UUID] = []
+
+    async def load(db, practice_id):
+        loads.append(practice_id)
+        if practice_id == slow_practice.id:
+            await release.wait()
+        return await real_load(db, practice_id)
+
+    cache._load = load
+
+    async def read(practice_id):
+        async with async_session_factory() as session:
+            return await cache.get_practice_state(session, practice_id)
+
+    slow_reads = [asyncio.create_task(read(slow_practice.id)) for _ in range(3)]
+    await asyncio.sleep(0)
+    other = await asyncio.wait_for(read(other_practice.id), timeout=1)
+    assert other_queue.id in other.queues
+    assert not any(task.done() for task in slow_reads)
+
+    release.set()
+    states = await asyncio.gather(*slow_reads)
+    assert all(state is states[0] for state in states)
+    assert loads == [slow_practice.id, other_practice.id]
+    assert cache._load_locks == {} and cache._load_lock_users == {}
@@ -0,0 +1,156 @@
+"""
+Server-Sent Events stream tests.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import app.routers.websocket as websocket_router
+from app.middleware.event_stream import EventStreamMiddleware
+from app.routers.events import _parse_event_id, stream_events
+from app.routers.websocket import ConnectionManager, MessageType
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording sent frames."""
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(text)
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _called(number: str) -> dict:
+    return {"type": MessageType.TICKET_CALLED, "data": {"ticket_number": number}}
+
+
+def _events(chunk: str) -> list[tuple[str | None, dict]]:
+    """Parse SSE frames into (id, message) pairs."""
+    events = []
+    for frame in chunk.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_stream_resumes_from_last_event_id_and_shares_frames(monkeypatch) -> None:
+    """SSE clients get the WebSocket broadcasts, replayed after Last-Event-ID."""
+    manager = ConnectionManager(coalesce_window_ms=0)
+    monkeypatch.setattr(websocket_router, "manager", manager)
+    for number in ("A-001", "A-002"):
+        await manager.broadcast_to_practice("practice-1", _called(number))
+
+    response = await stream_events(
+        "practice-1",
+        topics=None,
+        last_event_id=None,
+        last_event_id_header=f"{manager.epoch}:1",
+    )
+    assert response.media_type == "text/event-stream"
+    assert response.headers["X-Accel-Buffering"] == "no"
+    body = response.body_iterator
+    assert await body.__anext__() == "retry: 3000\n\n"
+
+    # connected, then exactly the missed event, in one chunk
+    connected, missed = _events(await body.__anext__())
+    assert connected[0] is None and connected[1]["type"] == "connected"
+    assert missed == (f"{manager.epoch}:2", {**_called("A-002"), "seq": 2})
+
+    # A live broadcast is the same JSON the WebSocket client receives
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, "practice-1")
+    await manager.broadcast_to_practice("practice-1", _called("A-003"))
+    chunk = await body.__anext__()
+    await asyncio.sleep(0)
+    assert chunk == f"id: {manager.epoch}:3\ndata: {websocket.sent[-1]}\n\n"
+
+    await body.aclose()
+    manager.disconnect(websocket, "practice-1")
+    assert manager.get_connection_count() == 0
+    assert manager._ticker is None
+
+    assert _parse_event_id("3f2a:41") == ("3f2a", 41)
+    assert _parse_event_id("garbage") == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_consultation_topics_are_rejected(monkeypatch) -> None:
+    """Token-protected topics are WebSocket-only; the rest are subscribed."""
+    manager = ConnectionManager(coalesce_window_ms=0)
+    monkeypatch.setattr(websocket_router, "manager", manager)
+
+    response = await stream_events(
+        "practice-1",
+        topics="led,consultation:3f2a",
+        last_event_id=None,
+        last_event_id_header=None,
+    )
+    body = response.body_iterator
+    await body.__anext__()
+    [(_, connected)] = _events(await body.__anext__())
+    assert connected["data"]["subscribed_topics"] == ["led"]
+    assert connected["data"]["rejected_topics"] == ["consultation:3f2a"]
+    await body.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_middleware_caps_streams_and_adds_security_headers() -> None:
+    """Streams beyond the per-client cap get 429; all get security headers."""
+    release = asyncio.Event()
+
+    async def stream_app(scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await release.wait()
+        await send({"type": "http.response.body", "body": b""})
+
+    async def main_app(scope, receive, send) -> None:
+        raise AssertionError("streams must not reach the main stack")
+
+    middleware = EventStreamMiddleware(
+        main_app, stream_app, "/api/v1/events/", max_streams_per_client=2
+    )
+
+    async def request(host: str) -> list[dict]:
+        sent: list[dict] = []
+
+        async def receive() -> dict:
+            return {"type": "http.request", "body": b""}
+
+        async def send(message: dict) -> None:
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/v1/events/practice-1/stream",
+            "headers": [],
+            "query_string": b"",
+            "client": (host, 50000),
+        }
+        await middleware(scope, receive, send)
+        return sent
+
+    open_streams = [asyncio.create_task(request("10.0.0.1")) for _ in range(2)]
+    other_client = asyncio.create_task(request("10.0.0.2"))
+    await asyncio.sleep(0.01)
+    rejected = await request("10.0.0.1")
+    assert rejected[0]["status"] == 429
+    assert (b"retry-after", b"30") in rejected[0]["headers"]
+
+    release.set()
+    for sent in await asyncio.gather(*open_streams, other_client):
+        assert sent[0]["status"] == 200
+        headers = dict(sent[0]["headers"])
+        assert headers[b"x-frame-options"] == b"DENY"
+        assert headers[b"x-content-type-options"] == b"nosniff"
+    assert middleware._open == {}
@@ -0,0 +1,125 @@
+"""
+Wait time estimator tests.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.models import Ticket, TicketStatus, WaitTimeLog
+from app.services.wait_time_estimator import WaitTimeEstimator
+
+
+def test_estimate_follows_call_intervals() -> None:
+    """Call intervals drive the per-position estimate; breaks are ignored."""
+    estimator = WaitTimeEstimator(alpha=0.5)
+    queue_id = uuid.uuid4()
+    start = datetime(2024, 3, 4, 9, 0, tzinfo=timezone.utc)
+
+    assert estimator.estimate_wait(queue_id, 3, fallback_minutes=15, at=start) == 45
+
+    for minute in (0, 4, 8, 12):
+        estimator.observe_call(queue_id, start + timedelta(minutes=minute))
+    # Lunch break is not throughput
+    estimator.observe_call(queue_id, start + timedelta(hours=4))
+
+    assert estimator.minutes_per_ticket(queue_id, at=start) == pytest.approx(4.0)
+    assert estimator.estimate_wait(queue_id, 3, at=start) == 12
+
+
+@pytest.mark.asyncio
+async def test_rebuild_reads_bounded_window(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Startup rebuild replays recent calls and logs only."""
+    now = datetime.now(timezone.utc)
+    practice, queue = await practice_with_queue()
+    async with async_session_factory() as session:
+        recent = now - timedelta(hours=2)
+        for i in range(4):
+            session.add(
+                Ticket(
+                    queue_id=queue.id,
+                    ticket_number=f"A-{i:03d}",
+                    status=TicketStatus.COMPLETED,
+                    called_at=recent + timedelta(minutes=6 * i),
+                    completed_at=recent + timedelta(minutes=6 * i + 5),
+                )
+            )
+        session.add(
+            Ticket(
+                queue_id=queue.id,
+                ticket_number="A-999",
+                status=TicketStatus.COMPLETED,
+                called_at=now - timedelta(days=60),
+                completed_at=now - timedelta(days=60),
+            )
+        )
+        session.add(
+            WaitTimeLog(
+                practice_id=practice.id,
+                queue_id=queue.id,
+                waiting_count=3,
+                average_wait_minutes=18,
+                recorded_at=now - timedelta(days=1),
+            )
+        )
+        await session.commit()
+
+    estimator = WaitTimeEstimator(alpha=0.5)
+    replayed = await estimator.rebuild(async_session_factory, window_days=14)
+
+    # 4 calls, 4 completions and 1 log inside the window
+    assert replayed == 9
+    assert estimator.minutes_per_ticket(queue.id, at=recent) == pytest.approx(6.0)
+
+
+def test_batch_call_divides_interval() -> None:
+    """Tickets called at once share the interval since the previous call."""
+    estimator = WaitTimeEstimator(alpha=0.5)
+    queue_id = uuid.uuid4()
+    start = datetime(2024, 3, 4, 9, 0, tzinfo=timezone.utc)
+
+    estimator.observe_call(queue_id, start)
+    estimator.observe_call(queue_id, start + timedelta(minutes=12), count=3)
+
+    assert estimator.minutes_per_ticket(queue_id, at=start) == pytest.approx(4.0)
+
+
+@pytest.mark.asyncio
+async def test_sync_reads_calls_from_database(
+    async_session_factory, practice_with_queue
+) -> None:
+    """Calls are read from the database, batches grouped by call time."""
+    now = datetime.now(timezone.utc)
+    _, queue = await practice_with_queue()
+
+    # Written by other workers: one call, then a batch of four 20 min later
+    first = now - timedelta(minutes=30)
+    batch = now - timedelta(minutes=10)
+    async with async_session_factory() as session:
+        session.add(
+            Ticket(
+                queue_id=queue.id,
+                ticket_number="A-001",
+                status=TicketStatus.CALLED,
+                called_at=first,
+            )
+        )
+        for i in range(4):
+            session.add(
+                Ticket(
+                    queue_id=queue.id,
+                    ticket_number=f"A-{i + 2:03d}",
+                    status=TicketStatus.CALLED,
+                    called_at=batch,
+                )
+            )
+        await session.commit()
+
+    estimator = WaitTimeEstimator(alpha=0.5)
+    assert await estimator.sync(async_session_factory) == 2
+    assert estimator.minutes_per_ticket(queue.id, at=batch) == pytest.approx(5.0)
+    # Already replayed rows are not read again
+    assert await estimator.sync(async_session_factory) == 0
@@ -0,0 +1,154 @@
+"""
+WebRTC signaling tests (push over WebSocket, bounded TTL store).
+"""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+import app.routers.websocket as websocket_router
+from app.models.models import Practice, User, UserRole
+from app.models.patient_consultation import ConsultationType, PatientConsultation
+from app.routers.websocket import ConnectionManager, MessageType
+from app.services.auth_service import create_access_token, hash_password
+from app.services.webrtc_signaling import SignalRoom, SignalStore
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording sent messages."""
+
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+
+def _user(role: UserRole, email: str) -> User:
+    return User(
+        id=uuid.uuid4(),
+        email=email,
+        hashed_password=hash_password("TestPass123!"),
+        first_name="Test",
+        last_name="User",
+        role=role,
+        is_active=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_signals_are_pushed_to_subscribed_participants(
+    client: AsyncClient, db_session, monkeypatch
+) -> None:
+    """Offers and ICE candidates reach the peer over WebSocket, in seq order."""
+    practice = Practice(
+        id=uuid.uuid4(),
+        name="Praxis Test",
+        address="Teststraße 1, 12345 Teststadt",
+        phone="+49 123 456789",
+        email="praxis@test.de",
+        is_active=True,
+    )
+    patient = _user(UserRole.PATIENT, "patient@example.de")
+    doctor = _user(UserRole.DOCTOR, "doctor@example.de")
+    stranger = _user(UserRole.PATIENT, "stranger@example.de")
+    consultation = PatientConsultation(
+        id=uuid.uuid4(),
+        practice_id=practice.id,
+        patient_id=patient.id,
+        doctor_id=doctor.id,
+        consultation_type=ConsultationType.VIDEO_CALL,
+        subject="Kontrolle",
+    )
+    db_session.add_all([practice, patient, doctor, stranger])
+    await db_session.flush()
+    db_session.add(consultation)
+    await db_session.commit()
+
+    manager = ConnectionManager()
+    monkeypatch.setattr(websocket_router, "manager", manager)
+    topic = f"consultation:{consultation.id}"
+    patient_token = create_access_token(patient.id, patient.role)
+    doctor_headers = {
+        "Authorization": f"Bearer {create_access_token(doctor.id, doctor.role)}"
+    }
+
+    # SDP and ICE candidates only for participants
+    authorize = websocket_router._authorize_topics
+    assert await authorize([topic, "led"], None) == (["led"], [topic])
+    assert await authorize([topic], create_access_token(stranger.id, stranger.role)) == (
+        [],
+        [topic],
+    )
+    topics, rejected = await authorize([topic], patient_token)
+    assert (topics, rejected) == ([topic], [])
+
+    patient_ws = FakeWebSocket()
+    await manager.connect(patient_ws, str(practice.id), topics)
+
+    base = f"/api/v1/consultations/{consultation.id}/signal"
+    response = await client.post(
+        f"{base}/offer", json={"sdp": "v=0", "type": "offer"}, headers=doctor_headers
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        f"{base}/ice",
+        json={"candidate": "candidate:1", "sdp_mid": "0", "sdp_m_line_index": 0},
+        headers=doctor_headers,
+    )
+    assert response.status_code == 200
+    await asyncio.sleep(0)
+
+    pushed = [m["data"] for m in patient_ws.sent if m["type"] == MessageType.WEBRTC_SIGNAL]
+    assert [(s["seq"], s["signal_type"]) for s in pushed] == [
+        (1, "offer"),
+        (2, "ice-candidate"),
+    ]
+    assert pushed[0]["sender_id"] == str(doctor.id)
+
+    # Catching up after a gap
+    response = await client.get(
+        f"{base}/poll",
+        params={"since_seq": 1},
+        headers={"Authorization": f"Bearer {patient_token}"},
+    )
+    assert [s["seq"] for s in response.json()] == [2]
+
+    # A peer joining late gets the pending signals on subscribe
+    late_ws = FakeWebSocket()
+    await manager.connect(late_ws, str(practice.id), topics)
+    await websocket_router._send_topic_snapshots(late_ws, str(practice.id), topics)
+    await asyncio.sleep(0)
+    assert [m["data"]["seq"] for m in late_ws.sent] == [1, 2]
+
+    for websocket in (patient_ws, late_ws):
+        manager.disconnect(websocket, str(practice.id))
+
+
+@pytest.mark.asyncio
+async def test_signal_store_is_bounded_and_expires() -> None:
+    """Rooms keep the newest signals only, and only for the TTL."""
+    store = SignalStore(max_per_room=2, ttl_seconds=0.05)
+    room = SignalRoom(uuid.uuid4(), uuid.uuid4(), uuid.uuid4(), uuid.uuid4())
+    store._rooms[room.consultation_id] = room
+    sender = uuid.uuid4()
+    for n in range(3):
+        store.add(room, "ice-candidate", {"candidate": str(n)}, sender)
+
+    assert [signal.seq for signal in store.since(room)] == [2, 3]
+    assert [signal.seq for signal in store.since(room, 2)] == [3]
+
+    await asyncio.sleep(0.06)
+    assert store.since(room) == []
+    store._sweep()
+    assert store.get(room.consultation_id) is None
+
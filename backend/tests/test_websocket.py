@@ -0,0 +1,381 @@
+"""
+WebSocket fan-out tests.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+import app.routers.websocket as websocket_router
+from app.models.models import Ticket, TicketStatus
+from app.routers.websocket import (
+    ConnectionManager,
+    MessageType,
+    OverflowPolicy,
+    _handle_client_message,
+)
+from app.schemas.schemas import TicketCreate
+from app.services.queue_service import create_ticket
+from app.services.public_summary_cache import get_public_summary_cache
+from app.services.ws_snapshot_cache import TopicSnapshotCache
+
+
+class FakeWebSocket:
+    """WebSocket stand-in recording sent messages; ``stalled`` never completes a send."""
+
+    def __init__(self, stalled: bool = False) -> None:
+        self.stalled = stalled
+        self.sent: list[dict] = []
+        self.closed_with = None
+        self._never = asyncio.Event()
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        if self.stalled:
+            await self._never.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+def _message(msg_type: str, **data) -> dict:
+    return {"type": msg_type, "data": data, "timestamp": "2026-01-01T00:00:00Z"}
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_does_not_delay_others() -> None:
+    """Broadcast returns immediately and fast clients receive despite a stalled one."""
+    manager = ConnectionManager(max_queue=8, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    stalled = FakeWebSocket(stalled=True)
+    fast = [FakeWebSocket() for _ in range(3)]
+    for websocket in [stalled, *fast]:
+        await manager.connect(websocket, "practice-1")
+
+    await asyncio.wait_for(
+        manager.broadcast_to_practice(
+            "practice-1", _message(MessageType.TICKET_CALLED, ticket_number="A-001")
+        ),
+        timeout=0.1,
+    )
+    await asyncio.sleep(0.01)
+
+    assert all(ws.sent[0]["type"] == MessageType.TICKET_CALLED for ws in fast)
+    assert stalled.sent == []
+    for websocket in [stalled, *fast]:
+        manager.disconnect(websocket, "practice-1")
+
+
+async def _flood_stalled_client(policy: str) -> tuple[ConnectionManager, FakeWebSocket]:
+    """Connect a stalled client and broadcast more than its queue holds."""
+    manager = ConnectionManager(max_queue=3, overflow_policy=policy, coalesce_window_ms=0)
+    websocket = FakeWebSocket(stalled=True)
+    await manager.connect(websocket, "practice-1")
+    await manager.broadcast_to_practice("practice-1", _message(MessageType.HEARTBEAT))
+    await asyncio.sleep(0)  # writer takes the first message and stalls
+
+    for minutes in range(5):
+        await manager.broadcast_to_practice(
+            "practice-1",
+            _message(MessageType.WAIT_TIME_UPDATE, queue_id="q1", minutes=minutes),
+        )
+        await manager.broadcast_to_practice(
+            "practice-1", _message(MessageType.TICKET_CALLED, ticket_number=f"A-{minutes}")
+        )
+    return manager, websocket
+
+
+def _queued(manager: ConnectionManager, websocket: FakeWebSocket) -> list[dict]:
+    return [json.loads(entry[1]) for entry in manager._clients[websocket]._queue]
+
+
+@pytest.mark.asyncio
+async def test_overflow_policies() -> None:
+    """Full queues drop the oldest, coalesce state updates or disconnect."""
+    manager, websocket = await _flood_stalled_client(OverflowPolicy.DROP_OLDEST)
+    assert [m["data"] for m in _queued(manager, websocket)] == [
+        {"ticket_number": "A-3"},
+        {"queue_id": "q1", "minutes": 4},
+        {"ticket_number": "A-4"},
+    ]
+    manager.disconnect(websocket, "practice-1")
+
+    # The wait time entry is updated in place instead of queued again
+    manager, websocket = await _flood_stalled_client(OverflowPolicy.COALESCE)
+    assert [m["data"] for m in _queued(manager, websocket)] == [
+        {"queue_id": "q1", "minutes": 4},
+        {"ticket_number": "A-3"},
+        {"ticket_number": "A-4"},
+    ]
+    manager.disconnect(websocket, "practice-1")
+
+    manager, websocket = await _flood_stalled_client(OverflowPolicy.DISCONNECT)
+    await asyncio.sleep(0)
+    assert manager.get_connection_count("practice-1") == 0
+    assert websocket.closed_with == 1013
+
+
+@pytest.mark.asyncio
+async def test_subscribe_unsubscribe_keeps_indexes_in_sync(monkeypatch) -> None:
+    """Runtime (un)subscribe and disconnect update both index directions."""
+    manager = ConnectionManager(coalesce_window_ms=0)
+    monkeypatch.setattr(websocket_router, "manager", manager)
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(first, "practice-1", ["queue:a", "ticket:A-001"])
+    await manager.connect(second, "practice-1", ["queue:a"])
+
+    await _handle_client_message(
+        first, "practice-1", {"type": MessageType.SUBSCRIBE, "data": {"topics": ["led", "led"]}}
+    )
+    await _handle_client_message(
+        first, "practice-1", {"type": MessageType.UNSUBSCRIBE, "data": {"topics": ["queue:a", "x"]}}
+    )
+    client = manager._clients[first]
+    assert client.topics == {"ticket:A-001", "led"}
+    assert {topic for _, topic in manager._topic_subscriptions} == {
+        "queue:a",
+        "ticket:A-001",
+        "led",
+    }
+    assert manager._topic_subscriptions[("practice-1", "queue:a")] == {
+        manager._clients[second]
+    }
+
+    await manager.broadcast_to_topic("led", _message(MessageType.LED_STATUS, segment_id="s1"))
+    await asyncio.sleep(0)
+    assert [m["type"] for m in first.sent] == [
+        "subscribed",
+        "unsubscribed",
+        MessageType.LED_STATUS,
+    ]
+
+    manager.disconnect(first, "practice-1")
+    assert set(manager._topic_subscriptions) == {("practice-1", "queue:a")}
+    manager.disconnect(second, "practice-1")
+    assert manager._topic_subscriptions == {}
+    assert manager._active_connections == {}
+    assert manager.get_connection_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_time_updates_within_window_become_one_frame() -> None:
+    """20 updates of a queue inside the window reach each client once, latest first."""
+    manager = ConnectionManager(coalesce_window_ms=50)
+    clients = [FakeWebSocket() for _ in range(3)]
+    for websocket in clients:
+        await manager.connect(websocket, "practice-1", ["wait_times"])
+
+    for minutes in range(20):
+        await manager.broadcast_to_topic(
+            "wait_times",
+            _message(MessageType.WAIT_TIME_UPDATE, queue_id="q1", minutes=minutes),
+        )
+    await manager.broadcast_to_topic(
+        "wait_times", _message(MessageType.WAIT_TIME_UPDATE, queue_id="q2", minutes=7)
+    )
+    # Not windowed: goes out at once
+    await manager.broadcast_to_practice(
+        "practice-1", _message(MessageType.TICKET_CALLED, ticket_number="A-001")
+    )
+    await asyncio.sleep(0.01)
+    assert [m["type"] for m in clients[0].sent] == [MessageType.TICKET_CALLED]
+
+    await asyncio.sleep(0.08)
+    for websocket in clients:
+        assert [m["data"] for m in websocket.sent[1:]] == [
+            {"queue_id": "q1", "minutes": 19},
+            {"queue_id": "q2", "minutes": 7},
+        ]
+        manager.disconnect(websocket, "practice-1")
+
+
+@pytest.mark.asyncio
+async def test_shared_ticker_heartbeats_and_drops_idle_clients() -> None:
+    """One tick heartbeats every practice once and the wheel expires silent clients."""
+    manager = ConnectionManager(heartbeat_seconds=5, idle_timeout_seconds=10)
+    chatty, silent = FakeWebSocket(), FakeWebSocket()
+    other_practice = FakeWebSocket()
+    await manager.connect(chatty, "practice-1")
+    await manager.connect(silent, "practice-1")
+    await manager.connect(other_practice, "practice-2")
+
+    manager.touch(chatty)
+    manager._on_tick()
+    await asyncio.sleep(0)
+    assert [m["data"]["connections"] for m in chatty.sent] == [2]
+    assert [m["data"]["connections"] for m in other_practice.sent] == [1]
+
+    # Two ticks (10 s) without a message from silent or other_practice
+    manager.touch(chatty)
+    manager._on_tick()
+    await asyncio.sleep(0)
+    assert silent.closed_with == 1001
+    assert other_practice.closed_with == 1001
+    assert chatty.closed_with is None
+    assert manager.get_connection_count() == 1
+    assert manager.get_connection_count("practice-1") == 1
+
+    manager.disconnect(chatty, "practice-1")
+    assert manager._ticker is None
+
+
+@pytest.mark.asyncio
+async def test_reconnect_replays_missed_events_or_asks_for_snapshot() -> None:
+    """A client resuming with since_seq gets exactly the frames it missed."""
+    manager = ConnectionManager(coalesce_window_ms=0, replay_buffer_size=4)
+    for number in ("A-001", "A-002", "A-003"):
+        message = websocket_router.encode_message(
+            _message(MessageType.TICKET_CALLED, ticket_number=number)
+        )
+        await manager.broadcast_to_practice("practice-1", message)
+        await manager.broadcast_to_topic(f"ticket:{number}", message, "practice-1")
+    assert manager.stream_position("practice-1") == 3
+
+    # Missed seq 2 and 3; subscribed to one ticket topic
+    client = FakeWebSocket()
+    await manager.connect(client, "practice-1", ["ticket:A-003"])
+    assert manager.resume(client, 1, manager.epoch)
+    await asyncio.sleep(0)
+    assert [(m["seq"], m["data"]["ticket_number"]) for m in client.sent] == [
+        (2, "A-002"),
+        (3, "A-003"),
+        (3, "A-003"),
+    ]
+
+    # Seq 1 has left the 4-frame buffer; another epoch means another process
+    assert not manager.resume(client, 0, manager.epoch)
+    assert not manager.resume(client, 3, "other-epoch")
+    assert manager.resume(client, 3, manager.epoch)
+    manager.disconnect(client, "practice-1")
+
+    frame = json.loads(await websocket_router._snapshot_frame("practice-1"))
+    assert frame["type"] == MessageType.SNAPSHOT
+    assert frame["data"] is None
+    assert (frame["seq"], frame["epoch"]) == (0, websocket_router.manager.epoch)
+
+
+@pytest.mark.asyncio
+async def test_topic_broadcasts_stay_in_their_practice() -> None:
+    """Ticket numbers repeat across practices; seq never crosses practices."""
+    manager = ConnectionManager(coalesce_window_ms=0)
+    in_a, in_b = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(in_a, "practice-a", ["ticket:A-001", "led"])
+    await manager.connect(in_b, "practice-b", ["ticket:A-001", "led"])
+
+    for _ in range(5):
+        message = websocket_router.encode_message(
+            _message(MessageType.TICKET_CALLED, ticket_number="A-001")
+        )
+        await manager.broadcast_to_practice("practice-a", message)
+        await manager.broadcast_to_topic("ticket:A-001", message, "practice-a")
+    await manager.broadcast_to_topic(
+        "ticket:A-001",
+        _message(MessageType.TICKET_CALLED, ticket_number="A-001"),
+        "practice-b",
+    )
+    # Without a practice: every subscriber, no sequence number
+    await manager.broadcast_to_topic("led", _message(MessageType.LED_STATUS, segment_id="s1"))
+    await asyncio.sleep(0)
+
+    assert [m.get("seq") for m in in_a.sent] == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5, None]
+    assert [m.get("seq") for m in in_b.sent] == [1, None]
+    assert manager.stream_position("practice-b") == 1
+
+    # Resuming in practice B replays B's stream only
+    manager.disconnect(in_b, "practice-b")
+    resumed = FakeWebSocket()
+    await manager.connect(resumed, "practice-b", ["ticket:A-001"])
+    assert manager.resume(resumed, 0, manager.epoch)
+    await asyncio.sleep(0)
+    assert [m["seq"] for m in resumed.sent] == [1]
+
+    manager.disconnect(in_a, "practice-a")
+    manager.disconnect(resumed, "practice-b")
+
+
+class _NoDatabase:
+    """Session factory standing in for the database once the cache is warm."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    async def execute(self, *args, **kwargs):
+        raise AssertionError("snapshot should come from the cache")
+
+
+@pytest.mark.asyncio
+async def test_subscription_snapshots_come_from_cached_state(
+    db_session, practice_with_queue, monkeypatch
+) -> None:
+    """queue:, ticket: and wait_times subscriptions start with their state."""
+    practice, queue = await practice_with_queue("Allgemein")
+    ticket = await create_ticket(db_session, TicketCreate(queue_id=queue.id))
+
+    manager = ConnectionManager()
+    monkeypatch.setattr(websocket_router, "manager", manager)
+    topics = [f"queue:{queue.id}", f"ticket:{ticket.ticket_number}", "wait_times", "led"]
+
+    async def snapshots() -> dict[str, dict]:
+        client = FakeWebSocket()
+        await manager.connect(client, str(practice.id), topics)
+        await websocket_router._send_topic_snapshots(client, str(practice.id), topics)
+        await asyncio.sleep(0)
+        manager.disconnect(client, str(practice.id))
+        assert {m["type"] for m in client.sent} == {MessageType.SNAPSHOT}
+        return {m["topic"]: m["data"] for m in client.sent}
+
+    first = await snapshots()
+    assert set(first) == set(topics[:3])
+    assert first[f"queue:{queue.id}"]["waiting_count"] == 1
+    assert first[f"ticket:{ticket.ticket_number}"]["status"] == "waiting"
+    assert first["wait_times"]["queues"][0]["waiting_count"] == 1
+
+    # Warm cache: the next connection needs no database at all
+    monkeypatch.setattr(websocket_router, "async_session_maker", _NoDatabase)
+    assert await snapshots() == first
+
+
+@pytest.mark.asyncio
+async def test_ticket_snapshot_ignores_earlier_days(
+    db_session, practice_with_queue
+) -> None:
+    """Only an open ticket is a snapshot; misses are not looked up again soon."""
+    practice, queue = await practice_with_queue("Allgemein")
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    # Yesterday's A-001, before the day close reset the numbers
+    db_session.add(
+        Ticket(
+            queue_id=queue.id,
+            ticket_number="A-001",
+            status=TicketStatus.COMPLETED,
+            created_at=yesterday,
+            completed_at=yesterday,
+        )
+    )
+    await db_session.commit()
+    cache = TopicSnapshotCache(get_public_summary_cache())
+    statements = 0
+
+    @event.listens_for(db_session.bind.sync_engine, "before_cursor_execute")
+    def _count(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    for _ in range(3):
+        assert await cache.get(db_session, practice.id, ["ticket:A-001"]) == {}
+    assert statements == 1
+
+    # Today's A-001 arrives as an event
+    cache.remember_ticket(str(practice.id), {"ticket_number": "A-001", "status": "waiting"})
+    states = await cache.get(db_session, practice.id, ["ticket:a-001"])
+    assert json.loads(states["ticket:a-001"])["status"] == "waiting"
+    assert statements == 1
+    event.remove(db_session.bind.sync_engine, "before_cursor_execute", _count)
@@ -273,12 +273,15 @@ class WebRTCIceCandidate {
 
 /// Generic WebRTC Signal for polling.
 class WebRTCSignal {
+  /// Sequence number within the consultation room.
+  final int seq;
   final String signalType;
   final Map<String, dynamic> payload;
   final String senderId;
   final DateTime timestamp;
   
   const WebRTCSignal({
+    this.seq = 0,
     required this.signalType,
     required this.payload,
     required this.senderId,
@@ -286,6 +289,7 @@ class WebRTCSignal {
   });
   
   factory WebRTCSignal.fromJson(Map<String, dynamic> json) => WebRTCSignal(
+    seq: json['seq'] as int? ?? 0,
     signalType: json['signal_type'] as String,
     payload: json['payload'] as Map<String, dynamic>,
     senderId: json['sender_id'] as String,
@@ -293,6 +297,7 @@ class WebRTCSignal {
   );
   
   Map<String, dynamic> toJson() => {
+    'seq': seq,
     'signal_type': signalType,
     'payload': payload,
     'sender_id': senderId,
@@ -226,17 +226,25 @@ class ConsultationService {
 
   /// Pollt nach neuen WebRTC Signals vom Peer.
   ///
+  /// Signals werden auch per WebSocket auf dem Topic
+  /// `consultation:{id}` gepusht; Polling dient zum Nachholen.
+  ///
   /// Args:
   ///   consultationId: ID der Konsultation.
-  ///   since: Nur Signals nach diesem Zeitstempel.
+  ///   sinceSeq: Nur Signals nach dieser Sequenznummer.
+  ///   since: Nur Signals nach diesem Zeitstempel (veraltet).
   ///
   /// Returns:
   ///   Liste der neuen Signals.
   Future<List<WebRTCSignal>> pollSignals(
     String consultationId, {
+    int? sinceSeq,
     DateTime? since,
   }) async {
     final queryParams = <String, dynamic>{};
+    if (sinceSeq != null) {
+      queryParams['since_seq'] = sinceSeq;
+    }
     if (since != null) {
       queryParams['since'] = since.toUtc().toIso8601String();
     }
@@ -16,6 +16,7 @@ class WSMessageType {
   static const systemNotification = 'system.notification';
   static const heartbeat = 'heartbeat';
   static const connected = 'connected';
+  static const snapshot = 'snapshot';
   static const error = 'error';
   
   // Client -> Server
@@ -30,11 +31,15 @@ class WSMessage {
     required this.type,
     required this.data,
     required this.timestamp,
+    this.topic,
   });
 
   final String type;
   final Map<String, dynamic> data;
   final DateTime timestamp;
+
+  /// Topic of a subscription snapshot (null for other messages).
+  final String? topic;
 }
 
 /// Connection established message.
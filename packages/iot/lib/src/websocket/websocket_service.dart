@@ -10,7 +10,9 @@ import 'event_models.dart';
 /// WebSocket service for real-time events.
 /// 
 /// Connects to backend WebSocket and provides streams for various event types.
-/// Supports automatic reconnection with exponential backoff.
+/// Supports automatic reconnection with exponential backoff. Reconnects
+/// resume from the last received sequence number, so the server replays
+/// only the missed events (or sends one snapshot).
 /// 
 /// Usage:
 /// ```dart
@@ -43,6 +45,10 @@ class WebSocketService {
   String? _currentPracticeId;
   List<String>? _currentTopics;
   
+  // Resume position: server epoch and last sequence number received
+  String? _epoch;
+  int? _lastSeq;
+  
   // State controller
   final _stateController = StreamController<WSConnectionState>.broadcast();
   
@@ -84,14 +90,25 @@ class WebSocketService {
     List<String>? topics,
   }) async {
     _intentionalDisconnect = false;
+    if (practiceId != _currentPracticeId) {
+      _epoch = null;
+      _lastSeq = null;
+    }
     _currentPracticeId = practiceId;
     _currentTopics = topics;
     
     _stateController.add(const WSConnectionState.connecting());
     
     try {
-      final topicsParam = topics != null ? '?topics=${topics.join(",")}' : '';
-      final uri = Uri.parse('$baseUrl/api/v1/ws/events/$practiceId$topicsParam');
+      final params = <String>[
+        if (topics != null) 'topics=${topics.join(",")}',
+        if (_epoch != null && _lastSeq != null) ...[
+          'since_seq=$_lastSeq',
+          'epoch=$_epoch',
+        ],
+      ];
+      final query = params.isEmpty ? '' : '?${params.join("&")}';
+      final uri = Uri.parse('$baseUrl/api/v1/ws/events/$practiceId$query');
       
       _channel = WebSocketChannel.connect(uri);
       
@@ -186,10 +203,16 @@ class WebSocketService {
         timestamp = DateTime.now();
       }
       
+      final seq = json['seq'];
+      if (seq is int && seq > (_lastSeq ?? 0)) {
+        _lastSeq = seq;
+      }
+      
       final message = WSMessage(
         type: json['type'] as String,
-        data: json['data'] as Map<String, dynamic>,
+        data: (json['data'] as Map<String, dynamic>?) ?? const {},
         timestamp: timestamp,
+        topic: json['topic'] as String?,
       );
       
       _rawMessageController.add(message);
@@ -232,9 +255,23 @@ class WebSocketService {
         break;
         
       case WSMessageType.connected:
+        final epoch = message.data['epoch']?.toString();
+        if (epoch != _epoch) {
+          // New server process: its sequence starts from here
+          _epoch = epoch;
+          _lastSeq = message.data['seq'] as int?;
+        }
         debugPrint('WebSocket: Connected confirmation received');
         break;
         
+      case WSMessageType.snapshot:
+        // With a topic: initial state of a queue:/ticket:/wait_times
+        // subscription. Without: missed events could not be replayed and
+        // data is the queue summary (empty: reload over REST). Listeners
+        // of rawMessages rebuild their state from it.
+        debugPrint('WebSocket: Snapshot received (${message.topic ?? "resync"})');
+        break;
+        
       case WSMessageType.heartbeat:
         // Heartbeat received, connection is alive
         break;